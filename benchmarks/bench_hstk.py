@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for hstk, run from the top of the source tree:
+
+    python benchmarks/bench_hstk.py [--quick] [-o bench_output.json]
+
+Measures
+    hsscript   command builder calls per second and seconds per million calls
+    startup    wall time of a fresh interpreter importing hstk.hscli, and of
+               'hs --help' through the hstk.hsserve:main entry point, next to
+               a bare interpreter for reference
+    cli        end to end latency of hs commands through click's CliRunner
+    gateway    paths per second through the gateway at several --jobs levels,
+               and at the same --pipeline levels with one job,
+               against a scratch directory (the 'file' transport, where reading
+               the gateway file back just returns the command) and against the
+               simulator
+
+Results are written as one JSON document so releases can be compared.
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+from click.testing import CliRunner
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hstk.hscli as hscli  # noqa: E402
+import hstk.hsscript as hss  # noqa: E402
+
+
+def _result(group, name, unit, value, **params):
+    return { 'group': group, 'name': name, 'unit': unit, 'value': value, 'params': params }
+
+
+def _timed_calls(func, calls):
+    """ Seconds per call for func() called calls times, best of 3 """
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / calls
+
+
+def bench_hsscript(calls):
+    exp = hss.HSExp('blue', string=True)
+    builders = {
+            'attribute_set': lambda: hss.attribute_set('color', exp),
+            'objective_add': lambda: hss.objective_add('keep-online', hss.HSExp('true')),
+            'eval': lambda: hss.eval(hss.HSExp('SIZE'), recursive=True, json=True),
+            '_clean_str': lambda: hss._clean_str('?.eval attributes/with "quotes"|and*more'),
+        }
+    ret = []
+    for name, func in builders.items():
+        per_call = _timed_calls(func, calls)
+        ret.append(_result('hsscript', name, 'calls/s', 1 / per_call, calls=calls))
+        ret.append(_result('hsscript', name, 's/million calls', per_call * 1000000, calls=calls))
+    return ret
+
+
+def _make_tree(root, nfiles):
+    paths = []
+    for i in range(nfiles):
+        dname = os.path.join(root, 'dir%d' % (i % 10))
+        os.makedirs(dname, exist_ok=True)
+        fname = os.path.join(dname, 'file%d' % (i))
+        with open(fname, 'w') as fd:
+            fd.write(fname)
+        paths.append(fname)
+    return paths
+
+
+def bench_startup(runs):
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([src_dir] + [p for p in [env.get('PYTHONPATH')] if p])
+    env['HS_NO_DAEMON'] = '1'
+    programs = {
+            'python': 'pass',
+            'import hstk.hscli': 'import hstk.hscli',
+            'hs --help': 'import hstk.hsserve as s; s.main(["--help"])',
+        }
+    ret = []
+    for name, code in programs.items():
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], env=env, stdout=subprocess.DEVNULL, check=True)
+            times.append(time.perf_counter() - start)
+        ret.append(_result('startup', name, 'ms median', statistics.median(times) * 1000, runs=runs))
+    return ret
+
+
+def _invoke(runner, args):
+    res = runner.invoke(hscli.cli, args)
+    if res.exit_code != 0:
+        raise RuntimeError('hs %s failed (%d): %s' % (' '.join(args), res.exit_code, res.output))
+    return res
+
+
+def bench_cli(root, runs):
+    runner = CliRunner()
+    fname = _make_tree(root, 1)[0]
+    commands = {
+            'eval': ['--gateway', 'sim', 'eval', '-e', 'SIZE', fname],
+            'tag set': ['--gateway', 'sim', 'tag', 'set', 'color', '-e', 'blue', '-s', fname],
+            'eval dry-run': ['-n', 'eval', '-e', 'SIZE', fname],
+        }
+    ret = []
+    for name, args in commands.items():
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            _invoke(runner, args)
+            times.append(time.perf_counter() - start)
+        times.sort()
+        ret.append(_result('cli', name, 'ms median', statistics.median(times) * 1000, runs=runs))
+        ret.append(_result('cli', name, 'ms max', times[-1] * 1000, runs=runs))
+    return ret
+
+
+def bench_gateway(root, nfiles, jobs_levels, latency):
+    runner = CliRunner()
+    paths = _make_tree(root, nfiles)
+    ret = []
+    for gateway in ('file', 'sim:latency=%g' % (latency)):
+        for jobs in jobs_levels:
+            args = ['--gateway', gateway, '--jobs', str(jobs), 'eval', '-e', 'SIZE'] + paths
+            start = time.perf_counter()
+            _invoke(runner, args)
+            elapsed = time.perf_counter() - start
+            ret.append(_result('gateway', gateway, 'paths/s', nfiles / elapsed, jobs=jobs, paths=nfiles))
+        # The same levels from one thread, written ahead with --pipeline
+        for pipeline in jobs_levels[1:]:
+            args = ['--gateway', gateway, '--pipeline', str(pipeline), 'eval', '-e', 'SIZE'] + paths
+            start = time.perf_counter()
+            _invoke(runner, args)
+            elapsed = time.perf_counter() - start
+            ret.append(_result('gateway', gateway, 'paths/s', nfiles / elapsed, jobs=1, pipeline=pipeline, paths=nfiles))
+    return ret
+
+
+@click.command(help="Run the hstk benchmarks and write the results as JSON")
+@click.option('-o', '--output', default='bench_output.json', type=click.Path(dir_okay=False), help="Results file, - for stdout")
+@click.option('--quick', is_flag=True, help="Few iterations, to check the benchmarks work")
+@click.option('--only', type=click.Choice(['hsscript', 'startup', 'cli', 'gateway']), multiple=True, help="Run only these groups")
+def main(output, quick, only):
+    if quick:
+        calls, runs, nfiles, jobs_levels, latency = 1000, 3, 20, (1, 4), 0.0
+    else:
+        calls, runs, nfiles, jobs_levels, latency = 100000, 50, 500, (1, 2, 4, 8, 16, 32), 0.001
+
+    results = []
+    root = tempfile.mkdtemp(prefix='hstk-bench-')
+    try:
+        if not only or 'hsscript' in only:
+            results += bench_hsscript(calls)
+        if not only or 'startup' in only:
+            results += bench_startup(runs)
+        if not only or 'cli' in only:
+            results += bench_cli(os.path.join(root, 'cli'), runs)
+        if not only or 'gateway' in only:
+            results += bench_gateway(os.path.join(root, 'gateway'), nfiles, jobs_levels, latency)
+    finally:
+        shutil.rmtree(root)
+
+    version = 'unknown'
+    version_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(hscli.__file__))), 'VERSION')
+    if os.path.isfile(version_file):
+        with open(version_file) as fd:
+            version = fd.readline().strip()
+    doc = {
+            'hstk_version': version,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'quick': quick,
+            'results': results,
+        }
+    with click.open_file(output, 'w') as fd:
+        json.dump(doc, fd, indent=4)
+        fd.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+"""
+Hammerspace toolkit: the hs cli (hstk.hscli) and hstk.Client, the python
+API to the same shadow commands, see hstk.hsclient.  Nothing is imported
+until it is used, use "from hstk.hsclient import Client" on python 3.6.
+"""
+
+
+def __getattr__(name):
+    if name == 'Client':
+        from hstk.hsclient import Client
+        return Client
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
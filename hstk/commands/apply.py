@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+apply subcommand, bulk metadata changes from a CSV or JSONL manifest
+"""
+
+import csv
+import json
+import os
+import sys
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        ShadCmd,
+        ordered_pool_map,
+)
+
+MANIFEST_FIELDS = ('path', 'type', 'name', 'value', 'op', 'flags')
+MANIFEST_FLAGS = ('recursive', 'nonfiles', 'unbound', 'string', 'json', 'force')
+
+# (metadata type, op) -> hsscript generator, the first op listed for a type is its default
+MANIFEST_OPS = {
+        'attribute': { 'set': hss.attribute_set, 'delete': hss.attribute_del },
+        'tag': { 'set': hss.tag_set, 'delete': hss.tag_del },
+        'rekognition_tag': { 'set': hss.rekognition_tag_set, 'delete': hss.rekognition_tag_del },
+        'label': { 'add': hss.label_add, 'delete': hss.label_del },
+        'keyword': { 'add': hss.keyword_add, 'delete': hss.keyword_del },
+        'objective': { 'add': hss.objective_add, 'delete': hss.objective_del },
+        'keep_on_site': { 'add': hss.sites_keep_on_add, 'delete': hss.sites_keep_on_del },
+}
+MANIFEST_OP_ALIASES = { 'add': 'set', 'set': 'add', 'del': 'delete' }
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def read_manifest(fd, fmt):
+    """
+    Yield (row number, row dict) from a text stream of CSV (with a header
+    line) or JSONL without reading the whole manifest in
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(fd)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for lineno, line in enumerate(fd, 1):
+        line = line.strip()
+        if len(line) == 0:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            row = ManifestError('invalid JSON: %s' % (e))
+        yield lineno, row
+
+
+def manifest_kwargs(row):
+    """ Validate a manifest row, return (hsscript generator, ShadCmd kwargs) """
+    if isinstance(row, Exception):
+        raise row
+    if not isinstance(row, dict):
+        raise ManifestError('row must be an object')
+    unknown = set(row.keys()) - set(MANIFEST_FIELDS)
+    if unknown:
+        raise ManifestError('unknown fields: %s' % (', '.join(sorted(str(field) for field in unknown))))
+    for field in ('path', 'type', 'name'):
+        if not row.get(field):
+            raise ManifestError('missing field: %s' % (field))
+    for field in ('path', 'type', 'name', 'op'):
+        if row.get(field) is not None and not isinstance(row[field], str):
+            raise ManifestError('%s must be a string' % (field))
+
+    mdtype = row['type'].replace('-', '_')
+    if mdtype not in MANIFEST_OPS:
+        raise ManifestError('unknown type: %s' % (row['type']))
+    ops = MANIFEST_OPS[mdtype]
+    op = row.get('op') or list(ops.keys())[0]
+    if op not in ops:
+        op = MANIFEST_OP_ALIASES.get(op, op)
+    if op not in ops:
+        raise ManifestError('op %s not valid for type %s, use one of: %s' % (row['op'], mdtype, ', '.join(ops.keys())))
+
+    flags = row.get('flags') or []
+    if isinstance(flags, str):
+        flags = [ flag.strip() for flag in flags.split(',') if flag.strip() ]
+    if not isinstance(flags, list) or not all(isinstance(flag, str) for flag in flags):
+        raise ManifestError('flags must be a list of strings or comma separated')
+    for flag in flags:
+        if flag not in MANIFEST_FLAGS:
+            raise ManifestError('unknown flag: %s' % (flag))
+
+    kwargs = {
+            'pathnames': [ row['path'] ],
+            'name': row['name'],
+            'outstream': None,
+            'string': 'string' in flags,
+            'input_json': 'json' in flags,
+        }
+    for flag in ('recursive', 'nonfiles', 'unbound', 'force'):
+        kwargs[flag] = flag in flags
+    value = row.get('value')
+    if value is not None and value != '':
+        if not isinstance(value, str):
+            value = json.dumps(value)
+        kwargs['exp'] = value
+    return ops[op], kwargs
+
+
+def _group_dir(path):
+    """
+    Batch key for a row, the directory named in its path.  No stat, a
+    directory row sorts in with its parent's, close enough for grouping
+    """
+    return os.path.dirname(os.path.normpath(path))
+
+
+def _batches(rows, batch_size):
+    """
+    Group rows in batches of batch_size by the directory holding their
+    gateway file, so commands against one directory are sent together
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            batch.sort(key=lambda r: r[1])
+            for row in batch:
+                yield row
+            batch = []
+    batch.sort(key=lambda r: r[1])
+    for row in batch:
+        yield row
+
+
+@click.command(name='apply', help="Bulk apply metadata changes listed in a CSV or JSONL manifest")
+@click.argument('manifest', type=click.File('r'))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), default=None, help="Manifest format, default from the file extension or jsonl")
+@click.option('--batch', type=click.IntRange(min=1), default=1024, help="Rows read at a time and grouped by directory")
+@click.pass_context
+def do_apply(ctx, manifest, fmt, batch):
+    """
+    Each manifest row has the fields path, type, name, value, op and flags.
+
+    \b
+    type:  attribute, tag, rekognition_tag, label, keyword, objective or keep_on_site
+    op:    set (attribute and tags) or add (others), or delete, default is set/add
+    value: expression for set/add, as with -e, optional for delete
+    flags: list or comma separated, of recursive, nonfiles, unbound, string, json, force
+
+    \b
+    ex: {"path": "a/b.mov", "type": "tag", "name": "color", "value": "blue", "flags": "string"}
+
+    Rows run concurrently with the global --jobs.  A status line is printed
+    for every row, with anything its command printed, a row fails when
+    it is invalid or its command couldn't be sent, exit status is 1 if any
+    row failed.
+    """
+    if fmt is None:
+        if manifest.name.endswith('.csv'):
+            fmt = 'csv'
+        else:
+            fmt = 'jsonl'
+
+    def _prepare(rows):
+        # Build the commands here in the main thread, ShadCmd needs the click context
+        for lineno, row in rows:
+            try:
+                shadgen, kwargs = manifest_kwargs(row)
+                cmd = ShadCmd(shadgen, kwargs)
+                yield (lineno, _group_dir(kwargs['pathnames'][0]), row, cmd, None)
+            except (ManifestError, RuntimeError, click.UsageError) as e:
+                yield (lineno, '', row, None, e)
+
+    def _run(item):
+        lineno, _, row, cmd, err = item
+        lines = []
+        if err is None:
+            try:
+                path = next(iter(cmd.paths))
+                lines = cmd.run_cmd_in_ctx(path)
+            except (OSError, RuntimeError) as e:
+                err = e
+        return lineno, row, lines, err
+
+    failed = 0
+    rows = _batches(_prepare(read_manifest(manifest, fmt)), batch)
+    for lineno, row, lines, err in ordered_pool_map(_run, rows, ctx.obj.jobs_or(1)):
+        if isinstance(row, dict):
+            path, mdtype, name = row.get('path'), row.get('type'), row.get('name')
+        else:
+            path, mdtype, name = None, None, None
+        output = ''.join(lines).rstrip('\n')
+        status = 'ok'
+        if err is not None:
+            failed += 1
+            status = 'error'
+        if ctx.obj.output_json:
+            res = { 'row': lineno, 'status': status, 'path': path, 'type': mdtype, 'name': name }
+            if err is not None:
+                res['error'] = str(err)
+            if output:
+                res['output'] = output
+            click.echo(json.dumps(res))
+        else:
+            msg = ''
+            if err is not None:
+                msg = ': ' + str(err)
+            elif output:
+                msg = ': ' + output
+            click.echo('%d %s %s %s %s%s' % (lineno, status, path, mdtype, name, msg))
+
+    if failed:
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+attribute subcommands
+"""
+
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        OrderedGroup,
+        _cmd_retcode,
+        param_defaults,
+        param_recursive,
+        param_nonfiles,
+        param_force,
+        param_eval,
+        param_read,
+        param_name,
+        param_value,
+        param_unbound,
+)
+
+
+attribute_short_help = "[sub] inode metadata: schema no, value yes"
+
+attribute_help = """
+attribute: Manage Hammerspace embedded attribute metadata
+
+Attributes can be defined on the fly, no schema pre-creation required.
+Attributes can also hold a value.  Most values are string type (-s) but may
+also be a number or expression (-e)
+
+  ex: hs attribute set -n color -s blue path/to/file
+"""
+
+@click.group(help=attribute_help, short_help=attribute_short_help, cls=OrderedGroup)
+def attribute():
+    attribute_short_help + '\n\n' + attribute_help
+    pass
+
+@attribute.command(name='list', help="list all attributes and values applied")
+@param_eval
+@param_read
+@param_defaults
+def do_attribute_list(ctx, *args, **kwargs):
+    _cmd_retcode(hss.attribute_list, **kwargs)
+
+@attribute.command(name='get', help="Get the attribute's value")
+@param_eval
+@param_read
+@param_name
+@param_unbound
+@param_defaults
+def do_attribute_get(ctx, *args, **kwargs):
+    _cmd_retcode(hss.attribute_get, **kwargs)
+
+@attribute.command(name='has', help="Is the inode's attribute value non-empty")
+@param_eval
+@param_read
+@param_name
+@param_defaults
+def do_attribute_has(ctx, *args, **kwargs):
+    _cmd_retcode(hss.attribute_get, **kwargs)
+
+@attribute.command(name='delete', help="remove attribute values from inode(s)")
+@param_name
+@param_force
+@param_recursive
+@param_nonfiles
+@param_defaults
+def do_attribute_del(ctx, *args, **kwargs):
+    _cmd_retcode(hss.attribute_del, **kwargs)
+
+@attribute.command(name='set', help="Add/Set value of attribute on inode(s)")
+@param_name
+@param_recursive
+@param_nonfiles
+@param_value
+@param_defaults
+@param_unbound
+def do_attribute_set(ctx, *args, **kwargs):
+    _cmd_retcode(hss.attribute_set, **kwargs)
+
+@attribute.command(name='add', help="Add/Set value of attribute on inode(s)")
+@param_name
+@param_recursive
+@param_nonfiles
+@param_value
+@param_defaults
+@param_unbound
+def do_attribute_add(ctx, *args, **kwargs):
+    _cmd_retcode(hss.attribute_set, **kwargs)
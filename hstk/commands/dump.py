@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+dump subcommands, bulk data dumpers
+"""
+
+import json
+import pprint
+import click
+import hstk.hsscript as hss
+from hstk.hscomplete import complete_catalog
+from hstk.hscli import (
+        OrderedGroup,
+        vnprint,
+        _cmd_retcode,
+        catalog_get,
+        hs_eval_iter,
+        param_path,
+        param_paths,
+        param_sharepaths,
+)
+
+
+@click.group(name='dump', help="[sub] Dump info about various items", cls=OrderedGroup)
+def dump_grp():
+    pass
+
+@dump_grp.command(name='inode', help="inode metadata")
+@click.option('--full', is_flag=True, help="Include all available details")
+@param_paths
+@click.pass_context
+def do_inode_dump(ctx, full, *args, **kwargs):
+    eval_args = {
+            #'force_json': True,
+            'exp': 'DUMP_INODE',
+            'recursive': True,
+            'raw': True,
+            'stream': True,
+        }
+    if full:
+        eval_args['exp'] = "THIS"
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@dump_grp.command(name='iinfo', help="Alternative inode details, always in JSON format")
+@param_paths
+@click.pass_context
+def do_inode_info(ctx, *args, **kwargs):
+    _cmd_retcode(hss.inode_info, **kwargs)
+
+@dump_grp.command(name='share', help="Full share(s) metadata")
+@click.option('--filter-volume', nargs=1, help="Only report files that have an instance on this volume, provide volume name")
+@param_sharepaths
+@click.pass_context
+def do_share_dump(ctx, filter_volume, *args, **kwargs):
+    eval_args = {
+            'exp': 'DUMP_INODE',
+            'recursive': True,
+            'raw': True,
+            'stream': True,
+        }
+    kwargs.update(eval_args)
+    if filter_volume is not None:
+        kwargs['exp'] = 'dump_inode_on(storage_volume("%s"))' % (filter_volume)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@dump_grp.command(name='misaligned', help="Dump details about misaligned files on the share(s)")
+@param_sharepaths
+@click.pass_context
+def do_misaligned_files(ctx, *args, **kwargs):
+    eval_args = {
+            'exp': 'IS_FILE and overall_alignment!=alignment("aligned")?dump_inode',
+            'recursive': True,
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@dump_grp.command(name='threat', help="Dump details about files that are a virus threat on the share(s)")
+@param_sharepaths
+@click.pass_context
+def do_threat_files(ctx, *args, **kwargs):
+    eval_args = {
+            'exp': 'IS_FILE and attributes.virus_scan==virus_scan_state("THREAT")?dump_inode',
+            'recursive': True,
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@dump_grp.command(name='map_file_to_obj', help="For --native object volumes, dump a mapping between file path and object volume path")
+@click.argument('bucket_name', nargs=1, required=True)
+@param_sharepaths
+@click.pass_context
+def do_dump_map_file_to_obj(ctx, bucket_name, *args, **kwargs):
+    eval_args = {
+            'exp': '{instances[|volume=storage_volume("%s")],!ISNA(#A)?{PATH,#A.PATH}}.#B' % (bucket_name),
+            'recursive': True,
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@dump_grp.command(name='files_on_volume', help="List all files that have data on the specified volume per share(s)")
+@click.argument('volume_name', nargs=1, required=True, shell_complete=complete_catalog('volumes'))
+@param_sharepaths
+@click.pass_context
+def do_dump_files_on_volume(ctx, volume_name, *args, **kwargs):
+    eval_args = {
+            'exp': '{instances[|volume=storage_volume("%s")],!ISNA(#A)?{PATH}}.#B' % (volume_name),
+            'recursive': True,
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+param_refresh = click.option('--refresh', is_flag=True, help="Read the list from the cluster rather than the catalog cache")
+
+
+def _fetch_volumes(path, kwargs):
+    # Another option to do the volume select:
+    # exp: "(INDEXED_TABLE{|::#A=STORAGE_VOLUMES[ROW].VOLUME_STATUS!=STORAGE_VOLUME_STATUS('REMOVED'),|::#B=STORAGE_VOLUMES[ROW].NAME}[ROWS(STORAGE_VOLUMES)])[|#A=TRUE].#B" .
+    # This builds an indexed table with the first column(#A)  being the
+    # predicate and the second column (#B) being the volume name.  The table is
+    # the same number of rows as there are storage volumes.  Then we select  #B
+    # where #A is true
+    #
+    # The |::<col>= syntax is how you set every row in the column to a specific formula.
+    # So :: means every row.
+    kwargs['pathnames'] = [ path ]
+    eval_args = {
+            'exp': 'STORAGE_VOLUMES',
+            'force_json': True,
+        }
+    kwargs.update(eval_args)
+    json_res = ( row for _, row in hs_eval_iter(**kwargs) )
+
+    volumes = []
+    for vol_json in json_res:
+        if 'VOLUME_STATUS' not in vol_json:
+            if 'Data Mover' not in vol_json['NAME']:
+                print()
+                print("ERROR, VOLUME_STATUS not found in")
+                pprint.pprint(vol_json)
+            continue
+        if vol_json['VOLUME_STATUS']['HAMMERSCRIPT'] != "STORAGE_VOLUME_STATUS('REMOVED')":
+            volumes.append(vol_json['NAME'])
+    return volumes
+
+def _fetch_volume_groups(path, kwargs):
+    kwargs['pathnames'] = [ path ]
+    eval_args = {
+            'exp': 'VOLUME_GROUPS.NAME',
+            'force_json': True,
+        }
+    kwargs.update(eval_args)
+    json_res = ( row for _, row in hs_eval_iter(**kwargs) )
+
+    vgs = []
+    for vg_json in json_res:
+        vgs.append(vg_json['NAME'])
+    return vgs
+
+def _fetch_objectives(path, kwargs):
+    kwargs['pathnames'] = [ path ]
+    eval_args = {
+            'exp': 'SMART_OBJECTIVES.NAME',
+            'force_json': True,
+        }
+    kwargs.update(eval_args)
+    json_res = ( row for _, row in hs_eval_iter(**kwargs) )
+
+    objs = []
+    for obj_json in json_res:
+        if obj_json['NAME'].startswith('__z_objective'):
+            # deleted objective
+            continue
+        objs.append(obj_json['NAME'])
+    return objs
+
+def _print_list(ctx, names):
+    if ctx.obj.output_json:
+        print(json.dumps(names))
+    else:
+        print('\n'.join(names))
+
+@dump_grp.command(name='volumes', help="List available volumes in the cluster")
+@param_refresh
+@param_path
+@click.pass_context
+def do_dump_volume_list(ctx, path, refresh, *args, **kwargs):
+    volumes = catalog_get('volumes', path, lambda: _fetch_volumes(path, kwargs), refresh=refresh)
+    _print_list(ctx, volumes)
+
+@dump_grp.command(name='volume_groups', help="List available volume_groups")
+@param_refresh
+@param_path
+@click.pass_context
+def do_dump_volume_group_list(ctx, path, refresh, *args, **kwargs):
+    vgs = catalog_get('volume_groups', path, lambda: _fetch_volume_groups(path, kwargs), refresh=refresh)
+    _print_list(ctx, vgs)
+
+@dump_grp.command(name='objectives', help="List available objectives")
+@param_refresh
+@param_path
+@click.pass_context
+def do_dump_objectives_list(ctx, path, refresh, *args, **kwargs):
+    objs = catalog_get('objectives', path, lambda: _fetch_objectives(path, kwargs), refresh=refresh)
+    _print_list(ctx, objs)
+
+@dump_grp.command(name='clear_catalog', help="Forget the cached volume, volume group, objective and site lists of share(s)")
+@param_sharepaths
+@click.pass_context
+def do_dump_clear_catalog(ctx, *args, **kwargs):
+    import hstk.hscatalog as hscatalog
+    for path in kwargs['pathnames']:
+        catalog = hscatalog.Catalog(path, cache_dir=ctx.obj.catalog_dir)
+        if ctx.obj.dry_run:
+            vnprint('dry run, not removing cached lists in ' + catalog.path)
+            continue
+        vnprint('removing cached lists in ' + catalog.path)
+        catalog.invalidate()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+eval, sum and collsum subcommands
+"""
+
+import sys
+import json
+import shutil
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        PathStream,
+        ShadCmd,
+        _cmd_retcode,
+        param_defaults,
+        param_sharepaths,
+        param_eval,
+        param_sum,
+        param_value,
+)
+
+# Subtrees run at once by --fan-out unless --jobs is given
+FAN_OUT_JOBS = 8
+
+param_fan_out = click.option('--fan-out', type=click.IntRange(min=1), metavar='DEPTH',
+        help="Send the command for each subtree DEPTH directory levels down and run them concurrently, "
+            "--jobs at a time (%d unless --jobs is given)" % (FAN_OUT_JOBS))
+
+
+def _fan_out(shadgen, kwargs):
+    """
+    Run shadgen for the --fan-out subtrees of each path, yields (path,
+    spooled results) for every subtree in order, see ShadCmd.iter_spooled()
+    """
+    import hstk.hsfanout as hsfanout
+    groups = []
+    subpaths = []
+    for path in kwargs['pathnames']:
+        subs = hsfanout.subtrees(path, kwargs['fan_out']) or [ path ]
+        groups.append((path, len(subs)))
+        subpaths.extend(subs)
+    kwargs['pathnames'] = subpaths
+    cmd = ShadCmd(shadgen, kwargs)
+    cmd.jobs = click.get_current_context().obj.jobs_or(FAN_OUT_JOBS)
+    results = cmd.iter_spooled()
+    for path, count in groups:
+        yield path, ( spool for _, (_, spool) in zip(range(count), results) )
+
+def _fan_out_exit(pathnames):
+    if isinstance(pathnames, PathStream) and pathnames.missing > 0:
+        sys.exit(1)
+    sys.exit(0)
+
+
+@click.command(name='eval', help="Evaluate hsscript expressions on a file")
+@click.option('--interactive', is_flag=True, help="Interactivly read expressions from terminal and apply live")
+@param_fan_out
+@param_eval
+@param_value
+@param_defaults
+def do_eval(ctx, *args, **kwargs):
+    if kwargs['interactive']:
+        kwargs['exp_stdin'] = True
+        while True:
+            cmd = ShadCmd(hss.eval, kwargs)
+            cmd.run()
+    if kwargs['fan_out'] is not None:
+        if kwargs['nonfiles']:
+            raise click.UsageError('--fan-out only splits up file walks, it can not be used with --nonfiles')
+        kwargs['recursive'] = True
+        pathnames = kwargs['pathnames']
+        print_filenames = isinstance(pathnames, PathStream) or len(pathnames) > 1
+        for path, spools in _fan_out(hss.eval, kwargs):
+            if print_filenames:
+                sys.stdout.write(f'##### {path}\n')
+            for spool in spools:
+                with spool:
+                    shutil.copyfileobj(spool, sys.stdout)
+            sys.stdout.flush()
+        _fan_out_exit(pathnames)
+    if kwargs['recursive'] or kwargs['nonfiles']:
+        # Recursive results can be any size, don't buffer them.  Streamed one
+        # path at a time, or spooled to temp files to run --jobs at once
+        if ctx.obj.pipeline > 1:
+            raise click.UsageError('--pipeline reads each result whole, it can not be used with --recursive or --nonfiles, use --jobs')
+        kwargs['spool'] = True
+    try:
+        cmd = ShadCmd(hss.eval, kwargs)
+    except ValueError:
+        print(ctx.get_help())
+        print('\n')
+        raise click.UsageError('Must provide expression (-e, -i, --interactive) to eval command')
+    cmd.run()
+    sys.exit(cmd.exit_status)
+
+@click.command(name='sum', help="Perform fast calculations on a set of files, --fan-out combines counts and sums, always as JSON")
+@param_fan_out
+@param_sum
+@param_value
+@param_defaults
+def do_sum(ctx, *args, **kwargs):
+    if kwargs['fan_out'] is not None:
+        _fan_out_sum(ctx, kwargs)
+    try:
+        cmd = ShadCmd(hss.sum, kwargs)
+    except ValueError:
+        print(ctx.get_help())
+        print('\n')
+        raise click.UsageError('Must provide expression (-e, -i, --interactive) to sum command')
+    cmd.run()
+    sys.exit(cmd.exit_status)
+
+def _fan_out_sum(ctx, kwargs):
+    import hstk.hsfanout as hsfanout
+    import hstk.hsjson as hsjson
+    if kwargs['nonfiles']:
+        raise click.UsageError('--fan-out only splits up file walks, it can not be used with --nonfiles')
+    if kwargs['raw'] or kwargs['compact']:
+        raise click.UsageError('--fan-out combines JSON results, it can not be used with --raw or --compact')
+    if kwargs['exp_stdin']:
+        raise click.UsageError('--fan-out checks the expression can be combined, pass it with -e')
+    try:
+        hsfanout.check_additive(kwargs['exp'])
+    except ValueError as e:
+        raise click.UsageError('--fan-out: %s' % (e))
+    kwargs['force_json'] = True
+    pathnames = kwargs['pathnames']
+    print_filenames = isinstance(pathnames, PathStream) or len(pathnames) > 1
+    for path, spools in _fan_out(hss.sum, kwargs):
+        merger = hsfanout.SumMerger()
+        for spool in spools:
+            with spool:
+                if ctx.obj.dry_run:
+                    continue
+                try:
+                    for table, record in hsjson.iter_json_records(spool, with_table=True):
+                        merger.add(table, record)
+                except ValueError as e:
+                    raise click.ClickException(f'{path}: {e}')
+        if print_filenames:
+            sys.stdout.write(f'##### {path}\n')
+        for result in merger.results():
+            sys.stdout.write(json.dumps(result) + '\n')
+        sys.stdout.flush()
+    _fan_out_exit(pathnames)
+
+@click.command(name='collsum', help="Usage details about one/all collections in whole share (fast)")
+@click.argument('collection', nargs=1, required=True, default="all")
+@click.option('--collation', nargs=1, required=False)
+@param_sharepaths
+@click.pass_context
+def do_collection_sum(ctx, collection, collation, *args, **kwargs):
+    if collation is None:
+        eval_args = {
+                'exp': 'collection_sums("%s")' % (collection),
+            }
+    else:
+        eval_args = {
+                'exp': 'collection_sums("%s")[SUMMATION("%s")]' % (collection, collation),
+            }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
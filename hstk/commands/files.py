@@ -0,0 +1,740 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fast offloaded file operations: rm, cp and rsync subcommands
+"""
+
+import copy
+import json
+import subprocess as sp
+import sys
+import os
+import pathlib
+import pprint
+import stat
+import threading
+import time
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        ShadCmd,
+        ordered_pool_map,
+        param_dirpaths,
+        vnprint,
+        hs_eval_iter,
+        hs_dirs_count,
+)
+
+# Paths removed at once by rm, and sources copied at once by cp and
+# rsync --pairs-from, unless --jobs is given
+RM_JOBS = 8
+CP_JOBS = 8
+
+
+@click.command(name='rm', help="Fast offloaded rm -rf")
+@click.option('-r', '-R', '--recursive', is_flag=True, help="Required for fast mode, remove directories and their contents recursively")
+@click.option('-f', '--force', is_flag=True, help="Required for fast mode, ignore nonexistent files and arguments")
+@click.option('-i', is_flag=True, help="Disables fast mode, passed through to system rm")
+@click.option('-I', 'I', is_flag=True, help="Disables fast mode, passed through to system rm")
+@click.option('--interactive', default=None, help="Disables fast mode, passed through to system rm")
+@click.option('--one-file-system', is_flag=True, help="Disables fast mode, passed through to system rm")
+@click.option('--no-preserve-root', is_flag=True, help="Disables fast mode, passed through to system rm")
+@click.option('--preserve-root', is_flag=True, help="Disables fast mode, passed through to system rm")
+@click.option('-d', '--dir', is_flag=True, help="Disables fast mode, passed through to system rm")
+@click.option('-v', '--verbose', is_flag=True, help="Disables fast mode, passed through to system rm")
+@click.argument('pathnames', nargs=-1, type=click.Path(exists=True), required=True)
+@click.pass_context
+def do_rm_rf(ctx, *args, **kwargs):
+    passthrough_opt_flags = [ 'i', 'I', 'one_file_system', 'no_preserve_root', 'dir', 'verbose' ]
+
+    call_out_args = []
+    for opt in passthrough_opt_flags:
+        if kwargs[opt]:
+            if len(opt) > 1:
+                call_out_args.append('--' + opt.replace('_', '-'))
+            else:
+                call_out_args.append('-' + opt)
+
+    # Custom handle non-flag passthrough options
+    if opt == 'interactive':
+        call_out_args.append('--' + opt)
+        if kwargs[opt] is not None:
+            call_out_args.append(kwargs[opt])
+
+    if len(call_out_args) > 0 or not (kwargs['force'] and kwargs['recursive']):
+        vnprint('Unsupported options supplied, falling back to system rm')
+        call_out_args += kwargs['pathnames']
+        call_out_args.insert(0, 'rm')
+        vnprint('Calling: ' + ' '.join(call_out_args))
+        if ctx.obj.dry_run:
+            return True
+        else:
+            return sp.call(call_out_args)
+
+    targets = []
+    dirs = []
+    # Targets run at once, drop any that go with a directory also given
+    for fpath in _rm_roots(kwargs['pathnames']):
+        if os.path.isdir(fpath):
+            dirs.append(fpath)
+            targets.append((fpath, True))
+        elif os.path.exists(fpath):
+            targets.append((fpath, False))
+        else:
+            vnprint('Path not found, ignoring due to --force: %s' % (fpath))
+
+    kwargs['pathnames'] = dirs
+    cmd = ShadCmd(hss.rm_rf, kwargs)
+    jobs = ctx.obj.jobs_or(RM_JOBS)
+
+    def remove(target):
+        """
+        Offloaded removal of a directory's contents then rmdir of the
+        directory itself, which the shadow command leaves behind, or unlink
+        of anything else.  Runs on a worker thread, returns (path, shadow
+        command output, error)
+        """
+        fpath, is_dir = target
+        with ctx.scope(cleanup=False):
+            lines = []
+            try:
+                if is_dir:
+                    lines = cmd.run_cmd(pathlib.Path(fpath))
+                    vnprint('rmdir( ' + fpath + ' )')
+                    if not ctx.obj.dry_run:
+                        os.rmdir(fpath)
+                else:
+                    vnprint('unlink( ' + fpath + ' )')
+                    if not ctx.obj.dry_run:
+                        os.unlink(fpath)
+            except FileNotFoundError:
+                vnprint('Path not found, ignoring due to --force: %s' % (fpath))
+            except OSError as e:
+                return fpath, lines, e
+            return fpath, lines, None
+
+    exit_status = 0
+    print_filenames = len(dirs) > 1
+    for fpath, lines, error in ordered_pool_map(remove, targets, jobs):
+        if lines:
+            if print_filenames:
+                sys.stdout.write(f'##### {fpath}\n')
+            sys.stdout.writelines(lines)
+            sys.stdout.flush()
+        if error is not None:
+            sys.stderr.write("rm: cannot remove '%s': %s\n" % (fpath, error.strerror or error))
+            exit_status = 1
+    sys.exit(exit_status)
+
+def _rm_roots(pathnames):
+    """ pathnames in order, less repeats and paths inside a directory in pathnames """
+    dirs = [ os.path.abspath(fpath).rstrip('/') + '/' for fpath in pathnames if os.path.isdir(fpath) ]
+    ret = []
+    seen = set()
+    for fpath in pathnames:
+        apath = os.path.abspath(fpath)
+        if apath in seen:
+            continue
+        seen.add(apath)
+        parent = next(( d for d in dirs if apath.startswith(d) ), None)
+        if parent is not None:
+            vnprint('%s is removed with %s' % (fpath, parent.rstrip('/') or '/'))
+            continue
+        ret.append(fpath)
+    return ret
+
+def _assimilation_details(path):
+    return [ rec for _, rec in hs_eval_iter(exp='assimilation_details', pathnames=[path]) ]
+
+def _server_path(path):
+    """ path as the cluster names it in assimilation_details, None if it won't say """
+    import hstk.hswait as hswait
+    for _, rec in hs_eval_iter(exp='PATH', pathnames=[path]):
+        return hswait.record_path(rec)
+    return None
+
+def wait_for_assimilation(ctx, path, timeout=None):
+    """
+    Block until the assimilation of path is finished, showing progress on a
+    terminal, see hstk.hswait.  Falls back to walking the tree if the
+    assimilation details can't be read.  False if timeout ran out
+    """
+    import hstk.hswait as hswait
+    if ctx.obj.dry_run:
+        vnprint('wait for assimilation of ' + path)
+        return True
+    out = sys.stderr if sys.stderr.isatty() else None
+    start = time.time()
+    try:
+        tracker = hswait.CompletionTracker(os.path.abspath(path), _assimilation_details, out=out,
+                server_target=_server_path(path))
+        ret = tracker.wait(timeout)
+        if tracker.listed is False:
+            vnprint('No assimilation of %s in the details, already finished' % (path))
+        return ret
+    except ValueError as e:
+        vnprint('Unable to follow assimilation_details (%s), walking the tree instead' % (e))
+        if timeout is not None:
+            timeout = max(timeout - (time.time() - start), 0)
+        return _walk_tree(ctx, path, timeout)
+
+def _walk_tree(ctx, path, timeout):
+    """ hs_dirs_count() of path, which waits out its assimilation, False if it outlasts timeout """
+    if timeout is None:
+        hs_dirs_count(path)
+        return True
+    def walk():
+        with ctx.scope(cleanup=False):
+            hs_dirs_count(path)
+    thread = threading.Thread(target=walk, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+def _stat(path):
+    """ os.stat() of a path or DirEntry, None if it doesn't exist, like os.path.exists() """
+    try:
+        if isinstance(path, os.DirEntry):
+            return path.stat()
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+def do_cp_a_fallback(ctx, kwargs, args, srcs, dest):
+    args = copy.copy(args)
+    if 'archive' in kwargs and kwargs['archive']:
+        args.append('--archive')
+    args.extend(srcs)
+    args.append(dest)
+    args.insert(0, 'cp')
+    vnprint('Calling: ' + ' '.join(args))
+    if ctx.obj.dry_run:
+        return 0
+    else:
+        return sp.call(args)
+
+def do_cp_a_fallback_handle_error(ctx, kwargs, args, srcs, dest, reason):
+    vnprint(reason + ', falling back to system cp')
+    res = do_cp_a_fallback(ctx, kwargs, args, srcs, dest)
+    if res != 0:
+        print('Error %d processing passthrough cp of path %s: %s' % (res, ' '.join(srcs), os.strerror(res)))
+        print('Aborting')
+        sys.exit(res)
+    return 0
+
+@click.command(name='cp', help="Fast offloaded recursive copy via clone",
+        context_settings=dict(ignore_unknown_options=True,))
+@click.option('-a', '--archive', is_flag=True, help="Required for fast mode, CoW 'copy' a file or recursivly copy a directory by clone")
+@click.option('--no-wait', is_flag=True, help="Return once the copy is submitted rather than when it is assimilated, see hs wait")
+@click.argument('srcs', nargs=-1, required=True, type=click.UNPROCESSED) # shove any unknown arguments in here
+@click.argument('dest', nargs=1, required=True)
+@click.pass_context
+def do_cp_a(ctx, *args, **kwargs):
+    # Look for anything in src that is not a file/dir,
+    # any unknown options will be shoved here due to click.UNPROCESSED above
+    # if anything is found, trigger a fall back to system cp.  Each source
+    # is only stat()ed once, the pre-flight checks below reuse it
+    call_out_args = []
+    tmp_list = []
+    stats = {}
+    for arg in kwargs['srcs']:
+        st = _stat(arg)
+        if st is None:
+            call_out_args.append(arg)
+        else:
+            stats[arg] = st
+            tmp_list.append(arg)
+    kwargs['srcs'] = tuple(tmp_list)
+
+    fast_sources = []
+    dest = kwargs['dest']
+    srcs = kwargs['srcs']
+
+    if len(call_out_args) > 0 or not kwargs['archive']:
+        reason='Unsupported options or non-existant source supplied'
+        return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
+
+    # NOTE: Trailing /s have no effect on behavior in either single or multi source mode
+
+    # Handle single source file nuances
+    dest_stat = _stat(dest)
+    if dest_stat is not None and not stat.S_ISDIR(dest_stat.st_mode):
+        reason='Destination exists but is not a directory'
+        return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
+
+    is_single_arg = False
+    if len(srcs) == 1:
+        is_single_arg = True
+        src = srcs[0]
+        if not stat.S_ISDIR(stats[src].st_mode):
+            reason='Single source %s is not a directory, use cp --reflink for faster copy' % (src)
+            return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
+
+        if dest_stat is None:
+            # If dest doesn't exist and src is a directory, cp makes dest and
+            # copies only the contents of srcs in
+            vnprint('mkdir '+dest)
+            if not ctx.obj.dry_run:
+                os.mkdir(dest)
+                dest_stat = os.stat(dest)
+            with os.scandir(src) as entries:
+                for entry in entries:
+                    fast_sources.append(entry.path)
+                    stats[entry.path] = _stat(entry)
+        else:
+            # We know from previous test that dest exists and is a directory
+            # In this case, cp just copes the whole directory src as a child of
+            # dest rather than the individual children
+            fast_sources.append(src)
+
+    # Now to multi source mode
+    if dest_stat is None:
+        # Use cp -a to generate the error message
+        reason='Destination directory does not exist'
+        return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
+
+    # In multi source mode, each source is just copied into dest as a child of dest, always
+    if not is_single_arg:
+        for src in srcs:
+            fast_sources.append(src)
+
+    for src in fast_sources:
+        # Pre-flight checks, fallback if any fail
+        if stats[src] is None:
+            # use cp -a to generate the error message
+            reason='Source %s does not exist' % (src)
+            return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
+
+        if stats[src].st_dev != dest_stat.st_dev:
+            reason='Source %s is on different filesystem from destination' % (src)
+            return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
+
+        # XXX Need to detect any filesystems mounted in the source tree
+
+    # Rely on pdfs to detect colisions and error out?
+    # XXX For this release, do extra sanity checks, won't be needed in the future
+    # One pass over dest rather than a lookup per source
+    with os.scandir(dest) as entries:
+        existing = set(entry.name for entry in entries)
+    for src in fast_sources:
+        entry = os.path.basename(src.rstrip(os.sep))
+        if len(entry) == 0:
+            entry = src
+        if entry in existing:
+            tgt = os.path.join(dest, entry)
+            reason='Source item "%s" collides with existing item "%s" in destination' % (src, tgt)
+            return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
+
+    kwargs['dest_inode'] = dest_stat.st_ino
+    kwargs['pathnames'] = fast_sources
+    cmd = ShadCmd(hss.cp_a, kwargs)
+    jobs = ctx.obj.jobs_or(CP_JOBS)
+
+    def offload(src):
+        """ The cp-a shadow command for one source, on a worker thread """
+        with ctx.scope(cleanup=False):
+            try:
+                return src, cmd.run_cmd(pathlib.Path(src)), None
+            except OSError as e:
+                return src, [], e
+
+    # Only a command that couldn't be sent fails a source.  What the cluster
+    # answers is passed on as it is, like cmd.run() does, rather than guessed
+    # to be an error
+    failed = []
+    for src, lines, error in ordered_pool_map(offload, fast_sources, jobs):
+        if error is not None:
+            failed.append(src)
+            print('Error processing offloaded cp -a of path %s: %s' % (src, error.strerror or error))
+        elif lines:
+            sys.stdout.write(''.join(lines))
+    if failed:
+        print('%d of %d offloaded copies failed, aborting' % (len(failed), len(fast_sources)))
+        sys.exit(1)
+
+    if kwargs['no_wait']:
+        sys.stderr.write('Not waiting for the copy to be assimilated, to follow it: hs wait %s\n' % (dest))
+    else:
+        wait_for_assimilation(ctx, dest)
+
+    sys.exit(0)
+
+@click.command(name='wait', help="Wait for the assimilation of a cp -a --no-wait destination to finish")
+@click.option('--timeout', type=click.FloatRange(min=0), help="Give up after this many seconds, exit status 1")
+@param_dirpaths
+@click.pass_context
+def do_wait(ctx, timeout, *args, **kwargs):
+    start = time.time()
+    for path in kwargs['pathnames']:
+        remaining = None if timeout is None else max(timeout - (time.time() - start), 0)
+        if not wait_for_assimilation(ctx, path, remaining):
+            sys.stderr.write('Timed out waiting for the assimilation of %s\n' % (path))
+            sys.exit(1)
+    sys.exit(0)
+
+@click.pass_context
+def _copy_md(ctx, src, dest):
+    vnprint('stat '+src)
+    if not ctx.obj.dry_run:
+        src_st = os.stat(src)
+        vnprint('chown %d.%d %s' % (src_st.st_uid, src_st.st_gid, dest))
+        os.chown(dest, src_st.st_uid, src_st.st_gid)
+        vnprint('chmod %o %s' % (src_st.st_mode, dest))
+        os.chmod(dest, src_st.st_mode)
+    else:
+        vnprint('chown dry_run.dry_run %s' % (dest))
+        vnprint('chmod dry_run %s' % (dest))
+
+    # XXX Add copying of acls
+    # XXX Add copying of HS metadata like tags, objectives, etc
+
+def _rsync_mkdir(ctx, path, stats):
+    """ mkdir for _rsync_plan(), path's stat in stats is stale after it """
+    vnprint('mkdir '+path)
+    if not ctx.obj.dry_run:
+        os.mkdir(path)
+    stats.pop(os.path.abspath(path), None)
+
+def _rsync_plan(ctx, src, dest, stats=None):
+    """
+    Check an rsync src/dest pair and make any directories it needs, returns
+    what the offloaded copy needs to know.  stats can hold os.stat()s
+    already taken by absolute path, see _stat_all(), the directories made
+    are dropped from it so later pairs see them.  Raises click.UsageError
+    if the pair can't be handled.
+    """
+    if stats is None:
+        stats = {}
+    src_st = stats[os.path.abspath(src)] if os.path.abspath(src) in stats else _stat(src)
+    dest_st = stats[os.path.abspath(dest)] if os.path.abspath(dest) in stats else _stat(dest)
+    if src_st is None:
+        raise click.UsageError("Source %s does not exist" % (src), ctx)
+
+    # NOTE: Trailing /s are important in rsync mode, which is different from cp-a
+    src_is_file = stat.S_ISREG(src_st.st_mode)
+    src_is_dir = stat.S_ISDIR(src_st.st_mode)
+    src_ends_slash = src[-1] == os.sep
+    src_undelete = False
+    dest_is_dir = dest_st is not None and stat.S_ISDIR(dest_st.st_mode)
+    dest_ends_slash = dest[-1] == os.sep
+    dest_exists = dest_st is not None
+
+    dest = os.path.abspath(dest)
+
+    if src_is_file:
+        # Dest needs to be a directory and cannot contain a file with the src files name
+        if (not src_ends_slash) and (not dest_ends_slash) \
+                and (not src_is_dir) and (not dest_is_dir) \
+                and os.path.basename(src) == os.path.basename(dest):
+            # Assume should be file on both sides
+            dest_fname = os.path.basename(dest)
+            dest_parent = os.path.dirname(dest)
+        elif (not dest_ends_slash) and (not dest_exists):
+            # In this case, rsync would create a file, not a dir, don't support that
+            # Snag a rename for future failure
+            dest_fname = os.path.basename(dest)
+            dest_parent = os.path.dirname(dest)
+        elif dest_ends_slash or dest_is_dir or (not dest_exists):
+            # should be directory or already is directory
+            dest_fname = os.path.basename(src)
+            dest_parent = dest
+        else:
+            # assume it is a file that was specified
+            dest_fname = os.path.basename(dest)
+            dest_parent = os.path.dirname(dest)
+        src_fname = os.path.basename(src)
+        src_parent = os.path.dirname(src)
+
+        if (dest_fname != src_fname):
+            if src_fname.startswith(dest_fname + '[#D'):
+                # allow restoring from undelete filename, which does have different name from dest
+                src_undelete = True
+            else:
+                reason="This rsync like tool can not handle renaming a file as part of the copy\n" + \
+                    "please provide a source filename and a target directory/ (include trailing /)\n" + \
+                    "src filename: %s     dest filename: %s" % (os.path.basename(src), dest_fname)
+                raise click.UsageError(reason, ctx)
+
+        elif not os.path.exists(dest_parent):
+            _rsync_mkdir(ctx, dest_parent, stats)
+            _copy_md(src_parent, dest_parent)
+
+        elif (not ctx.obj.dry_run) and (not os.path.isdir(dest_parent)):
+            reason="Source %s is a file but unable to find the destination/parent directory %s" % (src, dest_parent)
+            raise click.UsageError(reason, ctx)
+
+        dest_tgt = dest_parent
+
+    elif src_is_dir:
+        # in the following / patterns, must create srcdir name and use as target
+        if ((not src_ends_slash) and (not dest_ends_slash)) or \
+                ((not src_ends_slash) and dest_ends_slash):
+            dest_parent = os.path.join(dest, os.path.basename(src))
+            dest_fname = None
+            dest_tgt = dest_parent
+            if not dest_exists:
+                _rsync_mkdir(ctx, dest, stats)
+        else:
+            dest_parent = dest
+            dest_fname = None
+            dest_tgt = dest
+        src_fname = None
+        src_parent = src
+
+        src_dname = os.path.basename(src)
+        dest_dname = os.path.basename(dest)
+        if src_dname.startswith(dest_dname + '[#D'):
+            src_undelete = True
+
+        if not os.path.exists(dest_tgt):
+            _rsync_mkdir(ctx, dest_tgt, stats)
+            dest_is_dir = True
+        if (not ctx.obj.dry_run) and (not dest_is_dir):
+            reason="Source %s is a directory but dest %s is not" % (src, dest)
+            raise click.UsageError(reason, ctx)
+    else:
+        reason="Source %s is not a file or directory" % (src)
+        raise click.UsageError(reason, ctx)
+
+    vnprint('src inode %d' % (src_st.st_ino))
+    vnprint('stat dest_tgt '+dest_tgt)
+    dest_tgt_stat = os.stat(dest_tgt)
+    vnprint('dest_tgt inode %d' % (dest_tgt_stat.st_ino))
+
+    if src_st.st_dev != dest_tgt_stat.st_dev:
+        reason='Source (stat_dev %d) is on different filesystem from destination (stat_dev %d)' % (src_st.st_dev, dest_tgt_stat.st_dev)
+        raise click.UsageError(reason, ctx)
+    # XXX detect any filesystems mounted in the source tree?
+
+    return {
+            'src': src,
+            'dest': dest,
+            'dest_tgt': dest_tgt,
+            'dest_inode': dest_tgt_stat.st_ino,
+            'src_is_file': src_is_file,
+            'src_parent': src_parent,
+            'dest_parent': dest_parent,
+            'src_undelete': src_undelete,
+            # Needs the VERSION check of _rsync_check_versions()
+            'same_inode': dest_exists and src_st.st_ino == dest_st.st_ino,
+        }
+
+def _rsync_check_versions(ctx, plan, versions):
+    """
+    Detect any requests inside .snapshot/current/ that are not undelete
+    files, versions has the VERSION of src and dest.  Returns False if there
+    is nothing to do
+    """
+    src, dest = plan['src'], plan['dest']
+    if versions[src] == 2 and (not plan['src_undelete']):
+        vnprint("Trying to restore from .snapshot/current source and dest are the same file, doing nothing")
+        return False
+    elif versions[dest] > 1:
+        reason="Dest %s has version %d is in .snapshot/, can not restore TO a snapshot, only FROM" % (dest, versions[dest])
+        raise click.UsageError(reason, ctx)
+    return True
+
+def _rsync_versions(ctx, paths, jobs):
+    """
+    VERSION of each of paths, each asked once, jobs at a time.  Raises
+    ValueError naming the path whose answer couldn't be parsed
+    """
+    paths = list(dict.fromkeys(paths))
+    kwargs = {
+            'exp': 'VERSION',
+            'pathnames': paths,
+            'force_json': True,
+            'outstream': None,
+        }
+    cmd = ShadCmd(hss.eval, kwargs)
+    cmd.jobs = jobs
+    versions = {}
+    # Keyed by the paths as given, as the plans look them up, not as
+    # ShadCmd normalised them
+    for path, (_, lines) in zip(paths, cmd.iter_results()):
+        if ctx.obj.dry_run:
+            versions[path] = 1
+            continue
+        try:
+            versions[path] = int(lines[0])
+        except (IndexError, ValueError):
+            raise ValueError('Error parsing response from VERSION for %s, response was: %s' % (path, pprint.pformat(lines)))
+    return versions
+
+def _rsync_finish(ctx, plan):
+    # Follow the assimilation to block returning till assim is complete
+    wait_for_assimilation(ctx, plan['dest_tgt'])
+
+    if not plan['src_is_file']:
+        # Manually always copy the metadata for all directory sources
+        _copy_md(plan['src_parent'], plan['dest_parent'])
+
+def _stat_all(paths, jobs):
+    """ os.stat() of every path, jobs at a time, {path: stat or None} """
+    paths = list(dict.fromkeys(paths))
+    return dict(zip(paths, ordered_pool_map(_stat, paths, jobs)))
+
+def read_pairs(fd):
+    """ Yield (line number, src, dest) from TAB separated lines, skipping blanks and # comments """
+    for lineno, line in enumerate(fd, 1):
+        line = line.rstrip('\r\n')
+        if len(line.strip()) == 0 or line.lstrip().startswith('#'):
+            continue
+        src, sep, dest = line.partition('\t')
+        if not sep or not src or not dest or '\t' in dest:
+            yield lineno, None, ValueError('expected SRC<TAB>DEST: %r' % (line))
+            continue
+        yield lineno, src, dest
+
+@click.command(name='rsync', help="Fast offloaded recursive directory equalizer (Add and Delete)",
+        context_settings=dict(ignore_unknown_options=True,))
+@click.option('-a', '--archive', is_flag=True, help="Required, must specify -a --delete")
+@click.option('--delete', is_flag=True, help="Required, must specify -a --delete")
+@click.option('--pairs-from', type=click.File('r'), help="Read SRC<TAB>DEST pairs from this file, one per line, '-' for stdin")
+@click.argument('src', nargs=1, required=False,
+        type=click.Path(exists=True, readable=True))
+@click.argument('dest', nargs=1, required=False,
+        type=click.Path(exists=False, writable=True))
+@click.pass_context
+def do_rsync_a_delete(ctx, src, dest, pairs_from, *args, **kwargs):
+    if not kwargs['archive'] or not kwargs['delete']:
+        reason="Must provide both --delete and --archive options, this is the only supported method for this tool, which may remove data at the destination path"
+        raise click.UsageError(reason, ctx)
+
+    if pairs_from is not None:
+        if src is not None or dest is not None:
+            raise click.UsageError('Specify src and dest as arguments or with --pairs-from, not both', ctx)
+        _rsync_pairs(ctx, pairs_from, kwargs)
+    if src is None or dest is None:
+        raise click.UsageError('Missing src and dest arguments', ctx)
+
+    plan = _rsync_plan(ctx, src, dest)
+    if plan['same_inode']:
+        try:
+            versions = _rsync_versions(ctx, [plan['src'], plan['dest']], 1)
+        except ValueError as e:
+            print(e)
+            sys.stdout.flush()
+            sys.exit(1)
+        if not _rsync_check_versions(ctx, plan, versions):
+            sys.exit(0)
+
+    kwargs['dest_inode'] = plan['dest_inode']
+    kwargs['pathnames'] = [ plan['src'] ]
+    cmd = ShadCmd(hss.cp_a, kwargs)
+    cmd.run()
+    if cmd.exit_status != 0:
+        print('Error %d processing offloaded rsync of paths %s: %s' % (cmd.exit_status, src, os.strerror(cmd.exit_status)))
+        print('Aborting')
+        sys.exit(cmd.exit_status)
+
+    _rsync_finish(ctx, plan)
+    sys.exit(0)
+
+def _rsync_pairs(ctx, pairs_from, kwargs):
+    """
+    rsync every pair of a --pairs-from file.  All pairs are checked first,
+    with their paths stat()ed --jobs at a time and the VERSION evals of all
+    pairs needing one run together.  The offloaded copies of the pairs
+    that pass then go out --jobs at a time (8 unless --jobs is given) and each is
+    waited for.  A status line is printed for every pair, exit status is 1
+    if any pair failed.
+    """
+    jobs = ctx.obj.jobs_or(CP_JOBS)
+    pairs = list(read_pairs(pairs_from))
+    # By absolute path, the directories a pair makes are dropped for the
+    # pairs after it to stat again
+    stats = _stat_all([ os.path.abspath(path) for _, src, dest in pairs if src is not None for path in (src, dest) ], jobs)
+
+    results = {}
+    plans = []
+    for lineno, src, dest in pairs:
+        if src is None:
+            # dest holds the parse error
+            results[lineno] = dest
+            continue
+        try:
+            plans.append((lineno, _rsync_plan(ctx, src, dest, stats)))
+        except (click.UsageError, OSError) as e:
+            results[lineno] = e
+
+    checks = [ plan for _, plan in plans if plan['same_inode'] ]
+    versions = {}
+    if checks:
+        try:
+            versions = _rsync_versions(ctx, [ path for plan in checks for path in (plan['src'], plan['dest']) ], jobs)
+        except ValueError as e:
+            for lineno, plan in plans:
+                if plan['same_inode']:
+                    results[lineno] = e
+    todo = []
+    for lineno, plan in plans:
+        if lineno in results:
+            continue
+        try:
+            if plan['same_inode'] and not _rsync_check_versions(ctx, plan, versions):
+                results[lineno] = None
+                continue
+        except click.UsageError as e:
+            results[lineno] = e
+            continue
+        # Build the commands here in the main thread, ShadCmd needs the click context
+        cmd_kwargs = dict(kwargs, dest_inode=plan['dest_inode'], pathnames=[ plan['src'] ], outstream=None)
+        todo.append((lineno, plan, ShadCmd(hss.cp_a, cmd_kwargs)))
+
+    def offload(item):
+        """ The cp-a shadow command for one pair and its wait, on a worker thread """
+        lineno, plan, cmd = item
+        with ctx.scope(cleanup=False):
+            try:
+                lines = cmd.run_cmd(pathlib.Path(plan['src']))
+                _rsync_finish(ctx, plan)
+            except OSError as e:
+                return lineno, plan, e, ''
+        return lineno, plan, None, ''.join(lines).rstrip()
+
+    outputs = {}
+    for lineno, plan, err, output in ordered_pool_map(offload, todo, jobs):
+        results[lineno] = err
+        if output and not ctx.obj.dry_run:
+            outputs[lineno] = output
+
+    failed = 0
+    for lineno, src, dest in pairs:
+        err = results.get(lineno)
+        if src is None:
+            src, dest = '', ''
+        reason = None
+        if isinstance(err, click.ClickException):
+            reason = err.format_message()
+        elif isinstance(err, OSError):
+            reason = err.strerror or str(err)
+        elif err is not None:
+            reason = str(err)
+        if reason is not None:
+            failed += 1
+        if ctx.obj.output_json:
+            res = { 'row': lineno, 'status': 'ok' if reason is None else 'error', 'src': src, 'dest': dest }
+            if reason is not None:
+                res['error'] = reason
+            if lineno in outputs:
+                res['output'] = outputs[lineno]
+            click.echo(json.dumps(res))
+        elif reason is None:
+            msg = ': ' + outputs[lineno] if lineno in outputs else ''
+            click.echo('%d ok %s %s%s' % (lineno, src, dest, msg))
+        else:
+            click.echo('%d error %s %s: %s' % (lineno, src, dest, reason))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+index subcommands, a local SQLite index of share metadata
+"""
+
+import json
+import os
+import time
+import click
+import hstk.hsindex as hsindex
+from hstk.hscli import (
+        OrderedGroup,
+        hs_eval_iter,
+        param_sharepaths,
+)
+
+param_index_db = click.option('--db', 'db_path', type=click.Path(dir_okay=False), envvar='HS_INDEX',
+        help="Index database file, default $XDG_CACHE_HOME/hstk/index.sqlite")
+
+
+def _dump(pathnames, **kwargs):
+    """ DUMP_INODE eval records for pathnames, with the server's PATHs """
+    eval_args = {
+            'exp': 'DUMP_INODE',
+            'pathnames': pathnames,
+        }
+    eval_args.update(kwargs)
+    return ( rec for _, rec in hs_eval_iter(**eval_args) )
+
+def _path_map(share):
+    """ Where the cluster has share, from the PATH of its own record """
+    for rec in _dump([ share ]):
+        return hsindex.PathMap.from_record(rec, share)
+    return hsindex.PathMap(share, share)
+
+def _dump_dirs(share, paths):
+    """ DUMP_INODE records of share and every directory below it, client paths """
+    yield from paths.records(_dump([ share ]))
+    for rec in paths.records(_dump([ share ], nonfiles=True)):
+        inode = hsindex.inode_record(rec)
+        if inode is not None and inode['is_dir']:
+            yield rec
+
+def _dump_subtree(root, paths):
+    return paths.records(_dump([ root ], recursive=True))
+
+def _name_value(items):
+    ret = []
+    for item in items:
+        name, sep, value = item.partition('=')
+        ret.append((name, value if sep else None))
+    return ret
+
+
+@click.group(name='index', help="[sub] Local index of share metadata for offline lookups", cls=OrderedGroup)
+def index_grp():
+    pass
+
+@index_grp.command(name='build', help="Index all inodes of share(s), replacing what was indexed for them")
+@param_index_db
+@param_sharepaths
+@click.pass_context
+def do_index_build(ctx, db_path, *args, **kwargs):
+    for share in kwargs['pathnames']:
+        share = os.path.abspath(share)
+        start = time.time()
+        paths = _path_map(share)
+        records = _dump_subtree(share, paths)
+        if ctx.obj.dry_run:
+            # Nothing to index, leave the database alone
+            for rec in records:
+                pass
+            continue
+        with hsindex.MetadataIndex(db_path) as index:
+            count = index.build(share, records, _dump_dirs(share, paths))
+        if ctx.obj.output_json:
+            print(json.dumps({'share': share, 'inodes': count, 'seconds': time.time() - start}))
+        else:
+            print('%s: indexed %d inodes in %.1fs' % (share, count, time.time() - start))
+
+@index_grp.command(name='refresh', help="Update the index for share(s), only re-dumping directories that changed")
+@param_index_db
+@param_sharepaths
+@click.pass_context
+def do_index_refresh(ctx, db_path, *args, **kwargs):
+    """
+    Compares a change marker (modify time, version, size) of every directory
+    with the one stored by the last build or refresh.  The files of changed
+    directories and the whole tree under new directories are dumped again,
+    with one recursive eval for each topmost changed or new directory,
+    removed directories are dropped.  Metadata changes on files that do not
+    touch their directory are only picked up by a full build.  Shares that
+    were never built get a full build.
+    """
+    for share in kwargs['pathnames']:
+        share = os.path.abspath(share)
+        start = time.time()
+        paths = _path_map(share)
+        if ctx.obj.dry_run:
+            for rec in _dump_dirs(share, paths):
+                pass
+            continue
+        with hsindex.MetadataIndex(db_path) as index:
+            res = index.refresh(share, _dump_dirs(share, paths), lambda root: _dump_subtree(root, paths))
+            if res is None:
+                count = index.build(share, _dump_subtree(share, paths), _dump_dirs(share, paths))
+                res = {'changed': [], 'added': [ share ], 'removed': [], 'inodes': count}
+        if ctx.obj.output_json:
+            res['share'] = share
+            res['seconds'] = time.time() - start
+            print(json.dumps(res))
+        else:
+            print('%s: %d changed, %d new and %d removed directories, %d inodes in %.1fs' % (
+                share, len(res['changed']), len(res['added']), len(res['removed']), res['inodes'], time.time() - start))
+
+@index_grp.command(name='query', help="List indexed paths matching all of the given conditions")
+@param_index_db
+@click.option('--tag', 'tags', multiple=True, metavar='NAME[=VALUE]', help="Has tag NAME, with VALUE if given")
+@click.option('--attribute', 'attributes', multiple=True, metavar='NAME[=VALUE]', help="Has attribute NAME, with VALUE if given")
+@click.option('--keyword', 'keywords', multiple=True, help="Has keyword")
+@click.option('--label', 'labels', multiple=True, help="Has label")
+@click.option('--volume', 'volumes', multiple=True, help="Has an instance on this volume")
+@click.option('--under', type=click.Path(), help="Only paths in this directory tree")
+@click.option('--files', 'files_only', is_flag=True, help="Only files, not directories")
+@click.option('--details', is_flag=True, help="Include size, inode and metadata, always on with -j")
+@click.pass_context
+def do_index_query(ctx, db_path, tags, attributes, keywords, labels, volumes, under, files_only, details):
+    if under is not None:
+        under = os.path.abspath(under)
+    db_path = db_path or hsindex.default_index_path()
+    if not os.path.exists(db_path):
+        # Nothing indexed yet, nothing matches
+        return
+    with hsindex.MetadataIndex(db_path) as index:
+        results = index.query(tags=_name_value(tags), attributes=_name_value(attributes),
+                keywords=keywords, labels=labels, volumes=volumes, under=under, files_only=files_only)
+        for res in results:
+            if ctx.obj.output_json or details:
+                res['metadata'] = [ {'type': mdtype, 'name': name, 'value': value}
+                        for mdtype, name, value in index.metadata(res['path']) ]
+            if ctx.obj.output_json:
+                print(json.dumps(res))
+            elif details:
+                md = ' '.join('%s:%s%s' % (md['type'], md['name'], '' if md['value'] is None else '=' + md['value'])
+                        for md in res['metadata'])
+                print('%s\t%s\t%s\t%s' % (res['path'], res['size'], res['inode'], md))
+            else:
+                print(res['path'])
+
+@index_grp.command(name='list', help="Show the indexed shares")
+@param_index_db
+@click.pass_context
+def do_index_list(ctx, db_path):
+    db_path = db_path or hsindex.default_index_path()
+    shares = []
+    if os.path.exists(db_path):
+        with hsindex.MetadataIndex(db_path) as index:
+            shares = index.shares()
+    if ctx.obj.output_json:
+        print(json.dumps({'db': db_path, 'shares': shares}))
+        return
+    print('index: ' + db_path)
+    for share in shares:
+        print('%s: %d inodes, built %s' % (share['share'], share['inodes'], time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(share['built']))))
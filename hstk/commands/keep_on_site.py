@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+keep-on-site subcommands, GNS replication sites
+"""
+
+import json
+import click
+import hstk.hsscript as hss
+from hstk.hscomplete import complete_catalog
+from hstk.hscli import (
+        OrderedGroup,
+        group_decorator,
+        _cmd_retcode,
+        catalog_get,
+        hs_eval_iter,
+        first_path,
+        param_defaults,
+        param_sharepaths,
+        param_recursive,
+        param_nonfiles,
+        param_force,
+        param_eval,
+        param_read,
+)
+
+
+@click.group(name='keep-on-site', help="[sub] sites in the GNS to keep copies of the data on", cls=OrderedGroup)
+def keep_on_site():
+    pass
+
+def _fetch_site_names(path):
+    eval_args = {
+        'exp': 'THIS.PARTICIPANTS',
+        'force_json': True,
+        'pathnames': [ path ],
+    }
+    return [ site_json['SITE_NAME'] for _, site_json in hs_eval_iter(**eval_args) ]
+
+@click.pass_context
+def _gns_participant_site_names(ctx, pathnames=['.'], refresh=False, **kwargs):
+    path = first_path(pathnames) or '.'
+    if ctx.obj.dry_run:
+        list(hs_eval_iter(exp='THIS.PARTICIPANTS', force_json=True, pathnames=[ path ]))
+        return [ 'dry_run_test_site1', 'dry_run_test_site2' ]
+    return catalog_get('sites', path, lambda: _fetch_site_names(path), refresh=refresh)
+
+def _check_site_name(ctx, kwargs):
+    """ UsageError unless the site is a participant, a cached list that doesn't have it is refreshed first """
+    name = kwargs['name']
+    if name in _gns_participant_site_names(**kwargs):
+        return
+    kwargs = dict(kwargs, refresh=True)
+    if name not in _gns_participant_site_names(**kwargs):
+        errmsg = "'%s' is not a valid site name\n" % (name)
+        raise click.UsageError(errmsg, ctx)
+
+param_site_name = group_decorator(
+            click.argument('name', metavar='site_name', nargs=1, required=True, shell_complete=complete_catalog('sites')),
+        )
+
+@keep_on_site.command(name='available', help="List sites names participating in this share")
+@click.option('--refresh', is_flag=True, help="Read the list from the cluster rather than the catalog cache")
+@param_sharepaths
+@click.pass_context
+def do_gns_sites(ctx, *args, **kwargs):
+    sites = _gns_participant_site_names(**kwargs)
+
+    if ctx.obj.output_json:
+        print(json.dumps(sites))
+    else:
+        print('\n'.join(sites))
+
+@keep_on_site.command(name='list', help="list GNS sites with keep-on rules")
+@param_eval
+@param_read
+@param_defaults
+def do_gns_keep_on_list(ctx, *args, **kwargs):
+    _cmd_retcode(hss.sites_keep_on_list, **kwargs)
+
+@keep_on_site.command(name='has', help="Is there already a keep-on rule for the specified GNS site?")
+@param_eval
+@param_read
+@param_site_name
+@param_defaults
+def do_gns_keep_on_has(ctx, *args, **kwargs):
+    _cmd_retcode(hss.sites_keep_on_has, **kwargs)
+
+@keep_on_site.command(name='delete', help="remove a GNS site keep-on rule")
+@param_site_name
+@param_force
+@param_recursive
+@param_nonfiles
+@param_defaults
+def do_gns_keep_on_del(ctx, *args, **kwargs):
+    _check_site_name(ctx, kwargs)
+    _cmd_retcode(hss.sites_keep_on_del, **kwargs)
+
+@keep_on_site.command(name='add', help="add a GNS site keep-on rule")
+@param_site_name
+@param_recursive
+@param_nonfiles
+@param_defaults
+def do_gns_keep_on_add(ctx, *args, **kwargs):
+    _check_site_name(ctx, kwargs)
+    _cmd_retcode(hss.sites_keep_on_add, **kwargs)
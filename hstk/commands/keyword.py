@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+keyword subcommands
+"""
+
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        OrderedGroup,
+        _cmd_retcode,
+        param_defaults,
+        param_recursive,
+        param_nonfiles,
+        param_force,
+        param_eval,
+        param_read,
+        param_name,
+)
+
+
+keyword_short_help = "[sub] inode metadata: schema no, value no"
+
+keyword_help = """
+keyword: Manage Hammerspace embedded keyword metadata
+
+Keyword is a flexable metadata type that is created on the fly.  A keyword can
+not store a value.
+"""
+
+@click.group(help=keyword_help, short_help=keyword_short_help, cls=OrderedGroup)
+def keyword():
+    keyword_short_help + '\n\n' + keyword_help
+    pass
+
+@keyword.command(name='list', help="list all keywords applied")
+@param_eval
+@param_read
+@param_defaults
+def do_keyword_list(ctx, *args, **kwargs):
+    _cmd_retcode(hss.keyword_list, **kwargs)
+
+@keyword.command(name='has', help="Is the keyword assigned to the file")
+@param_eval
+@param_read
+@param_name
+@param_defaults
+def do_keyword_has(ctx, *args, **kwargs):
+    _cmd_retcode(hss.keyword_has, **kwargs)
+
+@keyword.command(name='delete', help="remove keywords from inode(s)")
+@param_name
+@param_force
+@param_recursive
+@param_nonfiles
+@param_defaults
+def do_keyword_del(ctx, *args, **kwargs):
+    _cmd_retcode(hss.keyword_del, **kwargs)
+
+@keyword.command(name='add', help="add a keyword to inode(s)")
+@param_name
+@param_recursive
+@param_nonfiles
+@param_defaults
+def do_keyword_add(ctx, *args, **kwargs):
+    _cmd_retcode(hss.keyword_add, **kwargs)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+label subcommands
+"""
+
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        OrderedGroup,
+        _cmd_retcode,
+        param_defaults,
+        param_recursive,
+        param_nonfiles,
+        param_force,
+        param_eval,
+        param_read,
+        param_name,
+)
+
+
+label_short_help = "[sub] inode metadata: schema hierarchical, value no"
+
+label_help = """
+label: Manage Hammerspace embedded label metadata
+
+Before a label can be added, it must be added to the labels scema via the admin
+interface using the label-* admin cli commands.  Labels are good for situations
+where you want to enforce the same wording/spelling/capitilaization/etc as well
+as if you want one label to imply a series of parents.
+"""
+
+@click.group(help=label_help, short_help=label_short_help, cls=OrderedGroup)
+def label():
+    label_short_help + '\n\n' + label_help
+    pass
+
+@label.command(name='list', help="list all labels applied")
+@param_eval
+@param_read
+@param_defaults
+def do_label_list(ctx, *args, **kwargs):
+    _cmd_retcode(hss.label_list, **kwargs)
+
+@label.command(name='has', help="Is the label assigned to the file")
+@param_eval
+@param_read
+@param_name
+@param_defaults
+def do_label_has(ctx, *args, **kwargs):
+    _cmd_retcode(hss.label_has, **kwargs)
+
+@label.command(name='delete', help="remove labels from inode(s)")
+@param_name
+@param_force
+@param_recursive
+@param_nonfiles
+@param_defaults
+def do_label_del(ctx, *args, **kwargs):
+    _cmd_retcode(hss.label_del, **kwargs)
+
+@label.command(name='add', help="add a label to inode(s)")
+@param_name
+@param_recursive
+@param_nonfiles
+@param_defaults
+def do_label_add(ctx, *args, **kwargs):
+    _cmd_retcode(hss.label_add, **kwargs)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+objective subcommands
+"""
+
+import click
+import hstk.hsscript as hss
+from hstk.hscomplete import complete_catalog
+from hstk.hscli import (
+        OrderedGroup,
+        group_decorator,
+        _cmd_retcode,
+        param_defaults,
+        param_recursive,
+        param_nonfiles,
+        param_force,
+        param_eval,
+        param_objective_read,
+        param_value,
+        param_unbound,
+)
+
+
+param_objective_name = group_decorator(
+            click.argument('name', nargs=1, required=True, shell_complete=complete_catalog('objectives')),
+        )
+
+objective_short_help = "[sub] control file placement on backend storage"
+
+@click.group(short_help=objective_short_help, cls=OrderedGroup)
+def objective():
+    objective_help = objective_short_help + '\n\n' + """
+    TODO XXX
+    """
+    pass
+
+@objective.command(name='list', help="list all (objective,expression) pairs assigned")
+@param_eval
+@param_objective_read
+@param_defaults
+def do_objective_list(ctx, *args, **kwargs):
+    _cmd_retcode(hss.objective_list, **kwargs)
+
+@objective.command(name='has', help="Get/list objective assignments")
+@param_eval
+@param_objective_read
+@param_objective_name
+@param_value
+@param_defaults
+def do_objective_has(ctx, *args, **kwargs):
+    _cmd_retcode(hss.objective_has, **kwargs)
+
+@objective.command(name='delete', help="remove (objective,expression) pair from inode(s)")
+@param_objective_name
+@param_force
+@param_recursive
+@param_nonfiles
+@param_value
+@param_defaults
+def do_objective_del(ctx, *args, **kwargs):
+    _cmd_retcode(hss.objective_del, **kwargs)
+
+@objective.command(name='add', help="Add (objective,expression) pair to inode(s)")
+@param_objective_name
+@param_recursive
+@param_nonfiles
+@param_value
+@param_defaults
+@param_unbound
+def do_objective_set(ctx, *args, **kwargs):
+    _cmd_retcode(hss.objective_add, **kwargs)
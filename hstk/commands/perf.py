@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+perf subcommands, performance and event counters
+"""
+
+import os
+import sys
+import json
+import time
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        OrderedGroup,
+        vnprint,
+        _cmd_retcode,
+        hs_eval_iter,
+        param_sharepaths,
+)
+
+
+param_perf_store = click.option('--store', 'store_dir', type=click.Path(file_okay=False), envvar='HS_PERF_STORE',
+        help="Directory perf record keeps samples in, default $XDG_CACHE_HOME/hstk/perf")
+
+
+@click.group(name='perf', help="[sub] Performance and operation stats", cls=OrderedGroup)
+def perf_grp():
+    pass
+
+def _dot_stats_files_paths(paths, dry_run=False):
+    """
+    This file is used to store the saved off/old stats (counter values) as a tag 'old_stats'
+    """
+    statsfs = {}
+
+    for path in paths:
+        # eval -e path to find the root of the share, create .stats there?
+        statsf = os.path.join(path, '.stats')
+
+        if dry_run:
+            vnprint('dry run, not creating .stats file ' + statsf)
+        elif not os.path.exists(statsf):
+            vnprint('creating .stats file ' + statsf)
+            with open(statsf, 'w') as fd:
+                pass
+        statsfs[path] = statsf
+
+    return statsfs
+
+@perf_grp.command(name='clear', help="Clear op/perf counters on share(s)")
+@param_sharepaths
+@click.pass_context
+def do_report_stats_clear(ctx, *args, **kwargs):
+    """
+    Doesn't actually 'clear' the stats, just saves off the current counters to a tag 'old_stats' that is then
+    diffed from the latest stats on future reads.  If needed, creates a .stats file to store this tag
+    """
+    # manual method of clearing stats via pdfs
+    # echo hi > $share/?.attribute=pdfs_stats
+    statsfs = _dot_stats_files_paths(kwargs['pathnames'], ctx.obj.dry_run)
+    tag_args = {
+            'exp': 'fs_stats.op_stats',
+            'name': 'old_stats',
+            'pathnames': statsfs,
+        }
+    kwargs.update(tag_args)
+    _cmd_retcode(hss.tag_set, **kwargs)
+
+@perf_grp.command(name='top_calls', help="Show filesystem calls consuming the most time on share(s)")
+@param_sharepaths
+@click.pass_context
+def do_report_stats_top_calls(ctx, *args, **kwargs):
+    statsfs = _dot_stats_files_paths(kwargs['pathnames'], ctx.obj.dry_run)
+    eval_args = {
+            'exp': '{(fs_stats.op_stats-get_tag("old_stats")),TOP100_TABLE{|::KEY={#A[PARENT.ROW].op_count,#A[PARENT.ROW].name,#A[PARENT.ROW].op_count,#A[PARENT.ROW].op_time,#A[PARENT.ROW].op_avg}}[ROWS(#A)]}.#B',
+            'pathnames': statsfs,
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@perf_grp.command(name='top_funcs', help="Top time consuming functions on share(s)")
+@click.option('--op', nargs=1, default='all', help="Restrict to reporting to funcs in a specific op")
+@param_sharepaths
+@click.pass_context
+def do_report_stats_funcs(ctx, op, *args, **kwargs):
+    statsfs = _dot_stats_files_paths(kwargs['pathnames'], ctx.obj.dry_run)
+    eval_args = {
+            'exp': '{(FS_STATS.OP_STATS-get_tag("old_stats"))[|NAME="%s"].func_stats,TOP100_TABLE{|::KEY={#A[PARENT.ROW].op_time,#A[PARENT.ROW].name,#A[PARENT.ROW].op_count,#A[PARENT.ROW].op_avg}}[ROWS(#A)]}.#B' % (op),
+            'pathnames': statsfs,
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@perf_grp.command(name='top_ops', help="Show filesystem ops consuming the most time by share(s)")
+@param_sharepaths
+@click.pass_context
+def do_report_stats_top_ops(ctx, *args, **kwargs):
+    statsfs = _dot_stats_files_paths(kwargs['pathnames'], ctx.obj.dry_run)
+    eval_args = {
+            'exp': '{(fs_stats.op_stats-get_tag("old_stats")),TOP100_TABLE{|::KEY={#A[PARENT.ROW].op_time,#A[PARENT.ROW].name,#A[PARENT.ROW].op_count,#A[PARENT.ROW].op_time,#A[PARENT.ROW].op_avg}}[ROWS(#A)]}.#B',
+            'pathnames': statsfs,
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@perf_grp.command(name='flushes', help="Counter for flush transactions by share(s)")
+@param_sharepaths
+@click.pass_context
+def do_report_stats_flushes(ctx, *args, **kwargs):
+    statsfs = _dot_stats_files_paths(kwargs['pathnames'], ctx.obj.dry_run)
+    eval_args = {
+            'exp': 'sum({|::#A=(fs_stats.op_stats-get_tag("old_stats"))[ROW].flush_count}[ROWS(fs_stats.op_stats)])',
+            'pathnames': statsfs,
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+def _sample(path):
+    """ An hstk.hsperf.Sample of the op counters of the share holding path """
+    import hstk.hsperf as hsperf
+    try:
+        ops = hsperf.op_counters(rec for _, rec in hs_eval_iter(exp='fs_stats.op_stats', pathnames=[path]))
+    except ValueError as e:
+        raise click.ClickException('%s: unable to read fs_stats.op_stats: %s' % (path, e))
+    return hsperf.Sample(time.time(), ops)
+
+@perf_grp.command(name='watch', help="Sample op counters every interval and show per op rates and latencies, "
+        "worked out locally so nothing is written to the share")
+@click.option('--interval', type=click.FloatRange(min=0.1), default=5.0, show_default=True, help="Seconds between samples")
+@click.option('--count', type=click.IntRange(min=0), default=0, help="Stop after this many intervals, 0 to run until interrupted")
+@click.option('--history', type=click.IntRange(min=2), default=60, show_default=True,
+        help="Samples kept to hold the latest interval against")
+@click.option('--top', type=click.IntRange(min=1), default=10, show_default=True, help="Ops shown, by time spent, and top movers")
+@param_sharepaths
+@click.pass_context
+def do_report_stats_watch(ctx, interval, count, history, top, *args, **kwargs):
+    """
+    Unlike the other perf commands there is no old_stats tag, each interval
+    is the difference of two samples kept in memory.  With -j every
+    interval of every share is a JSON line, on a terminal the table is
+    redrawn in place.
+    """
+    import hstk.hsperf as hsperf
+    paths = list(kwargs['pathnames'])
+    rings = dict((path, hsperf.StatsRing(history)) for path in paths)
+    redraw = sys.stdout.isatty() and not ctx.obj.output_json
+    start = time.time()
+    intervals = 0
+    try:
+        while True:
+            blocks = []
+            for path in paths:
+                sample = _sample(path)
+                prev = rings[path].samples[-1] if rings[path].samples else None
+                deltas = rings[path].add(sample)
+                if deltas is None:
+                    continue
+                secs = sample.when - prev.when
+                if ctx.obj.output_json:
+                    res = {
+                            'time': sample.when,
+                            'share': path,
+                            'secs': secs,
+                            'ops': [ delta.as_dict() for delta in deltas ],
+                            'movers': [ delta.name for delta in hsperf.top_movers(deltas, top) ],
+                        }
+                    blocks.append(json.dumps(res))
+                else:
+                    header = '##### %s  %s  interval %.1fs' % (path, time.strftime('%H:%M:%S', time.localtime(sample.when)), secs)
+                    blocks.append('\n'.join([header] + hsperf.format_deltas(deltas, secs, top)) + '\n')
+            if blocks:
+                if redraw:
+                    sys.stdout.write('\033[H\033[J')
+                sys.stdout.write('\n'.join(blocks) + '\n')
+                sys.stdout.flush()
+                intervals += 1
+            if ctx.obj.dry_run:
+                vnprint('dry run, not sampling again')
+                break
+            if count and intervals >= count:
+                break
+            # Sample on a fixed schedule rather than drifting by the sampling time
+            wait = interval - (time.time() - start) % interval
+            time.sleep(wait)
+    except KeyboardInterrupt:
+        pass
+
+@perf_grp.command(name='record', help="Keep samples of op counters every interval in a local store for perf report")
+@click.option('--interval', type=click.FloatRange(min=0.1), default=10.0, show_default=True, help="Seconds between samples")
+@click.option('--count', type=click.IntRange(min=0), default=0, help="Stop after this many samples, 0 to run until interrupted")
+@click.option('--max-size', type=click.IntRange(min=1), default=64, show_default=True, help="MiB of history kept for each share")
+@click.option('--coarse', type=click.FloatRange(min=0), default=60.0, show_default=True,
+        help="Seconds apart the samples kept in older history are")
+@param_perf_store
+@param_sharepaths
+@click.pass_context
+def do_perf_record(ctx, interval, count, max_size, coarse, store_dir, *args, **kwargs):
+    import hstk.hsperfstore as hsperfstore
+    if store_dir is None:
+        store_dir = hsperfstore.default_store_dir()
+    paths = list(kwargs['pathnames'])
+    stores = dict((path, hsperfstore.PerfStore(hsperfstore.share_store_dir(store_dir, path),
+        max_size=max_size << 20, coarse=coarse)) for path in paths)
+    start = time.time()
+    samples = 0
+    try:
+        while True:
+            for path in paths:
+                sample = _sample(path)
+                if ctx.obj.dry_run:
+                    vnprint('dry run, not recording sample in ' + stores[path].path)
+                    continue
+                stores[path].append(sample)
+                vnprint('recorded %d ops of %s in %s' % (len(sample.ops), path, stores[path].path))
+            samples += 1
+            if ctx.obj.dry_run or (count and samples >= count):
+                break
+            time.sleep(interval - (time.time() - start) % interval)
+    except KeyboardInterrupt:
+        pass
+
+@perf_grp.command(name='report', help="Per op rates and latency histograms over a window of perf record history")
+@click.option('--since', help="Start of the window, seconds since the epoch, YYYY-MM-DD[ HH:MM[:SS]] or an age like 2h")
+@click.option('--until', help="End of the window, like --since, default now")
+@click.option('--top', type=click.IntRange(min=1), default=20, show_default=True, help="Ops shown, by time spent")
+@param_perf_store
+@param_sharepaths
+@click.pass_context
+def do_perf_report(ctx, since, until, top, store_dir, *args, **kwargs):
+    import hstk.hsperfstore as hsperfstore
+    if store_dir is None:
+        store_dir = hsperfstore.default_store_dir()
+    try:
+        since = hsperfstore.parse_time(since) if since is not None else None
+        until = hsperfstore.parse_time(until) if until is not None else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx)
+    exit_status = 0
+    for path in kwargs['pathnames']:
+        store = hsperfstore.PerfStore(hsperfstore.share_store_dir(store_dir, path))
+        summary = hsperfstore.summarize(store.samples(since, until))
+        if summary is None:
+            sys.stderr.write('%s: fewer than 2 samples recorded in the window, see hs perf record\n' % (path))
+            exit_status = 1
+            continue
+        first, last, ops = summary
+        secs = last - first
+        busy = sorted(ops.values(), key=lambda op: (op.time, op.name), reverse=True)[:top]
+        if ctx.obj.output_json:
+            res = {
+                    'share': path,
+                    'since': first,
+                    'until': last,
+                    'ops': [ op.as_dict(secs) for op in busy ],
+                }
+            click.echo(json.dumps(res))
+            continue
+        click.echo('##### %s  %s - %s  (%.0fs)' % (path, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(first)),
+            time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last)), secs))
+        click.echo('%-24s %12s %12s %14s  %s' % ('OP', 'COUNT', 'RATE/s', 'AVG', 'LATENCY HISTOGRAM'))
+        for op in busy:
+            res = op.as_dict(secs)
+            hist = ' '.join('%s:%d' % (bucket, count) for bucket, count in res['histogram'].items())
+            click.echo('%-24s %12d %12.1f %14.3f  %s' % (op.name, op.count, res['rate'], res['avg'], hist))
+    sys.exit(exit_status)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+rekognition-tag subcommands
+"""
+
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        OrderedGroup,
+        _cmd_retcode,
+        param_defaults,
+        param_recursive,
+        param_nonfiles,
+        param_force,
+        param_eval,
+        param_read,
+        param_name,
+        param_value,
+        param_unbound,
+)
+
+
+rekognition_tag_short_help = "[sub] inode metadata: schema no, value yes"
+
+rekognition_tag_help = """
+rekognition_tag
+sub commands are used to view metadata added to an object by AWS's
+rekognition service.  Contact support for details on how to configure
+rekognition.
+"""
+
+@click.group(name='rekognition-tag', help=rekognition_tag_help, short_help=rekognition_tag_short_help, cls=OrderedGroup)
+def rekognition_tag():
+    rekognition_tag_short_help + '\n\n' + rekognition_tag_help
+    pass
+
+@rekognition_tag.command(name='list', help="list all rekognition tags and values applied")
+@param_eval
+@param_read
+@param_defaults
+def do_rekognition_tag_list(ctx, *args, **kwargs):
+    _cmd_retcode(hss.rekognition_tag_list, **kwargs)
+
+@rekognition_tag.command(name='get', help="Get the rekognition tag's value")
+@param_eval
+@param_read
+@param_name
+@param_unbound
+@param_defaults
+def do_rekognition_tag_get(ctx, *args, **kwargs):
+    _cmd_retcode(hss.rekognition_tag_get, **kwargs)
+
+@rekognition_tag.command(name='has', help="Is the inode's rekognition tag value non-empty")
+@param_eval
+@param_read
+@param_name
+@param_defaults
+def do_rekognition_tag_has(ctx, *args, **kwargs):
+    _cmd_retcode(hss.rekognition_tag_has, **kwargs)
+
+@rekognition_tag.command(name='delete', help="remove rekognition tag values from inode(s)")
+@param_name
+@param_force
+@param_recursive
+@param_nonfiles
+@param_defaults
+def do_rekognition_tag_del(ctx, *args, **kwargs):
+    _cmd_retcode(hss.rekognition_tag_del, **kwargs)
+
+@rekognition_tag.command(name='set', help="Add/Set value of rekognition tag on inode(s)")
+@param_name
+@param_recursive
+@param_nonfiles
+@param_value
+@param_defaults
+@param_unbound
+def do_rekognition_tag_set(ctx, *args, **kwargs):
+    _cmd_retcode(hss.rekognition_tag_set, **kwargs)
+
+@rekognition_tag.command(name='add', help="Add/Set value of rekognition tag on inode(s)")
+@param_name
+@param_recursive
+@param_nonfiles
+@param_value
+@param_defaults
+@param_unbound
+def do_rekognition_tag_add(ctx, *args, **kwargs):
+    _cmd_retcode(hss.rekognition_tag_set, **kwargs)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+serve subcommand, long running daemon to skip startup costs
+"""
+
+import click
+import hstk.hsserve as hsserve
+from hstk.hscli import (
+        vnprint,
+)
+
+
+@click.command(name='serve', help="Run a daemon that executes hs commands for local clients, skips startup costs")
+@click.option('--socket', 'socket_path', default=None, help="Unix socket to listen on, default $HS_SOCKET or $XDG_RUNTIME_DIR/hstk.sock, its directory must be private to you")
+@click.pass_context
+def do_serve(ctx, socket_path):
+    """
+    Runs in the foreground until killed.  With HS_DAEMON=1 set, the hs
+    command forwards to the daemon while the socket exists.
+    """
+    if not hsserve.supported():
+        raise click.UsageError('hs serve requires unix sockets and fork, not available on this platform', ctx)
+    if socket_path is None:
+        socket_path = hsserve.default_socket_path()
+    vnprint('listen( ' + socket_path + ' )')
+    if ctx.obj.dry_run:
+        return
+    try:
+        hsserve.serve(socket_path)
+    except RuntimeError as e:
+        raise click.UsageError(str(e), ctx)
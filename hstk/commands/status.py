@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+status subcommands, system, component and task status reports
+"""
+
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        OrderedGroup,
+        _cmd_retcode,
+        param_dirpaths,
+        param_sharepaths,
+)
+
+
+@click.group(help="[sub] System, component, task status", cls=OrderedGroup)
+def status():
+    pass
+
+@status.command(name='assimilation', help="State of current assimilations")
+@param_sharepaths
+@click.pass_context
+def do_assim_status(ctx, *args, **kwargs):
+    eval_args = {
+            'exp': 'assimilation_details',
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@status.command(name='csi', help="Details about the kubernetes CSI")
+@param_sharepaths
+@click.pass_context
+def do_csi_status(ctx, *args, **kwargs):
+    eval_args = {
+            'exp': 'attributes.csi_details',
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@status.command(name='collections', help="Collections present in the share")
+@param_sharepaths
+@click.pass_context
+def do_collections_list(ctx, *args, **kwargs):
+    eval_args = {
+            'exp': 'collections',
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@status.command(name='errors', help="Files in the share with errors")
+@click.option('--dump', is_flag=True, help="Dump inode details, only on files in dir+dirpath")
+@param_sharepaths
+@click.pass_context
+def do_errored_files(ctx, dump, *args, **kwargs):
+    if dump:
+        sum_args = {
+                'exp': '(IS_FILE AND ERRORS)?SUMS_TABLE{|KEY=ERRORS,|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
+            }
+        kwargs.update(sum_args)
+    else:
+        eval_args = {
+                'exp': 'IS_FILE and errors!=0?dump_inode',
+                'recursive': True,
+            }
+        kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@status.command(name='open', help="Files open each dir(s)")
+@param_dirpaths
+@click.pass_context
+def do_show_open_files(ctx, *args, **kwargs):
+    sum_args = {
+            'exp': '(IS_FILE AND IS_OPEN)?{1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}',
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
+
+@status.command(name='replication', help="Replication progress for the share(s)")
+@param_sharepaths
+@click.pass_context
+def do_replication_status(ctx, *args, **kwargs):
+    eval_args = {
+            'exp': 'replication_details',
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@status.command(name='sweeper', help="Progress of sweeper (checks file placement) for each share(s)")
+@param_sharepaths
+@click.pass_context
+def do_sweeper_status(ctx, *args, **kwargs):
+    eval_args = {
+            'exp': 'sweep_details',
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
+
+@status.command(name='volume', help="Health of volumes backing the share(s)")
+@param_sharepaths
+@click.pass_context
+def do_volume_health(ctx, *args, **kwargs):
+    eval_args = {
+            'exp': '{|::#A=storage_volumes.name[row],|::#B=storage_volumes.volume_status[row],|::#C=storage_volumes.oper_status[row]}[rows(storage_volumes)]',
+        }
+    kwargs.update(eval_args)
+    _cmd_retcode(hss.eval, **kwargs)
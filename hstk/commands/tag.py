@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+tag subcommands
+"""
+
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        OrderedGroup,
+        _cmd_retcode,
+        param_defaults,
+        param_recursive,
+        param_nonfiles,
+        param_force,
+        param_eval,
+        param_read,
+        param_name,
+        param_value,
+        param_unbound,
+)
+
+
+tag_short_help = "[sub] inode metadata: schema no, value yes"
+
+tag_help = """
+tag: Manage Hammerspace embedded tag metadata
+
+Tags do not follow a schema (they can be created on the fly) and do not have a
+value that can be stored with the key.  There is no list of tag names that have
+been applied to the files of a share, the only way to generate a list is to
+check all files in the share, which can be done via Hammerscript expression.
+"""
+
+@click.group(help=tag_help, short_help=tag_short_help, cls=OrderedGroup)
+def tag():
+    tag_short_help + '\n\n' + tag_help
+    pass
+
+@tag.command(name='list', help="list all tags and values applied")
+@param_eval
+@param_read
+@param_defaults
+@param_unbound
+def do_tag_list(ctx, *args, **kwargs):
+    _cmd_retcode(hss.tag_list, **kwargs)
+
+@tag.command(name='get', help="Get the tag's value")
+@param_eval
+@param_read
+@param_name
+@param_unbound
+@param_defaults
+def do_tag_get(ctx, *args, **kwargs):
+    _cmd_retcode(hss.tag_get, **kwargs)
+
+@tag.command(name='has', help="Is the inode's tag value non-empty")
+@param_eval
+@param_read
+@param_name
+@param_defaults
+def do_tag_has(ctx, *args, **kwargs):
+    _cmd_retcode(hss.tag_has, **kwargs)
+
+@tag.command(name='delete', help="remove tag values from inode(s)")
+@param_name
+@param_force
+@param_recursive
+@param_nonfiles
+@param_defaults
+def do_tag_del(ctx, *args, **kwargs):
+    _cmd_retcode(hss.tag_del, **kwargs)
+
+@tag.command(name='set', help="Add/Set value of tag on inode(s)")
+@param_name
+@param_recursive
+@param_nonfiles
+@param_value
+@param_defaults
+@param_unbound
+def do_tag_set(ctx, *args, **kwargs):
+    _cmd_retcode(hss.tag_set, **kwargs)
+
+@tag.command(name='add', help="Add/Set value of tag on inode(s)")
+@param_name
+@param_recursive
+@param_nonfiles
+@param_value
+@param_defaults
+@param_unbound
+def do_tag_add(ctx, *args, **kwargs):
+    _cmd_retcode(hss.tag_set, **kwargs)
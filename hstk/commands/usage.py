@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+usage subcommands, capacity and inode usage
+"""
+
+import click
+import hstk.hsscript as hss
+from hstk.hscli import (
+        OrderedGroup,
+        _cmd_retcode,
+        param_paths,
+        param_dirpaths,
+)
+
+
+@click.group(name='usage', short_help="[sub] Resource utilization such as capacity or inode", cls=OrderedGroup)
+def usage():
+    pass
+
+@usage.command(name='alignment', help="Alignment state of files each file(s) of files in dir(s)")
+@click.option('--top-files', is_flag=True, help="include largest files in each alignment state")
+@param_paths
+@click.pass_context
+def do_file_alignment(ctx, top_files, *args, **kwargs):
+    if top_files:
+        sum_args = {
+                'exp': 'IS_FILE?SUMS_TABLE{|KEY=OVERALL_ALIGNMENT,|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
+            }
+    else:
+        sum_args = {
+            'exp': 'IS_FILE?SUMS_TABLE{|KEY=OVERALL_ALIGNMENT,|VALUE=1}',
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
+
+@usage.command(name='virus-scan', help="Virus scan state of files each file(s) of files in dir(s)")
+@click.option('--top-files', is_flag=True, help="include largest files in each virus scan state")
+@param_paths
+@click.pass_context
+def do_file_virus_scan(ctx, top_files, *args, **kwargs):
+    if top_files:
+        sum_args = {
+                'exp': 'IS_FILE?SUMS_TABLE{|KEY=ATTRIBUTES.VIRUS_SCAN,|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
+            }
+    else:
+        sum_args = {
+            'exp': 'IS_FILE?SUMS_TABLE{|KEY=ATTRIBUTES.VIRUS_SCAN,|VALUE=1}',
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
+
+@usage.command(name='owner', help="Owner state of files each file(s) of files in dir(s)")
+@click.option('--top-files', is_flag=True, help="include largest files of each owner")
+@param_paths
+@click.pass_context
+def do_usage_owner(ctx, top_files, *args, **kwargs):
+    if top_files:
+        sum_args = {
+                'exp': 'IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
+            }
+    else:
+        sum_args = {
+            'exp': 'IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE=1}',
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
+
+@usage.command(name='online', help="Summary of files on NAS volumes in the dir")
+@param_dirpaths
+@click.pass_context
+def do_online_files(ctx, *args, **kwargs):
+    sum_args = {
+            'exp': 'IS_ONLINE?{1FILE,SPACE_USED,TOP10_TABLE{{space_used,DPATH}}}',
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
+
+@usage.command(name='volume', help="Usage for each volume backing each dir(s)")
+@click.option('--top-files', is_flag=True, help="Show largest files on each volume")
+@click.option('--deep', is_flag=True, help="Might take a long time, XXX")
+@param_paths
+@click.pass_context
+def do_volume_usage(ctx, top_files, deep, *args, **kwargs):
+    sum_args = {
+            'exp': 'IS_FILE?ROWS(INSTANCES)?SUMS_TABLE{|::KEY=INSTANCES[ROW].VOLUME,|::VALUE=1}[ROWS(INSTANCES)]:SUMS_TABLE{|KEY=#EMPTY,|::VALUE=1}',
+        }
+    kwargs.update(sum_args)
+    if top_files:
+        kwargs['exp'] = 'IS_FILE?ROWS(INSTANCES)?SUMS_TABLE{|::KEY=INSTANCES[ROW].VOLUME,|::VALUE={1FILE,INSTANCES[ROW].SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}[ROWS(INSTANCES)]:SUMS_TABLE{|KEY=#EMPTY,|::VALUE={1FILE, SPACE_USED, TOP10_TABLE{{space_used,dpath}}}}'
+    if deep:
+        kwargs['exp'] = 'IS_FILE?ROWS(INSTANCES)?SUMS_TABLE{|::KEY=INSTANCES[ROW].VOLUME,|::VALUE={1FILE,INSTANCES[ROW].SPACE_USED,TOP100_TABLE{{space_used,dpath}}}}[ROWS(INSTANCES)]:SUMS_TABLE{|KEY=#EMPTY,|::VALUE={1FILE, SPACE_USED, TOP100_TABLE{{space_used,dpath}}}}'
+    _cmd_retcode(hss.sum, **kwargs)
+
+@usage.command(name='user', help="Users consuming the most capacity in each dir(s)")
+@click.option('--details', is_flag=True, help="Include details like largest files per user")
+@param_dirpaths
+@click.pass_context
+def do_users_top_usage(ctx, details, *args, **kwargs):
+    sum_args = {
+            'exp': 'IS_FILE?SUMS_TABLE{|KEY={OWNER,OWNER_GROUP},|VALUE=SPACE_USED}',
+        }
+    if details:
+        sum_args = {
+            'exp': 'IS_FILE?SUMS_TABLE{|KEY={OWNER,OWNER_GROUP},|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
+
+@usage.command(name='objectives', help="Objectives applied and capacity managed by dir(s)")
+@param_dirpaths
+@click.pass_context
+def do_objectives_usage(ctx, *args, **kwargs):
+    sum_args = {
+            'exp': 'IS_FILE?SUMS_TABLE{|::KEY=LIST_OBJECTIVES_ACTIVE[ROW],|::VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}[ROWS(LIST_OBJECTIVES_ACTIVE)]',
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
+
+@usage.command(name='mime_tags', help="All tags added by mime discovery on dir(s)")
+@param_dirpaths
+@click.pass_context
+def do_list_mime_tags(ctx, *args, **kwargs):
+    sum_args = {
+            'exp': 'IS_FILE?SUMS_TABLE{attributes.mime.string,{1FILE,SPACE_USED,TOP10_TABLE{{SPACE_USED,DPATH}}}}',
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
+
+@usage.command(name='rekognition_tags', help="All tags added by Rekognition on dir(s)")
+@param_dirpaths
+@click.pass_context
+def do_list_rekognition_tags(ctx, **kwargs):
+    sum_args = {
+            'exp': 'IS_FILE?ISTABLE(LIST_REKOGNITION_TAGS)?SUMS_TABLE{|::KEY=LIST_REKOGNITION_TAGS()[ROW].NAME,|::VALUE={1FILE,TOP10_TABLE{{LIST_REKOGNITION_TAGS()[ROW].value,dpath}}}}[ROWS(LIST_REKOGNITION_TAGS())]',
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
+
+@usage.command(name='dirs', help="Number of subdirectories under specified directory(ies), not including that directory")
+@param_dirpaths
+@click.pass_context
+def do_dirs_count(ctx, *args, **kwargs):
+    # Also, an efficient way to follow an assimilation, this will block until it completes
+    sum_args = {
+            'exp': '1',
+            'nonfiles': True,
+        }
+    kwargs.update(sum_args)
+    _cmd_retcode(hss.sum, **kwargs)
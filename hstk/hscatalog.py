@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+On disk cache of the cluster catalogs: volumes, volume groups, objectives
+and GNS sites
+
+These change rarely but listing or validating against them costs a gateway
+round trip and a whole JSON table each time, so the lists are kept in a
+file per share under $XDG_CACHE_HOME/hstk/catalog.  A file is named for
+the share's mount point and what is mounted there (the server and export
+from the mount table), so remounting from another cluster doesn't reuse
+its catalogs.  Each list is used until it is older than the TTL.
+
+Any number of processes can share the files: updates are made under an
+flock() of a lock file, re-reading the file first so updates of other
+lists aren't lost, and land with a rename so readers never see part of
+one.  Readers don't lock.
+
+This module is imported by shell completion, keep it to the standard
+library and away from hstk.hscli.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from hstk.hslimit import share_root
+
+KINDS = ('volumes', 'volume_groups', 'objectives', 'sites')
+DEFAULT_TTL = 300.0
+
+
+def default_cache_dir():
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'hstk', 'catalog')
+
+
+def _mount_source(root, mounts='/proc/self/mounts'):
+    """ What is mounted on root, 'server:/export' for NFS, None if unknown """
+    source = None
+    try:
+        with open(mounts) as fd:
+            for line in fd:
+                fields = line.split()
+                if len(fields) > 1 and fields[1].replace('\\040', ' ') == root:
+                    # The last mount on a directory is the one seen
+                    source = fields[0]
+    except OSError:
+        pass
+    return source
+
+
+def share_identity(path):
+    """ (share mount point, cluster) for the share holding path """
+    root = share_root(path)
+    cluster = _mount_source(root)
+    if cluster is None:
+        try:
+            cluster = 'dev:%d' % (os.stat(root).st_dev)
+        except OSError:
+            cluster = 'unknown'
+    return root, cluster
+
+
+class Catalog(object):
+    """ The cached catalogs of the share holding path """
+
+    def __init__(self, path, cache_dir=None, ttl=DEFAULT_TTL, clock=time.time):
+        self.share, self.cluster = share_identity(path)
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        key = hashlib.sha1(('%s\0%s' % (self.share, self.cluster)).encode()).hexdigest()[:20]
+        self.path = os.path.join(self.cache_dir, key + '.json')
+        self.ttl = ttl
+        self.clock = clock
+
+    def _load(self):
+        """ {kind: {'time':, 'value':}}, empty if the file is missing, damaged or another share's """
+        try:
+            with open(self.path) as fd:
+                data = json.load(fd)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('share') != self.share or data.get('cluster') != self.cluster:
+            return {}
+        entries = data.get('entries')
+        return entries if isinstance(entries, dict) else {}
+
+    def lookup(self, kind, max_age=None):
+        """ The cached list of kind, None if there isn't one or it is older than max_age seconds """
+        entry = self._load().get(kind)
+        if not isinstance(entry, dict) or 'value' not in entry:
+            return None
+        if max_age is not None and self.clock() - entry.get('time', 0) > max_age:
+            return None
+        return entry['value']
+
+    def get(self, kind, fetch, refresh=False):
+        """ The list of kind, from the cache if it is younger than the TTL, else from fetch() and cached """
+        if not refresh:
+            value = self.lookup(kind, self.ttl)
+            if value is not None:
+                return value
+        value = fetch()
+        try:
+            self._update(lambda entries: entries.__setitem__(kind, { 'time': self.clock(), 'value': value }))
+        except OSError:
+            # A cache that can't be written only costs the round trip next time
+            pass
+        return value
+
+    def invalidate(self, kinds=None):
+        """ Drop the cached lists of kinds, all of them by default """
+        if not os.path.exists(self.path):
+            return
+        def drop(entries):
+            for kind in (kinds if kinds is not None else list(entries)):
+                entries.pop(kind, None)
+        self._update(drop)
+
+    def _update(self, change):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        lock = None
+        try:
+            import fcntl
+            lock = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        try:
+            entries = self._load()
+            change(entries)
+            data = { 'share': self.share, 'cluster': self.cluster, 'entries': entries }
+            fd, tmpname = tempfile.mkstemp(dir=self.cache_dir, prefix='.catalog.')
+            try:
+                with os.fdopen(fd, 'w') as tmp:
+                    json.dump(data, tmp)
+                os.replace(tmpname, self.path)
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+        finally:
+            if lock is not None:
+                os.close(lock)
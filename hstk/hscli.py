@@ -12,48 +12,106 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
-import subprocess as sp
+# Keep the imports here to what every command needs, hs startup time depends
+# on it.  Anything else belongs in the hstk.commands module that uses it.
 import sys
 import os
-import json
-import pprint
-import random
 import io
+import importlib
 import pathlib
 import click
-import platform
 import hstk.hsscript as hss
+import hstk.hsgateway as hsgw
+import hstk.hsprofile as hsprof
+import hstk.hslimit as hslimit
 
 # Windows compatability stuff
-if platform.system().startswith('Windows') or platform.system().startswith('CYGWIN'):
+if sys.platform.startswith('win') or sys.platform.startswith('cygwin'):
     WINDOWS = True
     WIN_PADDING = b'\0'*50
 else:
     WINDOWS = False
     WIN_PADDING = b''
 
+# Size of the reads used when streaming results back from a gateway file
+GATEWAY_READ_SIZE = 64 * 1024
+
+# Size of the reads used for --files-from path lists
+PATH_READ_SIZE = 64 * 1024
+
+# Results held in memory per path by iter_spooled() before going to a temp file
+SPOOL_SIZE = 1024 * 1024
+
+# Paths whose gateway file location is remembered by a GatewayDirCache
+GATEWAY_DIRS_SIZE = 64 * 1024
 
 # Helper object for containing global settings to be passed with context
 class HSGlobals(object):
-    def __init__(self, verbose=False, dry_run=False, debug=False, output_json=False):
+    def __init__(self, verbose=False, dry_run=False, debug=False, output_json=False, jobs=None, stream=False, transport=None, profile=None, concurrency=None, rate_limit=None, catalog_dir=None, catalog_ttl=300.0, gateway_dirs=None, pipeline=1, log=None):
         self.verbose = verbose
         self.dry_run = dry_run
         self.debug = debug
         if debug and not verbose:
             verbose = debug
         self.output_json = output_json
+        self.jobs = jobs
+        self.stream = stream
+        if transport is None:
+            if dry_run:
+                transport = hsgw.DryRunGateway()
+            else:
+                transport = hsgw.FileGateway()
+        self.transport = transport
+        self.profile = profile
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.catalog_dir = catalog_dir
+        self.catalog_ttl = catalog_ttl
+        self.gateway_dirs = gateway_dirs
+        self.pipeline = pipeline
+        # Takes the verbose and dry-run lines instead of stdout when set
+        self.log = log
+
+    def jobs_or(self, default):
+        """ --jobs, or the command's own default when it wasn't given """
+        jobs = default if self.jobs is None else self.jobs
+        if self.concurrency is not None:
+            self.concurrency.fit(jobs)
+        return jobs
+
+
 
+ALIAS_MAPPINGS = {
+        'attribute': ('attributes', 'attr', 'attrs'),
+        'tag': ('tags', ),
+        'label': ('labels', 'lab'),
+        'available': ('avail',),
+        'keyword': ('keywords',),
+        'delete': ('del',),
+        'assimilation': ('assim',),
+        'alignment': ('align',),
+        'collsum': ('collsums', 'colsum', 'colsums'),
+        'objective': ('objectives', 'obj', 'objs'),
+        'rekognition-tag': ('rekognition-tags', ),
+        'keep-on-site': ('keep-on-sites', ),
+}
 
+class MissingExpression(ValueError):
+    """ A command that needs an expression was run without one """
 
 class OrderedGroup(click.Group):
     """
     Keep the order items are added in for --help output
+
+    Commands can also be added lazily as a 'module:attribute' import path,
+    the module is only imported once the command is looked up.  Any
+    ALIAS_MAPPINGS for a command name are applied as commands are added.
     """
 
     def __init__(self, commands=None, name=None, **kwargs):
         self._ordered_commands = []
         self._cmd_aliases = {}
+        self._lazy_commands = {}
         if commands is not None:
             for cmd in commands:
                 self._ordered_commands.append(cmd.name)
@@ -67,15 +125,17 @@ class OrderedGroup(click.Group):
             cmd_name = name
         else:
             cmd_name = cmd.name
-        for alias in aliases:
-            if alias in self._cmd_aliases:
-                raise click.NoSuchOption(f'Duplicate alias ({alias}) added to group\n' +
-                         '    New cmd: {cmd_name}\n' +
-                         '    Orig cmd: {self._cmd_aliases[alias]}\n')
-            self._cmd_aliases[alias] = cmd_name
+        self.add_alias(cmd_name, *aliases)
+        self.add_alias(cmd_name, *ALIAS_MAPPINGS.get(cmd_name, ()))
         self._ordered_commands.append(cmd_name)
         super(OrderedGroup, self).add_command(cmd, name=None)
 
+    def add_lazy_command(self, cmd_name, import_path, aliases=[]):
+        self.add_alias(cmd_name, *aliases)
+        self.add_alias(cmd_name, *ALIAS_MAPPINGS.get(cmd_name, ()))
+        self._ordered_commands.append(cmd_name)
+        self._lazy_commands[cmd_name] = import_path
+
     def add_alias(self, cmd_name, *aliases):
         for alias in aliases:
             if alias in self._cmd_aliases:
@@ -84,6 +144,12 @@ class OrderedGroup(click.Group):
                          '    Orig cmd: {self._cmd_aliases[alias]}\n')
             self._cmd_aliases[alias] = cmd_name
 
+    def _load_lazy_command(self, cmd_name):
+        modname, attr = self._lazy_commands.pop(cmd_name).split(':')
+        cmd = getattr(importlib.import_module(modname), attr)
+        # Bypass add_command(), the name and aliases are already registered
+        self.commands[cmd_name] = cmd
+
     def get_command(self, ctx, cmd_name):
         """
         Command name resolution priority
@@ -104,6 +170,8 @@ class OrderedGroup(click.Group):
                 ctx.fail('%s matched too many commands: %s' % (cmd_name, ', '.join(sorted(matches))))
             cmd_name = matches[0]
 
+        if cmd_name in self._lazy_commands:
+            self._load_lazy_command(cmd_name)
         return super(OrderedGroup, self).get_command(ctx, cmd_name)
 
     def print_cmd_tree(self, cmd=None, indent=0):
@@ -112,10 +180,10 @@ class OrderedGroup(click.Group):
         for sub in cmd._ordered_commands:
             if sub == "foo": # no idea...
                 continue
-            subcmd = cmd.commands[sub]
+            subcmd = cmd.get_command(None, sub)
             print("%s %- 18s %s" % ("  "*indent, sub, subcmd.help))
             if isinstance(subcmd, OrderedGroup):
-                self.print_cmd_tree(cmd=cmd.commands[sub], indent=indent+1)
+                self.print_cmd_tree(cmd=subcmd, indent=indent+1)
 
 
 #
@@ -126,9 +194,23 @@ class OrderedGroup(click.Group):
 @click.option('-n', '--dry-run', is_flag=True, help="Don't operate on files")
 @click.option('-d', '--debug', is_flag=True, help="Show debug output")
 @click.option('-j', '--json', 'output_json', is_flag=True, help="Use JSON formatted output")
+@click.option('--jobs', type=click.IntRange(min=1), default=None, envvar='HS_JOBS', help="Number of paths to run shadow commands on in parallel, default 1, or 8 for rm, cp, rsync --pairs-from and --fan-out")
+@click.option('--adaptive', is_flag=True, help="Vary the shadow commands in flight between --min-jobs and --jobs (or the command's default) to keep round trips under --target-latency")
+@click.option('--min-jobs', type=click.IntRange(min=1), default=1, help="Fewest shadow commands kept in flight with --adaptive")
+@click.option('--target-latency', type=click.FloatRange(min=0), default=1.0, envvar='HS_TARGET_LATENCY', help="Round trip time in seconds --adaptive backs off above")
+@click.option('--max-ops', type=click.FloatRange(min=0, min_open=True), envvar='HS_MAX_OPS', help="Most shadow commands a second to send to each share")
+@click.option('--max-bytes', type=click.FloatRange(min=0, min_open=True), envvar='HS_MAX_BYTES', help="Most bytes a second of shadow commands and results for each share")
+@click.option('--rate-state', type=click.Path(file_okay=False), envvar='HS_RATE_STATE', help="Directory to keep the --max-ops/--max-bytes budgets in, shared by every hs using it")
+@click.option('--catalog-dir', type=click.Path(file_okay=False), envvar='HS_CATALOG_DIR', help="Directory to cache volume, volume group, objective and site lists in, default $XDG_CACHE_HOME/hstk/catalog")
+@click.option('--catalog-ttl', type=click.FloatRange(min=0), default=300.0, envvar='HS_CATALOG_TTL', help="Seconds cached volume, volume group, objective and site lists are used for, 0 to not cache")
+@click.option('--pipeline', type=click.IntRange(min=1), default=1, envvar='HS_PIPELINE', help="With --jobs 1, number of shadow commands to write before reading the first result")
+@click.option('--stream', is_flag=True, help="Write results as they are read rather than after all paths complete, runs one path at a time")
+@click.option('--gateway', default='file', envvar='HS_GATEWAY', help="Gateway transport: 'file' or 'sim[:latency=SECS][,payload=BYTES][,root=DIR][,export=PATH]' to simulate a cluster")
+@click.option('--profile', is_flag=True, help="Time each phase of the gateway round trips, print a summary table to stderr on exit")
+@click.option('--profile-trace', type=click.Path(dir_okay=False, writable=True), help="Time each phase of the gateway round trips, write a JSON trace of the most recent ones to this file on exit")
 @click.option('--cmd-tree', is_flag=True, help="Show help for available commands")
 @click.pass_context
-def cli(ctx, verbose, dry_run, debug, output_json, cmd_tree):
+def cli(ctx, verbose, dry_run, debug, output_json, jobs, adaptive, min_jobs, target_latency, max_ops, max_bytes, rate_state, catalog_dir, catalog_ttl, pipeline, stream, gateway, profile, profile_trace, cmd_tree):
     """
     Top level function to kick of click parsing.
     verbose and dry-run are to be respected globally
@@ -141,12 +223,59 @@ def cli(ctx, verbose, dry_run, debug, output_json, cmd_tree):
         print(ctx.command.get_help(ctx))
         sys.exit(0)
 
-    ctx.obj = HSGlobals(verbose=verbose, dry_run=dry_run, debug=debug, output_json=output_json)
+    transport = None
+    if not dry_run:
+        try:
+            transport = hsgw.gateway_from_spec(gateway)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--gateway')
+
+    gw_profile = None
+    if profile or profile_trace:
+        gw_profile = hsprof.GatewayProfile()
+        ctx.call_on_close(lambda: _report_profile(gw_profile, profile, profile_trace))
+
+    concurrency = None
+    if adaptive:
+        if jobs is not None and min_jobs > jobs:
+            raise click.BadParameter('must not be more than --jobs', param_hint='--min-jobs')
+        # Without --jobs each command's own default is the ceiling
+        concurrency = hslimit.AdaptiveConcurrency(floor=min_jobs, ceiling=jobs, target_latency=target_latency)
+        if verbose:
+            ctx.call_on_close(lambda: sys.stderr.write('V: ' + concurrency.summary()))
+
+    rate_limit = None
+    if max_ops is not None or max_bytes is not None:
+        try:
+            rate_limit = hslimit.ShareRateLimit(ops=max_ops, nbytes=max_bytes, state_dir=rate_state)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--rate-state')
+        if verbose:
+            ctx.call_on_close(lambda: sys.stderr.write('V: rate limit: waited %.3fs\n' % (rate_limit.waited)))
+
+    ctx.obj = HSGlobals(verbose=verbose, dry_run=dry_run, debug=debug, output_json=output_json, jobs=jobs, stream=stream, transport=transport, profile=gw_profile, concurrency=concurrency, rate_limit=rate_limit, catalog_dir=catalog_dir, catalog_ttl=catalog_ttl, pipeline=pipeline)
     if ctx.obj.verbose > 1:
         print ('V: verbose: ' + str(verbose))
         print ('V: dry_run: ' + str(dry_run))
         print ('V: debug: ' + str(debug))
         print ('V: output_json: ' + str(output_json))
+        print ('V: jobs: ' + str(jobs))
+        print ('V: adaptive: ' + str(adaptive))
+        print ('V: max_ops: ' + str(max_ops))
+        print ('V: max_bytes: ' + str(max_bytes))
+        print ('V: pipeline: ' + str(pipeline))
+        print ('V: stream: ' + str(stream))
+        print ('V: gateway: ' + str(gateway))
+        print ('V: profile: ' + str(profile))
+
+def _report_profile(gw_profile, table, trace_file):
+    if table:
+        sys.stderr.write(gw_profile.format_table())
+    if trace_file:
+        import json
+        with click.open_file(trace_file, 'w') as fd:
+            json.dump(gw_profile.trace(), fd, indent=4)
+            fd.write('\n')
 
 def print_full_cmd_tree():
     """ Helper to allow cli function to call methods of itself """
@@ -162,25 +291,122 @@ def group_decorator(*decs):
         return f
     return deco_group_apply
 
+def ordered_pool_map(func, items, jobs):
+    """
+    Like map(func, items) but run up to 'jobs' calls at once on a thread pool.
+    Results are yielded in the same order as items, and only a bounded window
+    of items is pulled from the iterable and held in flight at any one time.
+    """
+    if jobs <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    import concurrent.futures
+
+    items = iter(items)
+    window = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        for item in items:
+            window.append(pool.submit(func, item))
+            if len(window) >= jobs * 2:
+                yield window.pop(0).result()
+        while window:
+            yield window.pop(0).result()
+
+def _gateway_dir(fname):
+    """ (directory for the gateway file, command prefix naming fname in it) """
+    if fname.is_dir():
+        return fname, b'./'
+    return fname.parent, b'./' + fname.name.encode()
+
+class GatewayDirCache(object):
+    """
+    Where the gateway file and command prefix for a path are, so a path
+    used again doesn't need another stat() to find out if it is a
+    directory.  Holds the size most recently used paths, safe to share
+    between threads.  Paths that are removed or replaced by something else
+    need to be dropped with discard().
+    """
+
+    def __init__(self, size=GATEWAY_DIRS_SIZE):
+        import collections
+        import threading
+        self.size = size
+        self._dirs = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fname):
+        key = str(fname)
+        with self._lock:
+            found = self._dirs.get(key)
+            if found is not None:
+                self._dirs.move_to_end(key)
+                return found
+        found = _gateway_dir(fname)
+        with self._lock:
+            self._dirs[key] = found
+            while len(self._dirs) > self.size:
+                self._dirs.popitem(last=False)
+        return found
+
+    def discard(self, fname):
+        """ Forget fname and anything under it """
+        key = str(fname).rstrip(os.sep)
+        with self._lock:
+            for path in [ path for path in self._dirs if path == key or path.startswith(key + os.sep) ]:
+                del self._dirs[path]
+
 class ShadCmd(object):
-    @click.pass_context
-    def __init__(ctx, self, shadgen, kwargs):
-        self.ctx = ctx
-        self.verbose = self.ctx.obj.verbose
-        self.dry_run = self.ctx.obj.dry_run
-        self.debug = self.ctx.obj.debug
+    """
+    A shadow command run on a set of paths through .fs_command_gateway files
+
+    The global settings, an HSGlobals, come from the click context unless
+    passed in as settings, which is how it is used outside of the cli, see
+    hstk.hsclient.  command names the command for --profile.
+    """
+
+    def __init__(self, shadgen, kwargs, settings=None, command=None):
+        if settings is None:
+            self.ctx = click.get_current_context()
+            settings = self.ctx.obj
+            if command is None:
+                command = ' '.join(self.ctx.command_path.split()[1:])
+        else:
+            self.ctx = None
+        self.settings = settings
+        self.command = command
+        self.verbose = settings.verbose
+        self.dry_run = settings.dry_run
+        self.debug = settings.debug
         if 'force_json' in kwargs and kwargs['force_json']:
             self.output_json = True
         else:
-            self.output_json = self.ctx.obj.output_json
+            self.output_json = settings.output_json
         if 'outstream' in kwargs:
             self.outstream = kwargs['outstream']
         else:
             self.outstream = sys.stdout
+        self.jobs = settings.jobs_or(1)
+        self.transport = settings.transport
+        self.profile = settings.profile
+        self.concurrency = settings.concurrency
+        self.rate_limit = settings.rate_limit
+        self.gateway_dirs = settings.gateway_dirs
+        self.pipeline = settings.pipeline
+        if self.concurrency is not None:
+            self.concurrency.fit(self.pipeline)
+        if 'stream' in kwargs and kwargs['stream']:
+            self.stream = True
+        else:
+            self.stream = settings.stream
+        # Results too big to buffer, but --jobs still applies
+        self.spool = bool(kwargs.get('spool'))
         self.output_returns_error = False
         self.exit_status = 0
 
         self._paths = None
+        self._path_stream = None
         self.shadgen = shadgen
         self.kwargs = kwargs
         self.process_kwargs()
@@ -193,7 +419,7 @@ class ShadCmd(object):
                 if self.checkopt(arg, self.kwargs):
                     cnt += 1
             if cnt > 1:
-                self.ctx.fail("specify only one of the following options, found %d: %s" % (cnt, argset))
+                self.fail("specify only one of the following options, found %d: %s" % (cnt, argset))
 
         if self.output_json:
             self.kwargs['json'] = True
@@ -223,97 +449,352 @@ class ShadCmd(object):
         if self.checkopt('input_json', self.kwargs) and self.checkopt('value', self.kwargs):
             self.kwargs['value'].input_json = True
 
-        self.add_paths(*self.kwargs['pathnames'])
-
-    def run_cmd(self, fname):
+        if isinstance(self.kwargs['pathnames'], PathStream):
+            self.set_path_stream(self.kwargs['pathnames'])
+        else:
+            self.add_paths(*self.kwargs['pathnames'])
+
+    def fail(self, message):
+        """ Usage error of the command, ValueError outside of the cli """
+        if self.ctx is None:
+            raise ValueError(message)
+        self.ctx.fail(message)
+
+    def vnprint(self, line):
+        """ vnprint() by the settings of this command, works on any thread """
+        print_verbose(self.settings, line)
+
+    def round_trip(self, fname):
+        """ Start timing a gateway round trip for fname if --profile is on """
+        if self.profile is None:
+            return hsprof.NULL_ROUND_TRIP
+        return self.profile.round_trip(self.command or '', fname)
+
+    def in_flight(self):
+        """ Hold a place for one gateway round trip if --adaptive is on """
+        if self.concurrency is None:
+            return hslimit.NULL_SLOT
+        return self.concurrency.slot()
+
+    def throttle(self, fname, nbytes=0):
+        """ Wait for the --max-ops/--max-bytes budget of fname's share """
+        if self.rate_limit is not None:
+            self.rate_limit.op(fname, nbytes)
+
+    def throttle_data(self, fname, nbytes):
+        if self.rate_limit is not None:
+            self.rate_limit.data(fname, nbytes)
+
+    def submit_cmd(self, fname, rt=hsprof.NULL_ROUND_TRIP):
         """
-        Create the .fs_command_gateway file for the exp_file argument and write the command
-        then read from the .fs_command_gateway file
+        Create the .fs_command_gateway file for the exp_file argument and write the command,
+        returns the gateway path to collect the results from
         """
-        ret = []
-
-        work_id = hex(random.randint(0,99999999))
-        if fname.is_dir():
-            gw = fname
-            cmd = b'./'
+        work_id = hex(int.from_bytes(os.urandom(4), 'little') % 100000000)
+        if self.gateway_dirs is not None:
+            gw, cmd = self.gateway_dirs.get(fname)
         else:
-            gw = fname.parent
-            cmd = b'./' + fname.name.encode()
+            gw, cmd = _gateway_dir(fname)
         gw = gw / f'.fs_command_gateway {work_id}'
 
         # First open, send the command
-        vnprint(f'open( {gw} )')
-        if self.dry_run:
-            fd = io.StringIO()
-        else:
-            fd = gw.open('wb')
+        self.vnprint(f'open( {gw} )')
+        fd = self.transport.open_write(gw)
+        rt.mark('open')
 
         try:
             cmd += self.shadgen(**self.kwargs).encode()
         except ValueError as e:
             if (        ('value' not in self.kwargs)
                     or  ('value' in self.kwargs and (not self.kwargs['value'])) ):
-                sys.stderr.write('No expression (-e) provided')
-                sys.exit(2)
+                raise MissingExpression('No expression (-e) provided')
             else:
                 raise e
 
         # Add padding for windows, writes don't get pushed through the stack for if there is not enough data
         cmd += WIN_PADDING
+        self.throttle_data(fname, len(cmd))
+        rt.mark('build')
 
-        vnprint(f'write( {cmd} )')
+        self.vnprint(f'write( {cmd} )')
         fd.write(cmd)
+        rt.mark('write')
 
         # The flush here is only to make debugging easier so sync doesn't happen on close
-        vnprint(f'flush()')
+        self.vnprint(f'flush()')
         fd.flush()
+        rt.mark('flush')
 
-        vnprint(f'close( {gw} )')
+        self.vnprint(f'close( {gw} )')
         fd.close()
+        rt.mark('close')
 
-        # open again to collect the results
-        vnprint(f'open( {gw} )')
-        if self.dry_run:
-            fd = io.StringIO('dry run output')
-        else:
-            fd = gw.open('r')
-        vnprint('calling read()')
+        return gw
+
+    def open_result(self, gw, rt=hsprof.NULL_ROUND_TRIP):
+        """ open the gateway file again to collect the results """
+        self.vnprint(f'open( {gw} )')
+        fd = self.transport.open_read(gw)
+        rt.mark('reopen')
+        return fd
+
+    def run_cmd(self, fname):
+        """
+        Send the command for fname through a .fs_command_gateway file and return all
+        of the result lines
+        """
+        self.throttle(fname)
+        with self.in_flight():
+            # Timed from here, waiting for a slot is not part of the round trip
+            rt = self.round_trip(fname)
+            gw = self.submit_cmd(fname, rt)
+            ret = self.read_result(gw, rt)
+
+        self.throttle_data(fname, len("".join(ret)))
+        return ret
+
+    def read_result(self, gw, rt=hsprof.NULL_ROUND_TRIP):
+        """ All of the result lines of the command submitted to gw """
+        fd = self.open_result(gw, rt)
+        self.vnprint('calling read()')
         ret = fd.readlines()
-        vnprint(f'read() returned {len(ret)} lines {len("".join(ret))} bytes')
+        rt.mark('read')
+        self.vnprint(f'read() returned {len(ret)} lines {len("".join(ret))} bytes')
 
-        vnprint(f'close( {gw} )')
+        self.vnprint(f'close( {gw} )')
         fd.close()
-
+        rt.mark('close_read')
         return ret
 
+    def _collect(self, submitted):
+        fname, gw, rt, slot = submitted
+        try:
+            ret = self.read_result(gw, rt)
+        except BaseException:
+            slot.__exit__(*sys.exc_info())
+            raise
+        slot.__exit__(None, None, None)
+        self.throttle_data(fname, len("".join(ret)))
+        return fname, ret
+
+    def iter_pipelined(self):
+        """
+        iter_results() from this thread alone: the commands for up to
+        self.pipeline paths are written before the result of the first is
+        read, so the metadata server has a queue of them to work on.  With
+        --adaptive a command is only written ahead if there is room for it.
+        """
+        window = []
+        try:
+            for fname in self.paths:
+                if len(window) >= self.pipeline:
+                    yield self._collect(window.pop(0))
+                slot = self.in_flight()
+                # Never wait for room while holding some, read results instead
+                entered = False
+                while window and not entered:
+                    entered = slot.try_enter()
+                    if not entered:
+                        yield self._collect(window.pop(0))
+                if not entered:
+                    slot.__enter__()
+                self.throttle(fname)
+                # Timed once it has a slot, like run_cmd()
+                rt = self.round_trip(fname)
+                try:
+                    gw = self.submit_cmd(fname, rt)
+                except BaseException:
+                    slot.__exit__(*sys.exc_info())
+                    raise
+                window.append((fname, gw, rt, slot))
+            while window:
+                yield self._collect(window.pop(0))
+        finally:
+            # Given up on part way, the commands still outstanding are dropped
+            for fname, gw, rt, slot in window:
+                try:
+                    self.transport.open_read(gw).close()
+                except OSError:
+                    pass
+                slot.__exit__(None, None, None)
+
+    def iter_cmd_chunks(self, fname):
+        """
+        Send the command for fname through a .fs_command_gateway file and yield
+        the results in GATEWAY_READ_SIZE chunks as they arrive
+        """
+        self.throttle(fname)
+        with self.in_flight() as slot:
+            rt = self.round_trip(fname)
+            gw = self.submit_cmd(fname, rt)
+
+            fd = self.open_result(gw, rt)
+            self.vnprint('calling read() in streaming mode')
+            total = 0
+            try:
+                while True:
+                    chunk = fd.read(GATEWAY_READ_SIZE)
+                    # Latency is to the first results, not how fast they are consumed
+                    slot.ready()
+                    if not chunk:
+                        break
+                    total += len(chunk)
+                    self.throttle_data(fname, len(chunk))
+                    yield chunk
+            finally:
+                rt.mark('read')
+                self.vnprint(f'read() streamed {total} bytes')
+                self.vnprint(f'close( {gw} )')
+                fd.close()
+                rt.mark('close_read')
+
+    def stream_cmd(self, fname, outstream):
+        """
+        Send the command for fname through a .fs_command_gateway file and forward
+        the results to outstream as they arrive, returns the number of
+        characters forwarded
+        """
+        total = 0
+        for chunk in self.iter_cmd_chunks(fname):
+            outstream.write(chunk)
+            outstream.flush()
+            total += len(chunk)
+        return total
+
+    def _scope(self):
+        """
+        For worker threads, click only tracks the current context per
+        thread so push ours for vnprint() and friends
+        """
+        if self.ctx is None:
+            return hslimit.NULL_SLOT
+        return self.ctx.scope(cleanup=False)
+
+    def run_cmd_in_ctx(self, fname):
+        """
+        run_cmd() for worker threads and callers driving their own pool, with
+        the click context of this command pushed
+        """
+        with self._scope():
+            return self.run_cmd(fname)
+
+    def _run_path(self, fname):
+        return fname, self.run_cmd_in_ctx(fname)
+
+    def iter_results(self):
+        """
+        Kick off up to self.jobs shadow commands at once, yielding
+        (path, result lines) in the original path order as they complete.
+        With one job and --pipeline, see iter_pipelined()
+        """
+        if self.jobs <= 1 and self.pipeline > 1:
+            return self.iter_pipelined()
+        return ordered_pool_map(self._run_path, self.paths, self.jobs)
+
+    def _spool_path(self, fname):
+        import tempfile
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, mode='w+')
+        with self._scope():
+            for chunk in self.iter_cmd_chunks(fname):
+                spool.write(chunk)
+        spool.seek(0)
+        return fname, spool
+
+    def iter_spooled(self):
+        """
+        iter_results() for results of any size, yields (path, file) with the
+        results in a file object that spills to disk past SPOOL_SIZE, close
+        it when done
+        """
+        return ordered_pool_map(self._spool_path, self.paths, self.jobs)
+
     def runshad(self):
         ret = {}
+        for path, lines in self.iter_results():
+            ret[path] = lines
+        return ret
+
+    def _print_filenames(self):
+        if self._path_stream is not None:
+            return True
+        return len(self.paths) > 1
 
-        # Kick off the shadow commands one at a time, fix to run in parallel XXX
+    def runshad_stream(self):
+        """
+        Run the shadow commands one path at a time, writing the results to
+        outstream as they are read rather than buffering them.  Returns the
+        number of characters of output for each path
+        """
+        ret = {}
+
+        print_filenames = self._print_filenames()
         for path in self.paths:
-            ret[path] = []
-            lines = self.run_cmd(path)
-            ret[path].extend(lines)
+            if print_filenames:
+                self.outstream.write(f'##### {path}\n')
+            nchars = self.stream_cmd(path, self.outstream)
+            if self._path_stream is None:
+                ret[path] = nchars
+            if self.output_returns_error and nchars > 0:
+                self.exit_status = 1
         return ret
 
-    def run(self):
-        ret = self.runshad()
-        if self.outstream is not None:
-
-            print_filenames = False
-            if len(ret.keys()) > 1:
-                print_filenames = True
+    def runshad_spooled(self):
+        """
+        runshad_stream() for --jobs, up to self.jobs paths at once with their
+        results spooled to temp files, written to outstream in path order
+        """
+        import shutil
+        ret = {}
 
-            for k, v in ret.items():
+        print_filenames = self._print_filenames()
+        for path, spool in self.iter_spooled():
+            with spool:
                 if print_filenames:
-                    self.outstream.write(f'##### {k}\n')
-                for line in v:
-                    self.outstream.write(line)
+                    self.outstream.write(f'##### {path}\n')
+                shutil.copyfileobj(spool, self.outstream)
+                nchars = spool.tell()
             self.outstream.flush()
-        if self.output_returns_error:
-            for k, v in ret.items():
-                if len(v) > 0:
+            if self._path_stream is None:
+                ret[path] = nchars
+            if self.output_returns_error and nchars > 0:
+                self.exit_status = 1
+        return ret
+
+    def run(self):
+        """
+        Run the shadow command on all paths, output for each path is written
+        as soon as it and all paths before it complete.  Returns the result
+        lines for each path, unless the paths come from a PathStream, in which
+        case nothing is kept
+        """
+        try:
+            return self._run()
+        except MissingExpression as e:
+            self.fail(str(e))
+
+    def _run(self):
+        if self.spool and self.jobs > 1 and self.outstream is not None:
+            ret = self.runshad_spooled()
+        elif (self.stream or self.spool) and self.outstream is not None:
+            ret = self.runshad_stream()
+        else:
+            ret = {}
+            print_filenames = self._print_filenames()
+            for path, lines in self.iter_results():
+                if self._path_stream is None:
+                    ret[path] = lines
+                if self.outstream is not None:
+                    if print_filenames:
+                        self.outstream.write(f'##### {path}\n')
+                    for line in lines:
+                        self.outstream.write(line)
+                if self.output_returns_error and len(lines) > 0:
                     self.exit_status = 1
+            if self.outstream is not None:
+                self.outstream.flush()
+
+        if self._path_stream is not None and self._path_stream.missing > 0:
+            self.exit_status = 1
         return ret
 
     @property
@@ -328,33 +809,134 @@ class ShadCmd(object):
         raise RuntimeError('Use add_paths()')
 
     def add_paths(self, *paths):
+        if self._path_stream is not None:
+            raise RuntimeError('Paths already come from a PathStream')
         if self._paths is None:
             self._paths = []
         for path in paths:
             self._paths.append(pathlib.Path(path))
 
+    def set_path_stream(self, path_stream):
+        """ Take paths from a PathStream, read as the commands are run """
+        if self._paths:
+            raise RuntimeError('Paths already added with add_paths()')
+        self._path_stream = path_stream
+        self._paths = (pathlib.Path(path) for path in path_stream)
+
     def checkopt(self, opt, optsdict):
         if opt in optsdict and optsdict[opt] not in (None, False):
             return True
         return False
 
+class PathStream(object):
+    """
+    Paths read incrementally from a file or stdin ('-'), newline or NUL
+    delimited.  The paths are read PATH_READ_SIZE bytes at a time as they are
+    iterated over, the whole list is never held in memory, so it can only be
+    iterated over once.  With check_exists, paths that don't exist are
+    reported on stderr and skipped, counted in missing
+    """
+
+    def __init__(self, fname, null=False, check_exists=False):
+        self.fname = fname
+        self.null = null
+        self.check_exists = check_exists
+        self.missing = 0
+        self._iter = None
+        self._head = []
+
+    def _read(self):
+        if self.fname == '-':
+            fd = click.get_binary_stream('stdin')
+            close = False
+        else:
+            fd = open(self.fname, 'rb')
+            close = True
+        sep = b'\0' if self.null else b'\n'
+        rest = b''
+        try:
+            while True:
+                chunk = fd.read(PATH_READ_SIZE)
+                if not chunk:
+                    break
+                entries = (rest + chunk).split(sep)
+                rest = entries.pop()
+                for entry in entries:
+                    path = self._check(entry)
+                    if path is not None:
+                        yield path
+            path = self._check(rest)
+            if path is not None:
+                yield path
+        finally:
+            if close:
+                fd.close()
+
+    def _check(self, entry):
+        if not self.null and entry.endswith(b'\r'):
+            entry = entry[:-1]
+        if len(entry) == 0:
+            return None
+        path = os.fsdecode(entry)
+        if self.check_exists and not os.path.lexists(path):
+            self.missing += 1
+            sys.stderr.write(f'Path not found, skipping: {path}\n')
+            return None
+        return path
+
+    def peek(self):
+        """ First path without consuming it, None if there are none """
+        if self._iter is None:
+            self._iter = self._read()
+        if not self._head:
+            self._head = [ path for path in [ next(self._iter, None) ] if path is not None ]
+        if self._head:
+            return self._head[0]
+        return None
+
+    def __iter__(self):
+        if self._iter is None:
+            self._iter = self._read()
+        while self._head:
+            yield self._head.pop(0)
+        for path in self._iter:
+            yield path
+
+def first_path(pathnames):
+    """ First of a list of paths or a PathStream """
+    if isinstance(pathnames, PathStream):
+        return pathnames.peek()
+    return pathnames[0]
+
 def _param_defaults__pathnames_set_default(func):
     """
     Take the *paths and path parameters and convert to 'pathnames' list
     Also set the default to a single path of '.' if nothing was specified
+    Paths from --files-from replace the list with a PathStream
     """
     def wrapper(*args, **kwargs):
         if 'path' in kwargs:
             kwargs['pathnames'] = [ kwargs['path'] ]
-        if kwargs['pathnames'] is None or len(kwargs['pathnames']) == 0:
+        if kwargs.get('files_from') is not None:
+            if kwargs['pathnames']:
+                raise click.UsageError('Specify paths as arguments or with --files-from, not both')
+            kwargs['pathnames'] = PathStream(kwargs['files_from'], null=kwargs['null'], check_exists=kwargs['check_exists'])
+        elif kwargs['pathnames'] is None or len(kwargs['pathnames']) == 0:
             vnprint('Setting default pathname to .')
             kwargs['pathnames'] = [ '.' ]
         func(*args, **kwargs)
     return wrapper
 
+param_files_from = group_decorator(
+            click.option('--files-from', metavar='FILE', help="Read the paths from FILE, one per line, '-' for stdin"),
+            click.option('-0', '--null', is_flag=True, help="--files-from paths are NUL delimited, as from find -print0"),
+            click.option('--check-exists', is_flag=True, help="Skip and report --files-from paths that don't exist"),
+        )
+
 param_defaults = group_decorator(
             click.pass_context,
             click.argument('pathnames', metavar='paths', nargs=-1, type=click.Path(exists=True, readable=False)),
+            param_files_from,
             _param_defaults__pathnames_set_default
         )
 
@@ -429,28 +1011,22 @@ def _cmd_retcode(hscmd, **kwargs):
     cmd.run()
     sys.exit(cmd.exit_status)
 
-#
-# Subcommands with noun only
-#
-@cli.command(name='eval', help="Evaluate hsscript expressions on a file")
-@click.option('--interactive', is_flag=True, help="Interactivly read expressions from terminal and apply live")
-@param_eval
-@param_value
-@param_defaults
-def do_eval(ctx, *args, **kwargs):
-    if kwargs['interactive']:
-        kwargs['exp_stdin'] = True
-        while True:
-            cmd = ShadCmd(hss.eval, kwargs)
-            cmd.run()
-    try:
-        cmd = ShadCmd(hss.eval, kwargs)
-    except ValueError:
-        print(ctx.get_help())
-        print('\n')
-        raise click.UsageError('Must provide expression (-e, -i, --interactive) to eval command')
-    cmd.run()
-    sys.exit(cmd.exit_status)
+def print_verbose(settings, line):
+    """ Print a line if the HSGlobals settings are verbose or dry-run """
+    if settings.verbose > 0 or settings.dry_run:
+        tag = 'V: '
+        if settings.dry_run:
+            tag = 'N: '
+        if settings.log is not None:
+            settings.log(tag + line)
+        else:
+            print(tag + line)
+
+def vnprint(line):
+    """ Print a line if verbose or dry-run, nothing outside of a command """
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None and ctx.obj is not None:
+        print_verbose(ctx.obj, line)
 
 def hs_eval(*args, **kwargs):
     # Run an eval command but return the results as a string rather than displaying
@@ -467,21 +1043,6 @@ def hs_eval(*args, **kwargs):
         ret[path] = [ x[:-1] for x in cmd.outstream.readlines() ]
     return ret
 
-
-@cli.command(name='sum', help="Perform fast calculations on a set of files")
-@param_sum
-@param_value
-@param_defaults
-def do_sum(ctx, *args, **kwargs):
-    try:
-        cmd = ShadCmd(hss.sum, kwargs)
-    except ValueError:
-        print(ctx.get_help())
-        print('\n')
-        raise click.UsageError('Must provide expression (-e, -i, --interactive) to sum command')
-    cmd.run()
-    sys.exit(cmd.exit_status)
-
 def hs_sum(*args, **kwargs):
     # Run an sum command but return the results as a string rather than displaying
     kwargs['force_json'] = True
@@ -497,1020 +1058,19 @@ def hs_sum(*args, **kwargs):
         ret[path] = [ x[:-1] for x in cmd.outstream.readlines() ]
     return ret
 
-#
-# Subcommands with noun verb, metadata and objectives
-#
-
-attribute_short_help = "[sub] inode metadata: schema no, value yes"
-attribute_help = """
-attribute: Manage Hammerspace embedded attribute metadata
-
-Attributes can be defined on the fly, no schema pre-creation required.
-Attributes can also hold a value.  Most values are string type (-s) but may
-also be a number or expression (-e)
-
-  ex: hs attribute set -n color -s blue path/to/file
-"""
-@cli.group(help=attribute_help, short_help=attribute_short_help, cls=OrderedGroup)
-def attribute():
-    attribute_short_help + '\n\n' + attribute_help
-    pass
-
-keyword_short_help = "[sub] inode metadata: schema no, value no"
-keyword_help = """
-keyword: Manage Hammerspace embedded keyword metadata
-
-Keyword is a flexable metadata type that is created on the fly.  A keyword can
-not store a value.
-"""
-@cli.group(help=keyword_help, short_help=keyword_short_help, cls=OrderedGroup)
-def keyword():
-    keyword_short_help + '\n\n' + keyword_help
-    pass
-
-label_short_help = "[sub] inode metadata: schema hierarchical, value no"
-label_help = """
-label: Manage Hammerspace embedded label metadata
-
-Before a label can be added, it must be added to the labels scema via the admin
-interface using the label-* admin cli commands.  Labels are good for situations
-where you want to enforce the same wording/spelling/capitilaization/etc as well
-as if you want one label to imply a series of parents.
-"""
-@cli.group(help=label_help, short_help=label_short_help, cls=OrderedGroup)
-def label():
-    label_short_help + '\n\n' + label_help
-    pass
-
-tag_short_help = "[sub] inode metadata: schema no, value yes"
-tag_help = """
-tag: Manage Hammerspace embedded tag metadata
-
-Tags do not follow a schema (they can be created on the fly) and do not have a
-value that can be stored with the key.  There is no list of tag names that have
-been applied to the files of a share, the only way to generate a list is to
-check all files in the share, which can be done via Hammerscript expression.
-"""
-@cli.group(help=tag_help, short_help=tag_short_help, cls=OrderedGroup)
-def tag():
-    tag_short_help + '\n\n' + tag_help
-    pass
-
-rekognition_tag_short_help = "[sub] inode metadata: schema no, value yes"
-rekognition_tag_help = """
-rekognition_tag
-sub commands are used to view metadata added to an object by AWS's
-rekognition service.  Contact support for details on how to configure
-rekognition.
-"""
-@cli.group(help=rekognition_tag_help, short_help=rekognition_tag_short_help, cls=OrderedGroup)
-def rekognition_tag():
-    rekognition_tag_short_help + '\n\n' + rekognition_tag_help
-    pass
-
-objective_short_help = "[sub] control file placement on backend storage"
-@cli.group(short_help=objective_short_help, cls=OrderedGroup)
-def objective():
-    objective_help = objective_short_help + '\n\n' + """
-    TODO XXX
-    """
-    pass
-
-
-
-@attribute.command(name='list', help="list all attributes and values applied")
-@param_eval
-@param_read
-@param_defaults
-def do_attribute_list(ctx, *args, **kwargs):
-    _cmd_retcode(hss.attribute_list, **kwargs)
-
-@tag.command(name='list', help="list all tags and values applied")
-@param_eval
-@param_read
-@param_defaults
-@param_unbound
-def do_tag_list(ctx, *args, **kwargs):
-    _cmd_retcode(hss.tag_list, **kwargs)
-
-@rekognition_tag.command(name='list', help="list all rekognition tags and values applied")
-@param_eval
-@param_read
-@param_defaults
-def do_rekognition_tag_list(ctx, *args, **kwargs):
-    _cmd_retcode(hss.rekognition_tag_list, **kwargs)
-
-@keyword.command(name='list', help="list all keywords applied")
-@param_eval
-@param_read
-@param_defaults
-def do_keyword_list(ctx, *args, **kwargs):
-    _cmd_retcode(hss.keyword_list, **kwargs)
-
-@label.command(name='list', help="list all labels applied")
-@param_eval
-@param_read
-@param_defaults
-def do_label_list(ctx, *args, **kwargs):
-    _cmd_retcode(hss.label_list, **kwargs)
-
-@objective.command(name='list', help="list all (objective,expression) pairs assigned")
-@param_eval
-@param_objective_read
-@param_defaults
-def do_objective_list(ctx, *args, **kwargs):
-    _cmd_retcode(hss.objective_list, **kwargs)
-
-
-
-@attribute.command(name='get', help="Get the attribute's value")
-@param_eval
-@param_read
-@param_name
-@param_unbound
-@param_defaults
-def do_attribute_get(ctx, *args, **kwargs):
-    _cmd_retcode(hss.attribute_get, **kwargs)
-
-@attribute.command(name='has', help="Is the inode's attribute value non-empty")
-@param_eval
-@param_read
-@param_name
-@param_defaults
-def do_attribute_has(ctx, *args, **kwargs):
-    _cmd_retcode(hss.attribute_get, **kwargs)
-
-@tag.command(name='get', help="Get the tag's value")
-@param_eval
-@param_read
-@param_name
-@param_unbound
-@param_defaults
-def do_tag_get(ctx, *args, **kwargs):
-    _cmd_retcode(hss.tag_get, **kwargs)
-
-@rekognition_tag.command(name='get', help="Get the rekognition tag's value")
-@param_eval
-@param_read
-@param_name
-@param_unbound
-@param_defaults
-def do_rekognition_tag_get(ctx, *args, **kwargs):
-    _cmd_retcode(hss.rekognition_tag_get, **kwargs)
-
-@tag.command(name='has', help="Is the inode's tag value non-empty")
-@param_eval
-@param_read
-@param_name
-@param_defaults
-def do_tag_has(ctx, *args, **kwargs):
-    _cmd_retcode(hss.tag_has, **kwargs)
-
-@rekognition_tag.command(name='has', help="Is the inode's rekognition tag value non-empty")
-@param_eval
-@param_read
-@param_name
-@param_defaults
-def do_rekognition_tag_has(ctx, *args, **kwargs):
-    _cmd_retcode(hss.rekognition_tag_has, **kwargs)
-
-@keyword.command(name='has', help="Is the keyword assigned to the file")
-@param_eval
-@param_read
-@param_name
-@param_defaults
-def do_keyword_has(ctx, *args, **kwargs):
-    _cmd_retcode(hss.keyword_has, **kwargs)
-
-@label.command(name='has', help="Is the label assigned to the file")
-@param_eval
-@param_read
-@param_name
-@param_defaults
-def do_label_has(ctx, *args, **kwargs):
-    _cmd_retcode(hss.label_has, **kwargs)
-
-@objective.command(name='has', help="Get/list objective assignments")
-@param_eval
-@param_objective_read
-@param_name
-@param_value
-@param_defaults
-def do_objective_has(ctx, *args, **kwargs):
-    _cmd_retcode(hss.objective_has, **kwargs)
-
-
-
-@attribute.command(name='delete', help="remove attribute values from inode(s)")
-@param_name
-@param_force
-@param_recursive
-@param_nonfiles
-@param_defaults
-def do_attribute_del(ctx, *args, **kwargs):
-    _cmd_retcode(hss.attribute_del, **kwargs)
-
-@tag.command(name='delete', help="remove tag values from inode(s)")
-@param_name
-@param_force
-@param_recursive
-@param_nonfiles
-@param_defaults
-def do_tag_del(ctx, *args, **kwargs):
-    _cmd_retcode(hss.tag_del, **kwargs)
-
-@rekognition_tag.command(name='delete', help="remove rekognition tag values from inode(s)")
-@param_name
-@param_force
-@param_recursive
-@param_nonfiles
-@param_defaults
-def do_rekognition_tag_del(ctx, *args, **kwargs):
-    _cmd_retcode(hss.rekognition_tag_del, **kwargs)
-
-@keyword.command(name='delete', help="remove keywords from inode(s)")
-@param_name
-@param_force
-@param_recursive
-@param_nonfiles
-@param_defaults
-def do_keyword_del(ctx, *args, **kwargs):
-    _cmd_retcode(hss.keyword_del, **kwargs)
-
-@label.command(name='delete', help="remove labels from inode(s)")
-@param_name
-@param_force
-@param_recursive
-@param_nonfiles
-@param_defaults
-def do_label_del(ctx, *args, **kwargs):
-    _cmd_retcode(hss.label_del, **kwargs)
-
-@objective.command(name='delete', help="remove (objective,expression) pair from inode(s)")
-@param_name
-@param_force
-@param_recursive
-@param_nonfiles
-@param_value
-@param_defaults
-def do_objective_del(ctx, *args, **kwargs):
-    _cmd_retcode(hss.objective_del, **kwargs)
-
-
-
-@keyword.command(name='add', help="add a keyword to inode(s)")
-@param_name
-@param_recursive
-@param_nonfiles
-@param_defaults
-def do_keyword_add(ctx, *args, **kwargs):
-    _cmd_retcode(hss.keyword_add, **kwargs)
-
-@label.command(name='add', help="add a label to inode(s)")
-@param_name
-@param_recursive
-@param_nonfiles
-@param_defaults
-def do_label_add(ctx, *args, **kwargs):
-    _cmd_retcode(hss.label_add, **kwargs)
-
-@attribute.command(name='set', help="Add/Set value of attribute on inode(s)")
-@param_name
-@param_recursive
-@param_nonfiles
-@param_value
-@param_defaults
-@param_unbound
-def do_attribute_set(ctx, *args, **kwargs):
-    _cmd_retcode(hss.attribute_set, **kwargs)
-
-@attribute.command(name='add', help="Add/Set value of attribute on inode(s)")
-@param_name
-@param_recursive
-@param_nonfiles
-@param_value
-@param_defaults
-@param_unbound
-def do_attribute_add(ctx, *args, **kwargs):
-    _cmd_retcode(hss.attribute_set, **kwargs)
-
-@tag.command(name='set', help="Add/Set value of tag on inode(s)")
-@param_name
-@param_recursive
-@param_nonfiles
-@param_value
-@param_defaults
-@param_unbound
-def do_tag_set(ctx, *args, **kwargs):
-    _cmd_retcode(hss.tag_set, **kwargs)
-
-@rekognition_tag.command(name='set', help="Add/Set value of rekognition tag on inode(s)")
-@param_name
-@param_recursive
-@param_nonfiles
-@param_value
-@param_defaults
-@param_unbound
-def do_rekognition_tag_set(ctx, *args, **kwargs):
-    _cmd_retcode(hss.rekognition_tag_set, **kwargs)
-
-@tag.command(name='add', help="Add/Set value of tag on inode(s)")
-@param_name
-@param_recursive
-@param_nonfiles
-@param_value
-@param_defaults
-@param_unbound
-def do_tag_add(ctx, *args, **kwargs):
-    _cmd_retcode(hss.tag_set, **kwargs)
-
-@rekognition_tag.command(name='add', help="Add/Set value of rekognition tag on inode(s)")
-@param_name
-@param_recursive
-@param_nonfiles
-@param_value
-@param_defaults
-@param_unbound
-def do_rekognition_tag_add(ctx, *args, **kwargs):
-    _cmd_retcode(hss.rekognition_tag_set, **kwargs)
-
-@objective.command(name='add', help="Add (objective,expression) pair to inode(s)")
-@param_name
-@param_recursive
-@param_nonfiles
-@param_value
-@param_defaults
-@param_unbound
-def do_objective_set(ctx, *args, **kwargs):
-    _cmd_retcode(hss.objective_add, **kwargs)
-
-
-###
-### Simple commands
-###
-
-@click.pass_context
-def vnprint(ctx, line):
-    """ Print a line if verbose or dry-run """
-    if ctx.obj.verbose > 0 or ctx.obj.dry_run:
-        tag = 'V: '
-        if ctx.obj.dry_run:
-            tag = 'N: '
-        print(tag + line)
-
-@cli.command(name='rm', help="Fast offloaded rm -rf")
-@click.option('-r', '-R', '--recursive', is_flag=True, help="Required for fast mode, remove directories and their contents recursively")
-@click.option('-f', '--force', is_flag=True, help="Required for fast mode, ignore nonexistent files and arguments")
-@click.option('-i', is_flag=True, help="Disables fast mode, passed through to system rm")
-@click.option('-I', 'I', is_flag=True, help="Disables fast mode, passed through to system rm")
-@click.option('--interactive', default=None, help="Disables fast mode, passed through to system rm")
-@click.option('--one-file-system', is_flag=True, help="Disables fast mode, passed through to system rm")
-@click.option('--no-preserve-root', is_flag=True, help="Disables fast mode, passed through to system rm")
-@click.option('--preserve-root', is_flag=True, help="Disables fast mode, passed through to system rm")
-@click.option('-d', '--dir', is_flag=True, help="Disables fast mode, passed through to system rm")
-@click.option('-v', '--verbose', is_flag=True, help="Disables fast mode, passed through to system rm")
-@click.argument('pathnames', nargs=-1, type=click.Path(exists=True), required=True)
-@click.pass_context
-def do_rm_rf(ctx, *args, **kwargs):
-    passthrough_opt_flags = [ 'i', 'I', 'one_file_system', 'no_preserve_root', 'dir', 'verbose' ]
-
-    call_out_args = []
-    for opt in passthrough_opt_flags:
-        if kwargs[opt]:
-            if len(opt) > 1:
-                call_out_args.append('--' + opt.replace('_', '-'))
-            else:
-                call_out_args.append('-' + opt)
-
-    # Custom handle non-flag passthrough options
-    if opt == 'interactive':
-        call_out_args.append('--' + opt)
-        if kwargs[opt] is not None:
-            call_out_args.append(kwargs[opt])
-
-    if len(call_out_args) > 0 or not (kwargs['force'] and kwargs['recursive']):
-        vnprint('Unsupported options supplied, falling back to system rm')
-        call_out_args += kwargs['pathnames']
-        call_out_args.insert(0, 'rm')
-        vnprint('Calling: ' + ' '.join(call_out_args))
-        if ctx.obj.dry_run:
-            return True
-        else:
-            return sp.call(call_out_args)
-
-    others = []
-    dirs = []
-    for fpath in kwargs['pathnames']:
-        if os.path.isdir(fpath):
-            dirs.append(fpath)
-        elif os.path.exists(fpath):
-            others.append(fpath)
-        else:
-            vnprint('Path not found, ignoring due to --force: %s' % (fpath))
-
-    kwargs['pathnames'] = dirs
-    cmd = ShadCmd(hss.rm_rf, kwargs)
-    cmd.run()
-
-    # unlink any non-dirs
-    for fpath in others:
-        vnprint('unlink( ' + fpath + ' )')
-        if not ctx.obj.dry_run:
-            os.unlink(fpath)
-
-    # rmdir the base directories, the shadow command doesn't clean these up
-    for fpath in dirs:
-        vnprint('rmdir( ' + fpath + ' )')
-        if not ctx.obj.dry_run:
-            os.rmdir(fpath)
-    sys.exit(cmd.exit_status)
-
-
-def do_cp_a_fallback(ctx, kwargs, args, srcs, dest):
-    args = copy.copy(args)
-    if 'archive' in kwargs and kwargs['archive']:
-        args.append('--archive')
-    args.extend(srcs)
-    args.append(dest)
-    args.insert(0, 'cp')
-    vnprint('Calling: ' + ' '.join(args))
-    if ctx.obj.dry_run:
-        return 0
-    else:
-        return sp.call(args)
-
-def do_cp_a_fallback_handle_error(ctx, kwargs, args, srcs, dest, reason):
-    vnprint(reason + ', falling back to system cp')
-    res = do_cp_a_fallback(ctx, kwargs, args, srcs, dest)
-    if res != 0:
-        print('Error %d processing passthrough cp of path %s: %s' % (res, ' '.join(srcs), os.strerror(res)))
-        print('Aborting')
-        sys.exit(res)
-    return 0
-
-
-@cli.command(name='cp', help="Fast offloaded recursive copy via clone",
-        context_settings=dict(ignore_unknown_options=True,))
-@click.option('-a', '--archive', is_flag=True, help="Required for fast mode, CoW 'copy' a file or recursivly copy a directory by clone")
-@click.argument('srcs', nargs=-1, required=True, type=click.UNPROCESSED) # shove any unknown arguments in here
-@click.argument('dest', nargs=1, required=True)
-@click.pass_context
-def do_cp_a(ctx, *args, **kwargs):
-    # Look for anything in src that is not a file/dir,
-    # any unknown options will be shoved here due to click.UNPROCESSED above
-    # if anything is found, trigger a fall back to system cp
-    call_out_args = []
-    tmp_list = list(kwargs['srcs'])
-    for arg in tmp_list:
-        if not os.path.exists(arg):
-            call_out_args.append(arg)
-    for arg in call_out_args:
-        tmp_list.remove(arg)
-    kwargs['srcs'] = tuple(tmp_list)
-
-    fast_sources = []
-    dest = kwargs['dest']
-    srcs = kwargs['srcs']
-
-    if len(call_out_args) > 0 or not kwargs['archive']:
-        reason='Unsupported options or non-existant source supplied'
-        return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
-
-    # NOTE: Trailing /s have no effect on behavior in either single or multi source mode
-
-    # Handle single source file nuances
-    if os.path.exists(dest) and not os.path.isdir(dest):
-        reason='Destination exists but is not a directory'
-        return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
-
-    is_single_arg = False
-    if len(srcs) == 1:
-        is_single_arg = True
-        src = srcs[0]
-        if not os.path.isdir(src):
-            reason='Single source %s is not a directory, use cp --reflink for faster copy' % (src)
-            return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
-        source_entries = os.listdir(src)
-
-        if not os.path.exists(dest):
-            # If dest doesn't exist and src is a directory, cp makes dest and
-            # copies only the contents of srcs in
-            vnprint('mkdir '+dest)
-            if not ctx.obj.dry_run:
-                os.mkdir(dest)
-            for entry in source_entries:
-                fast_sources.append(os.path.join(src, entry))
-        else:
-            # We know from previous test that dest exists and is a directory
-            # In this case, cp just copes the whole directory src as a child of
-            # dest rather than the individual children
-            fast_sources.append(src)
-
-    # Now to multi source mode
-    if not os.path.isdir(dest):
-        # Use cp -a to generate the error message
-        reason='Destination directory does not exist'
-        return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
-
-    dest_stat = os.stat(dest)
-
-    # In multi source mode, each source is just copied into dest as a child of dest, always
-    if not is_single_arg:
-        for src in srcs:
-            fast_sources.append(src)
-
-    for src in fast_sources:
-        # Pre-flight checks, fallback if any fail
-        if not os.path.exists(src):
-            # use cp -a to generate the error message
-            reason='Source %s does not exist' % (src)
-            return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
-
-        src_stat = os.stat(src)
-        if src_stat.st_dev != dest_stat.st_dev:
-            reason='Source %s is on different filesystem from destination' % (src)
-            return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
-
-        # XXX Need to detect any filesystems mounted in the source tree
-
-    # Rely on pdfs to detect colisions and error out?
-    # XXX For this release, do extra sanity checks, won't be needed in the future
-    for src in fast_sources:
-        entry = os.path.basename(src)
-        if len(entry) == 0:
-            entry = src
-        tgt = os.path.join(dest, entry)
-        if os.path.exists(tgt):
-            reason='Source item "%s" collides with existing item "%s" in destination' % (src, tgt)
-            return do_cp_a_fallback_handle_error(ctx, kwargs, call_out_args, srcs, dest, reason)
-
-    kwargs['dest_inode'] = dest_stat.st_ino
-    kwargs['pathnames'] = fast_sources
-    cmd = ShadCmd(hss.cp_a, kwargs)
-    cmd.run()
-    if cmd.exit_status != 0:
-        print('Error %d processing offloaded cp -a of paths %s: %s' % (cmd.exit_status, ' '.join(fast_sources), os.strerror(cmd.exit_status)))
-        print('Aborting')
-        sys.exit(cmd.exit_status)
-
-    # Walk the tree, following any assimilation to block returning till assims are complete
-    hs_dirs_count(dest)
-
-    sys.exit(0)
-
-
-
-@click.pass_context
-def _copy_md(ctx, src, dest):
-    vnprint('stat '+src)
-    if not ctx.obj.dry_run:
-        src_st = os.stat(src)
-        vnprint('chown %d.%d %s' % (src_st.st_uid, src_st.st_gid, dest))
-        os.chown(dest, src_st.st_uid, src_st.st_gid)
-        vnprint('chmod %o %s' % (src_st.st_mode, dest))
-        os.chmod(dest, src_st.st_mode)
-    else:
-        vnprint('chown dry_run.dry_run %s' % (dest))
-        vnprint('chmod dry_run %s' % (dest))
-
-    # XXX Add copying of acls
-    # XXX Add copying of HS metadata like tags, objectives, etc
-
-@cli.command(name='rsync', help="Fast offloaded recursive directory equalizer (Add and Delete)",
-        context_settings=dict(ignore_unknown_options=True,))
-@click.option('-a', '--archive', is_flag=True, help="Required, must specify -a --delete")
-@click.option('--delete', is_flag=True, help="Required, must specify -a --delete")
-@click.argument('src', nargs=1, required=True,
-        type=click.Path(exists=True, readable=True))
-@click.argument('dest', nargs=1, required=True,
-        type=click.Path(exists=False, writable=True))
-@click.pass_context
-def do_rsync_a_delete(ctx, src, dest, *args, **kwargs):
-    if not kwargs['archive'] or not kwargs['delete']:
-        reason="Must provide both --delete and --archive options, this is the only supported method for this tool, which may remove data at the destination path"
-        raise click.UsageError(reason, ctx)
-
-    # NOTE: Trailing /s are important in rsync mode, which is different from cp-a
-    if os.path.isfile(src):
-        src_is_file = True
-    else:
-        src_is_file = False
-
-    if os.path.isdir(src):
-        src_is_dir = True
-    else:
-        src_is_dir = False
-
-    if src[-1] == os.sep:
-        src_ends_slash = True
-    else:
-        src_ends_slash = False
-
-    src_undelete = False
-
-    if os.path.isdir(dest):
-        dest_is_dir = True
-    else:
-        dest_is_dir = False
-
-    if dest[-1] == os.sep:
-        dest_ends_slash = True
-    else:
-        dest_ends_slash = False
-
-    if os.path.exists(dest):
-        dest_exists = True
-    else:
-        dest_exists = False
-
-    dest = os.path.abspath(dest)
-
-    if src_is_file:
-        # Dest needs to be a directory and cannot contain a file with the src files name
-        if (not src_ends_slash) and (not dest_ends_slash) \
-                and (not src_is_dir) and (not dest_is_dir) \
-                and os.path.basename(src) == os.path.basename(dest):
-            # Assume should be file on both sides
-            dest_fname = os.path.basename(dest)
-            dest_parent = os.path.dirname(dest)
-        elif (not dest_ends_slash) and (not dest_exists):
-            # In this case, rsync would create a file, not a dir, don't support that
-            # Snag a rename for future failure
-            dest_fname = os.path.basename(dest)
-            dest_parent = os.path.dirname(dest)
-        elif dest_ends_slash or dest_is_dir or (not dest_exists):
-            # should be directory or already is directory
-            dest_fname = os.path.basename(src)
-            dest_parent = dest
-        else:
-            # assume it is a file that was specified
-            dest_fname = os.path.basename(dest)
-            dest_parent = os.path.dirname(dest)
-        src_fname = os.path.basename(src)
-        src_parent = os.path.dirname(src)
-
-        if (dest_fname != src_fname):
-            if src_fname.startswith(dest_fname + '[#D'):
-                # allow restoring from undelete filename, which does have different name from dest
-                src_undelete = True
-            else:
-                reason="This rsync like tool can not handle renaming a file as part of the copy\n" + \
-                    "please provide a source filename and a target directory/ (include trailing /)\n" + \
-                    "src filename: %s     dest filename: %s" % (os.path.basename(src), dest_fname)
-                raise click.UsageError(reason, ctx)
-
-        elif not os.path.exists(dest_parent):
-            vnprint('mkdir '+dest_parent)
-            if not ctx.obj.dry_run:
-                os.mkdir(dest_parent)
-            _copy_md(src_parent, dest_parent)
-
-        elif (not ctx.obj.dry_run) and (not os.path.isdir(dest_parent)):
-            reason="Source %s is a file but unable to find the destination/parent directory %s" % (src, dest_parent)
-            raise click.UsageError(reason, ctx)
-
-        dest_tgt = dest_parent
-
-    elif src_is_dir:
-        # in the following / patterns, must create srcdir name and use as target
-        if ((not src_ends_slash) and (not dest_ends_slash)) or \
-                ((not src_ends_slash) and dest_ends_slash):
-            dest_parent = os.path.join(dest, os.path.basename(src))
-            dest_fname = None
-            dest_tgt = dest_parent
-            if not os.path.exists(dest):
-                vnprint('mkdir '+dest)
-                if not ctx.obj.dry_run:
-                    os.mkdir(dest)
-        else:
-            dest_parent = dest
-            dest_fname = None
-            dest_tgt = dest
-        src_fname = None
-        src_parent = src
-
-        src_dname = os.path.basename(src)
-        dest_dname = os.path.basename(dest)
-        if src_dname.startswith(dest_dname + '[#D'):
-            src_undelete = True
-
-        if not os.path.exists(dest_tgt):
-            vnprint('mkdir '+dest_tgt)
-            if not ctx.obj.dry_run:
-                os.mkdir(dest_tgt)
-            dest_is_dir = True
-        if (not ctx.obj.dry_run) and (not dest_is_dir):
-            reason="Source %s is a directory but dest %s is not" % (src, dest)
-            raise click.UsageError(reason, ctx)
-    else:
-        reason="Source %s is not a file or directory" % (src)
-        raise click.UsageError(reason, ctx)
-
-    vnprint('stat src '+src)
-    src_stat = os.stat(src)
-    vnprint('src inode %d' % (src_stat.st_ino))
-    vnprint('stat dest_tgt '+dest_tgt)
-    dest_tgt_stat = os.stat(dest_tgt)
-    vnprint('dest_tgt inode %d' % (dest_tgt_stat.st_ino))
-
-    if src_stat.st_dev != dest_tgt_stat.st_dev:
-        reason='Source (stat_dev %d) is on different filesystem from destination (stat_dev %d)' % (src_stat.st_dev, dest_tgt_stat.st_dev)
-        raise click.UsageError(reason, ctx)
-    # XXX detect any filesystems mounted in the source tree?
-
-    # Detect any requests inside .snapshot/current/ that are not undelete files.
-    if dest_exists:
-        dest_stat = os.stat(dest)
-        if src_stat.st_ino == dest_stat.st_ino:
-            versions = hs_eval(exp='VERSION', pathnames=[src, dest])
-            try:
-                versions[src] = int(versions[src][0])
-                versions[dest] = int(versions[dest][0])
-            except Exception as e:
-                print('Error parsing response from VERSION, response was:')
-                pprint.pprint(versions)
-                sys.stdout.flush()
-                raise e
-            if versions[src] == 2 and (not src_undelete):
-                vnprint("Trying to restore from .snapshot/current source and dest are the same file, doing nothing")
-                sys.exit(0)
-            elif versions[dest] > 1:
-                reason="Dest %s has version %d is in .snapshot/, can not restore TO a snapshot, only FROM" % (dest, versions[dest])
-                raise click.UsageError(reason, ctx)
-
-    kwargs['dest_inode'] = dest_tgt_stat.st_ino
-    kwargs['pathnames'] = [ src ]
-    cmd = ShadCmd(hss.cp_a, kwargs)
-    cmd.run()
-    if cmd.exit_status != 0:
-        print('Error %d processing offloaded rsync of paths %s: %s' % (cmd.exit_status, src, os.strerror(cmd.exit_status)))
-        print('Aborting')
-        sys.exit(cmd.exit_status)
-
-    # Walk the tree, following the assimilation to block returning till assim is complete
-    hs_dirs_count(dest_tgt)
-
-    if not src_is_file:
-        # Manually always copy the metadata for all directory sources
-        _copy_md(src_parent, dest_parent)
-    sys.exit(0)
-
-
-@cli.command(name='collsum', help="Usage details about one/all collections in whole share (fast)")
-@click.argument('collection', nargs=1, required=True, default="all")
-@click.option('--collation', nargs=1, required=False)
-@param_sharepaths
-@click.pass_context
-def do_collection_sum(ctx, collection, collation, *args, **kwargs):
-    if collation is None:
-        eval_args = {
-                'exp': 'collection_sums("%s")' % (collection),
-            }
-    else:
-        eval_args = {
-                'exp': 'collection_sums("%s")[SUMMATION("%s")]' % (collection, collation),
-            }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-
-
-#
-# Status reports
-#
-@click.group(help="[sub] System, component, task status", cls=OrderedGroup)
-def status():
-    pass
-cli.add_command(status)
-
-@status.command(name='assimilation', help="State of current assimilations")
-@param_sharepaths
-@click.pass_context
-def do_assim_status(ctx, *args, **kwargs):
-    eval_args = {
-            'exp': 'assimilation_details',
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@status.command(name='csi', help="Details about the kubernetes CSI")
-@param_sharepaths
-@click.pass_context
-def do_csi_status(ctx, *args, **kwargs):
-    eval_args = {
-            'exp': 'attributes.csi_details',
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@status.command(name='collections', help="Collections present in the share")
-@param_sharepaths
-@click.pass_context
-def do_collections_list(ctx, *args, **kwargs):
-    eval_args = {
-            'exp': 'collections',
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@status.command(name='errors', help="Files in the share with errors")
-@click.option('--dump', is_flag=True, help="Dump inode details, only on files in dir+dirpath")
-@param_sharepaths
-@click.pass_context
-def do_errored_files(ctx, dump, *args, **kwargs):
-    if dump:
-        sum_args = {
-                'exp': '(IS_FILE AND ERRORS)?SUMS_TABLE{|KEY=ERRORS,|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
-            }
-        kwargs.update(sum_args)
-    else:
-        eval_args = {
-                'exp': 'IS_FILE and errors!=0?dump_inode',
-                'recursive': True,
-            }
-        kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@status.command(name='open', help="Files open each dir(s)")
-@param_dirpaths
-@click.pass_context
-def do_show_open_files(ctx, *args, **kwargs):
-    sum_args = {
-            'exp': '(IS_FILE AND IS_OPEN)?{1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}',
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
-
-@status.command(name='replication', help="Replication progress for the share(s)")
-@param_sharepaths
-@click.pass_context
-def do_replication_status(ctx, *args, **kwargs):
-    eval_args = {
-            'exp': 'replication_details',
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@status.command(name='sweeper', help="Progress of sweeper (checks file placement) for each share(s)")
-@param_sharepaths
 @click.pass_context
-def do_sweeper_status(ctx, *args, **kwargs):
-    eval_args = {
-            'exp': 'sweep_details',
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@status.command(name='volume', help="Health of volumes backing the share(s)")
-@param_sharepaths
-@click.pass_context
-def do_volume_health(ctx, *args, **kwargs):
-    eval_args = {
-            'exp': '{|::#A=storage_volumes.name[row],|::#B=storage_volumes.volume_status[row],|::#C=storage_volumes.oper_status[row]}[rows(storage_volumes)]',
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-
-
-#
-# Capacity and inode usage
-#
-@click.group(name='usage', short_help="[sub] Resource utilization such as capacity or inode", cls=OrderedGroup)
-def usage():
-    pass
-cli.add_command(usage)
-
-@usage.command(name='alignment', help="Alignment state of files each file(s) of files in dir(s)")
-@click.option('--top-files', is_flag=True, help="include largest files in each alignment state")
-@param_paths
-@click.pass_context
-def do_file_alignment(ctx, top_files, *args, **kwargs):
-    if top_files:
-        sum_args = {
-                'exp': 'IS_FILE?SUMS_TABLE{|KEY=OVERALL_ALIGNMENT,|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
-            }
-    else:
-        sum_args = {
-            'exp': 'IS_FILE?SUMS_TABLE{|KEY=OVERALL_ALIGNMENT,|VALUE=1}',
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
-
-@usage.command(name='virus-scan', help="Virus scan state of files each file(s) of files in dir(s)")
-@click.option('--top-files', is_flag=True, help="include largest files in each virus scan state")
-@param_paths
-@click.pass_context
-def do_file_virus_scan(ctx, top_files, *args, **kwargs):
-    if top_files:
-        sum_args = {
-                'exp': 'IS_FILE?SUMS_TABLE{|KEY=ATTRIBUTES.VIRUS_SCAN,|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
-            }
-    else:
-        sum_args = {
-            'exp': 'IS_FILE?SUMS_TABLE{|KEY=ATTRIBUTES.VIRUS_SCAN,|VALUE=1}',
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
-
-@usage.command(name='owner', help="Owner state of files each file(s) of files in dir(s)")
-@click.option('--top-files', is_flag=True, help="include largest files of each owner")
-@param_paths
-@click.pass_context
-def do_usage_owner(ctx, top_files, *args, **kwargs):
-    if top_files:
-        sum_args = {
-                'exp': 'IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
-            }
-    else:
-        sum_args = {
-            'exp': 'IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE=1}',
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
-
-@usage.command(name='online', help="Summary of files on NAS volumes in the dir")
-@param_dirpaths
-@click.pass_context
-def do_online_files(ctx, *args, **kwargs):
-    sum_args = {
-            'exp': 'IS_ONLINE?{1FILE,SPACE_USED,TOP10_TABLE{{space_used,DPATH}}}',
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
-
-@usage.command(name='volume', help="Usage for each volume backing each dir(s)")
-@click.option('--top-files', is_flag=True, help="Show largest files on each volume")
-@click.option('--deep', is_flag=True, help="Might take a long time, XXX")
-@param_paths
-@click.pass_context
-def do_volume_usage(ctx, top_files, deep, *args, **kwargs):
-    sum_args = {
-            'exp': 'IS_FILE?ROWS(INSTANCES)?SUMS_TABLE{|::KEY=INSTANCES[ROW].VOLUME,|::VALUE=1}[ROWS(INSTANCES)]:SUMS_TABLE{|KEY=#EMPTY,|::VALUE=1}',
-        }
-    kwargs.update(sum_args)
-    if top_files:
-        kwargs['exp'] = 'IS_FILE?ROWS(INSTANCES)?SUMS_TABLE{|::KEY=INSTANCES[ROW].VOLUME,|::VALUE={1FILE,INSTANCES[ROW].SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}[ROWS(INSTANCES)]:SUMS_TABLE{|KEY=#EMPTY,|::VALUE={1FILE, SPACE_USED, TOP10_TABLE{{space_used,dpath}}}}'
-    if deep:
-        kwargs['exp'] = 'IS_FILE?ROWS(INSTANCES)?SUMS_TABLE{|::KEY=INSTANCES[ROW].VOLUME,|::VALUE={1FILE,INSTANCES[ROW].SPACE_USED,TOP100_TABLE{{space_used,dpath}}}}[ROWS(INSTANCES)]:SUMS_TABLE{|KEY=#EMPTY,|::VALUE={1FILE, SPACE_USED, TOP100_TABLE{{space_used,dpath}}}}'
-    _cmd_retcode(hss.sum, **kwargs)
-
-@usage.command(name='user', help="Users consuming the most capacity in each dir(s)")
-@click.option('--details', is_flag=True, help="Include details like largest files per user")
-@param_dirpaths
-@click.pass_context
-def do_users_top_usage(ctx, details, *args, **kwargs):
-    sum_args = {
-            'exp': 'IS_FILE?SUMS_TABLE{|KEY={OWNER,OWNER_GROUP},|VALUE=SPACE_USED}',
-        }
-    if details:
-        sum_args = {
-            'exp': 'IS_FILE?SUMS_TABLE{|KEY={OWNER,OWNER_GROUP},|VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}',
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
-
-@usage.command(name='objectives', help="Objectives applied and capacity managed by dir(s)")
-@param_dirpaths
-@click.pass_context
-def do_objectives_usage(ctx, *args, **kwargs):
-    sum_args = {
-            'exp': 'IS_FILE?SUMS_TABLE{|::KEY=LIST_OBJECTIVES_ACTIVE[ROW],|::VALUE={1FILE,SPACE_USED,TOP10_TABLE{{space_used,dpath}}}}[ROWS(LIST_OBJECTIVES_ACTIVE)]',
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
-
-@usage.command(name='mime_tags', help="All tags added by mime discovery on dir(s)")
-@param_dirpaths
-@click.pass_context
-def do_list_mime_tags(ctx, *args, **kwargs):
-    sum_args = {
-            'exp': 'IS_FILE?SUMS_TABLE{attributes.mime.string,{1FILE,SPACE_USED,TOP10_TABLE{{SPACE_USED,DPATH}}}}',
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
-
-@usage.command(name='rekognition_tags', help="All tags added by Rekognition on dir(s)")
-@param_dirpaths
-@click.pass_context
-def do_list_rekognition_tags(ctx, **kwargs):
-    sum_args = {
-            'exp': 'IS_FILE?ISTABLE(LIST_REKOGNITION_TAGS)?SUMS_TABLE{|::KEY=LIST_REKOGNITION_TAGS()[ROW].NAME,|::VALUE={1FILE,TOP10_TABLE{{LIST_REKOGNITION_TAGS()[ROW].value,dpath}}}}[ROWS(LIST_REKOGNITION_TAGS())]',
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
-
-@usage.command(name='dirs', help="Number of subdirectories under specified directory(ies), not including that directory")
-@param_dirpaths
-@click.pass_context
-def do_dirs_count(ctx, *args, **kwargs):
-    # Also, an efficient way to follow an assimilation, this will block until it completes
-    sum_args = {
-            'exp': '1',
-            'nonfiles': True,
-        }
-    kwargs.update(sum_args)
-    _cmd_retcode(hss.sum, **kwargs)
+def catalog_get(ctx, kind, path, fetch, refresh=False):
+    """
+    The kind list (see hstk.hscatalog.KINDS) of the share holding path from
+    the catalog cache, fetch() reads it from the cluster when the cache
+    can't answer.  Dry runs and --catalog-ttl 0 always fetch and cache
+    nothing.
+    """
+    if ctx.obj.dry_run or ctx.obj.catalog_ttl == 0:
+        return fetch()
+    import hstk.hscatalog as hscatalog
+    catalog = hscatalog.Catalog(path, cache_dir=ctx.obj.catalog_dir, ttl=ctx.obj.catalog_ttl)
+    return catalog.get(kind, fetch, refresh=refresh)
 
 def hs_dirs_count(*paths, **kwargs):
     """Call with one or more directory paths, get the results as JSON"""
@@ -1522,416 +1082,76 @@ def hs_dirs_count(*paths, **kwargs):
     kwargs.update(sum_args)
     return hs_sum(**kwargs)
 
-
-
-#
-# performance and event counters
-#
-@click.group(name='perf', help="[sub] Performance and operation stats", cls=OrderedGroup)
-def perf_grp():
-    pass
-cli.add_command(perf_grp)
-
-@click.pass_context
-def _dot_stats_files_paths(ctx, paths):
-    """
-    This file is used to store the saved off/old stats (counter values) as a tag 'old_stats'
-    """
-    statsfs = {}
-
-    for path in paths:
-        # eval -e path to find the root of the share, create .stats there?
-        statsf = os.path.join(path, '.stats')
-
-        if ctx.obj.dry_run:
-            vnprint('dry run, not creating .stats file ' + statsf)
-        elif not os.path.exists(statsf):
-            vnprint('creating .stats file ' + statsf)
-            with open(statsf, 'w') as fd:
+def _hs_iter_json(shadgen, kwargs):
+    import hstk.hsjson as hsjson
+    kwargs['force_json'] = True
+    kwargs['outstream'] = None
+    cmd = ShadCmd(shadgen, kwargs)
+    if (cmd.jobs > 1 or cmd.pipeline > 1) and cmd._path_stream is None and len(cmd.paths) > 1:
+        # Many paths, run --jobs or --pipeline of them at once, each result is read whole
+        for path, lines in cmd.iter_results():
+            if cmd.dry_run:
+                continue
+            for record in hsjson.iter_json_records(lines):
+                yield path, record
+        return
+    for path in cmd.paths:
+        chunks = cmd.iter_cmd_chunks(path)
+        if cmd.dry_run:
+            for chunk in chunks:
                 pass
-        statsfs[path] = statsf
-
-    return statsfs
+            continue
+        for record in hsjson.iter_json_records(chunks):
+            yield path, record
 
-@perf_grp.command(name='clear', help="Clear op/perf counters on share(s)")
-@param_sharepaths
-@click.pass_context
-def do_report_stats_clear(ctx, *args, **kwargs):
+def hs_eval_iter(*args, **kwargs):
     """
-    Doesn't actually 'clear' the stats, just saves off the current counters to a tag 'old_stats' that is then
-    diffed from the latest stats on future reads.  If needed, creates a .stats file to store this tag
+    Like hs_eval() but yields (path, record) as the JSON results are read
+    rather than returning all of the output, tables are yielded one row at
+    a time, see hstk.hsjson.  Nothing is yielded for a dry run.  With
+    --jobs or --pipeline and a list of paths, the paths are run concurrently.
     """
-    # manual method of clearing stats via pdfs
-    # echo hi > $share/?.attribute=pdfs_stats
-    statsfs = _dot_stats_files_paths(kwargs['pathnames'])
-    tag_args = {
-            'exp': 'fs_stats.op_stats',
-            'name': 'old_stats',
-            'pathnames': statsfs,
-        }
-    kwargs.update(tag_args)
-    _cmd_retcode(hss.tag_set, **kwargs)
-
-@perf_grp.command(name='top_calls', help="Show filesystem calls consuming the most time on share(s)")
-@param_sharepaths
-@click.pass_context
-def do_report_stats_top_calls(ctx, *args, **kwargs):
-    statsfs = _dot_stats_files_paths(kwargs['pathnames'])
-    eval_args = {
-            'exp': '{(fs_stats.op_stats-get_tag("old_stats")),TOP100_TABLE{|::KEY={#A[PARENT.ROW].op_count,#A[PARENT.ROW].name,#A[PARENT.ROW].op_count,#A[PARENT.ROW].op_time,#A[PARENT.ROW].op_avg}}[ROWS(#A)]}.#B',
-            'pathnames': statsfs,
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@perf_grp.command(name='top_funcs', help="Top time consuming functions on share(s)")
-@click.option('--op', nargs=1, default='all', help="Restrict to reporting to funcs in a specific op")
-@param_sharepaths
-@click.pass_context
-def do_report_stats_funcs(ctx, op, *args, **kwargs):
-    statsfs = _dot_stats_files_paths(kwargs['pathnames'])
-    eval_args = {
-            'exp': '{(FS_STATS.OP_STATS-get_tag("old_stats"))[|NAME="%s"].func_stats,TOP100_TABLE{|::KEY={#A[PARENT.ROW].op_time,#A[PARENT.ROW].name,#A[PARENT.ROW].op_count,#A[PARENT.ROW].op_avg}}[ROWS(#A)]}.#B' % (op),
-            'pathnames': statsfs,
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@perf_grp.command(name='top_ops', help="Show filesystem ops consuming the most time by share(s)")
-@param_sharepaths
-@click.pass_context
-def do_report_stats_top_ops(ctx, *args, **kwargs):
-    statsfs = _dot_stats_files_paths(kwargs['pathnames'])
-    eval_args = {
-            'exp': '{(fs_stats.op_stats-get_tag("old_stats")),TOP100_TABLE{|::KEY={#A[PARENT.ROW].op_time,#A[PARENT.ROW].name,#A[PARENT.ROW].op_count,#A[PARENT.ROW].op_time,#A[PARENT.ROW].op_avg}}[ROWS(#A)]}.#B',
-            'pathnames': statsfs,
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@perf_grp.command(name='flushes', help="Counter for flush transactions by share(s)")
-@param_sharepaths
-@click.pass_context
-def do_report_stats_flushes(ctx, *args, **kwargs):
-    statsfs = _dot_stats_files_paths(kwargs['pathnames'])
-    eval_args = {
-            'exp': 'sum({|::#A=(fs_stats.op_stats-get_tag("old_stats"))[ROW].flush_count}[ROWS(fs_stats.op_stats)])',
-            'pathnames': statsfs,
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-#
-# Bulk data dumpers
-#
-@click.group(name='dump', help="[sub] Dump info about various items", cls=OrderedGroup)
-def dump_grp():
-    pass
-cli.add_command(dump_grp)
-
-@dump_grp.command(name='inode', help="inode metadata")
-@click.option('--full', is_flag=True, help="Include all available details")
-@param_paths
-@click.pass_context
-def do_inode_dump(ctx, full, *args, **kwargs):
-    eval_args = {
-            #'force_json': True,
-            'exp': 'DUMP_INODE',
-            'recursive': True,
-            'raw': True,
-        }
-    if full:
-        eval_args['exp'] = "THIS"
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@dump_grp.command(name='iinfo', help="Alternative inode details, always in JSON format")
-@param_paths
-@click.pass_context
-def do_inode_info(ctx, *args, **kwargs):
-    _cmd_retcode(hss.inode_info, **kwargs)
-
-@dump_grp.command(name='share', help="Full share(s) metadata")
-@click.option('--filter-volume', nargs=1, help="Only report files that have an instance on this volume, provide volume name")
-@param_sharepaths
-@click.pass_context
-def do_share_dump(ctx, filter_volume, *args, **kwargs):
-    eval_args = {
-            'exp': 'DUMP_INODE',
-            'recursive': True,
-            'raw': True,
-        }
-    kwargs.update(eval_args)
-    if filter_volume is not None:
-        kwargs['exp'] = 'dump_inode_on(storage_volume("%s"))' % (filter_volume)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@dump_grp.command(name='misaligned', help="Dump details about misaligned files on the share(s)")
-@param_sharepaths
-@click.pass_context
-def do_misaligned_files(ctx, *args, **kwargs):
-    eval_args = {
-            'exp': 'IS_FILE and overall_alignment!=alignment("aligned")?dump_inode',
-            'recursive': True,
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@dump_grp.command(name='threat', help="Dump details about files that are a virus threat on the share(s)")
-@param_sharepaths
-@click.pass_context
-def do_threat_files(ctx, *args, **kwargs):
-    eval_args = {
-            'exp': 'IS_FILE and attributes.virus_scan==virus_scan_state("THREAT")?dump_inode',
-            'recursive': True,
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@dump_grp.command(name='map_file_to_obj', help="For --native object volumes, dump a mapping between file path and object volume path")
-@click.argument('bucket_name', nargs=1, required=True)
-@param_sharepaths
-@click.pass_context
-def do_dump_map_file_to_obj(ctx, bucket_name, *args, **kwargs):
-    eval_args = {
-            'exp': '{instances[|volume=storage_volume("%s")],!ISNA(#A)?{PATH,#A.PATH}}.#B' % (bucket_name),
-            'recursive': True,
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@dump_grp.command(name='files_on_volume', help="List all files that have data on the specified volume per share(s)")
-@click.argument('volume_name', nargs=1, required=True)
-@param_sharepaths
-@click.pass_context
-def do_dump_files_on_volume(ctx, volume_name, *args, **kwargs):
-    eval_args = {
-            'exp': '{instances[|volume=storage_volume("%s")],!ISNA(#A)?{PATH}}.#B' % (volume_name),
-            'recursive': True,
-        }
-    kwargs.update(eval_args)
-    _cmd_retcode(hss.eval, **kwargs)
-
-@dump_grp.command(name='volumes', help="List available volumes in the cluster")
-@param_path
-@click.pass_context
-def do_dump_volume_list(ctx, path, *args, **kwargs):
-    # Another option to do the volume select:
-    # exp: "(INDEXED_TABLE{|::#A=STORAGE_VOLUMES[ROW].VOLUME_STATUS!=STORAGE_VOLUME_STATUS('REMOVED'),|::#B=STORAGE_VOLUMES[ROW].NAME}[ROWS(STORAGE_VOLUMES)])[|#A=TRUE].#B" .
-    # This builds an indexed table with the first column(#A)  being the
-    # predicate and the second column (#B) being the volume name.  The table is
-    # the same number of rows as there are storage volumes.  Then we select  #B
-    # where #A is true
-    #
-    # The |::<col>= syntax is how you set every row in the column to a specific formula.
-    # So :: means every row.
-    kwargs['pathnames'] = [ path ]
-    eval_args = {
-            'exp': 'STORAGE_VOLUMES',
-            'force_json': True,
-        }
-    kwargs.update(eval_args)
-    hs_res = hs_eval(**kwargs)[path]
-    if ctx.obj.dry_run:
-        json_res = []
-    else:
-        json_res = json.loads(''.join(hs_res))['STORAGE_VOLUMES_TABLE']
-
-    volumes = []
-    for vol_json in json_res:
-        if 'VOLUME_STATUS' not in vol_json:
-            if 'Data Mover' not in vol_json['NAME']:
-                print()
-                print("ERROR, VOLUME_STATUS not found in")
-                pprint.pprint(vol_json)
-            continue
-        if vol_json['VOLUME_STATUS']['HAMMERSCRIPT'] != "STORAGE_VOLUME_STATUS('REMOVED')":
-            volumes.append(vol_json['NAME'])
-    if ctx.obj.output_json:
-        print(json.dumps(volumes))
-    else:
-        print('\n'.join(volumes))
-
-@dump_grp.command(name='volume_groups', help="List available volume_groups")
-@param_path
-@click.pass_context
-def do_dump_volume_group_list(ctx, path, *args, **kwargs):
-    kwargs['pathnames'] = [ path ]
-    eval_args = {
-            'exp': 'VOLUME_GROUPS.NAME',
-            'force_json': True,
-        }
-    kwargs.update(eval_args)
-
-    hs_res = hs_eval(**kwargs)[path]
-    if ctx.obj.dry_run:
-        json_res = []
-    else:
-        json_res = json.loads(''.join(hs_res))['VOLUME_GROUPS_TABLE']
+    return _hs_iter_json(hss.eval, kwargs)
 
-    vgs = []
-    for vg_json in json_res:
-        vgs.append(vg_json['NAME'])
+def hs_sum_iter(*args, **kwargs):
+    """ hs_eval_iter() for sum commands """
+    return _hs_iter_json(hss.sum, kwargs)
 
-    if ctx.obj.output_json:
-        print(json.dumps(vgs))
-    else:
-        print('\n'.join(vgs))
-
-@dump_grp.command(name='objectives', help="List available objectives")
-@param_path
-@click.pass_context
-def do_dump_objectives_list(ctx, path, *args, **kwargs):
-    kwargs['pathnames'] = [ path ]
-    eval_args = {
-            'exp': 'SMART_OBJECTIVES.NAME',
-            'force_json': True,
-        }
-    kwargs.update(eval_args)
-
-    hs_res = hs_eval(**kwargs)[path]
-    if ctx.obj.dry_run:
-        json_res = []
-    else:
-        json_res = json.loads(''.join(hs_res))['SMART_OBJECTIVES_TABLE']
-
-    objs = []
-    for obj_json in json_res:
-        if obj_json['NAME'].startswith('__z_objective'):
-            # deleted objective
-            continue
-        objs.append(obj_json['NAME'])
-
-    if ctx.obj.output_json:
-        print(json.dumps(objs))
-    else:
-        print('\n'.join(objs))
 
 #
-# GNS Replication sites
+# Subcommands, each lives in a module under hstk.commands that is only
+# imported when the command is used.  Keep in --help order.
 #
-@click.group(name='keep-on-site', help="[sub] sites in the GNS to keep copies of the data on", cls=OrderedGroup)
-def keep_on_site():
-    pass
-cli.add_command(keep_on_site)
-
-# only good for single share, but get new invocation for each path
-_GNS_PARTICIPANT_SITE_NAMES_CACHE=None
-@click.pass_context
-def _gns_participant_site_names(ctx, pathnames=['.'], force=False, **kwargs):
-    global _GNS_PARTICIPANT_SITE_NAMES_CACHE
-    if not force and _GNS_PARTICIPANT_SITE_NAMES_CACHE is not None:
-        return _GNS_PARTICIPANT_SITE_NAMES_CACHE
-    eval_args = {
-        'exp': 'THIS.PARTICIPANTS',
-        'force_json': True,
-        'pathnames': pathnames[:1],
-    }
-    eval_res = hs_eval(**eval_args)[pathnames[0]]
-    if ctx.obj.dry_run:
-        _GNS_PARTICIPANT_SITE_NAMES_CACHE = [ 'dry_run_test_site1', 'dry_run_test_site2' ]
-    else:
-        json_res = json.loads(''.join(eval_res))['PARTICIPANTS_TABLE']
-
-        _GNS_PARTICIPANT_SITE_NAMES_CACHE = []
-        for site_json in json_res:
-            _GNS_PARTICIPANT_SITE_NAMES_CACHE.append(site_json['SITE_NAME'])
-
-    return _GNS_PARTICIPANT_SITE_NAMES_CACHE
-
-def _completion_gns_participant_site_names(ctx, args, incomplete):
-    # XXX Upgrade to click 8 to get shell_complete=
-    pass
-
-param_site_name = group_decorator(
-            # Upgrade to click 8 to get shell_complete=
-            #click.argument('name', metavar='site_name', nargs=1, required=True, shell_complete=_completion_gns_participant_site_names),
-            click.argument('name', metavar='site_name', nargs=1, required=True),
-        )
-
-@keep_on_site.command(name='available', help="List sites names participating in this share")
-@param_sharepaths
-@click.pass_context
-def do_gns_sites(ctx, *args, **kwargs):
-    sites = _gns_participant_site_names(**kwargs)
-
-    if ctx.obj.output_json:
-        print(json.dumps(sites))
-    else:
-        print('\n'.join(sites))
-
-
-@keep_on_site.command(name='list', help="list GNS sites with keep-on rules")
-@param_eval
-@param_read
-@param_defaults
-def do_gns_keep_on_list(ctx, *args, **kwargs):
-    _cmd_retcode(hss.sites_keep_on_list, **kwargs)
-
-@keep_on_site.command(name='has', help="Is there already a keep-on rule for the specified GNS site?")
-@param_eval
-@param_read
-@param_site_name
-@param_defaults
-def do_gns_keep_on_has(ctx, *args, **kwargs):
-    _cmd_retcode(hss.sites_keep_on_has, **kwargs)
-
-@keep_on_site.command(name='delete', help="remove a GNS site keep-on rule")
-@param_site_name
-@param_force
-@param_recursive
-@param_nonfiles
-@param_defaults
-def do_gns_keep_on_del(ctx, *args, **kwargs):
-    if kwargs['name'] not in _gns_participant_site_names(**kwargs):
-        errmsg = "'%s' is not a valid site name\n" % (kwargs['name'])
-        raise click.UsageError(errmsg, ctx)
-    _cmd_retcode(hss.sites_keep_on_del, **kwargs)
-
-@keep_on_site.command(name='add', help="add a GNS site keep-on rule")
-@param_site_name
-@param_recursive
-@param_nonfiles
-@param_defaults
-def do_gns_keep_on_add(ctx, *args, **kwargs):
-    if kwargs['name'] not in _gns_participant_site_names(**kwargs):
-        errmsg = "'%s' is not a valid site name\n" % (kwargs['name'])
-        raise click.UsageError(errmsg, ctx)
-    _cmd_retcode(hss.sites_keep_on_add, **kwargs)
-
-
+LAZY_COMMANDS = (
+        ('eval', 'hstk.commands.evaluate:do_eval'),
+        ('sum', 'hstk.commands.evaluate:do_sum'),
+        ('attribute', 'hstk.commands.attribute:attribute'),
+        ('keyword', 'hstk.commands.keyword:keyword'),
+        ('label', 'hstk.commands.label:label'),
+        ('tag', 'hstk.commands.tag:tag'),
+        ('rekognition-tag', 'hstk.commands.rekognition_tag:rekognition_tag'),
+        ('objective', 'hstk.commands.objective:objective'),
+        ('rm', 'hstk.commands.files:do_rm_rf'),
+        ('cp', 'hstk.commands.files:do_cp_a'),
+        ('rsync', 'hstk.commands.files:do_rsync_a_delete'),
+        ('wait', 'hstk.commands.files:do_wait'),
+        ('collsum', 'hstk.commands.evaluate:do_collection_sum'),
+        ('status', 'hstk.commands.status:status'),
+        ('usage', 'hstk.commands.usage:usage'),
+        ('perf', 'hstk.commands.perf:perf_grp'),
+        ('dump', 'hstk.commands.dump:dump_grp'),
+        ('index', 'hstk.commands.index:index_grp'),
+        ('keep-on-site', 'hstk.commands.keep_on_site:keep_on_site'),
+        ('apply', 'hstk.commands.apply:do_apply'),
+        ('serve', 'hstk.commands.serve:do_serve'),
+)
+for _name, _import_path in LAZY_COMMANDS:
+    cli.add_lazy_command(_name, _import_path)
 
 ### List XXX all locations (share root, directory, files) that have a local objective
 ### List XXX all locations (share root, directory, files) that have a tag/attribute/etc
 ### List XXX all locations (share root, directory, files) that have a gns keep-on
 
-#
-# Setup aliases
-#
-
-ALIAS_MAPPINGS = {
-        'attribute': ('attributes', 'attr', 'attrs'),
-        'tag': ('tags', ),
-        'label': ('labels', 'lab'),
-        'available': ('avail',),
-        'keyword': ('keywords',),
-        'delete': ('del',),
-        'assimilation': ('assim',),
-        'alignment': ('align',),
-        'collsum': ('collsums', 'colsum', 'colsums'),
-        'objective': ('objectives', 'obj', 'objs'),
-        'rekognition-tag': ('rekognition-tags', ),
-        'keep-on-site': ('keep-on-sites', ),
-}
-def _alias_mappings(cmd):
-    for subname, subcmd in cmd.commands.items():
-        if subname in ALIAS_MAPPINGS:
-            cmd.add_alias(subname, *ALIAS_MAPPINGS[subname])
-        if isinstance(subcmd, OrderedGroup):
-            _alias_mappings(subcmd)
-
-_alias_mappings(cli)
-
 
 if __name__ == '__main__':
     cli()
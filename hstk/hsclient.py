@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Python API to the shadow commands, for programs that would otherwise run hs
+
+    import hstk
+    client = hstk.Client(jobs=8)
+    client.set('tag', 'color', 'blue', ['a.mov', 'b.mov'], string=True)
+    colors = client.get('tag', 'color', ['a.mov', 'b.mov'])
+
+A Client holds what the hs global options would: the gateway transport,
+--jobs, --pipeline, --adaptive, --max-ops/--max-bytes and --profile, along
+with where the gateway file of each path it has used goes.  It doesn't need
+a click context, any number of threads can share one Client, each call runs
+its paths up to jobs (or pipeline) at a time and the limits apply across
+all of them.
+
+Calls take a path or a list of them and return {path: result} in the
+order given.  Reads give the JSON records of each path, see hstk.hsjson.
+Writes give None for a path that worked, or what the gateway answered for
+one that didn't.  A dry run sends nothing, reads give no records and
+writes always work.  The commands a dry run (or verbose) would show are
+logged to the 'hstk' logger rather than printed.
+"""
+
+import logging
+import os
+import pathlib
+import stat
+import threading
+import time
+
+import hstk.hscli as hscli
+import hstk.hsgateway as hsgw
+import hstk.hsjson as hsjson
+import hstk.hslimit as hslimit
+import hstk.hsprofile as hsprof
+import hstk.hsscript as hss
+
+# metadata type -> {op: hsscript generator}, set is add for the types without values
+METADATA_OPS = {
+        'attribute': { 'list': hss.attribute_list, 'get': hss.attribute_get, 'has': hss.attribute_has,
+            'set': hss.attribute_set, 'delete': hss.attribute_del },
+        'tag': { 'list': hss.tag_list, 'get': hss.tag_get, 'has': hss.tag_has,
+            'set': hss.tag_set, 'delete': hss.tag_del },
+        'rekognition_tag': { 'list': hss.rekognition_tag_list, 'get': hss.rekognition_tag_get, 'has': hss.rekognition_tag_has,
+            'set': hss.rekognition_tag_set, 'delete': hss.rekognition_tag_del },
+        'label': { 'list': hss.label_list, 'has': hss.label_has, 'set': hss.label_add, 'delete': hss.label_del },
+        'keyword': { 'list': hss.keyword_list, 'has': hss.keyword_has, 'set': hss.keyword_add, 'delete': hss.keyword_del },
+        'objective': { 'list': hss.objective_list, 'has': hss.objective_has, 'set': hss.objective_add, 'delete': hss.objective_del },
+        'keep_on_site': { 'list': hss.sites_keep_on_list, 'has': hss.sites_keep_on_has,
+            'set': hss.sites_keep_on_add, 'delete': hss.sites_keep_on_del },
+}
+
+# Client arguments from_env() takes from the environment variables of the hs global options
+ENV_OPTIONS = (
+        ('jobs', 'HS_JOBS', int),
+        ('pipeline', 'HS_PIPELINE', int),
+        ('gateway', 'HS_GATEWAY', str),
+        ('target_latency', 'HS_TARGET_LATENCY', float),
+        ('max_ops', 'HS_MAX_OPS', float),
+        ('max_bytes', 'HS_MAX_BYTES', float),
+        ('rate_state', 'HS_RATE_STATE', str),
+)
+
+log = logging.getLogger('hstk')
+
+
+def _paths(paths):
+    """ A list of path strings from a path or an iterable of them """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [ paths ]
+    return [ os.fspath(path) for path in paths ]
+
+
+def _shadgen(mdtype, op):
+    ops = METADATA_OPS.get(mdtype.replace('-', '_'))
+    if ops is None:
+        raise ValueError('unknown metadata type: %s' % (mdtype))
+    if op not in ops:
+        raise ValueError('%s has no %s, use one of: %s' % (mdtype, op, ', '.join(ops.keys())))
+    return ops[op]
+
+
+class Client(object):
+    """
+    The arguments are the hs global options of the same names.  gateway is
+    a --gateway specification, ValueError if it isn't valid.
+    """
+
+    def __init__(self, jobs=1, dry_run=False, verbose=0, gateway='file', pipeline=1, adaptive=False, min_jobs=1,
+            target_latency=1.0, max_ops=None, max_bytes=None, rate_state=None, profile=False):
+        if jobs < 1 or pipeline < 1:
+            raise ValueError('jobs and pipeline must be at least 1, got %s and %s' % (jobs, pipeline))
+        transport = None
+        if not dry_run:
+            transport = hsgw.gateway_from_spec(gateway)
+        concurrency = None
+        if adaptive:
+            if min_jobs > jobs:
+                raise ValueError('min_jobs must not be more than jobs')
+            concurrency = hslimit.AdaptiveConcurrency(floor=min_jobs, ceiling=jobs, target_latency=target_latency)
+        rate_limit = None
+        if max_ops is not None or max_bytes is not None:
+            rate_limit = hslimit.ShareRateLimit(ops=max_ops, nbytes=max_bytes, state_dir=rate_state)
+        self.settings = hscli.HSGlobals(verbose=verbose, dry_run=dry_run, output_json=True, jobs=jobs,
+                transport=transport, profile=hsprof.GatewayProfile() if profile else None,
+                concurrency=concurrency, rate_limit=rate_limit, gateway_dirs=hscli.GatewayDirCache(), pipeline=pipeline,
+                log=log.info)
+
+    @classmethod
+    def from_env(cls, environ=None, **kwargs):
+        """ A Client set up by the HS_* environment variables as hs would be, kwargs take precedence """
+        environ = os.environ if environ is None else environ
+        for key, env, conv in ENV_OPTIONS:
+            if key not in kwargs and environ.get(env):
+                kwargs[key] = conv(environ[env])
+        return cls(**kwargs)
+
+    @property
+    def dry_run(self):
+        return self.settings.dry_run
+
+    @property
+    def transport(self):
+        return self.settings.transport
+
+    @property
+    def profile(self):
+        """ The GatewayProfile of every round trip made, None without profile=True """
+        return self.settings.profile
+
+    @property
+    def concurrency(self):
+        return self.settings.concurrency
+
+    @property
+    def rate_limit(self):
+        return self.settings.rate_limit
+
+    def _cmd(self, shadgen, command, paths, **kwargs):
+        kwargs['pathnames'] = paths
+        kwargs['force_json'] = True
+        kwargs['outstream'] = None
+        return hscli.ShadCmd(shadgen, kwargs, settings=self.settings, command=command)
+
+    def _read(self, shadgen, command, paths, **kwargs):
+        paths = _paths(paths)
+        cmd = self._cmd(shadgen, command, paths, **kwargs)
+        ret = {}
+        for path, (_, lines) in zip(paths, cmd.iter_results()):
+            ret[path] = [] if self.dry_run else list(hsjson.iter_json_records(lines))
+        return ret
+
+    def _write(self, shadgen, command, paths, **kwargs):
+        paths = _paths(paths)
+        cmd = self._cmd(shadgen, command, paths, **kwargs)
+        ret = {}
+        for path, (_, lines) in zip(paths, cmd.iter_results()):
+            output = ''.join(lines).strip()
+            ret[path] = output if output and not self.dry_run else None
+        return ret
+
+    def eval(self, paths, exp, recursive=False, nonfiles=False, input_json=False):
+        """ {path: records} of the expression exp, as hs eval """
+        return self._read(hss.eval, 'eval', paths, exp=exp, recursive=recursive, nonfiles=nonfiles, input_json=input_json)
+
+    def eval_iter(self, paths, exp, recursive=False, nonfiles=False, input_json=False):
+        """
+        eval() for results of any size, yields (path, record) as they are
+        read back, one path at a time
+        """
+        paths = _paths(paths)
+        cmd = self._cmd(hss.eval, 'eval', paths, exp=exp, recursive=recursive, nonfiles=nonfiles, input_json=input_json)
+        for path, fname in zip(paths, cmd.paths):
+            chunks = cmd.iter_cmd_chunks(fname)
+            if self.dry_run:
+                for chunk in chunks:
+                    pass
+                continue
+            for record in hsjson.iter_json_records(chunks):
+                yield path, record
+
+    def sum(self, paths, exp, nonfiles=False, input_json=False):
+        """ {path: records} of the expression exp summed over the files under path, as hs sum """
+        return self._read(hss.sum, 'sum', paths, exp=exp, nonfiles=nonfiles, input_json=input_json)
+
+    def list(self, mdtype, paths, recursive=False, **flags):
+        """
+        {path: records} of the metadata of mdtype, a key of METADATA_OPS.
+        flags are the hs <mdtype> list options: local, inherited, object,
+        and for objectives active, effective and share
+        """
+        return self._read(_shadgen(mdtype, 'list'), mdtype + ' list', paths, recursive=recursive, **flags)
+
+    def get(self, mdtype, name, paths, recursive=False, unbound=False, **flags):
+        """ {path: records} of the value of name, flags as for list() """
+        return self._read(_shadgen(mdtype, 'get'), mdtype + ' get', paths, name=name, recursive=recursive,
+                unbound=unbound, **flags)
+
+    def has(self, mdtype, name, paths, recursive=False, **flags):
+        """ {path: records} of whether name is set, flags as for list() """
+        return self._read(_shadgen(mdtype, 'has'), mdtype + ' has', paths, name=name, recursive=recursive, **flags)
+
+    def set(self, mdtype, name, value, paths, recursive=False, nonfiles=False, unbound=False, string=False, input_json=False):
+        """
+        Set name to the expression value, as hs <mdtype> set, or add name
+        for the types without values, where value can be None
+        """
+        kwargs = {}
+        if value is not None:
+            kwargs['exp'] = value
+        return self._write(_shadgen(mdtype, 'set'), mdtype + ' set', paths, name=name, recursive=recursive,
+                nonfiles=nonfiles, unbound=unbound, string=string, input_json=input_json, **kwargs)
+
+    def delete(self, mdtype, name, paths, recursive=False, nonfiles=False, force=False):
+        """ Remove name, as hs <mdtype> delete """
+        return self._write(_shadgen(mdtype, 'delete'), mdtype + ' delete', paths, name=name, recursive=recursive,
+                nonfiles=nonfiles, force=force)
+
+    def rm_rf(self, paths):
+        """
+        Remove paths and everything under them, as hs rm -rf, the contents of
+        directories are removed by the cluster.  Paths that don't exist are
+        skipped.  {path: None, or why it wasn't removed}
+        """
+        paths = [ path for path in _paths(paths) if os.path.lexists(path) ]
+        dirs = [ path for path in paths if os.path.isdir(path) and not os.path.islink(path) ]
+        cleared = self._write(hss.rm_rf, 'rm', dirs)
+        ret = {}
+        for path in paths:
+            error = cleared.get(path)
+            if error is None and not self.dry_run:
+                try:
+                    if path in cleared:
+                        os.rmdir(path)
+                    else:
+                        os.unlink(path)
+                except OSError as e:
+                    error = e.strerror or str(e)
+            self.settings.gateway_dirs.discard(pathlib.Path(path))
+            ret[path] = error
+        return ret
+
+    def cp_a(self, srcs, dest, wait=True, timeout=None):
+        """
+        Clone each of srcs into the directory dest, as hs cp -a SRC... DEST,
+        and with wait return once dest is assimilated, TimeoutError if that
+        takes more than timeout seconds.  dest must exist, be on the same
+        filesystem as srcs and not already hold any of their names,
+        ValueError otherwise.  Unlike hs cp nothing is ever copied by hand.
+        {src: None, or why it wasn't copied}
+        """
+        srcs = _paths(srcs)
+        dest_stat = os.stat(dest)
+        if not stat.S_ISDIR(dest_stat.st_mode):
+            raise ValueError('destination is not a directory: %s' % (dest))
+        existing = set(os.listdir(dest))
+        for src in srcs:
+            if os.stat(src).st_dev != dest_stat.st_dev:
+                raise ValueError('source %s is on a different filesystem from %s' % (src, dest))
+            if (os.path.basename(src.rstrip(os.sep)) or src) in existing:
+                raise ValueError('source %s collides with an existing item in %s' % (src, dest))
+        ret = self._write(hss.cp_a, 'cp', srcs, dest_inode=dest_stat.st_ino)
+        if wait and not any(ret.values()) and not self.wait(dest, timeout):
+            raise TimeoutError('timed out waiting for the assimilation of %s' % (dest))
+        return ret
+
+    def wait(self, path, timeout=None):
+        """ Block until the assimilation of path is finished, as hs wait, False if timeout ran out """
+        import hstk.hswait as hswait
+        if self.dry_run:
+            return True
+        start = time.time()
+        try:
+            records = self.eval(path, 'PATH')[path]
+            server_path = hswait.record_path(records[0]) if records else None
+            tracker = hswait.CompletionTracker(os.path.abspath(path), self._assimilation_details,
+                    server_target=server_path)
+            return tracker.wait(timeout)
+        except ValueError:
+            pass
+        # The details can't be read, walking the tree waits for it
+        if timeout is None:
+            self.sum(path, '1', nonfiles=True)
+            return True
+        thread = threading.Thread(target=self.sum, args=(path, '1'), kwargs={'nonfiles': True}, daemon=True)
+        thread.start()
+        thread.join(max(timeout - (time.time() - start), 0))
+        return not thread.is_alive()
+
+    def _assimilation_details(self, path):
+        return self.eval(path, 'assimilation_details')[path]
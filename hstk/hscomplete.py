@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fast shell completion for hs
+
+Click answers completion requests by building the whole command tree,
+which means importing hstk.hscli and every command module on each TAB.
+Instead hs answers the click completion protocol (_HS_COMPLETE set to
+bash_complete, zsh_complete or fish_complete) from here, before anything
+else is imported:
+    - commands, aliases and options come from TABLE in
+      hstk.hscomplete_table, generated from the click commands with
+          python -m hstk.hscomplete > hstk/hscomplete_table.py
+      and checked against them by the tests
+    - site, volume, volume group and objective names come from the
+      catalog cache (hstk.hscatalog) of the share holding the current
+      directory, whatever its age, it is never refreshed from here
+    - paths are left to the shell
+The *_source instructions that print the shell setup still go to click.
+
+This module is imported for every completion, keep it to the standard
+library.  Click is only imported to build the table.
+"""
+
+import os
+import sys
+
+
+def complete_catalog(kind):
+    """
+    A click shell_complete= callback for names of kind, see
+    hstk.hscatalog.KINDS, build_table() records the kind so completion
+    through the table gives the same names
+    """
+    def complete(ctx, param, incomplete):
+        return [ name for name in catalog_names(kind) if name.startswith(incomplete) ]
+    complete.catalog_kind = kind
+    return complete
+
+
+def catalog_names(kind, path='.'):
+    """ The cached names of kind for the share holding path, empty if there are none """
+    import hstk.hscatalog as hscatalog
+    try:
+        names = hscatalog.Catalog(path, cache_dir=os.environ.get('HS_CATALOG_DIR')).lookup(kind)
+    except OSError:
+        names = None
+    return names if isinstance(names, list) else []
+
+
+#
+# Building the table, needs click
+#
+def _param_kind(param):
+    import click
+    kind = getattr(getattr(param, '_custom_shell_complete', None), 'catalog_kind', None)
+    if kind is not None:
+        return kind
+    if isinstance(param.type, click.Choice):
+        return list(param.type.choices)
+    if isinstance(param.type, click.Path):
+        return 'file' if param.type.file_okay else 'dir'
+    if isinstance(param.type, click.File):
+        return 'file'
+    return None
+
+def _table_entry(cmd):
+    import click
+    entry = {
+            'commands': {},
+            'aliases': {},
+            'options': { '--help': [0, None] },
+            'args': [],
+        }
+    for param in cmd.params:
+        if isinstance(param, click.Option):
+            nargs = 0 if param.is_flag or param.count else param.nargs
+            for opt in param.opts + param.secondary_opts:
+                entry['options'][opt] = [nargs, _param_kind(param)]
+        elif isinstance(param, click.Argument):
+            entry['args'].append([param.name, param.nargs, _param_kind(param)])
+    return entry
+
+def build_table(cli):
+    """ {command path: entry} for cli and every command under it, the root path is '' """
+    table = {}
+    def walk(cmd, path):
+        entry = table[path] = _table_entry(cmd)
+        if hasattr(cmd, 'list_commands'):
+            for name in cmd.list_commands(None):
+                sub = cmd.get_command(None, name)
+                entry['commands'][name] = sub.get_short_help_str(limit=60)
+                walk(sub, (path + ' ' + name).strip())
+            entry['aliases'] = dict(getattr(cmd, '_cmd_aliases', {}))
+    walk(cli, '')
+    return table
+
+def write_table(fd):
+    import pprint
+    import hstk.hscli as hscli
+    fd.write('# Generated by "python -m hstk.hscomplete > hstk/hscomplete_table.py", do not edit\n')
+    fd.write('TABLE = ' + pprint.pformat(build_table(hscli.cli), width=120) + '\n')
+
+
+#
+# Answering completion requests
+#
+def _split(text):
+    """ Split a command line like the shell, keeping an unterminated last word """
+    import shlex
+    lex = shlex.shlex(text, posix=True)
+    lex.whitespace_split = True
+    lex.commenters = ''
+    words = []
+    try:
+        for word in lex:
+            words.append(word)
+    except ValueError:
+        # Unterminated quote, the rest is the word being completed
+        words.append(lex.token)
+    return words
+
+def _resolve(entry, word):
+    """ The command word names, like OrderedGroup.get_command() """
+    if word in entry['commands']:
+        return word
+    if word in entry['aliases']:
+        return entry['aliases'][word]
+    matches = [ name for name in entry['commands'] if name.startswith(word) ]
+    if len(matches) == 1:
+        return matches[0]
+    return None
+
+def _values(kind, incomplete):
+    """ [(type, value, help)] completing an argument or option value of kind """
+    if kind in ('file', 'dir'):
+        return [ (kind, incomplete, None) ]
+    if isinstance(kind, list):
+        names = kind
+    elif kind is not None:
+        names = catalog_names(kind)
+    else:
+        names = []
+    return [ ('plain', name, None) for name in names if name.startswith(incomplete) ]
+
+def complete(args, incomplete, table=None):
+    """ [(type, value, help)] for the word being completed after args, the words after 'hs' """
+    if table is None:
+        from hstk.hscomplete_table import TABLE as table
+    path = ''
+    entry = table[path]
+    position = 0
+    pending = 0
+    pending_kind = None
+    for word in args:
+        if pending:
+            pending -= 1
+            continue
+        if word.startswith('-') and word != '-':
+            spec = entry['options'].get(word.split('=', 1)[0])
+            if spec is not None and spec[0] > 0 and '=' not in word:
+                pending, pending_kind = spec
+            continue
+        name = _resolve(entry, word) if entry['commands'] else None
+        if name is not None:
+            path = (path + ' ' + name).strip()
+            entry = table[path]
+            position = 0
+            continue
+        position += 1
+
+    if pending:
+        return _values(pending_kind, incomplete)
+    if incomplete.startswith('-'):
+        return [ ('plain', opt, None) for opt in sorted(entry['options']) if opt.startswith(incomplete) ]
+    if entry['commands']:
+        return [ ('plain', name, helptext) for name, helptext in entry['commands'].items() if name.startswith(incomplete) ]
+    for name, nargs, kind in entry['args']:
+        if nargs < 0 or position < nargs:
+            return _values(kind, incomplete)
+        position -= nargs
+    return []
+
+def _format(shell, item):
+    kind, value, helptext = item
+    if shell == 'zsh':
+        if kind == 'plain':
+            value = value.replace(':', r'\:')
+        return '%s\n%s\n%s' % (kind, value, helptext or '_')
+    if shell == 'fish' and helptext:
+        return '%s,%s\t%s' % (kind, value, helptext)
+    return '%s,%s' % (kind, value)
+
+def main(instruction, environ=None, out=None):
+    """
+    Answer the completion request of instruction, the value of
+    _HS_COMPLETE, from the COMP_WORDS and COMP_CWORD the click shell
+    scripts set.  False if it is not a request handled here.
+    """
+    environ = os.environ if environ is None else environ
+    out = sys.stdout if out is None else out
+    shell, _, action = instruction.partition('_')
+    if action != 'complete' or shell not in ('bash', 'zsh', 'fish') or 'COMP_WORDS' not in environ:
+        return False
+    words = _split(environ['COMP_WORDS'])
+    if shell == 'fish':
+        # fish gives the word being completed rather than its index
+        incomplete = environ.get('COMP_CWORD', '')
+        if incomplete:
+            incomplete = _split(incomplete)[0]
+        args = words[1:]
+        if incomplete and args and args[-1] == incomplete:
+            args.pop()
+    else:
+        cword = int(environ.get('COMP_CWORD', len(words)))
+        args = words[1:cword]
+        incomplete = words[cword] if cword < len(words) else ''
+    lines = [ _format(shell, item) for item in complete(args, incomplete) ]
+    if lines:
+        out.write('\n'.join(lines) + '\n')
+    return True
+
+
+if __name__ == '__main__':
+    write_table(sys.stdout)
@@ -0,0 +1,1017 @@
+# Generated by "python -m hstk.hscomplete > hstk/hscomplete_table.py", do not edit
+TABLE = {'': {'aliases': {'attr': 'attribute',
+                  'attributes': 'attribute',
+                  'attrs': 'attribute',
+                  'collsums': 'collsum',
+                  'colsum': 'collsum',
+                  'colsums': 'collsum',
+                  'keep-on-sites': 'keep-on-site',
+                  'keywords': 'keyword',
+                  'lab': 'label',
+                  'labels': 'label',
+                  'obj': 'objective',
+                  'objectives': 'objective',
+                  'objs': 'objective',
+                  'rekognition-tags': 'rekognition-tag',
+                  'tags': 'tag'},
+      'args': [],
+      'commands': {'apply': 'Bulk apply metadata changes listed in a CSV or JSONL...',
+                   'attribute': '[sub] inode metadata: schema no, value yes',
+                   'collsum': 'Usage details about one/all collections in whole share...',
+                   'cp': 'Fast offloaded recursive copy via clone',
+                   'dump': '[sub] Dump info about various items',
+                   'eval': 'Evaluate hsscript expressions on a file',
+                   'index': '[sub] Local index of share metadata for offline lookups',
+                   'keep-on-site': '[sub] sites in the GNS to keep copies of the data on',
+                   'keyword': '[sub] inode metadata: schema no, value no',
+                   'label': '[sub] inode metadata: schema hierarchical, value no',
+                   'objective': '[sub] control file placement on backend storage',
+                   'perf': '[sub] Performance and operation stats',
+                   'rekognition-tag': '[sub] inode metadata: schema no, value yes',
+                   'rm': 'Fast offloaded rm -rf',
+                   'rsync': 'Fast offloaded recursive directory equalizer (Add and...',
+                   'serve': 'Run a daemon that executes hs commands for local clients,...',
+                   'status': '[sub] System, component, task status',
+                   'sum': 'Perform fast calculations on a set of files, --fan-out...',
+                   'tag': '[sub] inode metadata: schema no, value yes',
+                   'usage': '[sub] Resource utilization such as capacity or inode',
+                   'wait': 'Wait for the assimilation of a cp -a --no-wait...'},
+      'options': {'--adaptive': [0, None],
+                  '--catalog-dir': [1, 'dir'],
+                  '--catalog-ttl': [1, None],
+                  '--cmd-tree': [0, None],
+                  '--debug': [0, None],
+                  '--dry-run': [0, None],
+                  '--gateway': [1, None],
+                  '--help': [0, None],
+                  '--jobs': [1, None],
+                  '--json': [0, None],
+                  '--max-bytes': [1, None],
+                  '--max-ops': [1, None],
+                  '--min-jobs': [1, None],
+                  '--pipeline': [1, None],
+                  '--profile': [0, None],
+                  '--profile-trace': [1, 'file'],
+                  '--rate-state': [1, 'dir'],
+                  '--stream': [0, None],
+                  '--target-latency': [1, None],
+                  '--verbose': [0, None],
+                  '-d': [0, None],
+                  '-j': [0, None],
+                  '-n': [0, None],
+                  '-v': [0, None]}},
+ 'apply': {'aliases': {},
+           'args': [['manifest', 1, 'file']],
+           'commands': {},
+           'options': {'--batch': [1, None], '--format': [1, ['jsonl', 'csv']], '--help': [0, None]}},
+ 'attribute': {'aliases': {'del': 'delete'},
+               'args': [],
+               'commands': {'add': 'Add/Set value of attribute on inode(s)',
+                            'delete': 'remove attribute values from inode(s)',
+                            'get': "Get the attribute's value",
+                            'has': "Is the inode's attribute value non-empty",
+                            'list': 'list all attributes and values applied',
+                            'set': 'Add/Set value of attribute on inode(s)'},
+               'options': {'--help': [0, None]}},
+ 'attribute add': {'aliases': {},
+                   'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                   'commands': {},
+                   'options': {'--check-exists': [0, None],
+                               '--exp': [1, None],
+                               '--exp-stdin': [0, None],
+                               '--files-from': [1, None],
+                               '--help': [0, None],
+                               '--json': [0, None],
+                               '--nonfiles': [0, None],
+                               '--null': [0, None],
+                               '--recursive': [0, None],
+                               '--string': [0, None],
+                               '-0': [0, None],
+                               '-e': [1, None],
+                               '-i': [0, None],
+                               '-j': [0, None],
+                               '-r': [0, None],
+                               '-s': [0, None]}},
+ 'attribute delete': {'aliases': {},
+                      'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                      'commands': {},
+                      'options': {'--check-exists': [0, None],
+                                  '--files-from': [1, None],
+                                  '--force': [0, None],
+                                  '--help': [0, None],
+                                  '--nonfiles': [0, None],
+                                  '--null': [0, None],
+                                  '--recursive': [0, None],
+                                  '-0': [0, None],
+                                  '-r': [0, None]}},
+ 'attribute get': {'aliases': {},
+                   'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                   'commands': {},
+                   'options': {'--check-exists': [0, None],
+                               '--compact': [0, None],
+                               '--files-from': [1, None],
+                               '--help': [0, None],
+                               '--inherited': [0, None],
+                               '--local': [0, None],
+                               '--nonfiles': [0, None],
+                               '--null': [0, None],
+                               '--object': [0, None],
+                               '--raw': [0, None],
+                               '--recursive': [0, None],
+                               '--unbound': [0, None],
+                               '-0': [0, None],
+                               '-h': [0, None],
+                               '-l': [0, None],
+                               '-o': [0, None],
+                               '-r': [0, None],
+                               '-u': [0, None]}},
+ 'attribute has': {'aliases': {},
+                   'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                   'commands': {},
+                   'options': {'--check-exists': [0, None],
+                               '--compact': [0, None],
+                               '--files-from': [1, None],
+                               '--help': [0, None],
+                               '--inherited': [0, None],
+                               '--local': [0, None],
+                               '--nonfiles': [0, None],
+                               '--null': [0, None],
+                               '--object': [0, None],
+                               '--raw': [0, None],
+                               '--recursive': [0, None],
+                               '-0': [0, None],
+                               '-h': [0, None],
+                               '-l': [0, None],
+                               '-o': [0, None],
+                               '-r': [0, None]}},
+ 'attribute list': {'aliases': {},
+                    'args': [['pathnames', -1, 'file']],
+                    'commands': {},
+                    'options': {'--check-exists': [0, None],
+                                '--compact': [0, None],
+                                '--files-from': [1, None],
+                                '--help': [0, None],
+                                '--inherited': [0, None],
+                                '--local': [0, None],
+                                '--nonfiles': [0, None],
+                                '--null': [0, None],
+                                '--object': [0, None],
+                                '--raw': [0, None],
+                                '--recursive': [0, None],
+                                '-0': [0, None],
+                                '-h': [0, None],
+                                '-l': [0, None],
+                                '-o': [0, None],
+                                '-r': [0, None]}},
+ 'attribute set': {'aliases': {},
+                   'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                   'commands': {},
+                   'options': {'--check-exists': [0, None],
+                               '--exp': [1, None],
+                               '--exp-stdin': [0, None],
+                               '--files-from': [1, None],
+                               '--help': [0, None],
+                               '--json': [0, None],
+                               '--nonfiles': [0, None],
+                               '--null': [0, None],
+                               '--recursive': [0, None],
+                               '--string': [0, None],
+                               '-0': [0, None],
+                               '-e': [1, None],
+                               '-i': [0, None],
+                               '-j': [0, None],
+                               '-r': [0, None],
+                               '-s': [0, None]}},
+ 'collsum': {'aliases': {},
+             'args': [['collection', 1, None], ['pathnames', -1, 'dir']],
+             'commands': {},
+             'options': {'--collation': [1, None], '--help': [0, None]}},
+ 'cp': {'aliases': {},
+        'args': [['srcs', -1, None], ['dest', 1, None]],
+        'commands': {},
+        'options': {'--archive': [0, None], '--help': [0, None], '--no-wait': [0, None], '-a': [0, None]}},
+ 'dump': {'aliases': {},
+          'args': [],
+          'commands': {'clear_catalog': 'Forget the cached volume, volume group, objective and...',
+                       'files_on_volume': 'List all files that have data on the specified volume per...',
+                       'iinfo': 'Alternative inode details, always in JSON format',
+                       'inode': 'inode metadata',
+                       'map_file_to_obj': 'For --native object volumes, dump a mapping between file...',
+                       'misaligned': 'Dump details about misaligned files on the share(s)',
+                       'objectives': 'List available objectives',
+                       'share': 'Full share(s) metadata',
+                       'threat': 'Dump details about files that are a virus threat on the...',
+                       'volume_groups': 'List available volume_groups',
+                       'volumes': 'List available volumes in the cluster'},
+          'options': {'--help': [0, None]}},
+ 'dump clear_catalog': {'aliases': {},
+                        'args': [['pathnames', -1, 'dir']],
+                        'commands': {},
+                        'options': {'--help': [0, None]}},
+ 'dump files_on_volume': {'aliases': {},
+                          'args': [['volume_name', 1, 'volumes'], ['pathnames', -1, 'dir']],
+                          'commands': {},
+                          'options': {'--help': [0, None]}},
+ 'dump iinfo': {'aliases': {}, 'args': [['pathnames', -1, 'file']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'dump inode': {'aliases': {},
+                'args': [['pathnames', -1, 'file']],
+                'commands': {},
+                'options': {'--full': [0, None], '--help': [0, None]}},
+ 'dump map_file_to_obj': {'aliases': {},
+                          'args': [['bucket_name', 1, None], ['pathnames', -1, 'dir']],
+                          'commands': {},
+                          'options': {'--help': [0, None]}},
+ 'dump misaligned': {'aliases': {},
+                     'args': [['pathnames', -1, 'dir']],
+                     'commands': {},
+                     'options': {'--help': [0, None]}},
+ 'dump objectives': {'aliases': {},
+                     'args': [['path', 1, 'file']],
+                     'commands': {},
+                     'options': {'--help': [0, None], '--refresh': [0, None]}},
+ 'dump share': {'aliases': {},
+                'args': [['pathnames', -1, 'dir']],
+                'commands': {},
+                'options': {'--filter-volume': [1, None], '--help': [0, None]}},
+ 'dump threat': {'aliases': {}, 'args': [['pathnames', -1, 'dir']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'dump volume_groups': {'aliases': {},
+                        'args': [['path', 1, 'file']],
+                        'commands': {},
+                        'options': {'--help': [0, None], '--refresh': [0, None]}},
+ 'dump volumes': {'aliases': {},
+                  'args': [['path', 1, 'file']],
+                  'commands': {},
+                  'options': {'--help': [0, None], '--refresh': [0, None]}},
+ 'eval': {'aliases': {},
+          'args': [['pathnames', -1, 'file']],
+          'commands': {},
+          'options': {'--check-exists': [0, None],
+                      '--compact': [0, None],
+                      '--exp': [1, None],
+                      '--exp-stdin': [0, None],
+                      '--fan-out': [1, None],
+                      '--files-from': [1, None],
+                      '--help': [0, None],
+                      '--interactive': [0, None],
+                      '--json': [0, None],
+                      '--nonfiles': [0, None],
+                      '--null': [0, None],
+                      '--raw': [0, None],
+                      '--recursive': [0, None],
+                      '--string': [0, None],
+                      '-0': [0, None],
+                      '-e': [1, None],
+                      '-i': [0, None],
+                      '-j': [0, None],
+                      '-r': [0, None],
+                      '-s': [0, None]}},
+ 'index': {'aliases': {},
+           'args': [],
+           'commands': {'build': 'Index all inodes of share(s), replacing what was indexed...',
+                        'list': 'Show the indexed shares',
+                        'query': 'List indexed paths matching all of the given conditions',
+                        'refresh': 'Update the index for share(s), only re-dumping...'},
+           'options': {'--help': [0, None]}},
+ 'index build': {'aliases': {},
+                 'args': [['pathnames', -1, 'dir']],
+                 'commands': {},
+                 'options': {'--db': [1, 'file'], '--help': [0, None]}},
+ 'index list': {'aliases': {}, 'args': [], 'commands': {}, 'options': {'--db': [1, 'file'], '--help': [0, None]}},
+ 'index query': {'aliases': {},
+                 'args': [],
+                 'commands': {},
+                 'options': {'--attribute': [1, None],
+                             '--db': [1, 'file'],
+                             '--details': [0, None],
+                             '--files': [0, None],
+                             '--help': [0, None],
+                             '--keyword': [1, None],
+                             '--label': [1, None],
+                             '--tag': [1, None],
+                             '--under': [1, 'file'],
+                             '--volume': [1, None]}},
+ 'index refresh': {'aliases': {},
+                   'args': [['pathnames', -1, 'dir']],
+                   'commands': {},
+                   'options': {'--db': [1, 'file'], '--help': [0, None]}},
+ 'keep-on-site': {'aliases': {'avail': 'available', 'del': 'delete'},
+                  'args': [],
+                  'commands': {'add': 'add a GNS site keep-on rule',
+                               'available': 'List sites names participating in this share',
+                               'delete': 'remove a GNS site keep-on rule',
+                               'has': 'Is there already a keep-on rule for the specified GNS site?',
+                               'list': 'list GNS sites with keep-on rules'},
+                  'options': {'--help': [0, None]}},
+ 'keep-on-site add': {'aliases': {},
+                      'args': [['name', 1, 'sites'], ['pathnames', -1, 'file']],
+                      'commands': {},
+                      'options': {'--check-exists': [0, None],
+                                  '--files-from': [1, None],
+                                  '--help': [0, None],
+                                  '--nonfiles': [0, None],
+                                  '--null': [0, None],
+                                  '--recursive': [0, None],
+                                  '-0': [0, None],
+                                  '-r': [0, None]}},
+ 'keep-on-site available': {'aliases': {},
+                            'args': [['pathnames', -1, 'dir']],
+                            'commands': {},
+                            'options': {'--help': [0, None], '--refresh': [0, None]}},
+ 'keep-on-site delete': {'aliases': {},
+                         'args': [['name', 1, 'sites'], ['pathnames', -1, 'file']],
+                         'commands': {},
+                         'options': {'--check-exists': [0, None],
+                                     '--files-from': [1, None],
+                                     '--force': [0, None],
+                                     '--help': [0, None],
+                                     '--nonfiles': [0, None],
+                                     '--null': [0, None],
+                                     '--recursive': [0, None],
+                                     '-0': [0, None],
+                                     '-r': [0, None]}},
+ 'keep-on-site has': {'aliases': {},
+                      'args': [['name', 1, 'sites'], ['pathnames', -1, 'file']],
+                      'commands': {},
+                      'options': {'--check-exists': [0, None],
+                                  '--compact': [0, None],
+                                  '--files-from': [1, None],
+                                  '--help': [0, None],
+                                  '--inherited': [0, None],
+                                  '--local': [0, None],
+                                  '--nonfiles': [0, None],
+                                  '--null': [0, None],
+                                  '--object': [0, None],
+                                  '--raw': [0, None],
+                                  '--recursive': [0, None],
+                                  '-0': [0, None],
+                                  '-h': [0, None],
+                                  '-l': [0, None],
+                                  '-o': [0, None],
+                                  '-r': [0, None]}},
+ 'keep-on-site list': {'aliases': {},
+                       'args': [['pathnames', -1, 'file']],
+                       'commands': {},
+                       'options': {'--check-exists': [0, None],
+                                   '--compact': [0, None],
+                                   '--files-from': [1, None],
+                                   '--help': [0, None],
+                                   '--inherited': [0, None],
+                                   '--local': [0, None],
+                                   '--nonfiles': [0, None],
+                                   '--null': [0, None],
+                                   '--object': [0, None],
+                                   '--raw': [0, None],
+                                   '--recursive': [0, None],
+                                   '-0': [0, None],
+                                   '-h': [0, None],
+                                   '-l': [0, None],
+                                   '-o': [0, None],
+                                   '-r': [0, None]}},
+ 'keyword': {'aliases': {'del': 'delete'},
+             'args': [],
+             'commands': {'add': 'add a keyword to inode(s)',
+                          'delete': 'remove keywords from inode(s)',
+                          'has': 'Is the keyword assigned to the file',
+                          'list': 'list all keywords applied'},
+             'options': {'--help': [0, None]}},
+ 'keyword add': {'aliases': {},
+                 'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                 'commands': {},
+                 'options': {'--check-exists': [0, None],
+                             '--files-from': [1, None],
+                             '--help': [0, None],
+                             '--nonfiles': [0, None],
+                             '--null': [0, None],
+                             '--recursive': [0, None],
+                             '-0': [0, None],
+                             '-r': [0, None]}},
+ 'keyword delete': {'aliases': {},
+                    'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                    'commands': {},
+                    'options': {'--check-exists': [0, None],
+                                '--files-from': [1, None],
+                                '--force': [0, None],
+                                '--help': [0, None],
+                                '--nonfiles': [0, None],
+                                '--null': [0, None],
+                                '--recursive': [0, None],
+                                '-0': [0, None],
+                                '-r': [0, None]}},
+ 'keyword has': {'aliases': {},
+                 'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                 'commands': {},
+                 'options': {'--check-exists': [0, None],
+                             '--compact': [0, None],
+                             '--files-from': [1, None],
+                             '--help': [0, None],
+                             '--inherited': [0, None],
+                             '--local': [0, None],
+                             '--nonfiles': [0, None],
+                             '--null': [0, None],
+                             '--object': [0, None],
+                             '--raw': [0, None],
+                             '--recursive': [0, None],
+                             '-0': [0, None],
+                             '-h': [0, None],
+                             '-l': [0, None],
+                             '-o': [0, None],
+                             '-r': [0, None]}},
+ 'keyword list': {'aliases': {},
+                  'args': [['pathnames', -1, 'file']],
+                  'commands': {},
+                  'options': {'--check-exists': [0, None],
+                              '--compact': [0, None],
+                              '--files-from': [1, None],
+                              '--help': [0, None],
+                              '--inherited': [0, None],
+                              '--local': [0, None],
+                              '--nonfiles': [0, None],
+                              '--null': [0, None],
+                              '--object': [0, None],
+                              '--raw': [0, None],
+                              '--recursive': [0, None],
+                              '-0': [0, None],
+                              '-h': [0, None],
+                              '-l': [0, None],
+                              '-o': [0, None],
+                              '-r': [0, None]}},
+ 'label': {'aliases': {'del': 'delete'},
+           'args': [],
+           'commands': {'add': 'add a label to inode(s)',
+                        'delete': 'remove labels from inode(s)',
+                        'has': 'Is the label assigned to the file',
+                        'list': 'list all labels applied'},
+           'options': {'--help': [0, None]}},
+ 'label add': {'aliases': {},
+               'args': [['name', 1, None], ['pathnames', -1, 'file']],
+               'commands': {},
+               'options': {'--check-exists': [0, None],
+                           '--files-from': [1, None],
+                           '--help': [0, None],
+                           '--nonfiles': [0, None],
+                           '--null': [0, None],
+                           '--recursive': [0, None],
+                           '-0': [0, None],
+                           '-r': [0, None]}},
+ 'label delete': {'aliases': {},
+                  'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                  'commands': {},
+                  'options': {'--check-exists': [0, None],
+                              '--files-from': [1, None],
+                              '--force': [0, None],
+                              '--help': [0, None],
+                              '--nonfiles': [0, None],
+                              '--null': [0, None],
+                              '--recursive': [0, None],
+                              '-0': [0, None],
+                              '-r': [0, None]}},
+ 'label has': {'aliases': {},
+               'args': [['name', 1, None], ['pathnames', -1, 'file']],
+               'commands': {},
+               'options': {'--check-exists': [0, None],
+                           '--compact': [0, None],
+                           '--files-from': [1, None],
+                           '--help': [0, None],
+                           '--inherited': [0, None],
+                           '--local': [0, None],
+                           '--nonfiles': [0, None],
+                           '--null': [0, None],
+                           '--object': [0, None],
+                           '--raw': [0, None],
+                           '--recursive': [0, None],
+                           '-0': [0, None],
+                           '-h': [0, None],
+                           '-l': [0, None],
+                           '-o': [0, None],
+                           '-r': [0, None]}},
+ 'label list': {'aliases': {},
+                'args': [['pathnames', -1, 'file']],
+                'commands': {},
+                'options': {'--check-exists': [0, None],
+                            '--compact': [0, None],
+                            '--files-from': [1, None],
+                            '--help': [0, None],
+                            '--inherited': [0, None],
+                            '--local': [0, None],
+                            '--nonfiles': [0, None],
+                            '--null': [0, None],
+                            '--object': [0, None],
+                            '--raw': [0, None],
+                            '--recursive': [0, None],
+                            '-0': [0, None],
+                            '-h': [0, None],
+                            '-l': [0, None],
+                            '-o': [0, None],
+                            '-r': [0, None]}},
+ 'objective': {'aliases': {'del': 'delete'},
+               'args': [],
+               'commands': {'add': 'Add (objective,expression) pair to inode(s)',
+                            'delete': 'remove (objective,expression) pair from inode(s)',
+                            'has': 'Get/list objective assignments',
+                            'list': 'list all (objective,expression) pairs assigned'},
+               'options': {'--help': [0, None]}},
+ 'objective add': {'aliases': {},
+                   'args': [['name', 1, 'objectives'], ['pathnames', -1, 'file']],
+                   'commands': {},
+                   'options': {'--check-exists': [0, None],
+                               '--exp': [1, None],
+                               '--exp-stdin': [0, None],
+                               '--files-from': [1, None],
+                               '--help': [0, None],
+                               '--json': [0, None],
+                               '--nonfiles': [0, None],
+                               '--null': [0, None],
+                               '--recursive': [0, None],
+                               '--string': [0, None],
+                               '-0': [0, None],
+                               '-e': [1, None],
+                               '-i': [0, None],
+                               '-j': [0, None],
+                               '-r': [0, None],
+                               '-s': [0, None]}},
+ 'objective delete': {'aliases': {},
+                      'args': [['name', 1, 'objectives'], ['pathnames', -1, 'file']],
+                      'commands': {},
+                      'options': {'--check-exists': [0, None],
+                                  '--exp': [1, None],
+                                  '--exp-stdin': [0, None],
+                                  '--files-from': [1, None],
+                                  '--force': [0, None],
+                                  '--help': [0, None],
+                                  '--json': [0, None],
+                                  '--nonfiles': [0, None],
+                                  '--null': [0, None],
+                                  '--recursive': [0, None],
+                                  '--string': [0, None],
+                                  '-0': [0, None],
+                                  '-e': [1, None],
+                                  '-i': [0, None],
+                                  '-j': [0, None],
+                                  '-r': [0, None],
+                                  '-s': [0, None]}},
+ 'objective has': {'aliases': {},
+                   'args': [['name', 1, 'objectives'], ['pathnames', -1, 'file']],
+                   'commands': {},
+                   'options': {'--active': [0, None],
+                               '--check-exists': [0, None],
+                               '--compact': [0, None],
+                               '--effective': [0, None],
+                               '--exp': [1, None],
+                               '--exp-stdin': [0, None],
+                               '--files-from': [1, None],
+                               '--help': [0, None],
+                               '--inherited': [0, None],
+                               '--json': [0, None],
+                               '--local': [0, None],
+                               '--nonfiles': [0, None],
+                               '--null': [0, None],
+                               '--raw': [0, None],
+                               '--recursive': [0, None],
+                               '--share': [0, None],
+                               '--string': [0, None],
+                               '-0': [0, None],
+                               '-a': [0, None],
+                               '-e': [1, None],
+                               '-h': [0, None],
+                               '-i': [0, None],
+                               '-j': [0, None],
+                               '-l': [0, None],
+                               '-r': [0, None],
+                               '-s': [0, None]}},
+ 'objective list': {'aliases': {},
+                    'args': [['pathnames', -1, 'file']],
+                    'commands': {},
+                    'options': {'--active': [0, None],
+                                '--check-exists': [0, None],
+                                '--compact': [0, None],
+                                '--effective': [0, None],
+                                '--files-from': [1, None],
+                                '--help': [0, None],
+                                '--inherited': [0, None],
+                                '--local': [0, None],
+                                '--nonfiles': [0, None],
+                                '--null': [0, None],
+                                '--raw': [0, None],
+                                '--recursive': [0, None],
+                                '--share': [0, None],
+                                '-0': [0, None],
+                                '-a': [0, None],
+                                '-h': [0, None],
+                                '-l': [0, None],
+                                '-r': [0, None]}},
+ 'perf': {'aliases': {},
+          'args': [],
+          'commands': {'clear': 'Clear op/perf counters on share(s)',
+                       'flushes': 'Counter for flush transactions by share(s)',
+                       'record': 'Keep samples of op counters every interval in a local...',
+                       'report': 'Per op rates and latency histograms over a window of perf...',
+                       'top_calls': 'Show filesystem calls consuming the most time on share(s)',
+                       'top_funcs': 'Top time consuming functions on share(s)',
+                       'top_ops': 'Show filesystem ops consuming the most time by share(s)',
+                       'watch': 'Sample op counters every interval and show per op rates...'},
+          'options': {'--help': [0, None]}},
+ 'perf clear': {'aliases': {}, 'args': [['pathnames', -1, 'dir']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'perf flushes': {'aliases': {}, 'args': [['pathnames', -1, 'dir']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'perf record': {'aliases': {},
+                 'args': [['pathnames', -1, 'dir']],
+                 'commands': {},
+                 'options': {'--coarse': [1, None],
+                             '--count': [1, None],
+                             '--help': [0, None],
+                             '--interval': [1, None],
+                             '--max-size': [1, None],
+                             '--store': [1, 'dir']}},
+ 'perf report': {'aliases': {},
+                 'args': [['pathnames', -1, 'dir']],
+                 'commands': {},
+                 'options': {'--help': [0, None],
+                             '--since': [1, None],
+                             '--store': [1, 'dir'],
+                             '--top': [1, None],
+                             '--until': [1, None]}},
+ 'perf top_calls': {'aliases': {},
+                    'args': [['pathnames', -1, 'dir']],
+                    'commands': {},
+                    'options': {'--help': [0, None]}},
+ 'perf top_funcs': {'aliases': {},
+                    'args': [['pathnames', -1, 'dir']],
+                    'commands': {},
+                    'options': {'--help': [0, None], '--op': [1, None]}},
+ 'perf top_ops': {'aliases': {}, 'args': [['pathnames', -1, 'dir']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'perf watch': {'aliases': {},
+                'args': [['pathnames', -1, 'dir']],
+                'commands': {},
+                'options': {'--count': [1, None],
+                            '--help': [0, None],
+                            '--history': [1, None],
+                            '--interval': [1, None],
+                            '--top': [1, None]}},
+ 'rekognition-tag': {'aliases': {'del': 'delete'},
+                     'args': [],
+                     'commands': {'add': 'Add/Set value of rekognition tag on inode(s)',
+                                  'delete': 'remove rekognition tag values from inode(s)',
+                                  'get': "Get the rekognition tag's value",
+                                  'has': "Is the inode's rekognition tag value non-empty",
+                                  'list': 'list all rekognition tags and values applied',
+                                  'set': 'Add/Set value of rekognition tag on inode(s)'},
+                     'options': {'--help': [0, None]}},
+ 'rekognition-tag add': {'aliases': {},
+                         'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                         'commands': {},
+                         'options': {'--check-exists': [0, None],
+                                     '--exp': [1, None],
+                                     '--exp-stdin': [0, None],
+                                     '--files-from': [1, None],
+                                     '--help': [0, None],
+                                     '--json': [0, None],
+                                     '--nonfiles': [0, None],
+                                     '--null': [0, None],
+                                     '--recursive': [0, None],
+                                     '--string': [0, None],
+                                     '-0': [0, None],
+                                     '-e': [1, None],
+                                     '-i': [0, None],
+                                     '-j': [0, None],
+                                     '-r': [0, None],
+                                     '-s': [0, None]}},
+ 'rekognition-tag delete': {'aliases': {},
+                            'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                            'commands': {},
+                            'options': {'--check-exists': [0, None],
+                                        '--files-from': [1, None],
+                                        '--force': [0, None],
+                                        '--help': [0, None],
+                                        '--nonfiles': [0, None],
+                                        '--null': [0, None],
+                                        '--recursive': [0, None],
+                                        '-0': [0, None],
+                                        '-r': [0, None]}},
+ 'rekognition-tag get': {'aliases': {},
+                         'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                         'commands': {},
+                         'options': {'--check-exists': [0, None],
+                                     '--compact': [0, None],
+                                     '--files-from': [1, None],
+                                     '--help': [0, None],
+                                     '--inherited': [0, None],
+                                     '--local': [0, None],
+                                     '--nonfiles': [0, None],
+                                     '--null': [0, None],
+                                     '--object': [0, None],
+                                     '--raw': [0, None],
+                                     '--recursive': [0, None],
+                                     '--unbound': [0, None],
+                                     '-0': [0, None],
+                                     '-h': [0, None],
+                                     '-l': [0, None],
+                                     '-o': [0, None],
+                                     '-r': [0, None],
+                                     '-u': [0, None]}},
+ 'rekognition-tag has': {'aliases': {},
+                         'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                         'commands': {},
+                         'options': {'--check-exists': [0, None],
+                                     '--compact': [0, None],
+                                     '--files-from': [1, None],
+                                     '--help': [0, None],
+                                     '--inherited': [0, None],
+                                     '--local': [0, None],
+                                     '--nonfiles': [0, None],
+                                     '--null': [0, None],
+                                     '--object': [0, None],
+                                     '--raw': [0, None],
+                                     '--recursive': [0, None],
+                                     '-0': [0, None],
+                                     '-h': [0, None],
+                                     '-l': [0, None],
+                                     '-o': [0, None],
+                                     '-r': [0, None]}},
+ 'rekognition-tag list': {'aliases': {},
+                          'args': [['pathnames', -1, 'file']],
+                          'commands': {},
+                          'options': {'--check-exists': [0, None],
+                                      '--compact': [0, None],
+                                      '--files-from': [1, None],
+                                      '--help': [0, None],
+                                      '--inherited': [0, None],
+                                      '--local': [0, None],
+                                      '--nonfiles': [0, None],
+                                      '--null': [0, None],
+                                      '--object': [0, None],
+                                      '--raw': [0, None],
+                                      '--recursive': [0, None],
+                                      '-0': [0, None],
+                                      '-h': [0, None],
+                                      '-l': [0, None],
+                                      '-o': [0, None],
+                                      '-r': [0, None]}},
+ 'rekognition-tag set': {'aliases': {},
+                         'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                         'commands': {},
+                         'options': {'--check-exists': [0, None],
+                                     '--exp': [1, None],
+                                     '--exp-stdin': [0, None],
+                                     '--files-from': [1, None],
+                                     '--help': [0, None],
+                                     '--json': [0, None],
+                                     '--nonfiles': [0, None],
+                                     '--null': [0, None],
+                                     '--recursive': [0, None],
+                                     '--string': [0, None],
+                                     '-0': [0, None],
+                                     '-e': [1, None],
+                                     '-i': [0, None],
+                                     '-j': [0, None],
+                                     '-r': [0, None],
+                                     '-s': [0, None]}},
+ 'rm': {'aliases': {},
+        'args': [['pathnames', -1, 'file']],
+        'commands': {},
+        'options': {'--dir': [0, None],
+                    '--force': [0, None],
+                    '--help': [0, None],
+                    '--interactive': [1, None],
+                    '--no-preserve-root': [0, None],
+                    '--one-file-system': [0, None],
+                    '--preserve-root': [0, None],
+                    '--recursive': [0, None],
+                    '--verbose': [0, None],
+                    '-I': [0, None],
+                    '-R': [0, None],
+                    '-d': [0, None],
+                    '-f': [0, None],
+                    '-i': [0, None],
+                    '-r': [0, None],
+                    '-v': [0, None]}},
+ 'rsync': {'aliases': {},
+           'args': [['src', 1, 'file'], ['dest', 1, 'file']],
+           'commands': {},
+           'options': {'--archive': [0, None],
+                       '--delete': [0, None],
+                       '--help': [0, None],
+                       '--pairs-from': [1, 'file'],
+                       '-a': [0, None]}},
+ 'serve': {'aliases': {}, 'args': [], 'commands': {}, 'options': {'--help': [0, None], '--socket': [1, None]}},
+ 'status': {'aliases': {'assim': 'assimilation'},
+            'args': [],
+            'commands': {'assimilation': 'State of current assimilations',
+                         'collections': 'Collections present in the share',
+                         'csi': 'Details about the kubernetes CSI',
+                         'errors': 'Files in the share with errors',
+                         'open': 'Files open each dir(s)',
+                         'replication': 'Replication progress for the share(s)',
+                         'sweeper': 'Progress of sweeper (checks file placement) for each...',
+                         'volume': 'Health of volumes backing the share(s)'},
+            'options': {'--help': [0, None]}},
+ 'status assimilation': {'aliases': {},
+                         'args': [['pathnames', -1, 'dir']],
+                         'commands': {},
+                         'options': {'--help': [0, None]}},
+ 'status collections': {'aliases': {},
+                        'args': [['pathnames', -1, 'dir']],
+                        'commands': {},
+                        'options': {'--help': [0, None]}},
+ 'status csi': {'aliases': {}, 'args': [['pathnames', -1, 'dir']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'status errors': {'aliases': {},
+                   'args': [['pathnames', -1, 'dir']],
+                   'commands': {},
+                   'options': {'--dump': [0, None], '--help': [0, None]}},
+ 'status open': {'aliases': {}, 'args': [['pathnames', -1, 'dir']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'status replication': {'aliases': {},
+                        'args': [['pathnames', -1, 'dir']],
+                        'commands': {},
+                        'options': {'--help': [0, None]}},
+ 'status sweeper': {'aliases': {},
+                    'args': [['pathnames', -1, 'dir']],
+                    'commands': {},
+                    'options': {'--help': [0, None]}},
+ 'status volume': {'aliases': {}, 'args': [['pathnames', -1, 'dir']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'sum': {'aliases': {},
+         'args': [['pathnames', -1, 'file']],
+         'commands': {},
+         'options': {'--check-exists': [0, None],
+                     '--compact': [0, None],
+                     '--exp': [1, None],
+                     '--exp-stdin': [0, None],
+                     '--fan-out': [1, None],
+                     '--files-from': [1, None],
+                     '--help': [0, None],
+                     '--json': [0, None],
+                     '--nonfiles': [0, None],
+                     '--null': [0, None],
+                     '--raw': [0, None],
+                     '--string': [0, None],
+                     '-0': [0, None],
+                     '-e': [1, None],
+                     '-i': [0, None],
+                     '-j': [0, None],
+                     '-s': [0, None]}},
+ 'tag': {'aliases': {'del': 'delete'},
+         'args': [],
+         'commands': {'add': 'Add/Set value of tag on inode(s)',
+                      'delete': 'remove tag values from inode(s)',
+                      'get': "Get the tag's value",
+                      'has': "Is the inode's tag value non-empty",
+                      'list': 'list all tags and values applied',
+                      'set': 'Add/Set value of tag on inode(s)'},
+         'options': {'--help': [0, None]}},
+ 'tag add': {'aliases': {},
+             'args': [['name', 1, None], ['pathnames', -1, 'file']],
+             'commands': {},
+             'options': {'--check-exists': [0, None],
+                         '--exp': [1, None],
+                         '--exp-stdin': [0, None],
+                         '--files-from': [1, None],
+                         '--help': [0, None],
+                         '--json': [0, None],
+                         '--nonfiles': [0, None],
+                         '--null': [0, None],
+                         '--recursive': [0, None],
+                         '--string': [0, None],
+                         '-0': [0, None],
+                         '-e': [1, None],
+                         '-i': [0, None],
+                         '-j': [0, None],
+                         '-r': [0, None],
+                         '-s': [0, None]}},
+ 'tag delete': {'aliases': {},
+                'args': [['name', 1, None], ['pathnames', -1, 'file']],
+                'commands': {},
+                'options': {'--check-exists': [0, None],
+                            '--files-from': [1, None],
+                            '--force': [0, None],
+                            '--help': [0, None],
+                            '--nonfiles': [0, None],
+                            '--null': [0, None],
+                            '--recursive': [0, None],
+                            '-0': [0, None],
+                            '-r': [0, None]}},
+ 'tag get': {'aliases': {},
+             'args': [['name', 1, None], ['pathnames', -1, 'file']],
+             'commands': {},
+             'options': {'--check-exists': [0, None],
+                         '--compact': [0, None],
+                         '--files-from': [1, None],
+                         '--help': [0, None],
+                         '--inherited': [0, None],
+                         '--local': [0, None],
+                         '--nonfiles': [0, None],
+                         '--null': [0, None],
+                         '--object': [0, None],
+                         '--raw': [0, None],
+                         '--recursive': [0, None],
+                         '--unbound': [0, None],
+                         '-0': [0, None],
+                         '-h': [0, None],
+                         '-l': [0, None],
+                         '-o': [0, None],
+                         '-r': [0, None],
+                         '-u': [0, None]}},
+ 'tag has': {'aliases': {},
+             'args': [['name', 1, None], ['pathnames', -1, 'file']],
+             'commands': {},
+             'options': {'--check-exists': [0, None],
+                         '--compact': [0, None],
+                         '--files-from': [1, None],
+                         '--help': [0, None],
+                         '--inherited': [0, None],
+                         '--local': [0, None],
+                         '--nonfiles': [0, None],
+                         '--null': [0, None],
+                         '--object': [0, None],
+                         '--raw': [0, None],
+                         '--recursive': [0, None],
+                         '-0': [0, None],
+                         '-h': [0, None],
+                         '-l': [0, None],
+                         '-o': [0, None],
+                         '-r': [0, None]}},
+ 'tag list': {'aliases': {},
+              'args': [['pathnames', -1, 'file']],
+              'commands': {},
+              'options': {'--check-exists': [0, None],
+                          '--compact': [0, None],
+                          '--files-from': [1, None],
+                          '--help': [0, None],
+                          '--inherited': [0, None],
+                          '--local': [0, None],
+                          '--nonfiles': [0, None],
+                          '--null': [0, None],
+                          '--object': [0, None],
+                          '--raw': [0, None],
+                          '--recursive': [0, None],
+                          '-0': [0, None],
+                          '-h': [0, None],
+                          '-l': [0, None],
+                          '-o': [0, None],
+                          '-r': [0, None]}},
+ 'tag set': {'aliases': {},
+             'args': [['name', 1, None], ['pathnames', -1, 'file']],
+             'commands': {},
+             'options': {'--check-exists': [0, None],
+                         '--exp': [1, None],
+                         '--exp-stdin': [0, None],
+                         '--files-from': [1, None],
+                         '--help': [0, None],
+                         '--json': [0, None],
+                         '--nonfiles': [0, None],
+                         '--null': [0, None],
+                         '--recursive': [0, None],
+                         '--string': [0, None],
+                         '-0': [0, None],
+                         '-e': [1, None],
+                         '-i': [0, None],
+                         '-j': [0, None],
+                         '-r': [0, None],
+                         '-s': [0, None]}},
+ 'usage': {'aliases': {'align': 'alignment'},
+           'args': [],
+           'commands': {'alignment': 'Alignment state of files each file(s) of files in dir(s)',
+                        'dirs': 'Number of subdirectories under specified directory(ies),...',
+                        'mime_tags': 'All tags added by mime discovery on dir(s)',
+                        'objectives': 'Objectives applied and capacity managed by dir(s)',
+                        'online': 'Summary of files on NAS volumes in the dir',
+                        'owner': 'Owner state of files each file(s) of files in dir(s)',
+                        'rekognition_tags': 'All tags added by Rekognition on dir(s)',
+                        'user': 'Users consuming the most capacity in each dir(s)',
+                        'virus-scan': 'Virus scan state of files each file(s) of files in dir(s)',
+                        'volume': 'Usage for each volume backing each dir(s)'},
+           'options': {'--help': [0, None]}},
+ 'usage alignment': {'aliases': {},
+                     'args': [['pathnames', -1, 'file']],
+                     'commands': {},
+                     'options': {'--help': [0, None], '--top-files': [0, None]}},
+ 'usage dirs': {'aliases': {}, 'args': [['pathnames', -1, 'dir']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'usage mime_tags': {'aliases': {},
+                     'args': [['pathnames', -1, 'dir']],
+                     'commands': {},
+                     'options': {'--help': [0, None]}},
+ 'usage objectives': {'aliases': {},
+                      'args': [['pathnames', -1, 'dir']],
+                      'commands': {},
+                      'options': {'--help': [0, None]}},
+ 'usage online': {'aliases': {}, 'args': [['pathnames', -1, 'dir']], 'commands': {}, 'options': {'--help': [0, None]}},
+ 'usage owner': {'aliases': {},
+                 'args': [['pathnames', -1, 'file']],
+                 'commands': {},
+                 'options': {'--help': [0, None], '--top-files': [0, None]}},
+ 'usage rekognition_tags': {'aliases': {},
+                            'args': [['pathnames', -1, 'dir']],
+                            'commands': {},
+                            'options': {'--help': [0, None]}},
+ 'usage user': {'aliases': {},
+                'args': [['pathnames', -1, 'dir']],
+                'commands': {},
+                'options': {'--details': [0, None], '--help': [0, None]}},
+ 'usage virus-scan': {'aliases': {},
+                      'args': [['pathnames', -1, 'file']],
+                      'commands': {},
+                      'options': {'--help': [0, None], '--top-files': [0, None]}},
+ 'usage volume': {'aliases': {},
+                  'args': [['pathnames', -1, 'file']],
+                  'commands': {},
+                  'options': {'--deep': [0, None], '--help': [0, None], '--top-files': [0, None]}},
+ 'wait': {'aliases': {},
+          'args': [['pathnames', -1, 'dir']],
+          'commands': {},
+          'options': {'--help': [0, None], '--timeout': [1, None]}}}
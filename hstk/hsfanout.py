@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Client side fan-out of recursive commands over the subtrees of a directory
+
+A recursive eval or sum on a share root is one walk on the metadata server.
+subtrees() lists the top levels of the tree locally so the recursive
+command can be sent for each subtree on its own and run concurrently, the
+files above the fan-out depth are sent on their own too.  Between them they
+cover every file under the root once.
+
+eval results are simply concatenated in subtree order.  sum results are
+combined with SumMerger: numbers are added, objects are merged key by key,
+and rows of a <NAME>_TABLE are matched up on all of their fields but the
+summed ones (SUMMED_FIELDS), which are added, so per subtree 1FILE and
+SUMS_TABLE counts
+add up to the counts for the whole tree.  That only holds for counts and
+sums, check_additive() refuses expressions using MAX, MIN, averages, TOP
+tables or histograms, whose per subtree results can't be added up.
+"""
+
+import json
+import os
+import re
+
+# Aggregates whose per subtree results don't add up to the whole tree's
+_NON_ADDITIVE_RE = re.compile(r'\b(MAX|MIN|AVG|AVERAGE|MEAN|MEDIAN|TOP\w*|\w*HISTOGRAM\w*)\b', re.IGNORECASE)
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+# Columns of table rows that are counts or sums, every other column, numbers
+# like an OWNER uid KEY included, says which row it is
+SUMMED_FIELDS = frozenset(('VALUE', 'COUNT', '1FILE', 'SPACE_USED'))
+
+
+def subtrees(path, depth):
+    """
+    The paths to send a recursive command for in place of path: the
+    directories depth levels below path and the files above them, sorted
+    by name level by level.  Symlinks are not followed.  A path that is not
+    a directory is its own only subtree.
+    """
+    if depth < 1 or not os.path.isdir(path) or os.path.islink(path):
+        return [ path ]
+    ret = []
+    for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+        if entry.name.startswith('.fs_command_gateway'):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            ret.extend(subtrees(entry.path, depth - 1))
+        else:
+            ret.append(entry.path)
+    return ret
+
+
+def check_additive(exp):
+    """ Raise ValueError if the sum expression exp can't be fanned out """
+    match = _NON_ADDITIVE_RE.search(_STRING_RE.sub('""', exp or ''))
+    if match is not None:
+        raise ValueError('%s results of subtrees can not be combined, only counts and sums can be fanned out'
+                % (match.group(1).upper()))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def merge_values(a, b):
+    """ Combine two sum results, see the module docstring """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if _is_number(a) and _is_number(b):
+        return a + b
+    if isinstance(a, dict) and isinstance(b, dict):
+        ret = dict(a)
+        for key, value in b.items():
+            ret[key] = merge_values(ret.get(key), value)
+        return ret
+    if a == b:
+        return a
+    raise ValueError('cannot combine sum results %r and %r' % (a, b))
+
+
+def _row_key(row):
+    if not isinstance(row, dict):
+        return json.dumps(row, sort_keys=True)
+    return json.dumps({ key: value for key, value in row.items() if key.upper() not in SUMMED_FIELDS }, sort_keys=True)
+
+
+def _merge_rows(a, b):
+    """ Two table rows with the same _row_key(), only SUMMED_FIELDS are added """
+    if a is None or not isinstance(a, dict) or not isinstance(b, dict):
+        return merge_values(a, b)
+    ret = dict(a)
+    for key, value in b.items():
+        if key.upper() in SUMMED_FIELDS:
+            ret[key] = merge_values(ret.get(key), value)
+    return ret
+
+
+class SumMerger(object):
+    """
+    Accumulate sum JSON results from hstk.hsjson.iter_json_records() with
+    with_table=True, one add() per (table, record)
+    """
+
+    def __init__(self):
+        self.value = None
+        self.tables = {}
+
+    def add(self, table, record):
+        if table is None:
+            self.value = merge_values(self.value, record)
+            return
+        rows = self.tables.setdefault(table, {})
+        key = _row_key(record)
+        rows[key] = _merge_rows(rows.get(key), record)
+
+    def results(self):
+        """ The combined results, in the same shapes they came back in """
+        ret = []
+        if self.value is not None:
+            ret.append(self.value)
+        for table, rows in self.tables.items():
+            ret.append({table: list(rows.values())})
+        return ret
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Transports used to move hammerscript commands through a .fs_command_gateway file
+
+A transport hands out file like objects for the two halves of a gateway
+round trip.  The command is written to the object returned by open_write()
+and the write is completed by its close(), then the results are read back
+from the object returned by open_read().
+
+The cluster simulator lives in hstk.hssim, it is only imported when used.
+"""
+
+import io
+
+
+class GatewayTransport(object):
+    """ Base class, see the module docstring """
+
+    def open_write(self, gw):
+        raise NotImplementedError()
+
+    def open_read(self, gw):
+        raise NotImplementedError()
+
+
+class FileGateway(GatewayTransport):
+    """ The real thing, a shadow file on a Hammerspace share """
+
+    def open_write(self, gw):
+        return gw.open('wb')
+
+    def open_read(self, gw):
+        return gw.open('r')
+
+
+class DryRunGateway(GatewayTransport):
+    """ Don't touch the filesystem, always answer 'dry run output' """
+
+    def open_write(self, gw):
+        return io.BytesIO()
+
+    def open_read(self, gw):
+        return io.StringIO('dry run output')
+
+
+def gateway_from_spec(spec):
+    """
+    Build a transport from a --gateway specification string
+        file
+        sim[:latency=SECONDS][,payload=BYTES][,root=DIR][,export=PATH]
+    """
+    kind, _, opts = spec.partition(':')
+    if kind == 'file':
+        if opts:
+            raise ValueError('file gateway takes no options')
+        return FileGateway()
+    if kind == 'sim':
+        import hstk.hssim as hssim
+        kwargs = {}
+        for opt in opts.split(','):
+            if not opt:
+                continue
+            key, sep, val = opt.partition('=')
+            if not sep or key not in ('latency', 'payload', 'root', 'export'):
+                raise ValueError(f'unknown sim gateway option: {opt}')
+            kwargs[key] = val
+        try:
+            return hssim.SimGateway(**kwargs)
+        except ValueError as e:
+            raise ValueError(f'bad sim gateway option value: {e}')
+    raise ValueError(f'unknown gateway type: {kind}')
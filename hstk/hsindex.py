@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local SQLite index of share metadata, used by the 'hs index' commands
+
+The index is filled from the records of a recursive DUMP_INODE eval in JSON
+form, one record per inode, and then answers lookups by tag, attribute,
+keyword, label and volume without going back to the metadata server.
+
+A change marker is kept for every directory, built from the fields of its
+own DUMP_INODE record that change when entries are added, removed or
+renamed in it (MARKER_FIELDS).  refresh() compares fresh markers with the
+stored ones and only re-dumps the files of changed directories and the
+subtrees of new ones, one recursive dump per changed or new subtree rather
+than one per file.  The files of a changed directory come from a dump of
+the topmost changed directory holding it, so refresh trades round trips
+for records that are read and skipped.  Metadata changes on a file that leave its directory
+alone are not seen by a refresh, only by a full build.
+
+The cluster reports PATH as its own share path, not where the client has
+the share mounted.  The index stores client paths, a PathMap rewrites the
+records on the way in so refresh() can look at the directories and query
+--under works with local paths.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS shares (
+    share TEXT PRIMARY KEY,
+    built REAL,
+    inodes INTEGER
+);
+CREATE TABLE IF NOT EXISTS inodes (
+    id INTEGER PRIMARY KEY,
+    share TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    parent TEXT,
+    inode INTEGER,
+    size INTEGER,
+    mtime REAL,
+    is_dir INTEGER
+);
+CREATE INDEX IF NOT EXISTS inodes_share ON inodes (share);
+CREATE INDEX IF NOT EXISTS inodes_parent ON inodes (parent);
+CREATE TABLE IF NOT EXISTS instances (
+    id INTEGER NOT NULL,
+    volume TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS instances_id ON instances (id);
+CREATE INDEX IF NOT EXISTS instances_volume ON instances (volume);
+CREATE TABLE IF NOT EXISTS metadata (
+    id INTEGER NOT NULL,
+    mdtype TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS metadata_id ON metadata (id);
+CREATE INDEX IF NOT EXISTS metadata_name ON metadata (mdtype, name, value);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    share TEXT NOT NULL,
+    marker TEXT
+);
+CREATE INDEX IF NOT EXISTS dirs_share ON dirs (share);
+"""
+
+# Metadata types kept in the index and the DUMP_INODE fields they come from
+MDTYPE_FIELDS = {
+        'tag': ('TAGS',),
+        'attribute': ('ATTRIBUTES',),
+        'keyword': ('KEYWORDS',),
+        'label': ('LABELS', 'ASSIGNED_LABELS'),
+        'rekognition_tag': ('REKOGNITION_TAGS',),
+}
+
+# Directory DUMP_INODE fields that make up its change marker, when present
+MARKER_FIELDS = ('MODIFY_TIME', 'CHANGE_TIME', 'VERSION', 'SIZE', 'NLINK', 'CHILDREN')
+
+_INSERT_BATCH = 1000
+
+
+def default_index_path():
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'hstk', 'index.sqlite')
+
+
+def _field(rec, *names):
+    for name in names:
+        if name in rec:
+            return rec[name]
+        if name.lower() in rec:
+            return rec[name.lower()]
+    return None
+
+
+def _plain(value):
+    """ Hammerscript string values come back quoted, store them without """
+    if isinstance(value, str):
+        if len(value) > 1 and value[0] == '"' and value[-1] == '"':
+            try:
+                return json.loads(value)
+            except ValueError:
+                pass
+        return value
+    if value is None:
+        return None
+    return json.dumps(value)
+
+
+def _md_items(value):
+    """ {name: value}, [name, ...] or [{NAME:, VALUE:}, ...] -> (name, value) """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    if isinstance(value, dict):
+        return [ (name, _plain(val)) for name, val in value.items() ]
+    ret = []
+    for item in value or []:
+        if isinstance(item, dict):
+            ret.append((_plain(_field(item, 'NAME')), _plain(_field(item, 'VALUE'))))
+        else:
+            ret.append((_plain(item), None))
+    return ret
+
+
+def _volume_name(instance):
+    if isinstance(instance, dict):
+        vol = _field(instance, 'VOLUME', 'STORAGE_VOLUME')
+        if isinstance(vol, dict):
+            vol = _field(vol, 'NAME')
+        return _plain(vol)
+    return _plain(instance)
+
+
+def _raw_record(rec):
+    """ The DUMP_INODE fields of an eval record, see inode_record() """
+    if isinstance(rec, dict) and 'VALUE' in rec and set(rec.keys()) <= set(('PATH', 'VALUE')):
+        value = rec['VALUE']
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return rec
+        if isinstance(value, dict):
+            value = dict(value)
+            if 'PATH' in rec:
+                value.setdefault('PATH', rec['PATH'])
+            return value
+    return rec
+
+
+def dir_marker(rec):
+    """ The change marker of a directory DUMP_INODE record, as a string """
+    rec = _raw_record(rec)
+    return json.dumps([ _field(rec, name) for name in MARKER_FIELDS ])
+
+
+class PathMap(object):
+    """
+    Server side paths under server_root to the client paths under
+    client_root, where the share is mounted.  Paths outside server_root are
+    left alone.
+    """
+
+    def __init__(self, server_root, client_root):
+        self.server_root = server_root.rstrip('/') or '/'
+        self.client_root = client_root.rstrip('/') or '/'
+
+    @classmethod
+    def from_record(cls, rec, client_root):
+        """ Given the DUMP_INODE record of the share root itself """
+        inode = inode_record(rec)
+        if inode is None:
+            return cls(client_root, client_root)
+        return cls(inode['path'], client_root)
+
+    @staticmethod
+    def _move(path, old, new):
+        if path == old:
+            return new
+        prefix = old if old.endswith('/') else old + '/'
+        if path.startswith(prefix):
+            return new.rstrip('/') + '/' + path[len(prefix):]
+        return path
+
+    def to_client(self, path):
+        return self._move(path, self.server_root, self.client_root)
+
+    def to_server(self, path):
+        return self._move(path, self.client_root, self.server_root)
+
+    def records(self, records):
+        """ Raw DUMP_INODE eval records with PATH (and DPATH) rewritten to client paths """
+        for rec in records:
+            rec = _raw_record(rec)
+            if isinstance(rec, dict):
+                rec = dict(rec)
+                for name in ('PATH', 'DPATH', 'path', 'dpath'):
+                    if isinstance(rec.get(name), str):
+                        rec[name] = self.to_client(rec[name])
+            yield rec
+
+
+def _roots(paths):
+    """ The paths that have no ancestor in paths """
+    ret = []
+    for path in sorted(paths):
+        if ret and (path == ret[-1] or path.startswith(ret[-1].rstrip('/') + '/')):
+            continue
+        ret.append(path)
+    return ret
+
+
+def _subtree_where(root, include_root=True):
+    prefix = root.rstrip('/') + '/'
+    where = 'substr(path, 1, ?) = ?'
+    args = [len(prefix), prefix]
+    if include_root:
+        where = '(path = ? OR %s)' % (where)
+        args = [root] + args
+    return where, args
+
+
+def inode_record(rec):
+    """
+    Normalize one record of a DUMP_INODE eval, as {'PATH':, 'VALUE': dump}
+    or the dump itself, returns None if it has no path
+    """
+    rec = _raw_record(rec)
+    if not isinstance(rec, dict):
+        return None
+    path = _field(rec, 'PATH', 'DPATH')
+    if not path:
+        return None
+    path = path.rstrip('/') or '/'
+
+    is_dir = _field(rec, 'IS_DIR')
+    if is_dir is None:
+        mode = _field(rec, 'MODE')
+        if isinstance(mode, str):
+            try:
+                mode = int(mode, 0) if mode.startswith('0o') else int(mode, 8)
+            except ValueError:
+                mode = None
+        is_dir = mode is not None and (mode & 0o170000) == 0o040000
+    elif isinstance(is_dir, str):
+        is_dir = is_dir.upper() == 'TRUE'
+
+    md = []
+    for mdtype, fields in MDTYPE_FIELDS.items():
+        for name, value in _md_items(_field(rec, *fields)):
+            if name is not None:
+                md.append((mdtype, name, value))
+
+    return {
+            'path': path,
+            'parent': os.path.dirname(path),
+            'inode': _field(rec, 'INODE', 'INODE_NUMBER', 'FILEID'),
+            'size': _field(rec, 'SIZE'),
+            'mtime': _field(rec, 'MODIFY_TIME', 'MTIME'),
+            'is_dir': bool(is_dir),
+            'volumes': [ vol for vol in map(_volume_name, _field(rec, 'INSTANCES') or []) if vol ],
+            'metadata': md,
+        }
+
+
+class MetadataIndex(object):
+    """ An index database file, created if it does not exist yet """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = default_index_path()
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.db.execute('INSERT OR IGNORE INTO info (key, value) VALUES (?, ?)', ('schema', str(SCHEMA_VERSION)))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _delete_ids(self, where, args):
+        ids = 'SELECT id FROM inodes WHERE ' + where
+        self.db.execute('DELETE FROM instances WHERE id IN (%s)' % (ids), args)
+        self.db.execute('DELETE FROM metadata WHERE id IN (%s)' % (ids), args)
+        self.db.execute('DELETE FROM inodes WHERE ' + where, args)
+
+    def _insert(self, share, records):
+        count = 0
+        for rec in records:
+            values = (share, rec['parent'], rec['inode'], rec['size'], rec['mtime'], int(rec['is_dir']))
+            row = self.db.execute('SELECT id FROM inodes WHERE path = ?', (rec['path'],)).fetchone()
+            if row is None:
+                cur = self.db.execute(
+                        'INSERT INTO inodes (share, parent, inode, size, mtime, is_dir, path) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        values + (rec['path'],))
+                rowid = cur.lastrowid
+            else:
+                rowid = row[0]
+                self.db.execute('UPDATE inodes SET share = ?, parent = ?, inode = ?, size = ?, mtime = ?, is_dir = ? WHERE id = ?',
+                        values + (rowid,))
+                self.db.execute('DELETE FROM instances WHERE id = ?', (rowid,))
+                self.db.execute('DELETE FROM metadata WHERE id = ?', (rowid,))
+            if rec['volumes']:
+                self.db.executemany('INSERT INTO instances (id, volume) VALUES (?, ?)',
+                        [ (rowid, vol) for vol in rec['volumes'] ])
+            if rec['metadata']:
+                self.db.executemany('INSERT INTO metadata (id, mdtype, name, value) VALUES (?, ?, ?, ?)',
+                        [ (rowid, ) + item for item in rec['metadata'] ])
+            count += 1
+        return count
+
+    def _insert_records(self, share, records, keep=None):
+        """ Index raw DUMP_INODE records, only those keep(inode) is True for if given """
+        count = 0
+        batch = []
+        for rec in records:
+            rec = inode_record(rec)
+            if rec is None or (keep is not None and not keep(rec)):
+                continue
+            batch.append(rec)
+            if len(batch) >= _INSERT_BATCH:
+                count += self._insert(share, batch)
+                batch = []
+        count += self._insert(share, batch)
+        return count
+
+    def _set_dirs(self, share, dir_records):
+        """ Index directory DUMP_INODE records and store their change markers """
+        for rec in dir_records:
+            inode = inode_record(rec)
+            if inode is None:
+                continue
+            inode['is_dir'] = True
+            self._insert(share, [inode])
+            self.db.execute('INSERT OR REPLACE INTO dirs (path, share, marker) VALUES (?, ?, ?)',
+                    (inode['path'], share, dir_marker(rec)))
+
+    def _update_share(self, share):
+        count = self.db.execute('SELECT COUNT(*) FROM inodes WHERE share = ?', (share,)).fetchone()[0]
+        self.db.execute('INSERT OR REPLACE INTO shares (share, built, inodes) VALUES (?, ?, ?)',
+                (share, time.time(), count))
+        return count
+
+    def build(self, share, records, dir_records=()):
+        """
+        Replace everything indexed for share with records, raw DUMP_INODE
+        eval records, in one transaction.  dir_records are the DUMP_INODE
+        records of share and all directories below it, for refresh().
+        Returns the number of inodes indexed
+        """
+        share = share.rstrip('/') or '/'
+        with self.db:
+            self._delete_ids('share = ?', (share,))
+            self.db.execute('DELETE FROM dirs WHERE share = ?', (share,))
+            self._insert_records(share, records)
+            self._set_dirs(share, dir_records)
+            return self._update_share(share)
+
+    def markers(self, share):
+        share = share.rstrip('/') or '/'
+        return dict(self.db.execute('SELECT path, marker FROM dirs WHERE share = ?', (share,)))
+
+    def refresh(self, share, dir_records, dump_subtree):
+        """
+        Bring the index for share up to date given fresh DUMP_INODE records
+        of share and all directories below it.  Directories whose change
+        marker moved get their files replaced from dump_subtree() of the
+        topmost changed directories, directories new since the last run get
+        dump_subtree(dir), it returns raw DUMP_INODE eval records of
+        everything under a directory.  Directories that are gone are dropped
+        with everything under them.
+
+        Returns {changed, added, removed, inodes}, or None if share was
+        never built.
+        """
+        share = share.rstrip('/') or '/'
+        old = self.markers(share)
+        if not old:
+            return None
+        new = {}
+        for rec in dir_records:
+            inode = inode_record(rec)
+            if inode is not None:
+                new[inode['path']] = rec
+        changed = sorted(path for path, rec in new.items() if path in old and dir_marker(rec) != old[path])
+        added = _roots(path for path in new if path not in old)
+        removed = _roots(path for path in old if path not in new)
+
+        with self.db:
+            for root in removed:
+                where, args = _subtree_where(root)
+                self._delete_ids(where, args)
+                self.db.execute('DELETE FROM dirs WHERE ' + where, args)
+            for dirpath in changed:
+                self._delete_ids('parent = ? AND is_dir = 0', (dirpath,))
+            changed_dirs = set(changed)
+            for root in _roots(changed):
+                self._insert_records(share, dump_subtree(root),
+                        keep=lambda inode: not inode['is_dir'] and inode['parent'] in changed_dirs)
+            for root in added:
+                where, args = _subtree_where(root, include_root=False)
+                self._delete_ids(where, args)
+                self._insert_records(share, dump_subtree(root))
+            # Only the moved markers are written, an unchanged share costs no writes
+            self._set_dirs(share, [ rec for path, rec in new.items() if path not in old or path in changed ])
+            count = self._update_share(share)
+        return {'changed': changed, 'added': added, 'removed': removed, 'inodes': count}
+
+    def shares(self):
+        return [ {'share': share, 'built': built, 'inodes': inodes}
+                for share, built, inodes in self.db.execute('SELECT share, built, inodes FROM shares ORDER BY share') ]
+
+    def query(self, tags=(), attributes=(), keywords=(), labels=(), volumes=(), under=None, share=None, files_only=False):
+        """
+        Paths matching all of the given conditions, tags and attributes are
+        (name, value) with a value of None matching any value
+        """
+        where = []
+        args = []
+        for mdtype, items in (('tag', tags), ('attribute', attributes)):
+            for name, value in items:
+                cond = 'id IN (SELECT id FROM metadata WHERE mdtype = ? AND name = ?'
+                args += [mdtype, name]
+                if value is not None:
+                    cond += ' AND value = ?'
+                    args.append(value)
+                where.append(cond + ')')
+        for mdtype, names in (('keyword', keywords), ('label', labels)):
+            for name in names:
+                where.append('id IN (SELECT id FROM metadata WHERE mdtype = ? AND name = ?)')
+                args += [mdtype, name]
+        for vol in volumes:
+            where.append('id IN (SELECT id FROM instances WHERE volume = ?)')
+            args.append(vol)
+        if under is not None:
+            under = under.rstrip('/') or '/'
+            prefix = under if under.endswith('/') else under + '/'
+            where.append("(path = ? OR substr(path, 1, ?) = ?)")
+            args += [under, len(prefix), prefix]
+        if share is not None:
+            where.append('share = ?')
+            args.append(share.rstrip('/') or '/')
+        if files_only:
+            where.append('is_dir = 0')
+
+        sql = 'SELECT path, inode, size, mtime, is_dir FROM inodes'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY path'
+        for path, inode, size, mtime, is_dir in self.db.execute(sql, args):
+            yield {'path': path, 'inode': inode, 'size': size, 'mtime': mtime, 'is_dir': bool(is_dir)}
+
+    def metadata(self, path):
+        """ (mdtype, name, value) for one indexed path """
+        return self.db.execute(
+                'SELECT mdtype, name, value FROM metadata WHERE id = (SELECT id FROM inodes WHERE path = ?) ORDER BY mdtype, name',
+                (path,)).fetchall()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Incremental decoding of the JSON written by eval_json and sum_json
+
+Gateway results can be one JSON document, or many of them one after another
+for recursive commands.  Tables come back as {"<NAME>_TABLE": [row, ...]},
+those are taken apart and yielded one row at a time, so a large table never
+has to be held in memory as a whole.  Any other value is yielded as is.
+"""
+
+import json
+import re
+
+_WS = re.compile(r'\s*')
+_TABLE_START = re.compile(r'\{\s*"([A-Za-z0-9_]*_TABLE)"\s*:\s*\[')
+# Could still turn into a _TABLE_START with more data
+_TABLE_PARTIAL = re.compile(r'\{\s*(?:"[A-Za-z0-9_]*(?:"\s*(?::\s*)?)?)?\Z')
+_TABLE_END = re.compile(r'\]\s*\}')
+
+
+class JSONRecordDecoder(object):
+    """
+    Feed text in with feed(), each call returns the records completed so
+    far.  Call close() at the end of the input for any remaining records,
+    it raises ValueError if the input was truncated or not valid JSON.
+    The table the current rows belong to is in self.table, with
+    with_table=True records are returned as (table, record) where table is
+    None for values that were not table rows.
+    """
+
+    def __init__(self, with_table=False):
+        self.table = None
+        self.with_table = with_table
+        self._buf = ''
+        self._in_table = False
+        self._retry_len = 0
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text):
+        self._buf += text
+        if len(self._buf) < self._retry_len:
+            # The last value was incomplete, wait for a good deal more data
+            # rather than reparsing it from the start for every chunk
+            return []
+        return self._decode(final=False)
+
+    def close(self):
+        ret = self._decode(final=True)
+        if self._in_table:
+            raise ValueError('truncated JSON result, in %s' % (self.table))
+        if self._buf.strip():
+            raise ValueError('truncated JSON result: %r' % (self._buf[:80]))
+        return ret
+
+    def _decode(self, final):
+        ret = []
+        buf = self._buf
+        pos = 0
+        self._retry_len = 0
+        while True:
+            pos = _WS.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            if self._in_table:
+                if buf[pos] == ',':
+                    pos += 1
+                    continue
+                if buf[pos] == ']':
+                    m = _TABLE_END.match(buf, pos)
+                    if m is None:
+                        if final or buf[pos + 1:].strip():
+                            raise ValueError('only single table JSON objects can be decoded, found more after %s' % (self.table))
+                        break
+                    self._in_table = False
+                    pos = m.end()
+                    continue
+            else:
+                m = _TABLE_START.match(buf, pos)
+                if m is not None:
+                    self.table = m.group(1)
+                    self._in_table = True
+                    pos = m.end()
+                    continue
+                if not final and _TABLE_PARTIAL.match(buf, pos):
+                    break
+                self.table = None
+
+            try:
+                value, end = self._decoder.raw_decode(buf, pos)
+            except ValueError:
+                if final:
+                    raise
+                self._retry_len = 2 * (len(buf) - pos)
+                break
+            if end == len(buf) and not final and not isinstance(value, (dict, list, str)):
+                # A number or literal at the end might continue in the next chunk
+                break
+            if self.with_table:
+                value = (self.table if self._in_table else None, value)
+            ret.append(value)
+            pos = end
+        self._buf = buf[pos:]
+        return ret
+
+
+def iter_json_records(chunks, with_table=False):
+    """ Yield the records from an iterable of text chunks, see JSONRecordDecoder """
+    decoder = JSONRecordDecoder(with_table=with_table)
+    for chunk in chunks:
+        for record in decoder.feed(chunk):
+            yield record
+    for record in decoder.close():
+        yield record
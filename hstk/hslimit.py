@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Limits on the gateway operations a client puts on the metadata server
+
+AdaptiveConcurrency, used by --adaptive, caps the number of gateway round
+trips in flight and moves the cap with how the metadata server is coping,
+AIMD style as TCP does with its congestion window:
+    - every round trip that completes within the target latency raises the
+      cap, by one per round trip until the first slow one (slow start),
+      then by one per cap's worth of round trips
+    - a round trip that takes longer than the target, or fails, cuts the
+      cap by the backoff factor, at most once per cap's worth of round
+      trips so one burst of slow answers doesn't collapse it to the floor
+The cap stays between a floor and a ceiling.  Without a ceiling it is
+fit() to the most round trips any command using it runs at once, its
+--jobs default or --pipeline.
+
+ShareRateLimit, used by --max-ops and --max-bytes, is a token bucket per
+share root on the operations and bytes sent through the gateway files.  It
+works by reservation: a caller takes what it needs right away, going into
+debt if need be, and sleeps until the debt would have been refilled.  With
+a state directory the buckets are files in it, updated under flock(), so
+every hs process on the host that uses the same directory shares the same
+budget.
+"""
+
+import collections
+import os
+import threading
+import time
+
+# Paths whose share root ShareRateLimit remembers, most recently used
+SHARE_ROOTS_SIZE = 4096
+
+
+class _Slot(object):
+    """ One round trip holding a place in an AdaptiveConcurrency """
+
+    def __init__(self, limiter):
+        self._limiter = limiter
+        self._start = None
+        self.latency = None
+
+    def ready(self):
+        """ The results are coming back, the latency is measured up to here """
+        if self.latency is None:
+            self.latency = time.perf_counter() - self._start
+
+    def try_enter(self):
+        """ __enter__() if there is room right now, False if there isn't """
+        if not self._limiter.acquire(block=False):
+            return False
+        self._start = time.perf_counter()
+        return True
+
+    def __enter__(self):
+        self._limiter.acquire()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.ready()
+        self._limiter.release(self.latency, error=exc_type is not None and not issubclass(exc_type, GeneratorExit))
+        return False
+
+
+class _NullSlot(object):
+    """ Used when there is no limit """
+
+    def ready(self):
+        pass
+
+    def try_enter(self):
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SLOT = _NullSlot()
+
+
+class AdaptiveConcurrency(object):
+    """ Shared by any number of worker threads, see the module docstring """
+
+    def __init__(self, floor=1, ceiling=16, target_latency=1.0, backoff=0.5):
+        # No ceiling, take it from the commands, see fit()
+        self.fit_ceiling = ceiling is None
+        if ceiling is None:
+            ceiling = floor
+        if floor < 1 or ceiling < floor:
+            raise ValueError('need 1 <= floor <= ceiling, got %s and %s' % (floor, ceiling))
+        self.floor = floor
+        self.ceiling = ceiling
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.limit = float(floor)
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self.decreases = 0
+        self.peak = floor
+        self._slow_start = True
+        self._since_decrease = 0
+        self._cond = threading.Condition()
+
+    @property
+    def allowed(self):
+        """ The number of round trips let in flight right now """
+        return int(self.limit)
+
+    def slot(self):
+        """ Context manager that waits for room and holds it for a round trip """
+        return _Slot(self)
+
+    def fit(self, jobs):
+        """ Raise the ceiling to jobs, if it wasn't given """
+        if not self.fit_ceiling:
+            return
+        with self._cond:
+            self.ceiling = max(self.ceiling, jobs)
+
+    def acquire(self, block=True):
+        """ Wait for room for a round trip, without block False if there is none """
+        with self._cond:
+            while self.in_flight >= self.allowed:
+                if not block:
+                    return False
+                self._cond.wait()
+            self.in_flight += 1
+        return True
+
+    def release(self, latency, error=False):
+        with self._cond:
+            self.in_flight -= 1
+            self.completed += 1
+            self._since_decrease += 1
+            if error:
+                self.errors += 1
+            if error or latency > self.target_latency:
+                self._slow_start = False
+                if self._since_decrease >= self.limit:
+                    self.limit = max(float(self.floor), self.limit * self.backoff)
+                    self.decreases += 1
+                    self._since_decrease = 0
+            elif self._slow_start:
+                self.limit = min(float(self.ceiling), self.limit + 1.0)
+            else:
+                self.limit = min(float(self.ceiling), self.limit + 1.0 / self.limit)
+            self.peak = max(self.peak, self.allowed)
+            self._cond.notify_all()
+
+    def summary(self):
+        return ('adaptive concurrency: %d round trips, %d errors, limit %d (peak %d, %d decreases, range %d-%d, target %.3fs)\n'
+                % (self.completed, self.errors, self.allowed, self.peak, self.decreases, self.floor, self.ceiling, self.target_latency))
+
+
+class TokenBucket(object):
+    """ rate tokens a second, up to burst saved up, for the threads of one process """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError('rate must be more than 0, got %s' % (rate))
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self._tokens = self.burst
+        self._last = time.time()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens, last, count, now):
+        """ Returns (tokens, last, seconds to wait) after taking count """
+        tokens = min(self.burst, tokens + (now - last) * self.rate) - count
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return tokens, now, wait
+
+    def reserve(self, count=1):
+        """ Take count tokens, returns the seconds to wait before using them """
+        with self._lock:
+            self._tokens, self._last, wait = self._reserve(self._tokens, self._last, count, time.time())
+        return wait
+
+    def take(self, count=1):
+        wait = self.reserve(count)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class SharedTokenBucket(TokenBucket):
+    """ A TokenBucket kept in a file, shared by every process that opens it """
+
+    def __init__(self, path, rate, burst=None):
+        import fcntl
+        self._fcntl = fcntl
+        super(SharedTokenBucket, self).__init__(rate, burst)
+        self.path = path
+
+    def reserve(self, count=1):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            self._fcntl.flock(fd, self._fcntl.LOCK_EX)
+            state = os.read(fd, 128).split()
+            now = time.time()
+            try:
+                tokens, last = float(state[0]), float(state[1])
+            except (IndexError, ValueError):
+                tokens, last = self.burst, now
+            tokens, last, wait = self._reserve(tokens, last, count, now)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, ('%r %r\n' % (tokens, last)).encode())
+        finally:
+            os.close(fd)
+        return wait
+
+
+def share_root(path):
+    """ The mount point holding path """
+    path = os.path.abspath(str(path))
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+class ShareRateLimit(object):
+    """
+    ops a second and bytes a second through the gateway files of each share
+    root, either limit can be None.  With state_dir the limits are shared
+    by all processes using that directory.
+    """
+
+    def __init__(self, ops=None, nbytes=None, state_dir=None, roots_size=SHARE_ROOTS_SIZE):
+        self.ops = ops
+        self.nbytes = nbytes
+        self.state_dir = state_dir
+        self.waited = 0.0
+        self.roots_size = roots_size
+        self._buckets = {}
+        self._roots = collections.OrderedDict()
+        self._lock = threading.Lock()
+        if state_dir is not None:
+            try:
+                import fcntl
+            except ImportError:
+                raise ValueError('sharing rate limits between processes is not supported on this platform')
+            os.makedirs(state_dir, exist_ok=True)
+
+    def _root(self, path):
+        """ share_root(path), looked up once per path while it stays in the cache """
+        key = str(path)
+        with self._lock:
+            root = self._roots.get(key)
+            if root is not None:
+                self._roots.move_to_end(key)
+                return root
+        root = share_root(key)
+        with self._lock:
+            self._roots[key] = root
+            while len(self._roots) > self.roots_size:
+                self._roots.popitem(last=False)
+        return root
+
+    def _bucket(self, path, kind, rate):
+        root = self._root(path)
+        with self._lock:
+            bucket = self._buckets.get((root, kind))
+            if bucket is None:
+                if self.state_dir is None:
+                    bucket = TokenBucket(rate)
+                else:
+                    import urllib.parse
+                    fname = '%s.%s' % (urllib.parse.quote(root, safe=''), kind)
+                    bucket = SharedTokenBucket(os.path.join(self.state_dir, fname), rate)
+                self._buckets[(root, kind)] = bucket
+        return bucket
+
+    def _take(self, path, kind, rate, count):
+        if rate is None or count <= 0:
+            return
+        wait = self._bucket(path, kind, rate).take(count)
+        if wait > 0:
+            with self._lock:
+                self.waited += wait
+
+    def op(self, path, nbytes=0):
+        """ Wait for room for one gateway operation on path sending nbytes """
+        self._take(path, 'ops', self.ops, 1)
+        self._take(path, 'bytes', self.nbytes, nbytes)
+
+    def data(self, path, nbytes):
+        """ Account for nbytes of results read back for path """
+        self._take(path, 'bytes', self.nbytes, nbytes)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Client side arithmetic on fs_stats.op_stats samples
+
+The metadata server only keeps running totals per op, an op_count and the
+op_time spent in them.  Taking samples at known times and differencing
+them gives per op rates and average latencies over each interval without
+saving anything on the share, the op_time units are the server's.  A
+StatsRing keeps the last few samples so the latest interval can be held
+against the ones before it to find the ops that moved the most.
+"""
+
+import collections
+import json
+
+
+class OpCounters(collections.namedtuple('OpCounters', 'count time')):
+    """ The running totals of one op """
+
+
+class Sample(object):
+    """ The OpCounters of every op at one time, {name: OpCounters} """
+
+    def __init__(self, when, ops):
+        self.when = when
+        self.ops = ops
+
+
+class OpDelta(object):
+    """ What one op did between two samples """
+
+    def __init__(self, name, count, time, secs):
+        self.name = name
+        self.count = count
+        self.time = time
+        self.rate = count / secs if secs > 0 else 0.0
+        self.avg = time / count if count > 0 else 0.0
+        # op_time spent a second, what ranks the movers
+        self.load = time / secs if secs > 0 else 0.0
+        # Filled in by StatsRing against the earlier intervals
+        self.rate_change = 0.0
+        self.avg_change = 0.0
+        self.load_change = 0.0
+
+    def as_dict(self):
+        return {
+                'name': self.name,
+                'count': self.count,
+                'time': self.time,
+                'rate': self.rate,
+                'avg': self.avg,
+                'load': self.load,
+                'rate_change': self.rate_change,
+                'avg_change': self.avg_change,
+                'load_change': self.load_change,
+            }
+
+
+def _field(row, name):
+    for key, value in row.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _op_rows(value):
+    """ The op rows in a record, looking into JSON strings and wrapping objects but not into the rows """
+    if isinstance(value, str) and value[:1] in ('{', '['):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return
+    if isinstance(value, dict):
+        if _field(value, 'name') is not None and _field(value, 'op_count') is not None:
+            yield value
+            return
+        for item in value.values():
+            yield from _op_rows(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _op_rows(item)
+
+
+def op_counters(records):
+    """
+    {name: OpCounters} from the fs_stats.op_stats records of hs_eval_iter(),
+    rows without a name and numeric op_count and op_time are skipped.  The
+    func_stats tables inside the op rows aren't counted.
+    """
+    ops = {}
+    for record in records:
+        for row in _op_rows(record):
+            name = _field(row, 'name')
+            count = _number(_field(row, 'op_count'))
+            time = _number(_field(row, 'op_time'))
+            if not isinstance(name, str) or count is None or time is None:
+                continue
+            ops[name] = OpCounters(count, time)
+    return ops
+
+
+def sample_deltas(prev, cur):
+    """
+    [OpDelta] for every op in cur since prev.  An op whose counters went
+    backwards was reset on the server, what it has now all happened since.
+    """
+    secs = cur.when - prev.when
+    deltas = []
+    for name, counters in sorted(cur.ops.items()):
+        before = prev.ops.get(name, OpCounters(0, 0))
+        if counters.count < before.count or counters.time < before.time:
+            before = OpCounters(0, 0)
+        deltas.append(OpDelta(name, counters.count - before.count, counters.time - before.time, secs))
+    return deltas
+
+
+class StatsRing(object):
+    """ The last size samples, the intervals between them worked out as they come in """
+
+    def __init__(self, size=60):
+        if size < 2:
+            raise ValueError('need room for at least 2 samples, got %s' % (size))
+        self.samples = collections.deque(maxlen=size)
+        self.intervals = collections.deque(maxlen=size - 1)
+
+    def add(self, sample):
+        """ Add a sample, returns the [OpDelta] since the one before, None for the first """
+        deltas = None
+        if self.samples:
+            deltas = sample_deltas(self.samples[-1], sample)
+            self._compare(deltas)
+            self.intervals.append(deltas)
+        self.samples.append(sample)
+        return deltas
+
+    def _compare(self, deltas):
+        """ Changes of rate, load and avg latency against the mean of the intervals held """
+        if not self.intervals:
+            return
+        rates = collections.defaultdict(float)
+        loads = collections.defaultdict(float)
+        counts = collections.defaultdict(float)
+        times = collections.defaultdict(float)
+        for interval in self.intervals:
+            for delta in interval:
+                rates[delta.name] += delta.rate
+                loads[delta.name] += delta.load
+                counts[delta.name] += delta.count
+                times[delta.name] += delta.time
+        for delta in deltas:
+            delta.rate_change = delta.rate - rates[delta.name] / len(self.intervals)
+            delta.load_change = delta.load - loads[delta.name] / len(self.intervals)
+            if delta.count > 0 and counts[delta.name] > 0:
+                delta.avg_change = delta.avg - times[delta.name] / counts[delta.name]
+
+
+def top_movers(deltas, count=10):
+    """
+    The ops whose load, op_time spent a second, changed the most either way,
+    that takes in both more calls and slower ones
+    """
+    moved = [ delta for delta in deltas if delta.load_change ]
+    return sorted(moved, key=lambda d: (abs(d.load_change), d.name), reverse=True)[:count]
+
+
+def format_deltas(deltas, secs, top=10):
+    """ Lines of a table of the busiest ops by op_time, then the top movers """
+    lines = ['%-24s %12s %12s %14s %14s %14s' % ('OP', 'COUNT', 'RATE/s', 'AVG', 'RATE_CHANGE', 'AVG_CHANGE')]
+    busy = sorted(( delta for delta in deltas if delta.count > 0 ), key=lambda d: (d.time, d.name), reverse=True)
+    for delta in busy[:top]:
+        lines.append('%-24s %12d %12.1f %14.3f %+14.1f %+14.3f' % (delta.name, delta.count, delta.rate, delta.avg,
+            delta.rate_change, delta.avg_change))
+    movers = top_movers(deltas, top)
+    if movers:
+        lines.append('top movers over %.1fs: %s' % (secs, ', '.join('%s %+.1f' % (d.name, d.load_change) for d in movers)))
+    return lines
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local history of fs_stats.op_stats samples, used by 'hs perf record/report'
+
+Each share gets a directory in the store holding:
+    ops         the op names, one a line, a record refers to its op by line
+    seg-NNNNNNNN  segments of fixed width records (RECORD), a sample is the
+                run of records sharing a time, kept in time order
+Records are appended to the newest segment until it is full, then a new one
+is started.  A full segment is downsampled, only samples at least coarse
+seconds apart are kept, and the oldest segments are removed once all of
+them add up to more than max_size.  The counters are running totals so a
+downsampled history still gives exact counts between the samples it kept,
+just over longer intervals.
+
+The server only has an op_time total per op, not the time of each call,
+so the latency histograms of a report are of the average latency of each
+interval between samples, weighted by the calls made in it.
+"""
+
+import collections
+import math
+import os
+import re
+import struct
+import time
+
+import hstk.hsperf as hsperf
+
+# time, op, op_count, op_time
+RECORD = struct.Struct('<dIdd')
+SEGMENTS = 8
+MAX_SIZE = 64 << 20
+COARSE = 60.0
+
+_SEGMENT_RE = re.compile(r'^seg-(\d{8})$')
+_AGO_RE = re.compile(r'^-?(?P<num>\d+(\.\d+)?)(?P<unit>[smhdw])$')
+_UNITS = { 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800 }
+_TIME_FORMATS = ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M', '%Y-%m-%d')
+
+
+def default_store_dir():
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'hstk', 'perf')
+
+
+def share_store_dir(store_dir, share):
+    """ The directory in store_dir for the share holding share """
+    import urllib.parse
+    import hstk.hslimit as hslimit
+    return os.path.join(store_dir, urllib.parse.quote(hslimit.share_root(share), safe=''))
+
+
+def parse_time(text, now=None):
+    """
+    Seconds since the epoch from a number of them, a local
+    YYYY-MM-DD[ HH:MM[:SS]] or an age such as 90s, 15m, 2h, 1d or 1w.
+    Raises ValueError for anything else
+    """
+    text = text.strip()
+    if now is None:
+        now = time.time()
+    match = _AGO_RE.match(text)
+    if match is not None:
+        return now - float(match.group('num')) * _UNITS[match.group('unit')]
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    for fmt in _TIME_FORMATS:
+        try:
+            return time.mktime(time.strptime(text, fmt))
+        except ValueError:
+            pass
+    raise ValueError('not a time or an age: %r' % (text))
+
+
+def downsample(samples, secs):
+    """ The samples at least secs apart, always keeping the first and last """
+    kept = []
+    for sample in samples:
+        if not kept or sample.when >= kept[-1].when + secs:
+            kept.append(sample)
+        last = sample
+    if kept and kept[-1] is not last:
+        kept.append(last)
+    return kept
+
+
+def latency_bucket(avg):
+    """ The power of 2 histogram bucket avg falls in, named by its upper bound """
+    if avg <= 1:
+        return 1
+    return 1 << int(math.ceil(math.log(avg, 2)))
+
+
+class OpReport(object):
+    """ What one op did over a report window """
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.time = 0
+        self.histogram = collections.Counter()
+
+    def as_dict(self, secs):
+        return {
+                'name': self.name,
+                'count': self.count,
+                'time': self.time,
+                'rate': self.count / secs if secs > 0 else 0.0,
+                'avg': self.time / self.count if self.count > 0 else 0.0,
+                'histogram': dict(('<=%d' % (bucket), count) for bucket, count in sorted(self.histogram.items())),
+            }
+
+
+def summarize(samples):
+    """ (first time, last time, {name: OpReport}) over samples, None if there are less than two """
+    first = prev = None
+    ops = {}
+    for sample in samples:
+        if prev is None:
+            first = sample
+        else:
+            for delta in hsperf.sample_deltas(prev, sample):
+                if delta.count <= 0:
+                    continue
+                report = ops.get(delta.name)
+                if report is None:
+                    report = ops[delta.name] = OpReport(delta.name)
+                report.count += delta.count
+                report.time += delta.time
+                report.histogram[latency_bucket(delta.avg)] += delta.count
+        prev = sample
+    if first is None or prev is first:
+        return None
+    return first.when, prev.when, ops
+
+
+class PerfStore(object):
+    """ The history of one share, see the module docstring """
+
+    def __init__(self, path, max_size=MAX_SIZE, coarse=COARSE, segments=SEGMENTS):
+        self.path = path
+        self.max_size = max_size
+        self.coarse = coarse
+        self.segment_size = max(max_size // segments, RECORD.size * 256)
+        self._names = None
+        self._index = None
+
+    @property
+    def names(self):
+        if self._names is None:
+            try:
+                with open(os.path.join(self.path, 'ops')) as fd:
+                    self._names = [ line.rstrip('\n') for line in fd ]
+            except FileNotFoundError:
+                self._names = []
+            self._index = dict((name, i) for i, name in enumerate(self._names))
+        return self._names
+
+    def _op(self, name):
+        self.names
+        index = self._index.get(name)
+        if index is None:
+            index = self._add_op(name)
+        return index
+
+    def _add_op(self, name):
+        """
+        Append name to the ops file under an exclusive lock, another hs perf
+        record on the same share may have added ops since they were read
+        """
+        ops = os.path.join(self.path, 'ops')
+        lock = None
+        try:
+            import fcntl
+            lock = os.open(ops + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        try:
+            # Read again, only what is in the file now is safe to number after
+            self._names = None
+            names = self.names
+            index = self._index.get(name)
+            if index is None:
+                with open(ops, 'a') as fd:
+                    fd.write(name + '\n')
+                index = self._index[name] = len(names)
+                names.append(name)
+            return index
+        finally:
+            if lock is not None:
+                os.close(lock)
+
+    def _segment(self, seq):
+        return os.path.join(self.path, 'seg-%08d' % (seq))
+
+    def segments(self):
+        """ The segment sequence numbers, oldest first """
+        try:
+            fnames = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        return sorted(int(m.group(1)) for m in map(_SEGMENT_RE.match, fnames) if m is not None)
+
+    def append(self, sample):
+        """ Add a sample, rotating the newest segment if it is full """
+        os.makedirs(self.path, exist_ok=True)
+        data = b''.join(RECORD.pack(sample.when, self._op(name), counters.count, counters.time)
+                for name, counters in sorted(sample.ops.items()))
+        if not data:
+            return
+        segments = self.segments()
+        seq = segments[-1] if segments else 0
+        try:
+            size = os.path.getsize(self._segment(seq))
+        except FileNotFoundError:
+            size = 0
+        if size > 0 and size + len(data) > self.segment_size:
+            self._rotate(seq)
+            seq += 1
+        # One write of the whole sample, so readers never see half of one
+        fd = os.open(self._segment(seq), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def _rotate(self, seq):
+        fname = self._segment(seq)
+        kept = downsample(self._read(fname), self.coarse)
+        tmpname = fname + '.tmp'
+        with open(tmpname, 'wb') as fd:
+            for sample in kept:
+                fd.write(b''.join(RECORD.pack(sample.when, self._index[name], counters.count, counters.time)
+                    for name, counters in sorted(sample.ops.items())))
+        os.replace(tmpname, fname)
+
+        segments = self.segments()
+        sizes = [ os.path.getsize(self._segment(s)) for s in segments ]
+        while len(segments) > 1 and sum(sizes) > self.max_size:
+            os.unlink(self._segment(segments.pop(0)))
+            sizes.pop(0)
+
+    def _records(self, fd, start=0):
+        fd.seek(start * RECORD.size)
+        while True:
+            data = fd.read(RECORD.size * 1024)
+            if len(data) < RECORD.size:
+                return
+            yield from RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size])
+
+    def _first_at(self, fd, since):
+        """ The index of the first record at or after since, by bisecting the fixed width records """
+        fd.seek(0, os.SEEK_END)
+        lo, hi = 0, fd.tell() // RECORD.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            fd.seek(mid * RECORD.size)
+            if RECORD.unpack(fd.read(RECORD.size))[0] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _read(self, fname, since=None):
+        names = self.names
+        try:
+            fd = open(fname, 'rb')
+        except FileNotFoundError:
+            return
+        with fd:
+            start = self._first_at(fd, since) if since is not None else 0
+            sample = None
+            for when, op, count, op_time in self._records(fd, start):
+                if sample is None or when != sample.when:
+                    if sample is not None:
+                        yield sample
+                    sample = hsperf.Sample(when, {})
+                if op < len(names):
+                    sample.ops[names[op]] = hsperf.OpCounters(count, op_time)
+            if sample is not None:
+                yield sample
+
+    def samples(self, since=None, until=None):
+        """ The samples from since to until, oldest first """
+        for seq in self.segments():
+            for sample in self._read(self._segment(seq), since):
+                if until is not None and sample.when > until:
+                    return
+                yield sample
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per phase timing of gateway round trips, used by the --profile options
+
+Each round trip through a .fs_command_gateway file is timed phase by phase:
+    open        open the gateway file for writing
+    build       generate the hammerscript command
+    write       write the command
+    flush       flush it
+    close       close, this is where the command is submitted
+    reopen      open the gateway file again for the results
+    read        read the results
+    close_read  close the results
+so slow command submission can be told apart from slow result production.
+
+Only the most recent round trips are kept whole, older ones are folded into
+per phase counts and a bounded random sample for the percentiles, so a long
+profiled run or Client doesn't grow without bound.
+"""
+
+import collections
+import random
+import threading
+import time
+
+PHASES = ('open', 'build', 'write', 'flush', 'close', 'reopen', 'read', 'close_read')
+PERCENTILES = (50, 95, 99)
+# Round trips kept whole for the trace, and samples kept per command and phase
+KEEP_ROUND_TRIPS = 10000
+PHASE_SAMPLES = 4096
+
+
+class RoundTrip(object):
+    """ Timings for one command on one path, mark() closes the current phase """
+
+    def __init__(self, command, path):
+        self.command = command
+        self.path = str(path)
+        self.start = time.time()
+        self.phases = {}
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+
+class _NullRoundTrip(object):
+    """ Used when profiling is off """
+
+    def mark(self, phase):
+        pass
+
+
+NULL_ROUND_TRIP = _NullRoundTrip()
+
+
+def percentile(values, pct):
+    """ Nearest rank percentile of an already sorted list """
+    if not values:
+        return 0.0
+    rank = -(-pct * len(values) // 100)  # ceil
+    return values[max(int(rank), 1) - 1]
+
+
+class PhaseStats(object):
+    """
+    Count and max of the times of one phase of one command, with a reservoir
+    sample of at most size of them for the percentiles
+    """
+
+    def __init__(self, size=PHASE_SAMPLES):
+        self.size = size
+        self.count = 0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, ms, rand):
+        self.count += 1
+        self.max = max(self.max, ms)
+        if len(self.samples) < self.size:
+            self.samples.append(ms)
+            return
+        idx = rand.randrange(self.count)
+        if idx < self.size:
+            self.samples[idx] = ms
+
+    def copy(self):
+        ret = PhaseStats(self.size)
+        ret.count = self.count
+        ret.max = self.max
+        ret.samples = list(self.samples)
+        return ret
+
+
+class GatewayProfile(object):
+    """
+    Collects RoundTrips from any number of worker threads.  round_trips
+    holds the last keep of them, the ones before that are only in the
+    summary, see the module docstring.
+    """
+
+    def __init__(self, keep=KEEP_ROUND_TRIPS, samples=PHASE_SAMPLES):
+        self.round_trips = collections.deque()
+        self.keep = keep
+        self.samples = samples
+        # {command: {phase: PhaseStats}} of the round trips no longer kept
+        self._folded = {}
+        self._rand = random.Random()
+        self._lock = threading.Lock()
+
+    def round_trip(self, command, path):
+        rt = RoundTrip(command, path)
+        with self._lock:
+            self.round_trips.append(rt)
+            if len(self.round_trips) > self.keep:
+                self._fold(self._folded, self.round_trips.popleft())
+        return rt
+
+    def _fold(self, folded, rt):
+        cmd = folded.setdefault(rt.command, {})
+        for phase, secs in rt.phases.items():
+            if phase not in cmd:
+                cmd[phase] = PhaseStats(self.samples)
+            cmd[phase].add(secs * 1000, self._rand)
+
+    def summary(self):
+        """
+        Returns {command: {phase: {count, p50, p95, p99, max}}} with the
+        times in milliseconds
+        """
+        with self._lock:
+            folded = { command: { phase: stats.copy() for phase, stats in phases.items() }
+                    for command, phases in self._folded.items() }
+            round_trips = list(self.round_trips)
+            for rt in round_trips:
+                self._fold(folded, rt)
+
+        ret = {}
+        for command, phases in folded.items():
+            ret[command] = {}
+            for phase in PHASES:
+                if phase not in phases:
+                    continue
+                values = sorted(phases[phase].samples)
+                stats = { 'count': phases[phase].count }
+                for pct in PERCENTILES:
+                    stats['p%d' % (pct)] = percentile(values, pct)
+                stats['max'] = phases[phase].max
+                ret[command][phase] = stats
+        return ret
+
+    def format_table(self):
+        cols = ['p%d' % (pct) for pct in PERCENTILES] + ['max']
+        lines = ['%-24s %-10s %8s ' % ('command', 'phase', 'count') + ' '.join('%10s' % (col + '_ms') for col in cols)]
+        for command, phases in sorted(self.summary().items()):
+            for phase, stats in phases.items():
+                line = '%-24s %-10s %8d ' % (command, phase, stats['count'])
+                line += ' '.join('%10.3f' % (stats[col]) for col in cols)
+                lines.append(line)
+        return '\n'.join(lines) + '\n'
+
+    def trace(self):
+        """ The round trips still kept and the summary, ready for json.dump() """
+        with self._lock:
+            round_trips = list(self.round_trips)
+        return {
+                'round_trips': [
+                    { 'command': rt.command, 'path': rt.path, 'start': rt.start,
+                      'phases_ms': { phase: secs * 1000 for phase, secs in rt.phases.items() } }
+                    for rt in round_trips ],
+                'summary': self.summary(),
+            }
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Persistent 'hs serve' daemon and the thin client used by the hs command
+
+The daemon keeps hstk.hscli and the commands loaded and listens on a unix
+socket.  It forks a child per connection, which reads the client's command
+line, cwd, umask and environment along with its stdin/stdout/stderr file
+descriptors, takes over those descriptors, runs the command and reports its
+pid and then the exit status back over the socket.  The client passes on
+SIGINT and SIGTERM to that pid.
+
+Forwarding is opt-in, set HS_DAEMON=1.  The socket lives in a directory only
+its owner can enter, and both ends check the other is the same user before
+trusting it.
+
+This module is imported on every hs invocation, keep its imports light.  What
+only serving or forwarding needs is imported by the functions using it.
+"""
+
+import os
+import stat
+import sys
+
+# Set to 1 to forward commands to a running daemon
+DAEMON_ENV = 'HS_DAEMON'
+# Set to skip forwarding to a running daemon, overrides HS_DAEMON
+NO_DAEMON_ENV = 'HS_NO_DAEMON'
+SOCKET_ENV = 'HS_SOCKET'
+# Set by the click shell completion scripts
+COMPLETE_ENV = '_HS_COMPLETE'
+
+_MAX_REQUEST = 1024 * 1024
+
+
+# Signals the client passes on to the command running in the daemon
+_FORWARD_SIGNALS = ('SIGINT', 'SIGTERM')
+
+
+def default_socket_path():
+    """
+    $HS_SOCKET, else hstk.sock in $XDG_RUNTIME_DIR, else in a hstk-<uid>
+    directory under the temp dir that serve() creates mode 0700
+    """
+    if SOCKET_ENV in os.environ:
+        return os.environ[SOCKET_ENV]
+    rundir = os.environ.get('XDG_RUNTIME_DIR')
+    if not rundir:
+        import tempfile
+        rundir = os.path.join(tempfile.gettempdir(), 'hstk-%d' % (os.getuid()))
+    return os.path.join(rundir, 'hstk.sock')
+
+
+def _private(st):
+    """ Owned by us and nobody else can write it """
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def _check_socket_dir(path):
+    """
+    Create the directory the socket goes in, 0700, unless it exists.  Raises
+    RuntimeError if it's not ours or others can write it, somebody else could
+    swap the socket
+    """
+    sockdir = os.path.dirname(os.path.abspath(path))
+    try:
+        os.mkdir(sockdir, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(sockdir)
+    if not stat.S_ISDIR(st.st_mode) or not _private(st):
+        raise RuntimeError('hs serve socket directory %s must be a directory owned by uid %d '
+                'and not writable by others' % (sockdir, os.getuid()))
+
+
+def trusted_socket(path):
+    """ path is a socket of ours in a directory of ours, safe to connect to """
+    try:
+        st = os.lstat(path)
+        dst = os.lstat(os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        return False
+    return (stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+            and stat.S_ISDIR(dst.st_mode) and _private(dst))
+
+
+def _peer_uid(sock):
+    """ uid of the process at the other end of a unix socket, None if unknown """
+    import socket
+    import struct
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    ucred = struct.Struct('3i')
+    pid, uid, gid = ucred.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, ucred.size))
+    return uid
+
+
+def _same_user(sock):
+    uid = _peer_uid(sock)
+    return uid is None or uid == os.getuid()
+
+
+def supported():
+    """ The daemon needs unix sockets and fork, so no Windows """
+    import socket
+    return hasattr(socket, 'AF_UNIX') and hasattr(os, 'fork')
+
+
+def _recv_request(conn):
+    import array
+    import socket
+    fds = array.array('i')
+    data = b''
+    while not data.endswith(b'\n'):
+        msg, ancdata, flags, addr = conn.recvmsg(65536, socket.CMSG_LEN(3 * fds.itemsize))
+        for cmsg_level, cmsg_type, cmsg_data in ancdata:
+            if cmsg_level == socket.SOL_SOCKET and cmsg_type == socket.SCM_RIGHTS:
+                fds.frombytes(cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fds.itemsize)])
+        if not msg:
+            break
+        data += msg
+        if len(data) > _MAX_REQUEST:
+            break
+    return data, list(fds)
+
+
+def _run_child(conn, request, fds):
+    """ In the forked child, become the client process and run the command """
+    import json
+    import signal
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    os.chdir(request['cwd'])
+    os.umask(request['umask'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+
+    import hstk.hscli as hscli
+    try:
+        hscli.cli.main(args=request['argv'], prog_name='hs')
+        status = 0
+    except SystemExit as e:
+        if e.code is None:
+            status = 0
+        elif isinstance(e.code, int):
+            status = e.code
+        else:
+            sys.stderr.write(str(e.code) + '\n')
+            status = 1
+    except KeyboardInterrupt:
+        status = 128 + signal.SIGINT
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        status = 1
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    conn.sendall(json.dumps({'exit': status}).encode() + b'\n')
+    return status
+
+
+def _terminate(signum, frame):
+    sys.exit(128 + signum)
+
+
+def _handle(conn):
+    """ In the forked child, read the request and run it """
+    import json
+    import signal
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, _terminate)
+    if not _same_user(conn):
+        return 1
+    data, fds = _recv_request(conn)
+    try:
+        request = json.loads(data.decode())
+    except ValueError:
+        request = None
+    if request is None or len(fds) != 3:
+        for fd in fds:
+            os.close(fd)
+        return 1
+    conn.sendall(json.dumps({'pid': os.getpid()}).encode() + b'\n')
+    return _run_child(conn, request, fds)
+
+
+def _socket_in_use(path):
+    import socket
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+def serve(path=None):
+    """ Run the daemon in the foreground, until killed """
+    import signal
+    import socket
+    if path is None:
+        path = default_socket_path()
+    _check_socket_dir(path)
+    if os.path.lexists(path):
+        if _socket_in_use(path):
+            raise RuntimeError('hs serve already running on ' + path)
+        os.unlink(path)
+
+    # Children report their own exit status to the client, let the kernel
+    # reap them.  Killing the daemon removes its socket
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, _terminate)
+
+    # Preload everything so forked children start with it ready
+    import importlib
+    import hstk.hscli as hscli
+    for name, import_path in hscli.LAZY_COMMANDS:
+        importlib.import_module(import_path.partition(':')[0])
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(old_umask)
+    sock.listen(128)
+    try:
+        while True:
+            conn, addr = sock.accept()
+            # A child per connection, a slow client or command doesn't hold
+            # up the others
+            try:
+                pid = os.fork()
+            except OSError:
+                conn.close()
+                continue
+            if pid == 0:
+                status = 1
+                try:
+                    sock.close()
+                    status = _handle(conn)
+                finally:
+                    os._exit(status)
+            conn.close()
+    finally:
+        sock.close()
+        os.unlink(path)
+
+
+def forward(argv, path=None):
+    """
+    Send a command line to a running daemon and return its exit status.
+    Raises OSError if no daemon is listening or it isn't ours.
+    """
+    import array
+    import json
+    import signal
+    import socket
+    if path is None:
+        path = default_socket_path()
+    if not trusted_socket(path):
+        raise PermissionError('hs serve socket %s is not private to uid %d' % (path, os.getuid()))
+    umask = os.umask(0)
+    os.umask(umask)
+    request = {
+            'argv': list(argv),
+            'cwd': os.getcwd(),
+            'umask': umask,
+            'env': dict(os.environ),
+        }
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    handlers = {}
+    try:
+        sock.connect(path)
+        if not _same_user(sock):
+            raise PermissionError('hs serve socket %s is held by another user' % (path))
+        sys.stdout.flush()
+        sys.stderr.flush()
+        data = json.dumps(request).encode() + b'\n'
+        fds = array.array('i', [0, 1, 2])
+        sent = sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+        if sent < len(data):
+            sock.sendall(data[sent:])
+
+        resp = b''
+        status = None
+        while status is None:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            resp += chunk
+            while b'\n' in resp:
+                line, resp = resp.split(b'\n', 1)
+                try:
+                    msg = json.loads(line.decode())
+                except ValueError:
+                    continue
+                if 'pid' in msg and not handlers:
+                    handlers = _forward_signals(msg['pid'])
+                if 'exit' in msg:
+                    status = msg['exit']
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+        sock.close()
+
+    if status is None:
+        sys.stderr.write('hs serve daemon exited without a status\n')
+        return 1
+    return status
+
+
+def _forward_signals(pid):
+    """ Pass SIGINT and SIGTERM on to the command, returns the old handlers """
+    import signal
+    def relay(signum, frame):
+        try:
+            os.kill(pid, signum)
+        except OSError:
+            pass
+
+    handlers = {}
+    for name in _FORWARD_SIGNALS:
+        signum = getattr(signal, name)
+        handlers[signum] = signal.signal(signum, relay)
+    return handlers
+
+
+def _should_forward(argv):
+    if NO_DAEMON_ENV in os.environ or os.environ.get(DAEMON_ENV, '') in ('', '0'):
+        return False
+    if not supported():
+        return False
+    if 'serve' in argv:
+        return False
+    return trusted_socket(default_socket_path())
+
+
+def main(argv=None):
+    """ Entry point for the hs command, use the daemon if one is running """
+    if argv is None:
+        argv = sys.argv[1:]
+    if os.environ.get(COMPLETE_ENV):
+        # Shell completion, answered without loading the commands when it can be
+        import hstk.hscomplete as hscomplete
+        if hscomplete.main(os.environ[COMPLETE_ENV]):
+            sys.exit(0)
+    if _should_forward(argv):
+        try:
+            sys.exit(forward(argv))
+        except (ConnectionRefusedError, FileNotFoundError):
+            # stale socket, run it ourselves
+            pass
+        except PermissionError as e:
+            sys.stderr.write(str(e) + ', running without it\n')
+    import hstk.hscli as hscli
+    hscli.cli.main(args=argv, prog_name='hs')
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-process hammerscript simulator, a gateway transport for measuring and
+tuning the client without a Hammerspace cluster
+"""
+
+import io
+import json
+import os
+import pathlib
+import re
+import shutil
+import threading
+import time
+
+from hstk.hsgateway import GatewayTransport
+
+
+class _SimCommandFile(io.BytesIO):
+    """ Collect the written command, hand it to the simulator on close """
+
+    def __init__(self, sim, gw):
+        super(_SimCommandFile, self).__init__()
+        self._sim = sim
+        self._gw = gw
+
+    def close(self):
+        if not self.closed:
+            self._sim.submit(self._gw, self.getvalue())
+        super(_SimCommandFile, self).close()
+
+
+_CMD_RE = re.compile(r'^(?P<verb>eval|sum|set|cp-a|rm-rf|attribute=inode_info)(?P<mods>[a-z_]*)\s*(?P<args>.*)$', re.DOTALL)
+_MD_GET_RE = re.compile(r'^(?:get|has)_(?P<mdtype>[a-z_]+?)(?:_local|_inherited|_object|_active|_effective|_share)?(?:_unbound)?\("(?P<name>[^"]*)"')
+_MD_LIST_RE = re.compile(r'^list_(?P<mdtype>[a-z_]+?)s(?:_local|_inherited|_object|_active|_effective|_share)?(?:_unbound)?$')
+_MD_SET_RE = re.compile(r'^#\w+=(?P<op>set|add|delete|delete_force)_(?P<mdtype>[a-z_]+?)\("(?P<name>[^"]*)"(?:, EXPRESSION_FROM_\w+\((?P<value>.*)\))?\)$', re.DOTALL)
+_ATTR_SET_RE = re.compile(r'^(?P<name>[^=#]+)=(?P<value>.*)$', re.DOTALL)
+
+
+class SimGateway(GatewayTransport):
+    """
+    Answer the commands generated by hstk.hsscript from a local directory tree
+    without a Hammerspace cluster behind it.  Only meant for measuring and
+    tuning the client side, the answers are plausible rather than accurate.
+
+    latency: seconds after a command is written before its results are ready,
+             commands in flight at once all make progress, as they would
+             queued up on a metadata server
+    payload: pad every record of eval output to at least this many bytes
+    root: directory to search for cp-a destination inodes, defaults to the
+          directory the command was issued in, the one holding the source.
+          Never the whole mount, walking that for every copy is unbounded
+    export: report paths under root as under this server side path, the way
+            a cluster answers with its own share paths rather than the
+            client's mount point, needs root
+    """
+
+    def __init__(self, latency=0.0, payload=0, root=None, export=None):
+        self.latency = float(latency)
+        self.payload = int(payload)
+        self.root = root
+        if export is not None and root is None:
+            raise ValueError('export needs root')
+        self.export = export
+        self.metadata = {}
+        # Cluster wide tables, answered as {"<EXP>_TABLE": rows} whatever the path
+        self.catalogs = {
+                'STORAGE_VOLUMES': [{'NAME': 'vol1', 'VOLUME_STATUS': {'HAMMERSCRIPT': "STORAGE_VOLUME_STATUS('ONLINE')"}}],
+                'VOLUME_GROUPS.NAME': [{'NAME': 'vg1'}],
+                'SMART_OBJECTIVES.NAME': [{'NAME': 'keep-online'}],
+                'THIS.PARTICIPANTS': [{'SITE_NAME': 'site1'}, {'SITE_NAME': 'site2'}],
+            }
+        # fs_stats.op_stats, {verb: [op_count, op_time in microseconds]}
+        self.op_stats = {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def open_write(self, gw):
+        return _SimCommandFile(self, gw)
+
+    def open_read(self, gw):
+        with self._lock:
+            ret, ready = self._results.pop(str(gw), ('', 0.0))
+        wait = ready - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        return io.StringIO(ret)
+
+    def submit(self, gw, data):
+        """ Parse and execute a command written to gateway file gw """
+        data = data.rstrip(b'\0').decode()
+        name, _, cmd = data.partition('?.')
+        if name.startswith('./'):
+            name = name[2:]
+        target = pathlib.Path(gw).parent / name if name else pathlib.Path(gw).parent
+        ready = time.monotonic() + self.latency
+        ret = self.execute(target, cmd)
+        with self._lock:
+            self._results[str(gw)] = (ret, ready)
+
+    def execute(self, target, cmd):
+        match = _CMD_RE.match(cmd)
+        if match is None:
+            return f'unknown command: {cmd}\n'
+        verb = match.group('verb')
+        start = time.perf_counter()
+        try:
+            return self._execute(target, verb, match)
+        finally:
+            with self._lock:
+                counters = self.op_stats.setdefault(verb, [0, 0])
+                counters[0] += 1
+                counters[1] += int((time.perf_counter() - start) * 1000000)
+
+    def _execute(self, target, verb, match):
+        mods = match.group('mods')
+        args = match.group('args')
+
+        if verb == 'eval':
+            return self._eval(target, mods, args)
+        if verb == 'sum':
+            return self._sum(target, mods, args)
+        if verb == 'set':
+            return self._set(target, mods, args)
+        if verb == 'cp-a':
+            return self._cp_a(target, int(args))
+        if verb == 'rm-rf':
+            return self._rm_rf(target)
+        return json.dumps(self._inode_info(target)) + '\n'
+
+    def server_path(self, path):
+        """ path as the cluster reports it, see export """
+        path = str(path)
+        if self.export is None:
+            return path
+        root = os.path.abspath(self.root)
+        if path == root:
+            return self.export
+        if path.startswith(root.rstrip('/') + '/'):
+            return self.export.rstrip('/') + path[len(root.rstrip('/')):]
+        return path
+
+    def _walk(self, target, recursive, dirs=False, files=True):
+        """ Paths a command applies to, target itself unless recursive """
+        if not recursive or not target.is_dir():
+            yield target
+            return
+        for dirpath, dirnames, filenames in os.walk(str(target)):
+            if dirs and dirpath != str(target):
+                yield pathlib.Path(dirpath)
+            if files:
+                for fname in filenames:
+                    yield pathlib.Path(dirpath) / fname
+
+    def _value(self, path, exp):
+        exp = exp.strip()
+        uexp = exp.upper()
+        st = path.lstat()
+        if re.match(r'^-?\d+(\.\d+)?$', exp):
+            return exp
+        if uexp == 'VERSION':
+            # Anything reached through a .snapshot/ directory is an older version
+            return '2' if '.snapshot' in path.parts else '1'
+        if uexp in ('PATH', 'DPATH', 'NAME'):
+            return self.server_path(path) if uexp != 'NAME' else path.name
+        if uexp in ('SIZE', 'SPACE_USED'):
+            return str(st.st_size)
+        if uexp in ('THIS', 'DUMP_INODE'):
+            return json.dumps(self._inode_info(path))
+        if uexp == 'FS_STATS.OP_STATS':
+            with self._lock:
+                rows = [ {'name': verb, 'op_count': count, 'op_time': op_time, 'op_avg': op_time // max(count, 1)}
+                        for verb, (count, op_time) in sorted(self.op_stats.items()) ]
+            return json.dumps({'OP_STATS_TABLE': rows})
+        if uexp == 'ASSIMILATION_DETAILS':
+            # cp-a is done by the time it returns, nothing is ever in progress
+            return json.dumps({'ASSIMILATIONS_TABLE': []})
+        md = self.metadata.get(str(path), {})
+        match = _MD_GET_RE.match(exp)
+        if match is not None:
+            val = md.get(match.group('mdtype'), {}).get(match.group('name'))
+            if exp.startswith('has_'):
+                return 'TRUE' if val is not None else 'FALSE'
+            return '' if val is None else val
+        match = _MD_LIST_RE.match(exp)
+        if match is not None:
+            return json.dumps(md.get(match.group('mdtype'), {}))
+        return exp
+
+    def _pad(self, line):
+        if len(line) < self.payload:
+            line += ' ' * (self.payload - len(line))
+        return line + '\n'
+
+    def _eval(self, target, mods, exp):
+        out = []
+        rec = 'rec' in mods or 'nofiles' in mods
+        rows = self.catalogs.get(exp.strip().upper())
+        if rows is not None and not rec:
+            return json.dumps({exp.strip().upper().replace('.', '_') + '_TABLE': rows}) + '\n'
+        for path in self._walk(target, rec, dirs='nofiles' in mods):
+            val = self._value(path, exp)
+            if 'json' in mods and not rec and exp.strip().upper() == 'VERSION':
+                # The cluster answers eval_json VERSION with the bare number
+                pass
+            elif 'json' in mods:
+                val = json.dumps({'PATH': self.server_path(path), 'VALUE': val}) if rec else json.dumps({'VALUE': val})
+            elif rec:
+                val = f'{self.server_path(path)}: {val}'
+            out.append(self._pad(val))
+        return ''.join(out)
+
+    def _sum(self, target, mods, exp):
+        count = 0
+        space = 0
+        nonfiles = 'nofiles' in mods
+        for path in self._walk(target, True, dirs=nonfiles, files=not nonfiles):
+            count += 1
+            space += path.lstat().st_size
+        if exp.strip() == '1':
+            return f'{count}\n'
+        if 'json' in mods:
+            return json.dumps({'1FILE': count, 'SPACE_USED': space}) + '\n'
+        return f'1FILE: {count}\nSPACE_USED: {space}\n'
+
+    def _set(self, target, mods, args):
+        args = args.strip()
+        rec = 'rec' in mods or 'nofiles' in mods
+        for path in self._walk(target, rec, dirs='nofiles' in mods):
+            md = self.metadata.setdefault(str(path), {})
+            match = _MD_SET_RE.match(args)
+            if match is not None:
+                table = md.setdefault(match.group('mdtype'), {})
+                if match.group('op').startswith('delete'):
+                    table.pop(match.group('name'), None)
+                else:
+                    table[match.group('name')] = match.group('value') or 'TRUE'
+                continue
+            match = _ATTR_SET_RE.match(args)
+            if match is None:
+                return f'unable to parse set: {args}\n'
+            if match.group('value') == '#EMPTY':
+                md.setdefault('attribute', {}).pop(match.group('name'), None)
+            else:
+                md.setdefault('attribute', {})[match.group('name')] = match.group('value')
+        return ''
+
+    def _find_inode(self, near, ino):
+        root = self.root
+        if root is None:
+            root = os.path.dirname(os.path.abspath(str(near)))
+        for dirpath, dirnames, filenames in os.walk(root):
+            if os.stat(dirpath).st_ino == ino:
+                return dirpath
+        return None
+
+    def _cp_a(self, src, dest_inode):
+        dest = self._find_inode(src, dest_inode)
+        if dest is None:
+            return f'destination inode {dest_inode} not found\n'
+        tgt = os.path.join(dest, src.name)
+        if src.is_dir():
+            shutil.copytree(str(src), tgt, symlinks=True)
+        else:
+            shutil.copy2(str(src), tgt)
+        return ''
+
+    def _rm_rf(self, target):
+        # Like the real thing, only the contents are removed, not target itself
+        for entry in os.scandir(str(target)):
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+        return ''
+
+    def _inode_info(self, path):
+        st = path.lstat()
+        md = self.metadata.get(str(path), {})
+        is_dir = path.is_dir()
+        return {
+                'INODE': st.st_ino,
+                'PATH': self.server_path(path),
+                'SIZE': st.st_size,
+                'MODE': oct(st.st_mode),
+                'IS_DIR': is_dir,
+                'OWNER': st.st_uid,
+                'OWNER_GROUP': st.st_gid,
+                'MODIFY_TIME': st.st_mtime,
+                'INSTANCES': [] if is_dir else [ {'VOLUME': 'sim-volume'} ],
+                'TAGS': md.get('tag', {}),
+                'ATTRIBUTES': md.get('attribute', {}),
+                'KEYWORDS': sorted(md.get('keyword', {})),
+                'LABELS': sorted(md.get('label', {})),
+            }
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Hammerspace
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Following the assimilation of a cp -a or rsync destination until it is done
+
+Rather than walking the whole destination tree, the share's
+assimilation_details are polled, with the interval backing off up to a
+ceiling.  Every row of the details that names a path at or below
+the target is taken to be an assimilation of the target.  The rows name
+paths the way the cluster does, not where the client has the share mounted,
+so they are matched against the target's own PATH from the cluster.  It is
+finished once it is in one of FINISHED_STATES, or gone from the details
+after being seen.  A target the details never name, by its server path,
+has nothing left to assimilate, the copy finished before the first poll.
+Only details that can't be read leave the caller to walk the tree.  Progress comes from the
+row's counters, a field with DONE, PROCESSED or COMPLETED in its name
+against one with TOTAL in its name, where the cluster reports them.
+"""
+
+import json
+import time
+
+FINISHED_STATES = ('COMPLETE', 'COMPLETED', 'DONE', 'FINISHED', 'FAILED', 'ERROR', 'CANCELLED')
+_DONE_WORDS = ('DONE', 'PROCESSED', 'COMPLETED')
+
+
+def _rows(value):
+    """ Every object in a details record, nested or not """
+    if isinstance(value, str) and value[:1] in ('{', '['):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return
+    if isinstance(value, dict):
+        yield value
+        for item in value.values():
+            yield from _rows(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _rows(item)
+
+
+def _under(path, target):
+    path = path.strip('"').rstrip('/') or '/'
+    return path == target or path.startswith(target.rstrip('/') + '/')
+
+
+def record_path(record):
+    """ The path in the result record of a PATH eval, None if there isn't one """
+    if isinstance(record, dict):
+        record = record.get('VALUE', record.get('PATH'))
+    if not isinstance(record, str):
+        return None
+    return record.strip().strip('"').rstrip('/') or None
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _counts(row):
+    """ (done, total) from the counters of a details row, None if it has none """
+    done = total = None
+    for key, value in row.items():
+        ukey = key.upper()
+        if total is None and 'TOTAL' in ukey:
+            total = _number(value)
+        elif done is None and any(word in ukey for word in _DONE_WORDS):
+            done = _number(value)
+    if done is None or total is None:
+        return None
+    return done, total
+
+
+def _state(row):
+    for key, value in row.items():
+        if key.upper() in ('STATE', 'STATUS') and isinstance(value, str):
+            return value.strip('"').upper()
+    return None
+
+
+class Progress(object):
+    """
+    The rows naming a target and the assimilations of it still going, with
+    their summed counters
+    """
+
+    def __init__(self, active=0, done=None, total=None, matched=0):
+        self.active = active
+        self.done = done
+        self.total = total
+        self.matched = matched
+
+    @property
+    def finished(self):
+        """ Seen in the details and none still going, no rows at all is unknown """
+        return self.matched > 0 and self.active == 0
+
+
+def assimilation_progress(records, target):
+    """ Progress of target from assimilation_details records """
+    progress = Progress()
+    for record in records:
+        for row in _rows(record):
+            if not any(isinstance(value, str) and _under(value, target) for value in row.values()):
+                continue
+            progress.matched += 1
+            if _state(row) in FINISHED_STATES:
+                continue
+            progress.active += 1
+            counts = _counts(row)
+            if counts is not None:
+                progress.done = (progress.done or 0) + counts[0]
+                progress.total = (progress.total or 0) + counts[1]
+    return progress
+
+
+def format_eta(secs):
+    secs = int(secs)
+    if secs >= 3600:
+        return '%dh%02dm' % (secs // 3600, (secs % 3600) // 60)
+    if secs >= 60:
+        return '%dm%02ds' % (secs // 60, secs % 60)
+    return '%ds' % (secs)
+
+
+class CompletionTracker(object):
+    """
+    Poll until the assimilation of target is finished.  poll(target) returns
+    the assimilation_details records, it raises ValueError if they can't be
+    read, which wait() lets through so the caller can fall back to a walk.
+    A target no row names is finished, listed tells which it was.  Rows are
+    matched against server_target, target as the cluster names it, if given.
+    Progress lines go to out, refreshed in place, if it is given.
+    """
+
+    def __init__(self, target, poll, interval=0.5, max_interval=10.0, backoff=2.0, out=None,
+            clock=time.time, sleep=time.sleep, server_target=None):
+        self.target = target.rstrip('/') or '/'
+        self.server_target = (server_target or target).rstrip('/') or '/'
+        self.poll = poll
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.out = out
+        self.clock = clock
+        self.sleep = sleep
+        self.polls = 0
+        self._first = None
+        self._shown = False
+        self._seen = False
+        self.listed = None
+
+    def check(self):
+        self.polls += 1
+        progress = assimilation_progress(self.poll(self.target), self.server_target)
+        if progress.done is not None and self._first is None:
+            self._first = (self.clock(), progress.done)
+        return progress
+
+    def eta(self, progress):
+        """ Seconds left at the rate seen since the first poll, None if unknown """
+        if self._first is None or progress.done is None or not progress.total:
+            return None
+        start, start_done = self._first
+        elapsed = self.clock() - start
+        if elapsed <= 0 or progress.done <= start_done:
+            return None
+        rate = (progress.done - start_done) / elapsed
+        return max(progress.total - progress.done, 0) / rate
+
+    def format(self, progress):
+        line = 'assimilating %s: %d running' % (self.target, progress.active)
+        if progress.done is not None and progress.total:
+            line += ', %d/%d (%.1f%%)' % (progress.done, progress.total, 100.0 * progress.done / progress.total)
+        eta = self.eta(progress)
+        if eta is not None:
+            line += ', ETA ' + format_eta(eta)
+        return line
+
+    def _show(self, line):
+        if self.out is not None:
+            self.out.write('\r\033[K' + line)
+            self.out.flush()
+            self._shown = True
+
+    def wait(self, timeout=None):
+        """ True once the assimilation is finished, False if timeout ran out first """
+        start = self.clock()
+        interval = self.interval
+        try:
+            while True:
+                progress = self.check()
+                if progress.finished:
+                    return True
+                if progress.active == 0:
+                    # Dropped from the details once done, or done before
+                    # the first poll and never listed
+                    self.listed = self._seen
+                    return True
+                self._seen = True
+                self._show(self.format(progress))
+                wait = interval
+                if timeout is not None:
+                    wait = min(wait, timeout - (self.clock() - start))
+                    if wait <= 0:
+                        return False
+                self.sleep(wait)
+                interval = min(interval * self.backoff, self.max_interval)
+        finally:
+            if self._shown:
+                self.out.write('\r\033[K')
+                self.out.flush()
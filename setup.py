@@ -43,7 +43,7 @@ setup(
     url="https://github.com/hammer-space/hstk",
     entry_points={
         'console_scripts': [
-            'hs=hstk.hscli:cli'
+            'hs=hstk.hsserve:main'
         ]
     },
     classifiers=[
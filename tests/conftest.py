@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import os
+import pathlib
+import pytest
+import hstk.hsgateway as hsgw
+
+
+def _make_tree(root):
+    for dname in ('dir1', 'dir1/sub1', 'dir2'):
+        os.mkdir(os.path.join(root, dname))
+    for fname in ('file1', 'dir1/file2', 'dir1/sub1/file3', 'dir2/file4'):
+        with open(os.path.join(root, fname), 'w') as fd:
+            fd.write(fname)
+
+def _sim_cmd(sim, fname, cmd):
+    fname = pathlib.Path(fname)
+    if fname.is_dir():
+        gw = fname / '.fs_command_gateway 0x1'
+        data = b'./'
+    else:
+        gw = fname.parent / '.fs_command_gateway 0x1'
+        data = b'./' + fname.name.encode()
+    fd = sim.open_write(gw)
+    fd.write(data + cmd.encode() + b'\0' * 50)
+    fd.close()
+    return sim.open_read(gw).read()
+
+@pytest.fixture
+def make_tree():
+    """ Fills a directory with file1, dir1/file2, dir1/sub1/file3 and dir2/file4 """
+    return _make_tree
+
+@pytest.fixture
+def tree(tmp_path):
+    """ tmp_path filled by make_tree """
+    _make_tree(str(tmp_path))
+    return tmp_path
+
+@pytest.fixture
+def sim_cmd():
+    """ Run a hammerscript command on a path through a SimGateway, returns the output """
+    return _sim_cmd
+
+@pytest.fixture
+def use_sim(monkeypatch):
+    """ Have every --gateway given to the cli answer with this transport """
+    def use(sim):
+        monkeypatch.setattr(hsgw, 'gateway_from_spec', lambda spec: sim)
+        return sim
+    return use
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import json
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+import hstk.hsscript as hss
+
+def test_cli_apply(tree, monkeypatch, sim_cmd, use_sim):
+    sim = use_sim(hssim.SimGateway())
+    runner = CliRunner()
+    fname = str(tree / 'file1')
+    manifest = tree / 'manifest.jsonl'
+    manifest.write_text('\n'.join([
+            json.dumps({'path': fname, 'type': 'tag', 'name': 'color', 'value': 'blue', 'flags': 'string'}),
+            json.dumps({'path': fname, 'type': 'attribute', 'name': 'size', 'value': 'big', 'flags': ['string']}),
+            json.dumps({'path': fname, 'type': 'label', 'name': 'x', 'op': 'bogus'}),
+            '{not json',
+        ]) + '\n')
+    res = runner.invoke(hscli.cli, ['--jobs', '2', 'apply', str(manifest)])
+    assert res.exit_code == 1, res.output
+    status = sorted(line.split()[:2] for line in res.output.splitlines())
+    assert status == [['1', 'ok'], ['2', 'ok'], ['3', 'error'], ['4', 'error']]
+    assert sim_cmd(sim, fname, hss.tag_get('color')) == '"blue"\n'
+    assert json.loads(sim_cmd(sim, fname, hss.attribute_list())) == {'size': '"big"'}
+
+    manifest = tree / 'manifest.csv'
+    manifest.write_text('path,type,name,op\n%s,tag,color,delete\n' % (fname))
+    res = runner.invoke(hscli.cli, ['-j', 'apply', str(manifest)])
+    assert res.exit_code == 0, res.output
+    assert json.loads(res.output) == {'row': 2, 'status': 'ok', 'path': fname, 'type': 'tag', 'name': 'color'}
+    assert sim_cmd(sim, fname, hss.tag_has('color')) == 'FALSE\n'
+
+    # Output is passed along, only a command that can't be sent fails its row
+    set_ = sim._set
+    monkeypatch.setattr(sim, '_set', lambda target, mods, args: 'note\n' if 'size' in args else set_(target, mods, args))
+    submit = sim.submit
+    def read_only(gw, data):
+        if b'shape' in data:
+            raise OSError(30, 'Read-only file system')
+        submit(gw, data)
+    monkeypatch.setattr(sim, 'submit', read_only)
+    manifest = tree / 'manifest.jsonl'
+    manifest.write_text('\n'.join([
+            json.dumps({'path': fname, 'type': 'tag', 'name': 'color', 'value': 'red', 'flags': 'string'}),
+            json.dumps({'path': fname, 'type': 'tag', 'name': 'shape', 'value': 'round', 'flags': 'string'}),
+            json.dumps({'path': fname, 'type': 'attribute', 'name': 'size', 'value': 'small', 'flags': 'string'}),
+        ]) + '\n')
+    res = runner.invoke(hscli.cli, ['apply', str(manifest)])
+    assert res.exit_code == 1, res.output
+    assert res.output.splitlines() == ['1 ok %s tag color' % (fname), '2 error %s tag shape: [Errno 30] Read-only file system' % (fname),
+            '3 ok %s attribute size: note' % (fname)]
+
+    # Fields of the wrong type fail their row, not the run
+    manifest.write_text('\n'.join([
+            json.dumps({'path': fname, 'type': 1, 'name': 'color'}),
+            json.dumps({'path': 1, 'type': 'tag', 'name': 'color'}),
+            json.dumps({'path': fname, 'type': 'tag', 'name': 'color', 'flags': [1]}),
+            json.dumps({'path': fname, 'type': 'tag', 'name': 'color', 'op': 'delete'}),
+        ]) + '\n')
+    res = runner.invoke(hscli.cli, ['apply', str(manifest)])
+    assert res.exit_code == 1, res.output
+    assert [ line.split()[1] for line in res.output.splitlines() ] == ['error', 'error', 'error', 'ok']
+    assert 'type must be a string' in res.output and 'path must be a string' in res.output
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import subprocess
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'bench_hstk.py')
+
+def test_bench_quick(tmp_path):
+    output = tmp_path / 'bench.json'
+    subprocess.check_call([sys.executable, BENCH, '--quick', '-o', str(output)])
+    doc = json.loads(output.read_text())
+    groups = set(res['group'] for res in doc['results'])
+    assert groups == {'hsscript', 'startup', 'cli', 'gateway'}
+    assert all(res['value'] > 0 for res in doc['results'])
+    levels = [(res['params']['jobs'], res['params'].get('pipeline', 1)) for res in doc['results'] if res['group'] == 'gateway']
+    assert levels == [(1, 1), (4, 1), (1, 4), (1, 1), (4, 1), (1, 4)]
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import json
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+import hstk.hscatalog as hscatalog
+
+def test_catalog(tmp_path):
+    now = [1000.0]
+    fetches = []
+    def fetch():
+        fetches.append(now[0])
+        return ['vol%d' % (len(fetches))]
+    catalog = hscatalog.Catalog(str(tmp_path), cache_dir=str(tmp_path / 'cache'), ttl=60, clock=lambda: now[0])
+    assert catalog.get('volumes', fetch) == ['vol1']
+    # Another process sees what was cached, until the TTL runs out
+    other = hscatalog.Catalog(str(tmp_path / 'sub'), cache_dir=str(tmp_path / 'cache'), ttl=60, clock=lambda: now[0])
+    assert other.path == catalog.path
+    now[0] += 30
+    assert other.get('volumes', fetch) == ['vol1']
+    assert other.get('sites', lambda: ['site1']) == ['site1']
+    assert catalog.lookup('volumes') == ['vol1'] and catalog.lookup('sites') == ['site1']
+    now[0] += 31
+    assert catalog.get('volumes', fetch) == ['vol2']
+    assert catalog.get('volumes', fetch, refresh=True) == ['vol3']
+    catalog.invalidate(['volumes'])
+    assert catalog.lookup('volumes') is None and catalog.lookup('sites') == ['site1']
+    # A file left by another share or cluster is ignored
+    with open(catalog.path) as fd:
+        data = json.load(fd)
+    data['cluster'] = 'other:/export'
+    with open(catalog.path, 'w') as fd:
+        json.dump(data, fd)
+    assert catalog.lookup('sites') is None
+
+def test_cli_catalog(tmp_path, use_sim):
+    sim = use_sim(hssim.SimGateway())
+    runner = CliRunner()
+    base = ['--catalog-dir', str(tmp_path / 'cache')]
+    res = runner.invoke(hscli.cli, base + ['dump', 'volume_groups', str(tmp_path)])
+    assert res.exit_code == 0, res.output
+    assert res.output == 'vg1\n'
+    evals = sim.op_stats['eval'][0]
+    sim.catalogs['VOLUME_GROUPS.NAME'] = [{'NAME': 'vg2'}]
+    res = runner.invoke(hscli.cli, base + ['-j', 'dump', 'volume_groups', str(tmp_path)])
+    assert json.loads(res.output) == ['vg1'] and sim.op_stats['eval'][0] == evals
+    res = runner.invoke(hscli.cli, base + ['dump', 'volume_groups', '--refresh', str(tmp_path)])
+    assert res.output == 'vg2\n'
+    # Site validation reads the cached list, refreshing it for a name it doesn't have
+    res = runner.invoke(hscli.cli, base + ['keep-on-site', 'available', str(tmp_path)])
+    assert res.output == 'site1\nsite2\n'
+    evals = sim.op_stats['eval'][0]
+    res = runner.invoke(hscli.cli, base + ['keep-on-site', 'add', 'site2', str(tmp_path)])
+    assert res.exit_code == 0, res.output
+    assert sim.op_stats['eval'][0] == evals
+    sim.catalogs['THIS.PARTICIPANTS'].append({'SITE_NAME': 'site3'})
+    res = runner.invoke(hscli.cli, base + ['keep-on-site', 'add', 'site3', str(tmp_path)])
+    assert res.exit_code == 0, res.output
+    res = runner.invoke(hscli.cli, base + ['keep-on-site', 'add', 'site4', str(tmp_path)])
+    assert res.exit_code == 2
+    res = runner.invoke(hscli.cli, base + ['dump', 'clear_catalog', str(tmp_path)])
+    assert res.exit_code == 0, res.output
+    evals = sim.op_stats['eval'][0]
+    res = runner.invoke(hscli.cli, base + ['keep-on-site', 'available', str(tmp_path)])
+    assert res.output == 'site1\nsite2\nsite3\n' and sim.op_stats['eval'][0] == evals + 1
+    res = runner.invoke(hscli.cli, base + ['--catalog-ttl', '0', 'dump', 'objectives', str(tmp_path)])
+    assert res.output == 'keep-online\n'
@@ -2,6 +2,7 @@
 
 import os
 import sys
+import re
 import subprocess as sp
 import logging
 import traceback
@@ -9,10 +10,11 @@ import six
 from click.testing import CliRunner
 import click
 import hstk.hscli as hscli
+import hstk.commands.evaluate as evaluate
 
 log = logging.getLogger(__name__)
 
-MANUAL_TEST_PARAMS = ('interactive', 'input_json', 'exp_stdin', 'exp')
+MANUAL_TEST_PARAMS = ('interactive', 'input_json', 'exp_stdin', 'exp', 'files_from', 'check_exists', 'fan_out')
 
 def test_cli_loads():
     runner = CliRunner()
@@ -94,18 +96,18 @@ def _run_all_args(clickcmd, cliargsbase, cliargssuffix):
         _simple_param(cli, param)
 
 def test_auto_nvd_eval():
-    _run_all_args(hscli.do_eval, '-nvd eval -e THIS', '')
-    _run_all_args(hscli.do_eval, '-nvd eval -e THIS', 'testfile1')
-    _run_all_args(hscli.do_eval, '-nvd eval -e THIS', 'testfile1 testfile2')
+    _run_all_args(evaluate.do_eval, '-nvd eval -e THIS', '')
+    _run_all_args(evaluate.do_eval, '-nvd eval -e THIS', 'testfile1')
+    _run_all_args(evaluate.do_eval, '-nvd eval -e THIS', 'testfile1 testfile2')
 
 def test_nvd_eval_empty():
     # Expect to trigger an error with no -e
     _simple('-nvd eval', expect_exit=2, expect_exception=SystemExit(2))
 
 def test_auto_nvd_eval():
-    _run_all_args(hscli.do_sum, '-nvd sum -e IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE=1}', '')
-    _run_all_args(hscli.do_sum, '-nvd sum -e IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE=1}', 'testfile1')
-    _run_all_args(hscli.do_sum, '-nvd sum -e IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE=1}', 'testfile1 testfile2')
+    _run_all_args(evaluate.do_sum, '-nvd sum -e IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE=1}', '')
+    _run_all_args(evaluate.do_sum, '-nvd sum -e IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE=1}', 'testfile1')
+    _run_all_args(evaluate.do_sum, '-nvd sum -e IS_FILE?SUMS_TABLE{|KEY=OWNER,|VALUE=1}', 'testfile1 testfile2')
 
 def test_nvd_sum_empty():
     # Expect to trigger an error with no -e
@@ -141,11 +143,13 @@ BARE_COMMANDS_KNOWN_TO_FAIL = {
     ( tuple(), 'rm' ): {'expect_exit': 2, 'expect_exception': SystemExit()},
     ( tuple(), 'cp' ): {'expect_exit': 2, 'expect_exception': SystemExit()},
     ( tuple(), 'rsync' ): {'expect_exit': 2, 'expect_exception': SystemExit()},
+    ( ('perf', ), 'report' ): {'expect_exit': 1, 'expect_exception': SystemExit()},
     ( ('dump', ), 'map_file_to_obj' ): {'expect_exit': 2, 'expect_exception': SystemExit()},
     ( ('dump', ), 'files_on_volume' ): {'expect_exit': 2, 'expect_exception': SystemExit()},
     ( ('keep-on-site', ), 'add' ): {'expect_exit': 2, 'expect_exception': SystemExit()},
     ( ('keep-on-site', ), 'has' ): {'expect_exit': 2, 'expect_exception': SystemExit()},
     ( ('keep-on-site', ), 'delete' ): {'expect_exit': 2, 'expect_exception': SystemExit()},
+    ( tuple(), 'apply' ): {'expect_exit': 2, 'expect_exception': SystemExit()},
 }
 
 CMD_ARGS = {
@@ -158,6 +162,7 @@ CMD_ARGS = {
     'rsync': '-a --delete testfile1 testdir2',
     'map_file_to_obj': 'bucketname',
     'files_on_volume': 'volumename',
+    'apply': '-',
 }
 CMD_MANUAL_ARGS = {
     # Note, requires the 'subcommand' to be in CMD_ARGS or test will not be run
@@ -191,7 +196,8 @@ def _check_all_subcommand_groups(parentcmds, clickcmd):
     parentcmds = list(parentcmds) # make a copy
     if clickcmd.name != 'cli':
         parentcmds.append(clickcmd)
-    for subname, subcmd in clickcmd.commands.items():
+    for subname in clickcmd.list_commands(None):
+        subcmd = clickcmd.get_command(None, subname)
         if isinstance(subcmd, click.Group):
             _simple('-nvd ' + ' '.join([cmd.name for cmd in parentcmds]) + ' ' + subname)
             _check_all_subcommand_groups(parentcmds, subcmd)
@@ -247,3 +253,61 @@ def test_nvd_eval_pipe_output():
     res = sp.check_call((hs + ' -nvd eval -e 1 testfile1').split(), stdout=sp.PIPE)
     res = sp.check_call((hs + ' -nvd eval -e 1 testfile1').split(), stderr=sp.PIPE)
     res = sp.check_call((hs + ' -nvd eval -e 1 testfile1').split(), stdout=sp.PIPE, stderr=sp.PIPE)
+
+def test_nvd_jobs_output_order():
+    runner = CliRunner()
+    paths = ['testfile1', 'testfile2', 'testdir1', 'testdir2']
+    res = runner.invoke(hscli.cli, ['-nvd', '--jobs', '3', 'eval', '-e', 'THIS'] + paths)
+    assert res.exit_code == 0, _dump_clirunner_res(res)
+    headers = re.findall(r'##### (\S+)', res.output)
+    assert headers == paths, _dump_clirunner_res(res)
+
+def test_nvd_jobs_invalid():
+    _simple('-nvd --jobs 0 eval -e THIS', expect_exit=2, expect_exception=SystemExit(2))
+
+def test_nvd_stream():
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['-nvd', '--stream', 'eval', '-e', 'THIS', 'testfile1', 'testfile2'])
+    assert res.exit_code == 0, _dump_clirunner_res(res)
+    assert re.findall(r'##### (\S+)', res.output) == ['testfile1', 'testfile2'], _dump_clirunner_res(res)
+    assert res.output.count('dry run output') == 2, _dump_clirunner_res(res)
+
+def test_stream_cmd_chunks(monkeypatch):
+    monkeypatch.setattr(hscli, 'GATEWAY_READ_SIZE', 4)
+    outstream = six.StringIO()
+
+    @click.command()
+    @click.pass_context
+    def _run(ctx):
+        ctx.obj = hscli.HSGlobals(dry_run=True)
+        cmd = hscli.ShadCmd(hscli.hss.eval, {'exp': 'THIS', 'pathnames': ['testfile1'], 'outstream': outstream, 'stream': True})
+        ret = cmd.run()
+        assert list(ret.values()) == [len('dry run output')]
+
+    res = CliRunner().invoke(_run, [])
+    assert res.exit_code == 0, _dump_clirunner_res(res)
+    assert outstream.getvalue() == 'dry run output'
+
+def test_nvd_files_from():
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['-nvd', '--jobs', '2', 'tag', 'set', 'color', '-e', 'blue', '--files-from', '-', '-0', '--check-exists'],
+            input=b'testfile1\0nosuchfile\0testdir1\0')
+    assert res.exit_code == 1, _dump_clirunner_res(res)
+    assert re.findall(r'##### (\S+)', res.output) == ['testfile1', 'testdir1'], _dump_clirunner_res(res)
+
+    with open('filelist', 'w') as fd:
+        fd.write('testfile1\ntestfile2\n')
+    res = runner.invoke(hscli.cli, ['-nvd', 'tag', 'get', 'color', '--files-from', 'filelist'])
+    os.unlink('filelist')
+    assert res.exit_code == 0, _dump_clirunner_res(res)
+    assert re.findall(r'##### (\S+)', res.output) == ['testfile1', 'testfile2'], _dump_clirunner_res(res)
+
+    _simple('-nvd tag get color --files-from - testfile1', expect_exit=2, expect_exception=SystemExit(2))
+
+def test_path_stream_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr(hscli, 'PATH_READ_SIZE', 3)
+    listf = tmp_path / 'list'
+    listf.write_bytes(b'first\r\nsecond path\n\nthird')
+    stream = hscli.PathStream(str(listf))
+    assert stream.peek() == 'first'
+    assert list(stream) == ['first', 'second path', 'third']
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import pytest
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+import hstk.hsscript as hss
+
+def test_client(tree):
+    import hstk
+    client = hstk.Client(gateway='sim:root=%s' % (tree), jobs=4)
+    files = [ str(tree / name) for name in ('file1', 'dir1/file2', 'dir2/file4') ]
+    assert client.eval(files, 'SIZE') == dict((path, [{'VALUE': str(os.path.getsize(path))}]) for path in files)
+    assert client.set('tag', 'color', 'blue', files[:2], string=True) == { files[0]: None, files[1]: None }
+    assert client.get('tag', 'color', files) == { files[0]: [{'VALUE': '"blue"'}], files[1]: [{'VALUE': '"blue"'}], files[2]: [{'VALUE': ''}] }
+    assert client.set('label', 'keep', None, files[0]) == { files[0]: None }
+    assert client.has('label', 'keep', files[0]) == { files[0]: [{'VALUE': 'TRUE'}] }
+    assert client.delete('tag', 'color', files[0]) == { files[0]: None }
+    assert client.get('tag', 'color', files[0]) == { files[0]: [{'VALUE': ''}] }
+    with pytest.raises(ValueError):
+        client.get('label', 'keep', files[0])
+    assert client.sum(str(tree), '1') == { str(tree): [4] }
+    assert len(list(client.eval_iter(str(tree), 'PATH', recursive=True))) == 4
+
+    # Usable from many threads at once, the gateway dirs are only looked up once
+    import threading
+    threads = [ threading.Thread(target=client.eval, args=(files, 'SIZE')) for _ in range(8) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(client.settings.gateway_dirs._dirs) == 4
+
+    os.mkdir(str(tree / 'dest'))
+    assert client.cp_a([str(tree / 'dir1'), files[0]], str(tree / 'dest')) == { str(tree / 'dir1'): None, files[0]: None }
+    assert sorted(os.listdir(str(tree / 'dest'))) == ['dir1', 'file1']
+    with pytest.raises(ValueError):
+        client.cp_a([files[0]], str(tree / 'dest'))
+    assert client.rm_rf([str(tree / 'dest'), str(tree / 'nosuch')]) == { str(tree / 'dest'): None }
+    assert not os.path.exists(str(tree / 'dest'))
+    assert client.transport.op_stats['rm-rf'][0] == 1
+
+    dry = hstk.Client(dry_run=True)
+    assert dry.eval(files[0], 'SIZE') == { files[0]: [] }
+    assert dry.set('tag', 'color', 'red', files[0]) == { files[0]: None }
+    assert hstk.Client.from_env({'HS_JOBS': '3', 'HS_GATEWAY': 'sim'}).settings.jobs == 3
+
+def test_client_dry_run_logs(tree, capsys, caplog):
+    import logging
+    import hstk
+    path = str(tree / 'file1')
+    with caplog.at_level(logging.INFO, logger='hstk'):
+        assert hstk.Client(dry_run=True).eval(path, 'SIZE') == { path: [] }
+    assert capsys.readouterr().out == ''
+    assert any(msg.startswith('N: ') for msg in caplog.messages)
+
+    # No expression is a ValueError for the library, not an exit
+    settings = hscli.HSGlobals(transport=hssim.SimGateway())
+    cmd = hscli.ShadCmd(hss.eval, {'pathnames': [path], 'outstream': None}, settings=settings)
+    with pytest.raises(ValueError):
+        cmd.run()
+
+def test_client_wait_server_paths(tree):
+    import hstk
+    client = hstk.Client(gateway='sim:root=%s,export=/exports/share' % (tree))
+    polls = []
+    value = client.transport._value
+    def details(path, exp):
+        if exp.strip().upper() != 'ASSIMILATION_DETAILS':
+            return value(path, exp)
+        polls.append(path)
+        state = 'RUNNING' if len(polls) < 2 else 'COMPLETE'
+        return json.dumps({'ASSIMILATIONS_TABLE': [{'PATH': '/exports/share/dir2', 'STATE': state}]})
+    client.transport._value = details
+    assert client.wait(str(tree / 'dir2'))
+    assert len(polls) == 2 and 'sum' not in client.transport.op_stats
+    # Not in the details, finished before the first poll
+    polls[:] = []
+    assert client.wait(str(tree / 'dir1'))
+    assert len(polls) == 1 and 'sum' not in client.transport.op_stats
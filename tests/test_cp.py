@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+import os
+import pathlib
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+
+def test_cli_cp_many(tree, monkeypatch, use_sim):
+    sim = use_sim(hssim.SimGateway(root=str(tree)))
+    runner = CliRunner()
+    # Single source into a new directory copies its entries
+    res = runner.invoke(hscli.cli, ['cp', '-a', str(tree / 'dir1'), str(tree / 'copy')])
+    assert res.exit_code == 0, res.output
+    assert sorted(os.listdir(str(tree / 'copy'))) == ['file2', 'sub1']
+
+    archive = tree / 'archive'
+    archive.mkdir()
+    # Only a command that couldn't be sent is an error, answers are passed on
+    cp_a = sim._cp_a
+    monkeypatch.setattr(sim, '_cp_a', lambda src, ino: 'queued\n' if src.name == 'dir1' else cp_a(src, ino))
+    submit = sim.submit
+    def no_space(gw, data):
+        if pathlib.Path(gw).parent.name == 'dir2':
+            raise OSError(28, 'No space left on device')
+        submit(gw, data)
+    monkeypatch.setattr(sim, 'submit', no_space)
+    res = runner.invoke(hscli.cli, ['--jobs', '3', 'cp', '-a', '--no-wait', str(tree / 'dir1'), str(tree / 'dir2'),
+            str(tree / 'file1'), str(archive)])
+    assert res.exit_code == 1, res.output
+    assert 'cp -a of path %s: No space left on device' % (tree / 'dir2') in res.output
+    assert 'queued\n' in res.output
+    assert '1 of 3 offloaded copies failed' in res.output
+    assert sorted(os.listdir(str(archive))) == ['file1']
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import os
+import json
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+import hstk.hsfanout as hsfanout
+
+def test_fan_out_subtrees(tree):
+    rel = lambda paths: [ os.path.relpath(path, str(tree)) for path in paths ]
+    assert rel(hsfanout.subtrees(str(tree), 1)) == ['dir1', 'dir2', 'file1']
+    assert rel(hsfanout.subtrees(str(tree), 2)) == ['dir1/file2', 'dir1/sub1', 'dir2/file4', 'file1']
+    assert hsfanout.subtrees(str(tree / 'file1'), 2) == [str(tree / 'file1')]
+
+def test_cli_fan_out(tree):
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['--gateway', 'sim', 'sum', '--fan-out', '2', '-e', 'SIZE', str(tree)])
+    assert res.exit_code == 0, res.output
+    assert json.loads(res.output) == {'1FILE': 4, 'SPACE_USED': sum(len(f) for f in ('file1', 'dir1/file2', 'dir1/sub1/file3', 'dir2/file4'))}
+    res = runner.invoke(hscli.cli, ['--gateway', 'sim', 'eval', '--fan-out', '1', '-e', 'SIZE', str(tree)])
+    assert res.exit_code == 0, res.output
+    assert sorted(res.output.splitlines()) == sorted(runner.invoke(hscli.cli, ['--gateway', 'sim', 'eval', '-r', '-e', 'SIZE', str(tree)]).output.splitlines())
+    res = runner.invoke(hscli.cli, ['--gateway', 'sim', 'sum', '--fan-out', '1', '--nonfiles', '-e', '1', str(tree)])
+    assert res.exit_code == 2
+    # Only counts and sums add up across subtrees
+    for exp in ('MAX(SIZE)', 'min(SIZE)', 'SIZE/AVG(SIZE)', 'TOP10_TABLE{SIZE}', 'SIZE_HISTOGRAM'):
+        res = runner.invoke(hscli.cli, ['--gateway', 'sim', 'sum', '--fan-out', '1', '-e', exp, str(tree)])
+        assert res.exit_code == 2 and 'can not be combined' in res.output, exp
+    hsfanout.check_additive('SUMS_TABLE{|::KEY="max", |::VALUE=1}')
+
+def test_cli_fan_out_numeric_keys(tree, use_sim):
+    # SUMS_TABLE{|KEY=OWNER,|VALUE=1} per subtree, with uids for KEY
+    sim = use_sim(hssim.SimGateway())
+    def sums(target, mods, exp):
+        counts = {}
+        for path in sim._walk(target, True):
+            key = 1000 if 'dir1' in path.parts else 0
+            counts[key] = counts.get(key, 0) + 1
+        return json.dumps({'SUMS_TABLE': [ {'KEY': key, 'VALUE': count} for key, count in sorted(counts.items()) ]}) + '\n'
+    sim._sum = sums
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['sum', '--fan-out', '2', '-e', 'SUMS_TABLE{|KEY=OWNER,|VALUE=1}', str(tree)])
+    assert res.exit_code == 0, res.output
+    assert sorted(json.loads(res.output)['SUMS_TABLE'], key=lambda row: row['KEY']) == [{'KEY': 0, 'VALUE': 2}, {'KEY': 1000, 'VALUE': 2}]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import shutil
+import pytest
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+import hstk.hsscript as hss
+
+# The cluster answers with its own share paths, the index keeps client ones
+@pytest.mark.parametrize('export', [None, '/exports/share'])
+def test_cli_index(tmp_path, make_tree, sim_cmd, use_sim, export):
+    share = tmp_path / 'share'
+    share.mkdir()
+    make_tree(str(share))
+    sim = use_sim(hssim.SimGateway(root=str(share), export=export))
+    db = str(tmp_path / 'index.sqlite')
+    runner = CliRunner()
+    for fname in ('file1', 'dir1/sub1/file3'):
+        sim_cmd(sim, share / fname, hss.tag_set('color', hss.HSExp('blue', string=True)))
+    sim_cmd(sim, share / 'dir2' / 'file4', hss.keyword_add('urgent'))
+
+    res = runner.invoke(hscli.cli, ['index', 'build', '--db', db, str(share)])
+    assert res.exit_code == 0, res.output
+    assert 'indexed 8 inodes' in res.output
+
+    def query(*args):
+        res = runner.invoke(hscli.cli, ['index', 'query', '--db', db] + list(args))
+        assert res.exit_code == 0, res.output
+        return [ os.path.relpath(line, str(share)) for line in res.output.splitlines() ]
+
+    assert query('--tag', 'color=blue') == ['dir1/sub1/file3', 'file1']
+    assert query('--tag', 'color=red') == []
+    assert query('--tag', 'color', '--under', str(share / 'dir1')) == ['dir1/sub1/file3']
+    assert query('--keyword', 'urgent') == ['dir2/file4']
+    assert len(query('--volume', 'sim-volume')) == 4
+
+    res = runner.invoke(hscli.cli, ['-j', 'index', 'query', '--db', db, '--keyword', 'urgent'])
+    rec = json.loads(res.output)
+    assert rec['size'] == len('dir2/file4')
+    assert rec['metadata'] == [{'type': 'keyword', 'name': 'urgent', 'value': None}]
+
+    # Rebuilding replaces the share's entries
+    sim_cmd(sim, share / 'file1', hss.tag_del('color', force=False))
+    res = runner.invoke(hscli.cli, ['index', 'build', '--db', db, str(share)])
+    assert query('--tag', 'color') == ['dir1/sub1/file3']
+    res = runner.invoke(hscli.cli, ['-j', 'index', 'list', '--db', db])
+    assert [s['inodes'] for s in json.loads(res.output)['shares']] == [8]
+
+# The cluster answers with its own share paths, the index keeps client ones
+@pytest.mark.parametrize('export', [None, '/exports/share'])
+def test_cli_index_refresh(tmp_path, make_tree, sim_cmd, use_sim, export):
+    share = tmp_path / 'share'
+    share.mkdir()
+    make_tree(str(share))
+    sim = use_sim(hssim.SimGateway(root=str(share), export=export))
+    db = str(tmp_path / 'index.sqlite')
+    runner = CliRunner()
+
+    def query(*args):
+        res = runner.invoke(hscli.cli, ['index', 'query', '--db', db, '--files'] + list(args))
+        assert res.exit_code == 0, res.output
+        return [ os.path.relpath(line, str(share)) for line in res.output.splitlines() ]
+
+    def refresh():
+        res = runner.invoke(hscli.cli, ['-j', 'index', 'refresh', '--db', db, str(share)])
+        assert res.exit_code == 0, res.output
+        return json.loads(res.output)
+
+    # Never built, falls back to a full build
+    assert refresh()['inodes'] == 8
+    assert refresh()['changed'] == []
+
+    (share / 'dir1' / 'new').write_text('new')
+    shutil.rmtree(str(share / 'dir2'))
+    (share / 'dir1' / 'sub1' / 'sub2').mkdir()
+    (share / 'dir1' / 'sub1' / 'sub2' / 'deep').write_text('deep')
+    sim.op_stats.clear()
+    res = refresh()
+    # PATH of the share, its directories twice, then one recursive dump each
+    # for the changed share and the new sub2, not one per file
+    assert sim.op_stats['eval'][0] == 5
+    assert res['changed'] == [str(share), str(share / 'dir1'), str(share / 'dir1' / 'sub1')]
+    assert res['added'] == [str(share / 'dir1' / 'sub1' / 'sub2')]
+    assert res['removed'] == [str(share / 'dir2')]
+    assert query() == ['dir1/file2', 'dir1/new', 'dir1/sub1/file3', 'dir1/sub1/sub2/deep', 'file1']
+
+    # Tags only come along with changed directories
+    sim_cmd(sim, share / 'dir1' / 'new', hss.tag_set('color', hss.HSExp('red', string=True)))
+    refresh()
+    assert query('--tag', 'color') == []
+    (share / 'dir1' / 'another').write_text('another')
+    refresh()
+    assert query('--tag', 'color=red') == ['dir1/new']
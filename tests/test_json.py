@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import click
+import pytest
+import hstk.hscli as hscli
+import hstk.hsjson as hsjson
+import hstk.hsfanout as hsfanout
+import hstk.hssim as hssim
+
+def _chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def test_table_rows():
+    rows = [{'NAME': 'vol%d' % i, 'OTHER': [1, {'x': 'a ]} b'}]} for i in range(200)]
+    doc = json.dumps({'STORAGE_VOLUMES_TABLE': rows}, indent=4)
+    for size in (1, 5, 64, len(doc)):
+        assert list(hsjson.iter_json_records(_chunked(doc, size))) == rows
+
+def test_mixed_records():
+    text = '{"A_TABLE": [1, 2]}\n{"SIZE": 5}\n12\n"str"\n{"B_TABLE": []}\n345'
+    for size in (1, 3, len(text)):
+        assert list(hsjson.iter_json_records(_chunked(text, size))) == [1, 2, {'SIZE': 5}, 12, 'str', 345]
+
+def test_table_name():
+    decoder = hsjson.JSONRecordDecoder()
+    assert decoder.feed('{"PARTICIPANTS_TABLE": [{"SITE_NAME": "a"},') == [{'SITE_NAME': 'a'}]
+    assert decoder.table == 'PARTICIPANTS_TABLE'
+    assert decoder.feed('{"SITE_NAME": "b"}]}') == [{'SITE_NAME': 'b'}]
+    assert decoder.close() == []
+
+def test_bad_input():
+    for text in ('{"A_TABLE": [1, 2', '{"SIZE": ', 'dry run output', '{"A_TABLE": [1], "B": 2}'):
+        with pytest.raises(ValueError):
+            list(hsjson.iter_json_records(_chunked(text, 4)))
+
+def test_hs_eval_iter(tmp_path):
+    for dname in ('dir1', 'dir2'):
+        os.mkdir(str(tmp_path / dname))
+        with open(str(tmp_path / dname / 'file'), 'w') as fd:
+            fd.write('data')
+    ctx = click.Context(hscli.cli, obj=hscli.HSGlobals(transport=hssim.SimGateway()))
+    with ctx:
+        res = list(hscli.hs_eval_iter(exp='PATH', recursive=True, pathnames=[str(tmp_path)]))
+    assert sorted(rec['PATH'] for _, rec in res) == [str(tmp_path / 'dir1' / 'file'), str(tmp_path / 'dir2' / 'file')]
+    assert all(path == tmp_path for path, _ in res)
+    ctx = click.Context(hscli.cli, obj=hscli.HSGlobals(dry_run=True))
+    with ctx:
+        assert list(hscli.hs_sum_iter(exp='1', pathnames=[str(tmp_path)])) == []
+
+def test_sum_merger():
+    merger = hsfanout.SumMerger()
+    for text in ('{"1FILE": 2, "SPACE_USED": 10}\n{"SUMS_TABLE": [{"KEY": "a", "1FILE": 1}, {"KEY": "b", "1FILE": 1}]}',
+                 '{"1FILE": 3, "SPACE_USED": 5}\n{"SUMS_TABLE": [{"KEY": "b", "1FILE": 4}]}'):
+        for table, record in hsjson.iter_json_records(_chunked(text, 7), with_table=True):
+            merger.add(table, record)
+    assert merger.results() == [{'1FILE': 5, 'SPACE_USED': 15},
+                                {'SUMS_TABLE': [{'KEY': 'a', '1FILE': 1}, {'KEY': 'b', '1FILE': 5}]}]
+    # Numeric keys, like OWNER uids, still tell rows apart
+    merger = hsfanout.SumMerger()
+    for rows in ([{'KEY': 0, 'VALUE': 3}, {'KEY': 1000, 'VALUE': 2}], [{'KEY': 1000, 'VALUE': 1}]):
+        for row in rows:
+            merger.add('SUMS_TABLE', row)
+    assert merger.results() == [{'SUMS_TABLE': [{'KEY': 0, 'VALUE': 3}, {'KEY': 1000, 'VALUE': 3}]}]
+    with pytest.raises(ValueError):
+        hsfanout.merge_values({'NAME': 'x'}, {'NAME': 'y'})
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import subprocess as sp
+from click.testing import CliRunner
+import hstk.hscli as hscli
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _loaded_modules(code):
+    """ Run code in a fresh interpreter, return the modules it loaded """
+    code += '\nimport sys\nprint("\\n".join(sorted(sys.modules)))\n'
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([SRC_DIR] + [p for p in [env.get('PYTHONPATH')] if p])
+    out = sp.check_output([sys.executable, '-c', code], env=env)
+    return set(out.decode().split())
+
+def _command_modules(mods):
+    return set(m for m in mods if m.startswith('hstk.commands.'))
+
+def test_import_builds_no_commands():
+    mods = _loaded_modules('import hstk.hscli as hscli\nassert len(hscli.cli.commands) == 0')
+    assert _command_modules(mods) == set()
+    # hs runs through hstk.hsserve:main
+    mods = _loaded_modules('import hstk.hsserve\nimport hstk.hscli as hscli\nassert len(hscli.cli.commands) == 0')
+    assert _command_modules(mods) == set()
+
+def test_subcommand_imports_only_its_module():
+    mods = _loaded_modules('import hstk.hscli as hscli\nhscli.cli.get_command(None, "tag").get_command(None, "get")')
+    assert _command_modules(mods) == set(['hstk.commands.tag'])
+
+def test_lazy_aliases_and_prefixes():
+    assert hscli.cli.get_command(None, 'attrs').name == 'attribute'
+    assert hscli.cli.get_command(None, 'rekog').name == 'rekognition-tag'
+    assert hscli.cli.get_command(None, 'keep-on-sites').name == 'keep-on-site'
+    assert hscli.cli.get_command(None, 'tag').get_command(None, 'del').name == 'delete'
+    assert hscli.cli.get_command(None, 'nosuchcommand') is None
+
+def test_cmd_tree_loads_all():
+    res = CliRunner().invoke(hscli.cli, ['--cmd-tree'])
+    assert res.exit_code == 0
+    for name in hscli.cli.list_commands(None):
+        assert ' %s ' % (name) in res.output
+
+def test_completion_table_current():
+    import hstk.hscomplete as hscomplete
+    from hstk.hscomplete_table import TABLE
+    assert hscomplete.build_table(hscli.cli) == TABLE, 'run: python -m hstk.hscomplete > hstk/hscomplete_table.py'
+
+def _complete(words, cword, tmp_path, shell='bash'):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([SRC_DIR] + [p for p in [env.get('PYTHONPATH')] if p])
+    env.update(_HS_COMPLETE=shell + '_complete', COMP_WORDS=words, COMP_CWORD=str(cword), HS_CATALOG_DIR=str(tmp_path / 'cache'))
+    code = 'import sys\ntry:\n    import hstk.hsserve as s\n    s.main()\nfinally:\n    sys.stderr.write(" ".join(sorted(sys.modules)))\n'
+    proc = sp.run([sys.executable, '-c', code], env=env, cwd=str(tmp_path), stdout=sp.PIPE, stderr=sp.PIPE)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.decode().splitlines(), set(proc.stderr.decode().split())
+
+def test_fast_completion(tmp_path):
+    import hstk.hscatalog as hscatalog
+    catalog = hscatalog.Catalog(str(tmp_path), cache_dir=str(tmp_path / 'cache'))
+    catalog.get('sites', lambda: ['site1', 'site2', 'other'])
+    catalog.get('volumes', lambda: ['vol1', 'vol:2'])
+    out, mods = _complete('hs keep-on-site a', 2, tmp_path)
+    assert out == ['plain,add', 'plain,available']
+    assert 'hstk.hscli' not in mods and 'click' not in mods
+    out, mods = _complete('hs -n keep-on-sites add s', 4, tmp_path)
+    assert out == ['plain,site1', 'plain,site2']
+    out, mods = _complete('hs --jobs 4 tag get --re', 5, tmp_path)
+    assert 'plain,--recursive' in out
+    out, mods = _complete('hs rsync -a --delete src ', 5, tmp_path)
+    assert out == ['file,']
+    out, mods = _complete('hs ta', 'ta', tmp_path, shell='fish')
+    assert out == ['plain,tag\t[sub] inode metadata: schema no, value yes']
+    out, mods = _complete('hs dump files_on_volume ', 3, tmp_path, shell='zsh')
+    assert out == ['plain', 'vol1', '_', 'plain', 'vol\\:2', '_']
+    out, mods = _complete('hs dump files_on_volume vol1 ', 4, tmp_path)
+    assert out == ['dir,']
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import os
+import pytest
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hslimit as hslimit
+
+def test_adaptive_concurrency():
+    ac = hslimit.AdaptiveConcurrency(floor=2, ceiling=8, target_latency=1.0)
+    assert ac.allowed == 2
+    for _ in range(10):
+        ac.acquire()
+        ac.release(0.1)
+    assert ac.allowed == 8
+    ac.acquire()
+    ac.release(5.0)
+    assert ac.allowed == 4
+    # One cut per window of round trips
+    ac.acquire()
+    ac.release(5.0)
+    assert ac.allowed == 4
+    for _ in range(5):
+        ac.acquire()
+        ac.release(0.1)
+    assert ac.allowed == 5
+    for _ in range(20):
+        ac.acquire()
+        ac.release(0.1, error=True)
+    assert ac.allowed == 2 and ac.errors == 20
+    with pytest.raises(ValueError):
+        hslimit.AdaptiveConcurrency(floor=4, ceiling=2)
+
+def test_cli_adaptive(tree):
+    runner = CliRunner()
+    paths = [str(tree / 'file1'), str(tree / 'dir1' / 'file2')] * 4
+    res = runner.invoke(hscli.cli, ['-v', '--gateway', 'sim', '--jobs', '4', '--adaptive', '--min-jobs', '2', 'eval', '-e', 'SIZE'] + paths)
+    assert res.exit_code == 0, res.output
+    assert 'adaptive concurrency: 8 round trips, 0 errors' in res.output
+    res = runner.invoke(hscli.cli, ['--jobs', '2', '--adaptive', '--min-jobs', '3', 'eval', '-e', 'SIZE'] + paths)
+    assert res.exit_code == 2
+    # Without --jobs the ceiling is what the command runs at once, not 1
+    res = runner.invoke(hscli.cli, ['-v', '--gateway', 'sim', '--adaptive', '--pipeline', '4', 'eval', '-e', 'SIZE'] + paths)
+    assert res.exit_code == 0, res.output
+    assert 'range 1-4' in res.output
+    res = runner.invoke(hscli.cli, ['-v', '--gateway', 'sim', '--adaptive', 'rm', '-rf', str(tree / 'dir1')])
+    assert res.exit_code == 0, res.output
+    assert 'range 1-8' in res.output
+    ac = hslimit.AdaptiveConcurrency(floor=2, ceiling=None)
+    ac.fit(1)
+    assert ac.ceiling == 2
+    ac.fit(6)
+    assert ac.ceiling == 6
+
+def test_token_bucket(tmp_path):
+    bucket = hslimit.TokenBucket(10, burst=2)
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert 0.05 < bucket.reserve() <= 0.1
+    # Two processes' worth of buckets on the same file share one budget
+    state = str(tmp_path / 'bucket')
+    one = hslimit.SharedTokenBucket(state, 10, burst=2)
+    two = hslimit.SharedTokenBucket(state, 10, burst=2)
+    assert one.reserve() == 0 and two.reserve() == 0
+    assert 0.05 < one.reserve() <= 0.1
+    assert 0.15 < two.reserve() <= 0.2
+
+def test_share_rate_limit_roots(tree, monkeypatch):
+    limit = hslimit.ShareRateLimit(ops=1000, roots_size=2)
+    lookups = []
+    share_root = hslimit.share_root
+    monkeypatch.setattr(hslimit, 'share_root', lambda path: lookups.append(path) or share_root(path))
+    monkeypatch.setattr(hslimit.os.path, 'isdir', lambda path: pytest.fail('isdir(%s) per op' % (path)))
+    paths = [ str(tree / name) for name in ('file1', 'dir1', 'dir1/file2') ]
+    for path in paths[:2] * 3:
+        limit.op(path)
+        limit.data(path, 10)
+    assert lookups == paths[:2]
+    # Bounded, the least recently used path is looked up again
+    limit.op(paths[2])
+    limit.op(paths[0])
+    assert lookups == paths + paths[:1]
+    assert len(limit._roots) == 2
+
+def test_cli_rate_limit(tree):
+    runner = CliRunner()
+    paths = [str(tree / 'file1')] * 24
+    res = runner.invoke(hscli.cli, ['-v', '--gateway', 'sim', '--jobs', '4', '--max-ops', '20', '--rate-state', str(tree / 'state'),
+            'eval', '-e', 'SIZE'] + paths)
+    assert res.exit_code == 0, res.output
+    waited = float(res.output.split('rate limit: waited ')[1].split('s')[0])
+    assert waited > 0.1
+    assert len(os.listdir(str(tree / 'state'))) == 1
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import pytest
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+import hstk.hsperf as hsperf
+import hstk.hsperfstore as hsperfstore
+
+def test_stats_ring():
+    ring = hsperf.StatsRing(3)
+    stats = {'OP_STATS_TABLE': [{'name': 'read', 'op_count': 10, 'op_time': 100, 'func_stats': [{'name': 'f', 'op_count': 1, 'op_time': 1}]},
+                                {'name': 'write', 'op_count': 5, 'op_time': 50}]}
+    assert ring.add(hsperf.Sample(0.0, hsperf.op_counters([{'VALUE': json.dumps(stats)}]))) is None
+    assert set(ring.samples[0].ops) == {'read', 'write'}
+    deltas = ring.add(hsperf.Sample(1.0, {'read': hsperf.OpCounters(20, 200), 'write': hsperf.OpCounters(5, 50)}))
+    assert [(d.name, d.rate, d.avg) for d in deltas] == [('read', 10.0, 10.0), ('write', 0.0, 0.0)]
+    # read doubles its rate and write restarts its counters on the server
+    deltas = ring.add(hsperf.Sample(2.0, {'read': hsperf.OpCounters(40, 500), 'write': hsperf.OpCounters(2, 40)}))
+    read, write = deltas
+    assert (read.rate, read.rate_change, read.avg, read.avg_change) == (20.0, 10.0, 15.0, 5.0)
+    assert (write.count, write.time) == (2, 40)
+    assert [d.name for d in hsperf.top_movers(deltas)] == ['read', 'write']
+    assert len(ring.samples) == 3 and len(ring.intervals) == 2
+
+def test_cli_perf_watch(tmp_path, use_sim):
+    sim = use_sim(hssim.SimGateway())
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['-j', 'perf', 'watch', '--interval', '0.1', '--count', '2', str(tmp_path)])
+    assert res.exit_code == 0, res.output
+    lines = [ json.loads(line) for line in res.output.splitlines() ]
+    assert len(lines) == 2
+    assert lines[1]['share'] == str(tmp_path)
+    # Each sample is one eval, counted by the time the next one is answered
+    assert [ (op['name'], op['count']) for op in lines[1]['ops'] ] == [('eval', 1)]
+    assert not os.path.exists(str(tmp_path / '.stats'))
+    assert sim.metadata == {}
+    res = runner.invoke(hscli.cli, ['perf', 'watch', '--interval', '0.1', '--count', '1', str(tmp_path)])
+    assert res.exit_code == 0, res.output
+    assert res.output.startswith('##### %s' % (tmp_path)) and 'eval' in res.output
+
+def test_perf_store(tmp_path):
+    store = hsperfstore.PerfStore(str(tmp_path / 'store'), max_size=hsperfstore.RECORD.size * 512, coarse=2.0, segments=2)
+    for i in range(1000):
+        # reads go from 2 to 4 time units each at 1800
+        ops = {'read': hsperf.OpCounters(i * 10, i * 20 + max(i - 800, 0) * 20), 'write': hsperf.OpCounters(i, i)}
+        store.append(hsperf.Sample(1000.0 + i, ops))
+    # Full segments were downsampled to a sample every 2s and the oldest removed to stay in max_size
+    segments = store.segments()
+    assert len(segments) > 1 and segments[0] > 0
+    whens = [ sample.when for sample in store.samples() ]
+    assert whens == sorted(whens) and whens[-1] == 1999.0
+    assert whens[0] > 1000.0 and 2.0 in [ b - a for a, b in zip(whens, whens[1:]) ]
+    # Bisected to the window, the running totals give exact counts across downsampled gaps
+    samples = list(store.samples(since=1700.0, until=1900.0))
+    assert samples[0].when >= 1700.0 and samples[-1].when <= 1900.0
+    first, last, ops = hsperfstore.summarize(samples)
+    assert ops['read'].count == (last - first) * 10
+    assert set(ops['read'].histogram) == {2, 4}
+    assert hsperfstore.summarize(samples[:1]) is None
+    assert hsperfstore.parse_time('2h', now=10000.0) == 2800.0
+    assert hsperfstore.parse_time('1500') == 1500.0
+    with pytest.raises(ValueError):
+        hsperfstore.parse_time('yesterday')
+
+def test_perf_store_shared_ops(tmp_path):
+    # Two recorders on one share number their ops from the same file
+    one = hsperfstore.PerfStore(str(tmp_path / 'store'))
+    two = hsperfstore.PerfStore(str(tmp_path / 'store'))
+    os.makedirs(one.path)
+    assert one.names == [] and two.names == []
+    assert one._op('read') == 0
+    assert two._op('write') == 1
+    assert one._op('write') == 1 and two._op('read') == 0
+    assert (tmp_path / 'store' / 'ops').read_text() == 'read\nwrite\n'
+
+def test_cli_perf_record(tmp_path, use_sim):
+    sim = use_sim(hssim.SimGateway())
+    store = str(tmp_path / 'store')
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['perf', 'record', '--store', store, '--interval', '0.1', '--count', '4', str(tmp_path)])
+    assert res.exit_code == 0, res.output
+    # The first sample has no ops yet, each one after counts the eval before it
+    res = runner.invoke(hscli.cli, ['-j', 'perf', 'report', '--store', store, '--since', '1h', str(tmp_path)])
+    assert res.exit_code == 0, res.output
+    report = json.loads(res.output)
+    assert [ (op['name'], op['count']) for op in report['ops'] ] == [('eval', 2)]
+    res = runner.invoke(hscli.cli, ['perf', 'report', '--store', store, '--until', '1h', str(tmp_path)])
+    assert res.exit_code == 1
+    res = runner.invoke(hscli.cli, ['perf', 'report', '--store', store, '--since', 'later', str(tmp_path)])
+    assert res.exit_code == 2
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+import hstk.hsscript as hss
+import hstk.hslimit as hslimit
+
+def test_pipeline(tree, monkeypatch):
+    import time
+    files = [ tree / name for name in ('file1', 'dir1/file2', 'dir1/sub1/file3', 'dir2/file4', 'dir1') ]
+    # Windows clients pad the commands, the padding must survive being written ahead
+    monkeypatch.setattr(hscli, 'WIN_PADDING', b'\0' * 50)
+    sim = hssim.SimGateway(latency=0.2)
+    settings = hscli.HSGlobals(jobs=1, transport=sim, pipeline=len(files))
+    cmd = hscli.ShadCmd(hss.eval, {'exp': 'NAME', 'pathnames': files, 'outstream': None}, settings=settings)
+    start = time.monotonic()
+    results = list(cmd.iter_results())
+    assert time.monotonic() - start < 0.6
+    assert [ path for path, _ in results ] == files
+    assert [ lines for _, lines in results ] == [ [path.name + '\n'] for path in files ]
+
+    # --adaptive only lets it write ahead while there is room
+    settings.pipeline = 3
+    settings.concurrency = hslimit.AdaptiveConcurrency(floor=2, ceiling=2, target_latency=10)
+    sim.latency = 0.0
+    cmd = hscli.ShadCmd(hss.eval, {'exp': 'NAME', 'pathnames': files, 'outstream': None}, settings=settings)
+    assert [ lines for _, lines in cmd.iter_results() ] == [ [path.name + '\n'] for path in files ]
+    assert settings.concurrency.in_flight == 0 and settings.concurrency.completed == len(files)
+
+    # Dropped part way, the rest are read back and their slots given up
+    cmd = hscli.ShadCmd(hss.eval, {'exp': 'NAME', 'pathnames': files, 'outstream': None}, settings=settings)
+    results = cmd.iter_results()
+    next(results)
+    results.close()
+    assert settings.concurrency.in_flight == 0 and sim._results == {}
+
+def test_cli_pipeline(tree):
+    files = [ str(tree / name) for name in ('file1', 'dir1/file2', 'dir2/file4') ]
+    res = CliRunner().invoke(hscli.cli, ['-n', '--pipeline', '2', 'eval', '-e', 'SIZE'] + files)
+    assert res.exit_code == 0, res.output
+    ops = [ line.split('(')[0] for line in res.output.splitlines() if line.startswith('N: ') ]
+    assert ops[:9] == ['N: open', 'N: write', 'N: flush', 'N: close', 'N: open', 'N: write', 'N: flush', 'N: close', 'N: open']
+    assert res.output.count('dry run output') == 3
+
+    res = CliRunner().invoke(hscli.cli, ['--gateway', 'sim', '--pipeline', '4', 'eval', '-e', 'NAME'] + files)
+    assert res.exit_code == 0, res.output
+    assert [ line for line in res.output.splitlines() if not line.startswith('#####') ] == ['file1', 'file2', 'file4']
+
+def test_cli_eval_recursive_jobs(tree, monkeypatch, use_sim):
+    sim = use_sim(hssim.SimGateway())
+    spooled = []
+    orig = hscli.ShadCmd.iter_spooled
+    monkeypatch.setattr(hscli.ShadCmd, 'iter_spooled', lambda self: spooled.append(self.jobs) or orig(self))
+    dirs = [ str(tree / 'dir1'), str(tree / 'dir2') ]
+    res = CliRunner().invoke(hscli.cli, ['--gateway', 'sim', '--jobs', '2', 'eval', '-r', '-e', 'NAME'] + dirs)
+    assert res.exit_code == 0, res.output
+    assert spooled == [2]
+    assert res.output.splitlines()[0] == '##### ' + dirs[0]
+    assert len([ line for line in res.output.splitlines() if line.endswith(': file3') ]) == 1
+
+    res = CliRunner().invoke(hscli.cli, ['--gateway', 'sim', '--pipeline', '2', 'eval', '-r', '-e', 'NAME'] + dirs)
+    assert res.exit_code == 2 and '--pipeline' in res.output
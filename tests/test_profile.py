@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import json
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+import hstk.hsscript as hss
+import hstk.hsprofile as hsprof
+
+def test_cli_profile(tree):
+    runner = CliRunner()
+    paths = [str(tree / 'file1'), str(tree / 'dir1' / 'file2')]
+    trace = tree / 'trace.json'
+    res = runner.invoke(hscli.cli, ['--gateway', 'sim', '--jobs', '2', '--profile', '--profile-trace', str(trace), 'eval', '-e', 'SIZE'] + paths)
+    assert res.exit_code == 0, res.output
+    table = [line.split() for line in res.output.splitlines() if line.startswith('eval ')]
+    assert [row[1] for row in table] == list(hsprof.PHASES)
+    assert all(row[2] == '2' for row in table)
+    trace = json.loads(trace.read_text())
+    assert sorted(rt['path'] for rt in trace['round_trips']) == sorted(paths)
+    assert set(trace['round_trips'][0]['phases_ms']) == set(hsprof.PHASES)
+    assert trace['summary']['eval']['read']['count'] == 2
+
+def test_profile_percentile():
+    values = list(range(1, 101))
+    assert hsprof.percentile(values, 50) == 50
+    assert hsprof.percentile(values, 99) == 99
+    assert hsprof.percentile([7], 95) == 7
+    assert hsprof.percentile([], 50) == 0.0
+
+def test_round_trip_after_slot(tree):
+    import time
+
+    class SlowSlot(object):
+        def __enter__(self):
+            time.sleep(0.3)
+            return self
+        def __exit__(self, *exc):
+            return False
+        def try_enter(self):
+            return False
+        def ready(self):
+            pass
+
+    files = [ tree / 'file1', tree / 'dir1' / 'file2' ]
+    settings = hscli.HSGlobals(transport=hssim.SimGateway(), profile=hsprof.GatewayProfile(), pipeline=2)
+    cmd = hscli.ShadCmd(hss.eval, {'exp': 'NAME', 'pathnames': files, 'outstream': None}, settings=settings)
+    cmd.in_flight = SlowSlot
+    # Waiting for a slot is not counted in the round trip, whichever way it is sent
+    cmd.run_cmd(files[0])
+    list(cmd.iter_cmd_chunks(files[0]))
+    list(cmd.iter_pipelined())
+    assert len(settings.profile.round_trips) == 4
+    for rt in settings.profile.round_trips:
+        assert rt.phases['open'] < 0.2
+
+def test_profile_bounded():
+    profile = hsprof.GatewayProfile(keep=10, samples=20)
+    for i in range(1000):
+        rt = profile.round_trip('eval', 'file%d' % (i))
+        rt.phases['read'] = (i + 1) / 1000.0
+    assert len(profile.round_trips) == 10
+    assert len(profile._folded['eval']['read'].samples) == 20
+    stats = profile.summary()['eval']['read']
+    assert stats['count'] == 1000
+    assert stats['max'] == 1000.0
+    assert 0 < stats['p50'] <= stats['p95'] <= stats['p99'] <= 1000.0
+    assert [ rt['path'] for rt in profile.trace()['round_trips'] ] == [ 'file%d' % (i) for i in range(990, 1000) ]
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import os
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+
+def test_cli_rm(tree, monkeypatch, use_sim):
+    sim = use_sim(hssim.SimGateway())
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['rm', '-rf', str(tree / 'dir1'), str(tree / 'file1')])
+    assert res.exit_code == 0, res.output
+    assert sorted(os.listdir(str(tree))) == ['dir2']
+    # rmdir errors are reported per path, the rest still get removed
+    monkeypatch.setattr(sim, '_rm_rf', lambda target: '')
+    (tree / 'empty').mkdir()
+    res = runner.invoke(hscli.cli, ['rm', '-rf', str(tree / 'dir2'), str(tree / 'empty')])
+    assert res.exit_code == 1
+    assert "rm: cannot remove '%s'" % (tree / 'dir2') in res.output
+    assert sorted(os.listdir(str(tree))) == ['dir2']
+
+def test_cli_rm_nested(tree, monkeypatch, use_sim):
+    sim = use_sim(hssim.SimGateway())
+    runner = CliRunner()
+    # Paths inside another target go with it rather than racing it
+    res = runner.invoke(hscli.cli, ['rm', '-rf', str(tree / 'dir1'), str(tree / 'dir1' / 'file2'), str(tree / 'dir1' / 'sub1'), str(tree / 'dir1')])
+    assert res.exit_code == 0, res.output
+    assert sim.op_stats['rm-rf'][0] == 1
+    assert sorted(os.listdir(str(tree))) == ['dir2', 'file1']
+    # Gone by the time it is removed is fine with --force
+    rm_rf = sim._rm_rf
+    def rm_rf_and_file1(target):
+        os.unlink(str(tree / 'file1'))
+        return rm_rf(target)
+    monkeypatch.setattr(sim, '_rm_rf', rm_rf_and_file1)
+    res = runner.invoke(hscli.cli, ['--jobs', '1', 'rm', '-rf', str(tree / 'dir2'), str(tree / 'file1')])
+    assert res.exit_code == 0, res.output
+    assert os.listdir(str(tree)) == []
+
+def test_cli_default_jobs(tree, monkeypatch, use_sim):
+    import hstk.commands.files as files
+    sim = use_sim(hssim.SimGateway())
+    used = []
+    pool_map = files.ordered_pool_map
+    monkeypatch.setattr(files, 'ordered_pool_map', lambda func, items, jobs: used.append(jobs) or pool_map(func, items, jobs))
+    runner = CliRunner()
+    # rm has its own default, an explicit --jobs 1 is honoured
+    res = runner.invoke(hscli.cli, ['rm', '-rf', str(tree / 'dir1')])
+    assert res.exit_code == 0, res.output
+    res = runner.invoke(hscli.cli, ['--jobs', '1', 'rm', '-rf', str(tree / 'dir2')])
+    assert res.exit_code == 0, res.output
+    res = runner.invoke(hscli.cli, ['--jobs', '3', 'rm', '-rf', str(tree / 'file1')])
+    assert res.exit_code == 0, res.output
+    assert used == [files.RM_JOBS, 1, 3]
+    assert hscli.HSGlobals().jobs_or(5) == 5 and hscli.HSGlobals(jobs=1).jobs_or(5) == 1
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import os
+import json
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+
+def test_cli_rsync_pairs(tree, use_sim):
+    sim = use_sim(hssim.SimGateway(root=str(tree)))
+    pairs = tree / 'pairs'
+    pairs.write_text('# src<TAB>dest\n%s\t%s/\n\n%s\t%s\n%s\t%s\nno tab here\n' % (
+            tree / 'file1', tree / 'out1',
+            tree / 'dir2', tree / 'out2',
+            tree / 'missing', tree / 'out3'))
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['--jobs', '2', 'rsync', '-a', '--delete', '--pairs-from', str(pairs)])
+    assert res.exit_code == 1, res.output
+    lines = res.output.splitlines()
+    assert lines[0] == '2 ok %s %s/' % (tree / 'file1', tree / 'out1')
+    assert lines[1] == '4 ok %s %s' % (tree / 'dir2', tree / 'out2')
+    assert lines[2].startswith('5 error %s' % (tree / 'missing')) and 'does not exist' in lines[2]
+    assert lines[3].startswith('6 error') and 'SRC<TAB>DEST' in lines[3]
+    assert os.listdir(str(tree / 'out1')) == ['file1']
+    assert os.path.isdir(str(tree / 'out2' / 'dir2'))
+
+    res = runner.invoke(hscli.cli, ['-j', 'rsync', '-a', '--delete', '--pairs-from', '-'],
+            input='%s\t%s/\n' % (tree / 'dir1' / 'file2', tree / 'out1'))
+    assert res.exit_code == 0, res.output
+    assert json.loads(res.output) == {'row': 1, 'status': 'ok', 'src': str(tree / 'dir1' / 'file2'), 'dest': str(tree / 'out1') + '/'}
+
+    # A directory made for one pair is there for the next, not stale from the stat of all pairs up front
+    res = runner.invoke(hscli.cli, ['rsync', '-a', '--delete', '--pairs-from', '-'],
+            input='%s\t%s\n%s\t%s\n' % (tree / 'dir1', tree / 'out4', tree / 'dir2', tree / 'out4'))
+    assert res.exit_code == 0, res.output
+    assert sorted(os.listdir(str(tree / 'out4'))) == ['dir1', 'dir2']
+
+    # Pairs come from arguments or the file, not both
+    res = runner.invoke(hscli.cli, ['rsync', '-a', '--delete', '--pairs-from', str(pairs), str(tree / 'file1'), str(tree / 'out1')])
+    assert res.exit_code == 2
+    res = runner.invoke(hscli.cli, ['rsync', '-a', '--delete'])
+    assert res.exit_code == 2
+
+def test_cli_rsync_same_inode_slash(tree):
+    # The VERSION check is looked up by the paths as given, trailing / and all
+    runner = CliRunner()
+    src = str(tree / 'dir1') + '/'
+    res = runner.invoke(hscli.cli, ['-n', 'rsync', '-a', '--delete', src, str(tree / 'dir1')])
+    assert res.exit_code == 0, res.output
+    res = runner.invoke(hscli.cli, ['-n', 'rsync', '-a', '--delete', '--pairs-from', '-'],
+            input='%s\t%s\n' % (src, tree / 'dir1'))
+    assert res.exit_code == 0, res.output
+
+def test_sim_rsync_versions(tree, use_sim):
+    os.mkdir(str(tree / '.snapshot'))
+    os.symlink(str(tree), str(tree / '.snapshot' / 'current'))
+    snap = str(tree / '.snapshot' / 'current' / 'dir1')
+    sim = use_sim(hssim.SimGateway(root=str(tree)))
+    runner = CliRunner()
+    # Restoring the current version onto itself does nothing
+    res = runner.invoke(hscli.cli, ['rsync', '-a', '--delete', snap + '/', str(tree / 'dir1')])
+    assert res.exit_code == 0, res.output
+    assert sim.op_stats['eval'][0] == 2 and 'cp-a' not in sim.op_stats
+    # Nothing is restored to a snapshot
+    res = runner.invoke(hscli.cli, ['rsync', '-a', '--delete', str(tree / 'dir1') + '/', snap])
+    assert res.exit_code == 2
+    assert 'can not restore TO a snapshot' in res.output
+    assert 'cp-a' not in sim.op_stats
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import os
+import signal
+import sys
+import time
+import subprocess as sp
+import pytest
+import hstk.hsserve as hsserve
+
+pytestmark = pytest.mark.skipif(not hsserve.supported(), reason="hs serve needs unix sockets and fork")
+
+HS_CLIENT = [sys.executable, '-c', 'import hstk.hsserve as s; s.main()']
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env(sock):
+    env = dict(os.environ)
+    env['HS_SOCKET'] = sock
+    env['HS_DAEMON'] = '1'
+    env['PYTHONPATH'] = os.pathsep.join([SRC_DIR] + [p for p in [env.get('PYTHONPATH')] if p])
+    return env
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    os.chmod(str(tmp_path), 0o700)
+    sock = str(tmp_path / 'hs.sock')
+    env = _env(sock)
+    proc = sp.Popen([sys.executable, '-c', 'import hstk.hsserve as s; s.serve()'], env=env)
+    for i in range(100):
+        if os.path.exists(sock):
+            break
+        time.sleep(0.05)
+    yield env
+    proc.terminate()
+    proc.wait()
+
+
+def test_serve_forward(daemon, tmp_path):
+    (tmp_path / 'testfile1').write_text('testfile1')
+    res = sp.run(HS_CLIENT + ['-nvd', 'eval', '-e', '1', 'testfile1'], env=daemon, cwd=str(tmp_path),
+            stdout=sp.PIPE, stderr=sp.PIPE)
+    assert res.returncode == 0, res.stderr
+    assert b'dry run output' in res.stdout
+    assert b"?.eval 1" in res.stdout
+
+def test_serve_exit_status(daemon, tmp_path):
+    res = sp.run(HS_CLIENT + ['-nvd', 'eval'], env=daemon, cwd=str(tmp_path), stdout=sp.PIPE, stderr=sp.PIPE)
+    assert res.returncode == 2
+    assert b'Must provide expression' in res.stderr or b'No expression' in res.stderr
+
+def test_serve_stale_socket(tmp_path):
+    env = _env(str(tmp_path / 'missing.sock'))
+    (tmp_path / 'testfile1').write_text('testfile1')
+    res = sp.run(HS_CLIENT + ['-nvd', 'eval', '-e', '1', 'testfile1'], env=env, cwd=str(tmp_path), stdout=sp.PIPE)
+    assert res.returncode == 0
+    assert b'dry run output' in res.stdout
+
+def _start(args, env, cwd):
+    return sp.Popen(HS_CLIENT + args, env=env, cwd=str(cwd), stdout=sp.PIPE, stderr=sp.PIPE)
+
+def test_serve_concurrent_and_signals(daemon, tmp_path):
+    (tmp_path / 'testfile1').write_text('testfile1')
+    slow = _start(['--gateway', 'sim:latency=30', 'eval', '-e', '1', 'testfile1'], daemon, tmp_path)
+    time.sleep(0.5)
+    # The slow command doesn't hold up the next one
+    start = time.monotonic()
+    res = sp.run(HS_CLIENT + ['--gateway', 'sim', 'eval', '-e', '1', 'testfile1'], env=daemon, cwd=str(tmp_path),
+            stdout=sp.PIPE, stderr=sp.PIPE, timeout=20)
+    assert res.returncode == 0, res.stderr
+    assert time.monotonic() - start < 20
+    assert slow.poll() is None
+    # SIGTERM reaches the command in the daemon, not only the client
+    slow.send_signal(signal.SIGTERM)
+    out, err = slow.communicate(timeout=20)
+    assert slow.returncode == 128 + signal.SIGTERM, err
+
+def test_serve_opt_in(daemon, monkeypatch):
+    monkeypatch.setenv('HS_SOCKET', daemon['HS_SOCKET'])
+    monkeypatch.delenv('HS_NO_DAEMON', raising=False)
+    monkeypatch.delenv('HS_DAEMON', raising=False)
+    assert not hsserve._should_forward(['eval'])
+    monkeypatch.setenv('HS_DAEMON', '1')
+    assert hsserve._should_forward(['eval'])
+    assert not hsserve._should_forward(['serve'])
+
+def test_serve_untrusted_socket(daemon, tmp_path):
+    assert hsserve.trusted_socket(daemon['HS_SOCKET'])
+    os.chmod(str(tmp_path), 0o777)
+    try:
+        assert not hsserve.trusted_socket(daemon['HS_SOCKET'])
+        (tmp_path / 'testfile1').write_text('testfile1')
+        res = sp.run(HS_CLIENT + ['-nvd', 'eval', '-e', '1', 'testfile1'], env=daemon, cwd=str(tmp_path), stdout=sp.PIPE)
+        assert res.returncode == 0
+        assert b'dry run output' in res.stdout
+        with pytest.raises(PermissionError):
+            hsserve.forward(['eval'], daemon['HS_SOCKET'])
+    finally:
+        os.chmod(str(tmp_path), 0o700)
+
+def test_serve_socket_dir(tmp_path):
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    os.chmod(str(shared), 0o777)
+    with pytest.raises(RuntimeError):
+        hsserve.serve(str(shared / 'hs.sock'))
+    hsserve._check_socket_dir(str(tmp_path / 'new' / 'hs.sock'))
+    assert (tmp_path / 'new').stat().st_mode & 0o777 == 0o700
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import pytest
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hsgateway as hsgw
+import hstk.hssim as hssim
+import hstk.hsscript as hss
+
+def test_sim_eval(tree, sim_cmd):
+    sim = hssim.SimGateway()
+    assert sim_cmd(sim, tree / 'file1', hss.eval(hss.HSExp('VERSION'))) == '1\n'
+    out = sim_cmd(sim, tree, hss.eval(hss.HSExp('SIZE'), recursive=True))
+    assert len(out.splitlines()) == 4
+    out = sim_cmd(sim, tree, hss.eval(hss.HSExp('PATH'), recursive=True, json=True))
+    assert len([json.loads(line) for line in out.splitlines()]) == 4
+
+def test_sim_payload(tree, sim_cmd):
+    sim = hssim.SimGateway(payload=100)
+    out = sim_cmd(sim, tree, hss.eval(hss.HSExp('1'), recursive=True))
+    assert all(len(line) == 100 for line in out.splitlines())
+
+def test_sim_sum(tree, sim_cmd):
+    sim = hssim.SimGateway()
+    assert sim_cmd(sim, tree, hss.sum(hss.HSExp('1'))) == '4\n'
+    assert sim_cmd(sim, tree, hss.sum(hss.HSExp('1'), nonfiles=True)) == '3\n'
+
+def test_sim_tags(tree, sim_cmd):
+    sim = hssim.SimGateway()
+    fname = tree / 'file1'
+    assert sim_cmd(sim, fname, hss.tag_set('color', hss.HSExp('blue'))) == ''
+    assert sim_cmd(sim, fname, hss.tag_get('color')) == '"blue"\n'
+    assert sim_cmd(sim, fname, hss.tag_has('color')) == 'TRUE\n'
+    sim_cmd(sim, fname, hss.tag_del('color', force=False))
+    assert sim_cmd(sim, fname, hss.tag_has('color')) == 'FALSE\n'
+    sim_cmd(sim, fname, hss.attribute_set('size', hss.HSExp('big')))
+    assert json.loads(sim_cmd(sim, fname, hss.attribute_list())) == {'size': 'big'}
+
+def test_sim_cp_rm(tree, sim_cmd):
+    sim = hssim.SimGateway(root=str(tree))
+    dest_inode = os.stat(str(tree / 'dir2')).st_ino
+    assert sim_cmd(sim, tree / 'dir1', hss.cp_a(dest_inode=dest_inode)) == ''
+    assert (tree / 'dir2' / 'dir1' / 'sub1' / 'file3').exists()
+    assert sim_cmd(sim, tree / 'dir1', hss.rm_rf()) == ''
+    assert os.listdir(str(tree / 'dir1')) == []
+
+def test_sim_inode_info(tree, sim_cmd):
+    sim = hssim.SimGateway()
+    info = json.loads(sim_cmd(sim, tree / 'file1', hss.inode_info()))
+    assert info['INODE'] == os.stat(str(tree / 'file1')).st_ino
+
+def test_sim_cp_a_search_bounded(tree, monkeypatch):
+    sim = hssim.SimGateway()
+    walked = []
+    walk = os.walk
+    monkeypatch.setattr(hssim.os, 'walk', lambda top: walked.append(top) or walk(top))
+    dest = tree / 'dir1' / 'sub1'
+    assert sim._cp_a(tree / 'dir1' / 'file2', dest.stat().st_ino) == ''
+    assert (dest / 'file2').exists()
+    assert walked == [str(tree / 'dir1')]
+    # Outside the command's directory needs root
+    assert 'not found' in sim._cp_a(tree / 'dir1' / 'file2', (tree / 'dir2').stat().st_ino)
+
+def test_gateway_from_spec():
+    assert isinstance(hsgw.gateway_from_spec('file'), hsgw.FileGateway)
+    sim = hsgw.gateway_from_spec('sim:latency=0.5,payload=10')
+    assert sim.latency == 0.5 and sim.payload == 10
+    for spec in ('bogus', 'sim:speed=1', 'sim:latency=fast', 'file:x=1'):
+        with pytest.raises(ValueError):
+            hsgw.gateway_from_spec(spec)
+
+def test_cli_sim_gateway(tree):
+    runner = CliRunner()
+    paths = [str(tree / 'file1'), str(tree / 'dir1' / 'file2')]
+    res = runner.invoke(hscli.cli, ['--gateway', 'sim', '--jobs', '2', 'eval', '-e', 'SIZE'] + paths)
+    assert res.exit_code == 0, res.output
+    assert res.output == '##### %s\n5\n##### %s\n10\n' % tuple(paths)
+    res = runner.invoke(hscli.cli, ['--gateway', 'bogus', 'eval', '-e', 'SIZE'] + paths)
+    assert res.exit_code == 2
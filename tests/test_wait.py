@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import pytest
+from click.testing import CliRunner
+import hstk.hscli as hscli
+import hstk.hssim as hssim
+import hstk.hswait as hswait
+
+def test_completion_tracker():
+    details = [
+        [{'ASSIMILATIONS': [{'PATH': '/share/dest/a', 'STATE': 'RUNNING', 'FILES_DONE': 0, 'FILES_TOTAL': 100},
+                            {'PATH': '/share/other', 'STATE': 'RUNNING'}]}],
+        [{'VALUE': json.dumps([{'PATH': '/share/dest/a', 'STATE': 'RUNNING', 'FILES_DONE': 50, 'FILES_TOTAL': 100}])}],
+        [{'PATH': '/share/dest/a', 'STATE': 'COMPLETE'}],
+    ]
+    now = [0.0]
+    sleeps = []
+    def sleep(secs):
+        sleeps.append(secs)
+        now[0] += secs
+    out = io.StringIO()
+    tracker = hswait.CompletionTracker('/share/dest/', lambda target: details.pop(0), interval=1, out=out,
+            clock=lambda: now[0], sleep=sleep)
+    assert tracker.wait() is True
+    assert sleeps == [1, 2]
+    assert '50/100 (50.0%), ETA 1s' in out.getvalue()
+    # No rows for the target is unknown, not finished
+    assert not hswait.assimilation_progress([{'PATH': '/share/other'}], '/share/dest').finished
+    # but a target never listed is done by the time wait() looks
+    unknown = hswait.CompletionTracker('/share/dest', lambda target: [{'PATH': '/share/other'}], clock=lambda: now[0], sleep=sleep)
+    assert unknown.wait() is True and unknown.listed is False
+    never = hswait.CompletionTracker('/share/dest', lambda target: [{'PATH': '/share/dest'}], clock=lambda: now[0], sleep=sleep)
+    assert never.wait(timeout=5) is False
+    # Seen running, then dropped from the details
+    details = [ [{'PATH': '/share/dest', 'STATE': 'RUNNING'}], [] ]
+    dropped = hswait.CompletionTracker('/share/dest', lambda target: details.pop(0), clock=lambda: now[0], sleep=sleep)
+    assert dropped.wait() is True and dropped.listed is True
+    def unreadable(target):
+        raise ValueError('bad JSON')
+    with pytest.raises(ValueError):
+        hswait.CompletionTracker('/share/dest', unreadable, clock=lambda: now[0], sleep=sleep).wait()
+
+def test_cli_wait_server_paths(tree, monkeypatch, use_sim):
+    # The cluster names paths by its export, not the client's mount point
+    sim = use_sim(hssim.SimGateway(root=str(tree), export='/exports/share'))
+    polls = []
+    value = sim._value
+    def details(path, exp):
+        if exp.strip().upper() != 'ASSIMILATION_DETAILS':
+            return value(path, exp)
+        polls.append(path)
+        state = 'RUNNING' if len(polls) < 2 else 'COMPLETE'
+        return json.dumps({'ASSIMILATIONS_TABLE': [{'PATH': '/exports/share/dir2', 'STATE': state}]})
+    monkeypatch.setattr(sim, '_value', details)
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['wait', str(tree / 'dir2')])
+    assert res.exit_code == 0, res.output
+    assert len(polls) == 2 and 'sum' not in sim.op_stats
+    # Not in the details at all, finished before the first poll, no walk
+    polls[:] = []
+    res = runner.invoke(hscli.cli, ['wait', str(tree / 'dir1')])
+    assert res.exit_code == 0, res.output
+    assert len(polls) == 1 and 'sum' not in sim.op_stats
+
+def test_cli_wait_walk_timeout(tree, monkeypatch, use_sim):
+    import time
+    import hstk.commands.files as files
+    sim = use_sim(hssim.SimGateway())
+    def unreadable(path):
+        raise ValueError('bad JSON')
+    monkeypatch.setattr(files, '_assimilation_details', unreadable)
+    sum_ = sim._sum
+    def slow_sum(target, mods, exp):
+        time.sleep(1)
+        return sum_(target, mods, exp)
+    monkeypatch.setattr(sim, '_sum', slow_sum)
+    runner = CliRunner()
+    # Unreadable details walk the tree, within --timeout
+    start = time.monotonic()
+    res = runner.invoke(hscli.cli, ['wait', '--timeout', '0.2', str(tree / 'dir1')])
+    assert res.exit_code == 1
+    assert time.monotonic() - start < 0.9
+    res = runner.invoke(hscli.cli, ['wait', str(tree / 'dir1')])
+    assert res.exit_code == 0, res.output
+    time.sleep(1)
+    assert sim.op_stats['sum'][0] == 2
+
+def test_cli_cp_wait(tree, use_sim):
+    sim = use_sim(hssim.SimGateway(root=str(tree)))
+    runner = CliRunner()
+    res = runner.invoke(hscli.cli, ['cp', '-a', str(tree / 'dir1'), str(tree / 'file1'), str(tree / 'dir2')])
+    assert res.exit_code == 0, res.output
+    assert (tree / 'dir2' / 'dir1' / 'sub1' / 'file3').exists()
+    res = runner.invoke(hscli.cli, ['cp', '-a', '--no-wait', str(tree / 'dir1' / 'sub1'), str(tree / 'dir2')])
+    assert res.exit_code == 0, res.output
+    assert 'hs wait %s' % (tree / 'dir2') in res.output
+    res = runner.invoke(hscli.cli, ['wait', '--timeout', '5', str(tree / 'dir2')])
+    assert res.exit_code == 0, res.output